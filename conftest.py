@@ -1,6 +1,111 @@
 import os
-from hypothesis import settings, Verbosity
+from pathlib import Path
+from typing import Optional
+
+import pytest
+from hypothesis import HealthCheck, settings, Verbosity
+
+from scripts.utils.chain_cache import ChainCache, is_chain_cache_enabled, register_fixtures
+from scripts.utils.dev_node import get_development_network_port, is_node_listening
+from scripts.utils.in_process_evm import InProcessEVM, is_in_process_evm_enabled
+from scripts.utils.tracing import TRACER, get_trace_output_path
+from scripts.utils.workers import configure_worker_network, is_xdist_worker
+from tests.soak import SOAK_BATCH_EXAMPLES, SOAK_PROFILE, SOAK_STATEFUL_STEP_COUNT, SOAK_STATS
 
 settings.register_profile("smoke", max_examples=5)
 settings.register_profile("debug", max_examples=10, verbosity=Verbosity.verbose)
+# time-budgeted, see tests/soak.py: max_examples is the size of a batch
+settings.register_profile(
+    SOAK_PROFILE,
+    max_examples=SOAK_BATCH_EXAMPLES,
+    stateful_step_count=SOAK_STATEFUL_STEP_COUNT,
+    deadline=None,
+    suppress_health_check=[HealthCheck.too_slow, HealthCheck.filter_too_much],
+)
 settings.load_profile(os.getenv("HYPOTHESIS_PROFILE", "default"))
+
+CHAIN_CACHE: Optional[ChainCache] = None
+IN_PROCESS_EVM: Optional[InProcessEVM] = None
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config):
+    global CHAIN_CACHE, IN_PROCESS_EVM
+    config.addinivalue_line(
+        "markers", "requires_node: needs the external development node (HTTP endpoint, full traces), skipped otherwise"
+    )
+    if config.getoption("--network", default=None):
+        return
+
+    if config.getoption("numprocesses", default=None) and not is_xdist_worker():
+        # xdist controller, only the workers connect, each to its own development node (brownie shifts the port).
+        # The chain cache is provisioned once, here, the workers start their nodes on copies of it.
+        configure_worker_network(worker_count=config.getoption("numprocesses"))
+        if is_chain_cache_enabled():
+            chain_cache: ChainCache = ChainCache()
+            if not chain_cache.is_provisioned:
+                chain_cache.provision()
+        return
+
+    configure_worker_network()
+
+    if is_in_process_evm_enabled():
+        # brownie only connects to the development network if it's not connected yet
+        IN_PROCESS_EVM = InProcessEVM()
+        IN_PROCESS_EVM.connect()
+        return
+
+    if not is_chain_cache_enabled():
+        return
+    if is_node_listening(get_development_network_port()):
+        # brownie attaches to the running node, it's not ours to replace
+        return
+
+    # started before brownie connects to the development network, so that it attaches to it
+    CHAIN_CACHE = ChainCache()
+    CHAIN_CACHE.start()
+
+
+def pytest_unconfigure(config):
+    if CHAIN_CACHE is not None:
+        CHAIN_CACHE.stop()
+    if IN_PROCESS_EVM is not None:
+        IN_PROCESS_EVM.disconnect()
+
+
+def pytest_collection_modifyitems(config, items):
+    if not is_in_process_evm_enabled():
+        return
+
+    skip: pytest.MarkDecorator = pytest.mark.skip(reason="requires the external development node")
+    for item in items:
+        if "requires_node" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def chain_cache_fixtures():
+    if CHAIN_CACHE is not None:
+        register_fixtures(CHAIN_CACHE.read_manifest())
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    # the time of a test not covered by the spans of its steps is spent in the test body or in hypothesis itself
+    with TRACER.span(item.nodeid, category="test"):
+        yield
+
+
+def pytest_sessionfinish(session, exitstatus):
+    trace_output_path: Optional[Path] = get_trace_output_path()
+    if trace_output_path is None:
+        return
+
+    TRACER.write_chrome_trace(trace_output_path)
+    print(f"\n\nSlowest spans (trace written to {trace_output_path}):\n{TRACER.format_summary()}")
+
+
+def pytest_terminal_summary(terminalreporter):
+    if SOAK_STATS.batches:
+        terminalreporter.write_sep("=", "soak")
+        terminalreporter.write_line(SOAK_STATS.format_summary())
@@ -26,6 +26,23 @@ struct TokenAmountInfo {
     uint256 tokenAmount;
 }
 
+/// @notice Per PaymentRequest flags. Kept in a struct so that they are packed into a single storage slot, which is
+/// already warm by the time pay() checks whether intermediate events should be emitted.
+struct PaymentRequestFlags {
+    bool isEnabled;
+    // if set, pay() only emits PaymentRequestPaid, skipping the events of the intermediate payment stages
+    bool isLeanEvents;
+}
+
+/// @notice Stage of pay() at which a payment failed. The order mirrors PaymentFailedAt.ALL in scripts/utils/contants.py.
+enum PaymentStage {
+    PP,
+    TA,
+    PPA,
+    PR,
+    TOKEN_BALANCE_OR_APPROVAL
+}
+
 // in the context below, "PaymentRequest" can be in place of ERC-721 and vice-versa.
 /// @notice PaymentRequest represents a request for a payment, to be paid by some party.
 contract PaymentRequest is ERC721Enumerable {
@@ -44,22 +61,22 @@ contract PaymentRequest is ERC721Enumerable {
 
     event PaymentRequestCreated(
         uint256 indexed paymentRequestId,
-        address creator,
-        address from,
+        address indexed creator,
+        address indexed from,
         bool isStatic
     );
 
     event PaymentPreconditionPassed(
         uint256 indexed paymentRequestId,
-        address token,
-        address payer
+        address indexed token,
+        address indexed payer
     );
 
     event TokenAmountObtained(
         uint256 indexed PaymentRequestId,
-        address token,
+        address indexed token,
         uint256 amount,
-        address payer,
+        address indexed payer,
         bool isStatic
     );
 
@@ -69,18 +86,50 @@ contract PaymentRequest is ERC721Enumerable {
         uint256 receiptId
     );
 
+    // at most three topics can be indexed, the token is left out since the payer and payee are the most common filters
     event PaymentRequestPaid(
         uint256 indexed paymentRequestId,
         uint256 receiptId,
         address token,
         uint256 amuont,
-        address payer,
-        address payee
+        address indexed payer,
+        address indexed payee
     );
 
     
     event PaymentRequestEnabled(uint256 indexed paymentRequestId);
     event PaymentRequestDisabled(uint256 indexed paymentRequestId);
+    event PaymentRequestClosed(uint256 indexed paymentRequestId);
+    event PaymentRequestEventModeChanged(uint256 indexed paymentRequestId, bool isLeanEvents);
+
+    // Errors raised by pay(). Each one of them maps to a single PaymentStage, which allows to identify where a payment
+    // failed from the revert data alone (see scripts/utils/errors.py).
+    error PaymentRequestNotEnabled(uint256 paymentRequestId);
+    error PayerNotAllowed(uint256 paymentRequestId, address payer);
+    error PaymentPreconditionNotMet(uint256 paymentRequestId, address payer);
+    error TokenNotAccepted(uint256 paymentRequestId, address token);
+    error TokenTransferFailed(uint256 paymentRequestId, address token);
+    error TokenIndexOutOfBounds(uint256 paymentRequestId, uint256 tokenIndex);
+    error UnsupportedPackedPaymentFlags(uint256 paymentRequestId, uint256 flags);
+    /// @notice An external call performed by pay() reverted. reason contains the revert data of that call.
+    error PaymentStageReverted(uint256 paymentRequestId, PaymentStage stage, bytes reason);
+
+    // Errors raised outside of pay()
+    error NotPaymentRequestOwner(uint256 paymentRequestId, address caller);
+    error RestrictedPaymentRequestCannotBeEnabled(uint256 paymentRequestId);
+    error TokenAmountNotStatic(uint256 paymentRequestId);
+    error TokenAmountNotDynamic(uint256 paymentRequestId);
+    error EmptyTokenAmounts();
+    error DuplicateTokenAmount(uint256 paymentRequestId, address token);
+    error PaymentRequestIsClosed(uint256 paymentRequestId);
+
+    // Layout of the single word accepted by payPacked(). The PaymentRequest ID is stored in the lowest 128 bits,
+    // the index of the token in tokenIdToAcceptedStaticTokens in the following 64 bits, and the flags in the
+    // highest 64 bits. No flags are defined yet, so they must be zero.
+    uint256 internal constant PACKED_PAYMENT_REQUEST_ID_MASK = type(uint128).max;
+    uint256 internal constant PACKED_TOKEN_INDEX_OFFSET = 128;
+    uint256 internal constant PACKED_TOKEN_INDEX_MASK = type(uint64).max;
+    uint256 internal constant PACKED_FLAGS_OFFSET = 192;
 
     using Counters for Counters.Counter;
     Counters.Counter private _tokenId;
@@ -93,11 +142,19 @@ contract PaymentRequest is ERC721Enumerable {
     mapping(uint256 => address) internal tokenIdToPostPaymentAction;
     mapping(uint256 => address) internal tokenIdToPaymentPrecondition;
     mapping(uint256 => address) internal tokenIdToDynamicTokenAmount;
-    mapping(uint256 => bool) internal tokenIdToEnabled;
+    mapping(uint256 => PaymentRequestFlags) internal tokenIdToFlags;
     // If set, the Payment Request is a request for payment for a specific address, i.e. the payment is requested
     // from a specific address.
     mapping(uint256 => address) internal tokenIdToFrom;
     mapping(address => uint256[]) internal tokenIdsRequestedFrom;
+    // position of the Payment Request in tokenIdsRequestedFrom, allows to remove it when it's closed
+    mapping(uint256 => uint256) internal tokenIdToRequestedFromIndex;
+
+    // Running aggregates, updated on every payment. They allow to query the payment totals of a PaymentRequest
+    // without scanning all of its Receipts.
+    mapping(uint256 => uint256) internal tokenIdToNumPayments;
+    // only kept for static token amounts, since only then the set of accepted tokens is known
+    mapping(uint256 => mapping(address => uint256)) internal tokenIdToTotalCollected;
 
     constructor(
         string memory name,
@@ -118,67 +175,107 @@ contract PaymentRequest is ERC721Enumerable {
 
     // Static/Dynamic Token Amount Distinction
     function isTokenAmountStatic(uint256 paymentRequestId) public view returns(bool) {
-        return tokenIdToDynamicTokenAmount[paymentRequestId] == address(0);
+        _requireNotClosed(paymentRequestId);
+        return _isTokenAmountStatic(paymentRequestId);
     }
 
     function isTokenAmountDynamic(uint256 paymentRequestId) public view returns(bool) {
-        return tokenIdToDynamicTokenAmount[paymentRequestId] != address(0);
+        _requireNotClosed(paymentRequestId);
+        return !_isTokenAmountStatic(paymentRequestId);
     }
 
     function isPaymentPreconditionSet(uint256 paymentRequestId) public view returns(bool) {
+        _requireNotClosed(paymentRequestId);
         return tokenIdToPaymentPrecondition[paymentRequestId] != address(0);
     }
 
     function isPaymentPostActionSet(uint256 paymentRequestId) public view returns(bool) {
+        _requireNotClosed(paymentRequestId);
         return tokenIdToPostPaymentAction[paymentRequestId]  != address(0);
     }
 
+    /// @notice Unchecked version of isTokenAmountStatic(), for pay(). An enabled PaymentRequest is never closed.
+    function _isTokenAmountStatic(uint256 paymentRequestId) internal view returns(bool) {
+        return tokenIdToDynamicTokenAmount[paymentRequestId] == address(0);
+    }
+
+    /// @notice The storage of a closed PaymentRequest has been cleared, the getters revert instead of returning
+    /// the zeroed values, which would look like the ones of a real PaymentRequest.
+    function _requireNotClosed(uint256 paymentRequestId) internal view {
+        if (isClosed(paymentRequestId)) {
+            revert PaymentRequestIsClosed(paymentRequestId);
+        }
+    }
+
+    function _requireStaticTokenAmount(uint256 paymentRequestId) internal view {
+        if (!isTokenAmountStatic(paymentRequestId)) {
+            revert TokenAmountNotStatic(paymentRequestId);
+        }
+    }
+
+    function _requireDynamicTokenAmount(uint256 paymentRequestId) internal view {
+        if (!isTokenAmountDynamic(paymentRequestId)) {
+            revert TokenAmountNotDynamic(paymentRequestId);
+        }
+    }
+
+    function _requirePaymentRequestOwner(uint256 paymentRequestId) internal view {
+        if (msg.sender != ownerOf(paymentRequestId)) {
+            revert NotPaymentRequestOwner(paymentRequestId, msg.sender);
+        }
+    }
+
     // Static Token Count
     function getNumberOfStaticTokens(uint256 paymentRequestId) public view returns (uint256) {
-        require(isTokenAmountStatic(paymentRequestId), "Amount of the provided PaymentRequest ID is not static.");
+        _requireStaticTokenAmount(paymentRequestId);
         return tokenIdToAcceptedStaticTokens[paymentRequestId].length;
     }
 
     // Static Token Address Getters
     function getStaticTokens(uint256 paymentRequestId) public view returns (address[] memory) {
-        require(isTokenAmountStatic(paymentRequestId), "Amount of the provided PaymentRequest ID is not static.");
+        _requireStaticTokenAmount(paymentRequestId);
         return tokenIdToAcceptedStaticTokens[paymentRequestId];
     }
 
     function getStaticTokenByIndex(uint256 paymentRequestId, uint256 index) public view returns (address) {
-        require(isTokenAmountStatic(paymentRequestId), "Amount of the provided PaymentRequest ID is not static.");
+        _requireStaticTokenAmount(paymentRequestId);
         return tokenIdToAcceptedStaticTokens[paymentRequestId][index];
     }
 
     // Static TokenAmountInfo Getetrs
     function getStaticTokenAmountInfos(uint256 paymentRequestId) public view returns (TokenAmountInfo[] memory) {
-        require(isTokenAmountStatic(paymentRequestId), "Amount of the provided PaymentRequest ID is not static.");
+        _requireStaticTokenAmount(paymentRequestId);
         return tokenIdToAmountArray[paymentRequestId];
     }
 
     function getStaticTokenAmountInfoByIndex(uint256 paymentRequestId, uint256 index) public view returns (TokenAmountInfo memory) {
-        require(isTokenAmountStatic(paymentRequestId), "Amount of the provided PaymentRequest ID is not static.");
+        _requireStaticTokenAmount(paymentRequestId);
         return tokenIdToAmountArray[paymentRequestId][index];
     }
 
     // Static uint256 Amount Getters
     function getStaticTokenAmountByIndex(uint256 paymentRequestId, uint256 index) public view returns (uint256) {
-        require(isTokenAmountStatic(paymentRequestId), "Amount of the provided PaymentRequest ID is not static.");
+        _requireStaticTokenAmount(paymentRequestId);
         return tokenIdToAmountArray[paymentRequestId][index].tokenAmount;
     }
 
     function getStaticAmountForToken(uint256 paymentRequestId, address token) public view returns (uint256) {
-        require(isTokenAmountStatic(paymentRequestId), "Amount of the provided PaymentRequest ID is not static.");
+        _requireStaticTokenAmount(paymentRequestId);
+        return _getStaticAmountForToken(paymentRequestId, token);
+    }
 
+    function _getStaticAmountForToken(uint256 paymentRequestId, address token) internal view returns (uint256) {
         TokenAmountMappingValue memory tokenAmount = tokenIdToAmountMap[paymentRequestId][token];
         
-        require(tokenAmount.isSet, "Payments in the provided token are not accepted.");
+        if (!tokenAmount.isSet) {
+            revert TokenNotAccepted(paymentRequestId, token);
+        }
         
         return tokenAmount.tokenAmount;
     }
 
     function isDynamicTokenAccepted(uint256 paymentRequestId, address token) public returns (bool) {
-        require(isTokenAmountDynamic(paymentRequestId), "Amount of the provided PaymentRequest ID is not dynamic.");
+        _requireDynamicTokenAmount(paymentRequestId);
         address dynamicTokenAmountAddr = tokenIdToDynamicTokenAmount[paymentRequestId];
         IDynamicTokenAmount dynamicTokenAmount = IDynamicTokenAmount(dynamicTokenAmountAddr);
         return dynamicTokenAmount.isTokenAccepted(
@@ -190,33 +287,43 @@ contract PaymentRequest is ERC721Enumerable {
     }
 
     function isStaticTokenAccepted(uint256 paymentRequestId, address token) public view returns (bool) {
-        require(isTokenAmountStatic(paymentRequestId), "Amount of the provided PaymentRequest ID is not static.");
+        _requireStaticTokenAmount(paymentRequestId);
         TokenAmountMappingValue memory tokenAmount = tokenIdToAmountMap[paymentRequestId][token];
         return tokenAmount.isSet;
     }
 
     // Address Of Custom Action Getters
     function getPostPaymentAction(uint256 paymentRequestId) public view returns (address) {
+        _requireNotClosed(paymentRequestId);
         return tokenIdToPostPaymentAction[paymentRequestId];
     }
 
     function getPaymentPrecondition(uint256 paymentRequestId) public view returns (address) {
+        _requireNotClosed(paymentRequestId);
         return tokenIdToPaymentPrecondition[paymentRequestId];
     }
 
     function getDynamicTokenAmount(uint256 paymentRequestId) public view returns (address) {
+        _requireNotClosed(paymentRequestId);
         return tokenIdToDynamicTokenAmount[paymentRequestId];
     }
 
     // PaymentRequest From Getters
     function isRestricted(uint256 paymentRequestId) public view returns (bool) {
-        return tokenIdToFrom[paymentRequestId] != address(0);
+        _requireNotClosed(paymentRequestId);
+        return _isRestricted(paymentRequestId);
     }
 
     function getRestrictedAddress(uint256 paymentRequestId) public view returns (address) {
+        _requireNotClosed(paymentRequestId);
         return tokenIdToFrom[paymentRequestId];
     }
 
+    /// @notice Unchecked version of isRestricted(), for pay(). An enabled PaymentRequest is never closed.
+    function _isRestricted(uint256 paymentRequestId) internal view returns (bool) {
+        return tokenIdToFrom[paymentRequestId] != address(0);
+    }
+
     function getNumPaymentRequestsRequestedFrom(address from) public view returns (uint256) {
         return tokenIdsRequestedFrom[from].length;
     }
@@ -228,6 +335,37 @@ contract PaymentRequest is ERC721Enumerable {
     function getPaymentRequestIdsRequestedFrom(address from) public view returns (uint256[] memory) {
         return tokenIdsRequestedFrom[from];
     }
+
+    // Payment Aggregate Getters
+    /// @notice The aggregates are cleared by close() like the rest of the PaymentRequest, keeping them would cost the
+    /// storage refund that closing is for. As such this reverts for a closed PaymentRequest instead of returning 0.
+    function getNumberOfPayments(uint256 paymentRequestId) public view returns (uint256) {
+        _requireNotClosed(paymentRequestId);
+        return tokenIdToNumPayments[paymentRequestId];
+    }
+
+    function getTotalCollectedForToken(uint256 paymentRequestId, address token) public view returns (uint256) {
+        _requireStaticTokenAmount(paymentRequestId);
+        return tokenIdToTotalCollected[paymentRequestId][token];
+    }
+
+    /// @notice Total amount collected in each one of the accepted tokens, in the same order as getStaticTokens().
+    function getTotalsCollected(uint256 paymentRequestId) public view returns (TokenAmountInfo[] memory) {
+        _requireStaticTokenAmount(paymentRequestId);
+        address[] storage acceptedTokens = tokenIdToAcceptedStaticTokens[paymentRequestId];
+        TokenAmountInfo[] memory totals = new TokenAmountInfo[](acceptedTokens.length);
+
+        for (uint256 i = 0; i < acceptedTokens.length; i++) {
+            address token = acceptedTokens[i];
+            totals[i] = TokenAmountInfo({token: token, tokenAmount: tokenIdToTotalCollected[paymentRequestId][token]});
+        }
+        return totals;
+    }
+
+    /// @notice A closed PaymentRequest has been burned and its storage has been cleared. It can no longer be paid.
+    function isClosed(uint256 paymentRequestId) public view returns (bool) {
+        return paymentRequestId < _tokenId.current() && !_exists(paymentRequestId);
+    }
     
  
     /// @notice Get the price when a dynamic pricing scheme is in use. This is the only method available in this
@@ -235,15 +373,15 @@ contract PaymentRequest is ERC721Enumerable {
     /// infeasible to implement. An example of that would be an IDynamicTokenAmountInfo that accepts any token converted
     /// to a stablecoin such as USDT. Operations like listing all of the accepted token IDs becomes impractical
     function getDynamicAmountForToken(uint256 paymentRequestId, address token) public returns (uint256) {
-        require(isTokenAmountDynamic(paymentRequestId), "Amount of the provided PaymentRequest ID is not dynamic.");
+        _requireDynamicTokenAmount(paymentRequestId);
         address dynamicTokenAmountAddr = tokenIdToDynamicTokenAmount[paymentRequestId];
         IDynamicTokenAmount dynamicTokenAmount = IDynamicTokenAmount(dynamicTokenAmountAddr);
         return dynamicTokenAmount.getAmountForToken(
                 paymentRequestId,
                 token,
-                msg.sender            
+                msg.sender
             );
-        }
+    }
 
         /* == BEGIN auxiliary procedures for creating the PaymentReqeust == */
 
@@ -259,11 +397,15 @@ contract PaymentRequest is ERC721Enumerable {
         uint256 tokenId,
         TokenAmountInfo[] memory prices
     ) internal {
-        require(prices.length > 0, "Product prices cannot be empty.");
+        if (prices.length == 0) {
+            revert EmptyTokenAmounts();
+        }
 
         for (uint256 i = 0; i < prices.length; i++) {
             TokenAmountInfo memory price = prices[i];
-            require(!tokenIdToAmountMap[tokenId][price.token].isSet, "Multiple token amounts for the same token provided.");
+            if (tokenIdToAmountMap[tokenId][price.token].isSet) {
+                revert DuplicateTokenAmount(tokenId, price.token);
+            }
             tokenIdToAmountMap[tokenId][price.token] = TokenAmountMappingValue({
                     tokenAmount: price.tokenAmount,
                     isSet: true
@@ -282,13 +424,22 @@ contract PaymentRequest is ERC721Enumerable {
         _mint(owner, tokenId);
 
         tokenIdToPostPaymentAction[tokenId] = postPaymentAction;
-        tokenIdToEnabled[tokenId] = true;
+        tokenIdToFlags[tokenId].isEnabled = true;
         tokenIdToPaymentPrecondition[tokenId] = paymentPrecondition;
 
         _tokenId.increment();
         return tokenId;
     }
 
+    function _storeRequestedFrom(uint256 tokenId, address from) internal {
+        if (from == address(0)) {
+            return;
+        }
+        tokenIdToFrom[tokenId] = from;
+        tokenIdToRequestedFromIndex[tokenId] = tokenIdsRequestedFrom[from].length;
+        tokenIdsRequestedFrom[from].push(tokenId);
+    }
+
     /* == END auxiliary procedures for creating the PaymentReqeust == */
 
 
@@ -303,12 +454,31 @@ contract PaymentRequest is ERC721Enumerable {
         uint256 paymentRequestId,
         address token
     ) public returns (uint256) {
-        bool isStatic = isTokenAmountStatic(paymentRequestId);
-        uint256 amount = isStatic ? getStaticAmountForToken(paymentRequestId, token) : getDynamicAmountForToken(paymentRequestId, token);
+        (uint256 amount, bool isStatic) = _getAmountForToken(paymentRequestId, token);
         emit TokenAmountObtained(paymentRequestId, token, amount, msg.sender, isStatic);
         return amount;
     }
 
+    function _getAmountForToken(uint256 paymentRequestId, address token) internal returns (uint256, bool) {
+        bool isStatic = isTokenAmountStatic(paymentRequestId);
+        uint256 amount = isStatic ? getStaticAmountForToken(paymentRequestId, token) : getDynamicAmountForToken(paymentRequestId, token);
+        return (amount, isStatic);
+    }
+
+    /// @notice Same as _getAmountForToken(), for pay(): the reverts of the IDynamicTokenAmount are attributed to the
+    /// TA stage. Only pay() wraps reverts into PaymentStageReverted, the public getters revert as they are.
+    function _getPaymentAmountForToken(uint256 paymentRequestId, address token) internal returns (uint256, bool) {
+        if (_isTokenAmountStatic(paymentRequestId)) {
+            return (_getStaticAmountForToken(paymentRequestId, token), true);
+        }
+        IDynamicTokenAmount dynamicTokenAmount = IDynamicTokenAmount(tokenIdToDynamicTokenAmount[paymentRequestId]);
+        try dynamicTokenAmount.getAmountForToken(paymentRequestId, token, msg.sender) returns (uint256 amount) {
+            return (amount, false);
+        } catch (bytes memory reason) {
+            revert PaymentStageReverted(paymentRequestId, PaymentStage.TA, reason);
+        }
+    }
+
     function isTokenAccepted(uint256 paymentRequestId, address token) public returns (bool) {
         return isTokenAmountStatic(paymentRequestId) ? isStaticTokenAccepted(paymentRequestId, token) : isDynamicTokenAccepted(paymentRequestId, token);
     }
@@ -319,11 +489,8 @@ contract PaymentRequest is ERC721Enumerable {
     ) internal {
         
         // if it's a restricted PaymentRequest, only one address can pay
-        if (isRestricted(paymentRequestId)) {
-            require(
-                getRestrictedAddress(paymentRequestId) == msg.sender,
-                "Only the restricted address can pay for this PaymentRequest"
-            );
+        if (_isRestricted(paymentRequestId) && tokenIdToFrom[paymentRequestId] != msg.sender) {
+            revert PayerNotAllowed(paymentRequestId, msg.sender);
         }
 
         // Check if pre-conditions for payment are met. For example, perhaps you only want to allow this product
@@ -336,20 +503,21 @@ contract PaymentRequest is ERC721Enumerable {
             IPaymentPrecondition paymentPrecondition = IPaymentPrecondition(
                 paymentPreconditionAddr
             );
-            bool isPaymentAllowed = paymentPrecondition
-                .isPaymentAllowed(
+            try paymentPrecondition.isPaymentAllowed(paymentRequestId, token, msg.sender) returns (bool isPaymentAllowed) {
+                if (!isPaymentAllowed) {
+                    revert PaymentPreconditionNotMet(paymentRequestId, msg.sender);
+                }
+            } catch (bytes memory reason) {
+                revert PaymentStageReverted(paymentRequestId, PaymentStage.PP, reason);
+            }
+                
+            if (!_isLeanEvents(paymentRequestId)) {
+                emit PaymentPreconditionPassed(
                     paymentRequestId,
                     token,
                     msg.sender
                 );
-            
-            require(isPaymentAllowed, "Payment precondition not met");
-                
-            emit PaymentPreconditionPassed(
-                paymentRequestId,
-                token,
-                msg.sender
-            );
+            }
             
         }
     }
@@ -372,24 +540,23 @@ contract PaymentRequest is ERC721Enumerable {
 
         IERC20 erc20Token = IERC20(token);
 
-        bool isIntermediaryTransferSuccess = erc20Token.transferFrom(
-            msg.sender,
-            address(this),
-            tokenAmount
-        );
-
-        require(
-            isIntermediaryTransferSuccess,
-            "Could not transfer payment. Was it approved?"
-        );
+        // a failure here means that the payer either does not have enough tokens or has not approved them
+        try erc20Token.transferFrom(msg.sender, address(this), tokenAmount) returns (bool isIntermediaryTransferSuccess) {
+            if (!isIntermediaryTransferSuccess) {
+                revert TokenTransferFailed(paymentRequestId, token);
+            }
+        } catch (bytes memory reason) {
+            revert PaymentStageReverted(paymentRequestId, PaymentStage.TOKEN_BALANCE_OR_APPROVAL, reason);
+        }
 
-        bool isTransferSuccess = erc20Token.transfer(
-                ownerOf(paymentRequestId),
-                tokenAmount
-            );
         // No events emitted by this contract. Observe the Transfer event of ERC-20
-
-        require(isTransferSuccess, "Could not transfer tokens.");
+        try erc20Token.transfer(ownerOf(paymentRequestId), tokenAmount) returns (bool isTransferSuccess) {
+            if (!isTransferSuccess) {
+                revert TokenTransferFailed(paymentRequestId, token);
+            }
+        } catch (bytes memory reason) {
+            revert PaymentStageReverted(paymentRequestId, PaymentStage.TOKEN_BALANCE_OR_APPROVAL, reason);
+        }
     }
 
     function _emitReceipt(
@@ -397,14 +564,11 @@ contract PaymentRequest is ERC721Enumerable {
         address token,
         uint256 tokenAmount
     ) internal returns (uint256) {
-        return receipt.create(
-            {
-                paymentRequestId: paymentRequestId,
-                token: token,
-                tokenAmount: tokenAmount,
-                payer: msg.sender,
-                payee: ownerOf(paymentRequestId)
-            });
+        try receipt.create(paymentRequestId, token, tokenAmount, msg.sender, ownerOf(paymentRequestId)) returns (uint256 receiptId) {
+            return receiptId;
+        } catch (bytes memory reason) {
+            revert PaymentStageReverted(paymentRequestId, PaymentStage.PR, reason);
+        }
     }
 
     function _executePostPaymentAction(
@@ -419,20 +583,24 @@ contract PaymentRequest is ERC721Enumerable {
             IPostPaymentAction postPaymentAction = IPostPaymentAction(
                 postPaymentActionAddr
             );
-            postPaymentAction.onPostPayment(address(receipt), receiptId);
-            emit PostPaymentActionExecuted(
-                paymentRequestId,
-                postPaymentActionAddr,
-                receiptId
-            );
+            try postPaymentAction.onPostPayment(address(receipt), receiptId) {
+            } catch (bytes memory reason) {
+                revert PaymentStageReverted(paymentRequestId, PaymentStage.PPA, reason);
+            }
+            if (!_isLeanEvents(paymentRequestId)) {
+                emit PostPaymentActionExecuted(
+                    paymentRequestId,
+                    postPaymentActionAddr,
+                    receiptId
+                );
+            }
         }
     }
 
     modifier paymentRequestIsEnabled(uint256 paymentRequestId) {
-        require(
-            isEnabled(paymentRequestId),
-            "PaymentRequest is disabled"
-        );
+        if (!isEnabled(paymentRequestId)) {
+            revert PaymentRequestNotEnabled(paymentRequestId);
+        }
         _;
     }
 
@@ -450,8 +618,9 @@ contract PaymentRequest is ERC721Enumerable {
 
         // map token prices into internal data structure
         _storeTokenAmountsInInternalStructures(tokenId, prices);        
-        tokenIdToFrom[tokenId] = from;
+        _storeRequestedFrom(tokenId, from);
 
+        emit PaymentRequestCreated(tokenId, msg.sender, from, true);
         return tokenId;
     }
 
@@ -466,8 +635,9 @@ contract PaymentRequest is ERC721Enumerable {
         // map token prices into internal data structure
         tokenIdToDynamicTokenAmount[tokenId] = dynamicTokenAmount;
 
-        tokenIdToFrom[tokenId] = from;
+        _storeRequestedFrom(tokenId, from);
 
+        emit PaymentRequestCreated(tokenId, msg.sender, from, false);
         return tokenId;
     }
 
@@ -475,31 +645,92 @@ contract PaymentRequest is ERC721Enumerable {
 
     /* == BEGIN PaymentRequest mutators == */
     function enable(uint256 paymentRequestId) public {
-        require(
-            msg.sender == ownerOf(paymentRequestId),
-            "Only owner can enable a PaymentRequest"
-        );
-        require(
-            !isRestricted(paymentRequestId),
-            "Restricted PaymentRequest cannot be (re)enabled."
-        );
+        _requirePaymentRequestOwner(paymentRequestId);
+        if (isRestricted(paymentRequestId)) {
+            revert RestrictedPaymentRequestCannotBeEnabled(paymentRequestId);
+        }
         if (isEnabled(paymentRequestId)) {
             return;
         }
-        tokenIdToEnabled[paymentRequestId] = true;
+        tokenIdToFlags[paymentRequestId].isEnabled = true;
         emit PaymentRequestEnabled(paymentRequestId);
     }
 
     function disable(uint256 paymentRequestId) public {
-        require(
-            msg.sender == ownerOf(paymentRequestId),
-            "Only owner can disable a PaymentRequest"
-        );
+        _requirePaymentRequestOwner(paymentRequestId);
+        _disable(paymentRequestId);
+    }
+
+    /// @notice In lean event mode pay() only emits PaymentRequestPaid, which saves the gas of the intermediate stage
+    /// events for merchants that don't consume them.
+    function setLeanEvents(uint256 paymentRequestId, bool isLean) public {
+        _requirePaymentRequestOwner(paymentRequestId);
+        if (isLeanEvents(paymentRequestId) == isLean) {
+            return;
+        }
+        tokenIdToFlags[paymentRequestId].isLeanEvents = isLean;
+        emit PaymentRequestEventModeChanged(paymentRequestId, isLean);
+    }
+
+    /// @notice Burns the PaymentRequest and deletes its token amounts and configuration from storage, collecting
+    /// the respective gas refunds. Issued Receipts are not affected. Meant for PaymentRequests which will not be paid
+    /// anymore, such as restricted ones that have already been paid.
+    function close(uint256 paymentRequestId) external {
+        _close(paymentRequestId);
+    }
+
+    function closeMany(uint256[] calldata paymentRequestIds) external {
+        for (uint256 i = 0; i < paymentRequestIds.length; i++) {
+            _close(paymentRequestIds[i]);
+        }
+    }
+
+    function _disable(uint256 paymentRequestId) internal {
         if (isEnabled(paymentRequestId)) {
-            tokenIdToEnabled[paymentRequestId] = false;
+            tokenIdToFlags[paymentRequestId].isEnabled = false;
             emit PaymentRequestDisabled(paymentRequestId);
         }
+    }
+
+    function _close(uint256 paymentRequestId) internal {
+        _requirePaymentRequestOwner(paymentRequestId);
+
+        address[] storage acceptedTokens = tokenIdToAcceptedStaticTokens[paymentRequestId];
+        for (uint256 i = 0; i < acceptedTokens.length; i++) {
+            delete tokenIdToAmountMap[paymentRequestId][acceptedTokens[i]];
+            delete tokenIdToTotalCollected[paymentRequestId][acceptedTokens[i]];
+        }
+        delete tokenIdToAcceptedStaticTokens[paymentRequestId];
+        delete tokenIdToAmountArray[paymentRequestId];
+
+        delete tokenIdToPostPaymentAction[paymentRequestId];
+        delete tokenIdToPaymentPrecondition[paymentRequestId];
+        delete tokenIdToDynamicTokenAmount[paymentRequestId];
+        delete tokenIdToFlags[paymentRequestId];
+        delete tokenIdToNumPayments[paymentRequestId];
+        _removeRequestedFrom(paymentRequestId);
+
+        _burn(paymentRequestId);
+        emit PaymentRequestClosed(paymentRequestId);
+    }
+
+    function _removeRequestedFrom(uint256 paymentRequestId) internal {
+        address from = tokenIdToFrom[paymentRequestId];
+        if (from == address(0)) {
+            return;
+        }
+
+        // move the last PaymentRequest ID into the position of the one to remove, and delete the last position
+        uint256[] storage requestedFrom = tokenIdsRequestedFrom[from];
+        uint256 index = tokenIdToRequestedFromIndex[paymentRequestId];
+        uint256 lastPaymentRequestId = requestedFrom[requestedFrom.length - 1];
+
+        requestedFrom[index] = lastPaymentRequestId;
+        tokenIdToRequestedFromIndex[lastPaymentRequestId] = index;
+        requestedFrom.pop();
 
+        delete tokenIdToRequestedFromIndex[paymentRequestId];
+        delete tokenIdToFrom[paymentRequestId];
     }
 
     /* == END PaymentRequest mutators == */
@@ -511,29 +742,87 @@ contract PaymentRequest is ERC721Enumerable {
         view
         returns (bool)
     {
-        return tokenIdToEnabled[paymentRequestId];
+        return tokenIdToFlags[paymentRequestId].isEnabled;
+    }
+
+    function isLeanEvents(uint256 paymentRequestId) public view returns (bool) {
+        _requireNotClosed(paymentRequestId);
+        return _isLeanEvents(paymentRequestId);
+    }
+
+    /// @notice Unchecked version of isLeanEvents(), for pay(). An enabled PaymentRequest is never closed.
+    function _isLeanEvents(uint256 paymentRequestId) internal view returns (bool) {
+        return tokenIdToFlags[paymentRequestId].isLeanEvents;
     }
 
     /* == END PaymentRequest state readers == */
 
     function pay(uint256 paymentRequestId, address token)
         external
+        returns (uint256)
+    {
+        return _pay(paymentRequestId, token);
+    }
+
+    /// @notice Calldata-compact version of pay() for PaymentRequests with static token amounts. Instead of two
+    /// calldata words, a single one is passed, containing the PaymentRequest ID, the index of the token in
+    /// getStaticTokens() and the flags (see PACKED_* constants). The token address is resolved from storage.
+    /// Useful on rollups, where calldata dominates the cost of a transaction.
+    function payPacked(uint256 packedPayment) external returns (uint256) {
+        uint256 paymentRequestId = packedPayment & PACKED_PAYMENT_REQUEST_ID_MASK;
+        uint256 tokenIndex = (packedPayment >> PACKED_TOKEN_INDEX_OFFSET) & PACKED_TOKEN_INDEX_MASK;
+        uint256 flags = packedPayment >> PACKED_FLAGS_OFFSET;
+
+        if (flags != 0) {
+            revert UnsupportedPackedPaymentFlags(paymentRequestId, flags);
+        }
+        if (!_isTokenAmountStatic(paymentRequestId)) {
+            // TokenAmountNotStatic is raised by getters as well, it's attributed to a stage only here
+            revert PaymentStageReverted(
+                paymentRequestId, PaymentStage.TA, abi.encodeWithSelector(TokenAmountNotStatic.selector, paymentRequestId)
+            );
+        }
+
+        address[] storage acceptedTokens = tokenIdToAcceptedStaticTokens[paymentRequestId];
+        if (tokenIndex >= acceptedTokens.length) {
+            revert TokenIndexOutOfBounds(paymentRequestId, tokenIndex);
+        }
+
+        return _pay(paymentRequestId, acceptedTokens[tokenIndex]);
+    }
+
+    function _updatePaymentAggregates(uint256 paymentRequestId, address token, uint256 tokenAmount, bool isStatic) internal {
+        // the payment count can't realistically overflow
+        unchecked {
+            tokenIdToNumPayments[paymentRequestId] += 1;
+        }
+        if (isStatic) {
+            tokenIdToTotalCollected[paymentRequestId][token] += tokenAmount;
+        }
+    }
+
+    function _pay(uint256 paymentRequestId, address token)
+        internal
         paymentRequestIsEnabled(paymentRequestId)
         returns (uint256)
     {
         
         _checkPaymentPrecondition(paymentRequestId, token);
 
-        uint256 tokenAmount = getAmountForToken(
+        (uint256 tokenAmount, bool isStatic) = _getPaymentAmountForToken(
             paymentRequestId,
             token
         );
+        if (!_isLeanEvents(paymentRequestId)) {
+            emit TokenAmountObtained(paymentRequestId, token, tokenAmount, msg.sender, isStatic);
+        }
 
         _performTokenTransfer(
             paymentRequestId,
             token,
             tokenAmount
         );
+        _updatePaymentAggregates(paymentRequestId, token, tokenAmount, isStatic);
 
         // PaymentReqeust has been successfully paid, emit receipt
         uint256 receiptId = _emitReceipt(
@@ -545,8 +834,9 @@ contract PaymentRequest is ERC721Enumerable {
         );
         _executePostPaymentAction(paymentRequestId, receiptId);
 
-        if (isRestricted(paymentRequestId)) {
-            disable(paymentRequestId);
+        if (_isRestricted(paymentRequestId)) {
+            // the payer is not the owner, as such the ownership check of disable() does not apply here
+            _disable(paymentRequestId);
         }
 
         emit PaymentRequestPaid(paymentRequestId, receiptId, token, tokenAmount, msg.sender, ownerOf(paymentRequestId));
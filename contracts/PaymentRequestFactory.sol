@@ -0,0 +1,63 @@
+pragma solidity ^0.8.0;
+
+import "@openzeppelin/contracts/utils/Create2.sol";
+
+/// @notice Deterministic (CREATE2) deployer of PaymentRequest stacks: a PaymentRequest, its Receipt and the
+/// callbacks (PaymentPrecondition, DynamicTokenAmount, PostPaymentAction) used by its PaymentRequests.
+/// The address of a contract only depends on the address of this factory, on the account that requests the deployment,
+/// on the salt it chooses and on the init code (creation bytecode + constructor arguments) of the contract, so it can
+/// be computed offline. Deployments are idempotent: deploying a contract that already exists returns its address.
+/// @dev Init codes are provided by the caller instead of being embedded in the factory, which would put the factory
+/// over the contract size limit. Constructors are executed with this factory as msg.sender, so contracts that hand
+/// ownership or tokens to their deployer are not meant to be deployed by it. The Receipt of a PaymentRequest created
+/// without a custom one is deployed (and owned) by the PaymentRequest itself.
+contract PaymentRequestFactory {
+    event ContractDeployed(address indexed deployer, bytes32 indexed salt, address indexed deployed);
+    event StackDeployed(address indexed deployer, bytes32 indexed salt, address indexed paymentRequest, address[] callbacks);
+
+    /// @notice The salt is namespaced by the deployer, so that no other account can take the addresses of its
+    /// contracts.
+    function getDeployerSalt(address deployer, bytes32 salt) public pure returns (bytes32) {
+        return keccak256(abi.encode(deployer, salt));
+    }
+
+    function computeAddress(address deployer, bytes32 salt, bytes32 initCodeHash) public view returns (address) {
+        return Create2.computeAddress(getDeployerSalt(deployer, salt), initCodeHash);
+    }
+
+    function isDeployed(address deployer, bytes32 salt, bytes32 initCodeHash) external view returns (bool) {
+        return computeAddress(deployer, salt, initCodeHash).code.length > 0;
+    }
+
+    function deploy(bytes32 salt, bytes calldata initCode) external returns (address) {
+        return _deploy(salt, initCode);
+    }
+
+    /// @notice Deploys a PaymentRequest and its callbacks in a single transaction. Callbacks share the salt of the
+    /// PaymentRequest, the ones that are already deployed (e.g. by another stack of the same deployer) are reused.
+    function deployStack(
+        bytes32 salt,
+        bytes calldata paymentRequestInitCode,
+        bytes[] calldata callbackInitCodes
+    ) external returns (address paymentRequest, address[] memory callbacks) {
+        paymentRequest = _deploy(salt, paymentRequestInitCode);
+
+        callbacks = new address[](callbackInitCodes.length);
+        for (uint256 i = 0; i < callbackInitCodes.length; i++) {
+            callbacks[i] = _deploy(salt, callbackInitCodes[i]);
+        }
+
+        emit StackDeployed(msg.sender, salt, paymentRequest, callbacks);
+    }
+
+    function _deploy(bytes32 salt, bytes memory initCode) internal returns (address deployed) {
+        bytes32 deployerSalt = getDeployerSalt(msg.sender, salt);
+        deployed = Create2.computeAddress(deployerSalt, keccak256(initCode));
+        if (deployed.code.length > 0) {
+            return deployed;
+        }
+
+        Create2.deploy(0, deployerSalt, initCode);
+        emit ContractDeployed(msg.sender, salt, deployed);
+    }
+}
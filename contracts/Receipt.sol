@@ -23,6 +23,10 @@ struct OptionalReceiptDataLocation {
 /// transferred to another address. A record of both, the address that emitted the receipt (a PaymentRequest under regular use-case)
 /// and the original payer. Getter functions to obtain the list of Receipt IDs origninally issued to a particular address are available.
 contract Receipt is ERC721Enumerable, Ownable {
+    error ConsecutiveTransfersNotSupported();
+    error OwnerIndexOutOfBounds(uint256 paymentRequestId, address owner, uint256 index);
+    error GlobalIndexOutOfBounds(uint256 paymentRequestId, uint256 index);
+
     using Counters for Counters.Counter;
     Counters.Counter internal _tokenId;
 
@@ -104,22 +108,14 @@ contract Receipt is ERC721Enumerable, Ownable {
         
         if (batchSize > 1) {
             // Batching only possible during the construction phase, not after it.
-            revert("Receipt: consecutive transfers not supported");
+            revert ConsecutiveTransfersNotSupported();
         }
 
         ReceiptData memory receiptDataStruct = receiptData[receiptId];
         uint256 paymentRequestId = receiptDataStruct.paymentRequestId;
 
-        // First, deal with balances changes
-        if (from != address(0)) {
-            // receipt is being transferred from "from" to "to" (i.e. non-mint operation)
-            _balancesForPaymentRequestId[paymentRequestId][from] -= 1;
-        }
-        if (to != address(0)) {
-            _balancesForPaymentRequestId[paymentRequestId][to] += 1;
-        }
-        
-        // Now, take care of altering collections as needed
+        // First, take care of altering collections as needed. The owner enumeration relies on the balances before
+        // the transfer, as such those are only updated afterwards.
         // First, do all of the necessary changes for the "from" address
         if (from == address(0)) {
             // mint operation
@@ -137,7 +133,15 @@ contract Receipt is ERC721Enumerable, Ownable {
             // token transferred to an address distinct from the current owner. add ownershipt to "to"
             _addTokenToOwnerEnumerationForPaymentRequestId(paymentRequestId, to, receiptId);
         }
-        
+
+        // Now, deal with balances changes
+        if (from != address(0)) {
+            // receipt is being transferred from "from" to "to" (i.e. non-mint operation)
+            _balancesForPaymentRequestId[paymentRequestId][from] -= 1;
+        }
+        if (to != address(0)) {
+            _balancesForPaymentRequestId[paymentRequestId][to] += 1;
+        }
     }
 
     function _addTokenToAllTokensEnumerationForPaymentRequestId(uint256 paymentRequestId, uint256 tokenId) private {
@@ -153,7 +157,7 @@ contract Receipt is ERC721Enumerable, Ownable {
 
     function _removeTokenFromAllTokensEnumerationForPaymentRequestId(uint256 paymentRequestId, uint256 receiptId) private {
         // Move last receipt into the place of the token to remove, and delete the last index
-        uint256 lastReceiptIndex = _allTokensForPaymentRequestId[paymentRequestId].length;
+        uint256 lastReceiptIndex = _allTokensForPaymentRequestId[paymentRequestId].length - 1;
         uint256 lastReceiptId = _allTokensForPaymentRequestId[paymentRequestId][lastReceiptIndex];
         uint256 indexOfReceiptToRemove = _allTokensIndexForPaymentRequestId[paymentRequestId][receiptId];
 
@@ -216,7 +220,9 @@ contract Receipt is ERC721Enumerable, Ownable {
     }
 
     function receiptIdOfOwnerForPaymentRequestIdByIndex(uint256 paymentRequestId, address owner, uint256 index) public view virtual returns (uint256) {
-        require(index < ERC721.balanceOf(owner), "Receipt: owner index out of bounds");
+        if (index >= balanceOfForPaymentRequestId(paymentRequestId, owner)) {
+            revert OwnerIndexOutOfBounds(paymentRequestId, owner, index);
+        }
         return _ownedTokensForPaymentRequestId[paymentRequestId][owner][index];
     }
 
@@ -225,7 +231,9 @@ contract Receipt is ERC721Enumerable, Ownable {
     }
 
     function receiptIdPaymentRequestIdByIndex(uint256 paymentRequestId, uint256 index) public view virtual returns (uint256) {
-        require(index < totalSupplyForPaymentRequestId(paymentRequestId), "Receipt: global index out of bounds");
+        if (index >= totalSupplyForPaymentRequestId(paymentRequestId)) {
+            revert GlobalIndexOutOfBounds(paymentRequestId, index);
+        }
         return _allTokensForPaymentRequestId[paymentRequestId][index];
     }
 }
\ No newline at end of file
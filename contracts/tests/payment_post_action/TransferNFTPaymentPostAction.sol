@@ -16,16 +16,13 @@ contract TransferNFTPaymentPostAction is IPostPaymentAction {
 
     function onPostPayment(address receipt, uint256 receiptId) override external {
         // Transfer NFT under the control of this Smart Contract. As such, this particular smart contract requires
-        // that the owner of the NFT approves transfers from their address into the address of this smart contract.
+        // that the owner of the NFT approves transfers from their address by this smart contract.
         // In the context of the PaymentRequest.pay(), if the token was not approved, the whole payment will be
         // reverted.
-
         address owner = erc721.ownerOf(erc721Id);
-        erc721.safeTransferFrom(owner, address(this), erc721Id);
 
-        // Now, transfer the NFT from this contract to the payer's contract
         Receipt receiptContract = Receipt(receipt);
         ReceiptData memory receiptData = receiptContract.getReceiptData(receiptId);
-        erc721.safeTransferFrom(address(this), receiptData.payer, erc721Id);
+        erc721.safeTransferFrom(owner, receiptData.payer, erc721Id);
     }
 }
@@ -11,6 +11,6 @@ contract OnePurchasePerAddressPaymentPrecondition is IPaymentPrecondition {
     function isPaymentAllowed(uint256 paymentRequestId, address token, address payer) external override returns(bool) {
         PaymentRequest paymentRequest = PaymentRequest(msg.sender);
         Receipt receipt = paymentRequest.receipt();
-
+        return receipt.getNumberOfReceiptsForPaymentRequestPaidBy(paymentRequestId, payer) == 0;
     }
 }
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Microbenchmark of the fast-path encoders and decoders of scripts/utils/codec.py against the brownie path: encode_input()
+and decode_output() of the contract functions, which go through eth_abi, and EventDefinition.decode() (see
+scripts/utils/indexer.py) for the events.
+
+Usage: brownie run scripts/benchmark/codec.py [main] [iterations]
+
+The values are taken from a PaymentRequest with NUM_STATIC_TOKENS tokens, paid once. Every function is timed over the
+same arguments, the report has the time per call of both paths and the speedup.
+"""
+import timeit
+from dataclasses import dataclass
+from typing import Callable
+
+from brownie import Receipt, accounts, web3
+from brownie.network.account import Account
+from brownie.network.contract import ProjectContract
+from brownie.network.transaction import TransactionReceipt
+from hexbytes import HexBytes
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.codec import (
+    PAYMENT_REQUEST_PAID_TOPIC,
+    decode_payment_request_paid,
+    decode_receipt_data,
+    decode_token_amount_infos,
+    encode_approve,
+    encode_create_with_static_token_amount,
+    encode_pay,
+)
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.indexer import EventDefinition, get_event_definition
+
+DEFAULT_ITERATIONS: int = 10_000
+NUM_STATIC_TOKENS: int = 3
+TOKEN_AMOUNT: int = 10
+
+
+@dataclass
+class CodecBenchmarkResult:
+    name: str
+    # seconds per call
+    brownie_time: float
+    fast_time: float
+
+    @property
+    def speedup(self) -> float:
+        return self.brownie_time / self.fast_time
+
+
+def _time(function: Callable[[], object], iterations: int) -> float:
+    return timeit.timeit(function, number=iterations) / iterations
+
+
+def _call(contract: ProjectContract, data: str) -> bytes:
+    return bytes(web3.eth.call({"to": contract.address, "data": data}))
+
+
+def run_benchmark(iterations: int = DEFAULT_ITERATIONS) -> list[CodecBenchmarkResult]:
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: ProjectContract = contract_builder.PaymentRequest
+    tokens: list[ProjectContract] = [contract_builder.MyERC20 for _ in range(NUM_STATIC_TOKENS)]
+    receipt: ProjectContract = Receipt.at(payment_request.receipt())
+
+    token_amounts: list[tuple[str, int]] = [(token.address, TOKEN_AMOUNT) for token in tokens]
+    create_args: tuple = (token_amounts, ADDRESS_ZERO, ADDRESS_ZERO, ADDRESS_ZERO)
+    payment_request_id: int = payment_request.createWithStaticTokenAmount(*create_args, {"from": owner}).return_value
+    token: ProjectContract = tokens[0]
+    token.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    token.approve(payment_request.address, TOKEN_AMOUNT, {"from": payer})
+    pay_tx: TransactionReceipt = payment_request.pay(payment_request_id, token.address, {"from": payer})
+    receipt_id: int = pay_tx.return_value
+
+    receipt_data: bytes = _call(receipt, receipt.getReceiptData.encode_input(receipt_id))
+    receipt_data_hex: str = HexBytes(receipt_data).hex()
+    token_amount_infos: bytes = _call(
+        payment_request, payment_request.getStaticTokenAmountInfos.encode_input(payment_request_id)
+    )
+    token_amount_infos_hex: str = HexBytes(token_amount_infos).hex()
+    paid_log: dict = next(
+        log
+        for log in web3.eth.get_transaction_receipt(pay_tx.txid)["logs"]
+        if HexBytes(log["topics"][0]) == PAYMENT_REQUEST_PAID_TOPIC
+    )
+    paid_topics: list[bytes] = [bytes(HexBytes(topic)) for topic in paid_log["topics"]]
+    paid_data: bytes = bytes(HexBytes(paid_log["data"]))
+    payment_request_paid: EventDefinition = get_event_definition("PaymentRequestPaid")
+
+    # name -> (brownie path, fast path)
+    cases: dict[str, tuple[Callable[[], object], Callable[[], object]]] = {
+        "encode pay": (
+            lambda: payment_request.pay.encode_input(payment_request_id, token.address),
+            lambda: encode_pay(payment_request_id, token.address),
+        ),
+        "encode createWithStaticTokenAmount": (
+            lambda: payment_request.createWithStaticTokenAmount.encode_input(*create_args),
+            lambda: encode_create_with_static_token_amount(*create_args),
+        ),
+        "encode approve": (
+            lambda: token.approve.encode_input(payment_request.address, TOKEN_AMOUNT),
+            lambda: encode_approve(payment_request.address, TOKEN_AMOUNT),
+        ),
+        "decode ReceiptData": (
+            lambda: receipt.getReceiptData.decode_output(receipt_data_hex),
+            lambda: decode_receipt_data(receipt_data),
+        ),
+        "decode TokenAmountInfo[]": (
+            lambda: payment_request.getStaticTokenAmountInfos.decode_output(token_amount_infos_hex),
+            lambda: decode_token_amount_infos(token_amount_infos),
+        ),
+        "decode PaymentRequestPaid": (
+            lambda: payment_request_paid.decode(paid_topics, paid_data),
+            lambda: decode_payment_request_paid(paid_topics, paid_data),
+        ),
+    }
+    return [
+        CodecBenchmarkResult(
+            name=name, brownie_time=_time(brownie_path, iterations), fast_time=_time(fast_path, iterations)
+        )
+        for name, (brownie_path, fast_path) in cases.items()
+    ]
+
+
+def main(iterations: str = str(DEFAULT_ITERATIONS)):
+    results: list[CodecBenchmarkResult] = run_benchmark(int(iterations))
+
+    print(f"{'case':<38}{'brownie (us)':>14}{'fast (us)':>12}{'speedup':>10}")
+    for result in results:
+        print(
+            f"{result.name:<38}{result.brownie_time * 1e6:>14.2f}{result.fast_time * 1e6:>12.2f}"
+            f"{result.speedup:>9.1f}x"
+        )
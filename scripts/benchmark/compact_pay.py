@@ -0,0 +1,92 @@
+"""
+Compares the calldata size and the gas cost of PaymentRequest.pay() and PaymentRequest.payPacked().
+
+Usage: brownie run scripts/benchmark/compact_pay.py [main] [num_static_tokens]
+"""
+from dataclasses import dataclass
+
+from brownie import accounts
+from brownie.network.account import Account
+from brownie.network.contract import ProjectContract
+from brownie.network.transaction import TransactionReceipt, Status
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.calldata import pack_payment, get_calldata_gas
+from scripts.utils.contract import ContractBuilder
+
+TOKEN_AMOUNT: int = 10
+
+
+@dataclass
+class PayBenchmarkResult:
+    name: str
+    calldata_size: int
+    calldata_gas: int
+    gas_used: int
+
+
+def _create_payment_request(payment_request: ProjectContract, tokens: list[ProjectContract], owner: Account) -> int:
+    tx: TransactionReceipt = payment_request.createWithStaticTokenAmount(
+        [(token.address, TOKEN_AMOUNT) for token in tokens],
+        ADDRESS_ZERO,
+        ADDRESS_ZERO,
+        ADDRESS_ZERO,
+        {"from": owner},
+    )
+    return int(tx.return_value)
+
+
+def _fund_payer(payment_request: ProjectContract, token: ProjectContract, owner: Account, payer: Account) -> None:
+    token.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    token.approve(payment_request.address, TOKEN_AMOUNT, {"from": payer})
+
+
+def _to_result(name: str, tx: TransactionReceipt) -> PayBenchmarkResult:
+    assert tx.status == Status.Confirmed
+    return PayBenchmarkResult(
+        name=name,
+        calldata_size=(len(tx.input) - 2) // 2,
+        calldata_gas=get_calldata_gas(tx.input),
+        gas_used=tx.gas_used,
+    )
+
+
+def run_benchmark(num_static_tokens: int = 3) -> list[PayBenchmarkResult]:
+    owner: Account = accounts[0]
+    # a fresh payer and a fresh PaymentRequest for each measurement, so that both start from the same storage state
+    pay_payer: Account = accounts[1]
+    pay_packed_payer: Account = accounts[2]
+
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: ProjectContract = contract_builder.PaymentRequest
+    tokens: list[ProjectContract] = [contract_builder.MyERC20 for _ in range(num_static_tokens)]
+    token_index: int = num_static_tokens - 1
+    token: ProjectContract = tokens[token_index]
+
+    pay_payment_request_id: int = _create_payment_request(payment_request, tokens, owner)
+    pay_packed_payment_request_id: int = _create_payment_request(payment_request, tokens, owner)
+
+    _fund_payer(payment_request, token, owner, pay_payer)
+    _fund_payer(payment_request, token, owner, pay_packed_payer)
+
+    pay_tx: TransactionReceipt = payment_request.pay(
+        pay_payment_request_id, token.address, {"from": pay_payer}
+    )
+    pay_packed_tx: TransactionReceipt = payment_request.payPacked(
+        pack_payment(payment_request_id=pay_packed_payment_request_id, token_index=token_index),
+        {"from": pay_packed_payer},
+    )
+
+    return [_to_result("pay", pay_tx), _to_result("payPacked", pay_packed_tx)]
+
+
+def main(num_static_tokens: str = "3"):
+    results: list[PayBenchmarkResult] = run_benchmark(int(num_static_tokens))
+    baseline: PayBenchmarkResult = results[0]
+
+    print(f"{'function':<12}{'calldata bytes':>16}{'calldata gas':>14}{'total gas':>12}{'total gas delta':>18}")
+    for result in results:
+        print(
+            f"{result.name:<12}{result.calldata_size:>16}{result.calldata_gas:>14}{result.gas_used:>12}"
+            f"{result.gas_used - baseline.gas_used:>18}"
+        )
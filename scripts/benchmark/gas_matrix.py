@@ -0,0 +1,293 @@
+"""
+Gas benchmark of PaymentRequest across the full PaymentPrecondition x TokenAmount x PostPaymentAction matrix of
+tests/configuration.py. For every combination, the gas used by the creation of the PaymentRequest, by its first
+payment, by a repeated payment (from a distinct payer) and by the transfer of the issued Receipt is measured.
+
+Usage:
+    brownie run scripts/benchmark/gas_matrix.py main [baseline_path] [threshold]
+        compare against the baseline, fails if any cell regresses by more than threshold (a ratio, e.g. 0.02) or if
+        there is no baseline
+    brownie run scripts/benchmark/gas_matrix.py update_baseline [baseline_path]
+        measure and write a new baseline
+
+The default baseline, gas_matrix_baseline.json next to this script, is committed with the contracts: it has to be
+written with update_baseline on the development network (ganache, the compiler version of brownie-config.yaml) and
+committed again whenever a change to the contracts is meant to change their gas. Until it is, main() fails with
+GasBaselineNotFoundException rather than passing without anything to compare against.
+"""
+import itertools
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from brownie import MyERC20, Receipt, ZERO_ADDRESS, chain
+from brownie.exceptions import VirtualMachineError
+from brownie.network import accounts
+from brownie.network.account import Account
+from brownie.network.contract import ProjectContract
+from brownie.network.transaction import TransactionReceipt
+
+from tests.configuration import (
+    PaymentPrecondition,
+    PaymentRequestBuilder,
+    PaymentRequestConfiguration,
+    PostPaymentAction,
+    TokenAmount,
+)
+
+DEFAULT_BASELINE_PATH: Path = Path(__file__).parent / "gas_matrix_baseline.json"
+DEFAULT_THRESHOLD: float = 0.02
+
+STATIC_TOKEN_AMOUNTS: list[int] = [10, 20, 30]
+
+DEPENDENCIES_DEPLOYER_ACCOUNT_INDEX: int = 0
+PAYMENT_REQUEST_DEPLOYER_ACCOUNT_INDEX: int = 1
+CREATOR_ACCOUNT_INDEX: int = 2
+PAYER_ACCOUNT_INDEX: int = 3
+REPEAT_PAYER_ACCOUNT_INDEX: int = 4
+RECEIPT_RECIPIENT_ACCOUNT_INDEX: int = 5
+
+CREATE: str = "create"
+FIRST_PAY: str = "first_pay"
+REPEAT_PAY: str = "repeat_pay"
+RECEIPT_TRANSFER: str = "receipt_transfer"
+MEASUREMENTS: list[str] = [CREATE, FIRST_PAY, REPEAT_PAY, RECEIPT_TRANSFER]
+
+# these actions make the PaymentRequest unpayable after the first payment: the first one disables it and the second
+# one has no NFT left to transfer
+SINGLE_PAYMENT_POST_PAYMENT_ACTIONS: list[PostPaymentAction] = [
+    PostPaymentAction.DISABLE_PAYMENT_REQUEST,
+    PostPaymentAction.TRANSFER_NFT,
+]
+
+
+class GasRegressionException(Exception):
+    pass
+
+
+class GasBaselineNotFoundException(Exception):
+    pass
+
+
+@dataclass
+class GasMatrixCell:
+    payment_precondition: PaymentPrecondition
+    token_amount: TokenAmount
+    post_payment_action: PostPaymentAction
+    gas_used: dict[str, Optional[int]] = field(default_factory=lambda: {name: None for name in MEASUREMENTS})
+    error: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.payment_precondition.name}/{self.token_amount.name}/{self.post_payment_action.name}"
+
+
+@dataclass
+class GasRegression:
+    key: str
+    measurement: str
+    baseline_gas_used: int
+    gas_used: Optional[int]
+
+    def __str__(self) -> str:
+        if self.gas_used is None:
+            return f"{self.key} {self.measurement}: {self.baseline_gas_used} -> failed"
+        delta: float = (self.gas_used - self.baseline_gas_used) / self.baseline_gas_used
+        return f"{self.key} {self.measurement}: {self.baseline_gas_used} -> {self.gas_used} ({delta:+.2%})"
+
+
+def _create_payment_request(*, builder: PaymentRequestBuilder, creator: Account) -> TransactionReceipt:
+    payment_request: ProjectContract = builder.payment_request
+    if builder.is_token_amount_static:
+        return payment_request.createWithStaticTokenAmount(
+            builder.static_token_amounts,
+            builder.payment_precondition,
+            builder.post_payment_action,
+            ZERO_ADDRESS,
+            {"from": creator},
+        )
+    return payment_request.createWithDynamicTokenAmount(
+        builder.dynamic_token_amount,
+        builder.payment_precondition,
+        builder.post_payment_action,
+        ZERO_ADDRESS,
+        {"from": creator},
+    )
+
+
+def _setup_payer(*, configuration: PaymentRequestConfiguration, builder: PaymentRequestBuilder, payer: Account) -> None:
+    if configuration.payment_precondition == PaymentPrecondition.NFT_OWNER:
+        # for tokens other than the exclusive one, NFTOwnerPaymentPrecondition requires the payer to own a
+        # PaymentRequest of the same contract
+        _create_payment_request(builder=builder, creator=payer)
+
+
+def _pay(*, builder: PaymentRequestBuilder, payment_request_id: int, payer: Account) -> TransactionReceipt:
+    payment_request: ProjectContract = builder.payment_request
+
+    token: ProjectContract
+    amount: int
+    if builder.is_token_amount_static:
+        token_address, amount = builder.static_token_amounts[0]
+        token = MyERC20.at(token_address)
+    else:
+        token = builder.tokens_for_dynamic_token_amount_payment[0]
+        amount = payment_request.getAmountForToken.call(payment_request_id, token.address, {"from": payer})
+
+    builder.transfer_erc20_to_address(erc20=token, to=payer, amount=amount)
+    builder.approve_tokens_for_payment_request(erc20=token, from_account=payer, amount=amount)
+    return payment_request.pay(payment_request_id, token.address, {"from": payer})
+
+
+def measure_cell(configuration: PaymentRequestConfiguration) -> GasMatrixCell:
+    cell: GasMatrixCell = GasMatrixCell(
+        payment_precondition=configuration.payment_precondition,
+        token_amount=configuration.token_amount,
+        post_payment_action=configuration.post_payment_action,
+    )
+    creator: Account = accounts[CREATOR_ACCOUNT_INDEX]
+    payer: Account = accounts[PAYER_ACCOUNT_INDEX]
+    repeat_payer: Account = accounts[REPEAT_PAYER_ACCOUNT_INDEX]
+
+    try:
+        # only the PaymentRequest itself is measured, its dependencies are deployed in parallel
+        builder: PaymentRequestBuilder = PaymentRequestBuilder(
+            configuration,
+            DEPENDENCIES_DEPLOYER_ACCOUNT_INDEX,
+            PAYMENT_REQUEST_DEPLOYER_ACCOUNT_INDEX,
+            parallel_deploy=True,
+        )
+        payment_request: ProjectContract = builder.payment_request
+
+        tx: TransactionReceipt = _create_payment_request(builder=builder, creator=creator)
+        cell.gas_used[CREATE] = tx.gas_used
+        payment_request_id: int = int(tx.return_value)
+
+        if configuration.post_payment_action == PostPaymentAction.DISABLE_PAYMENT_REQUEST:
+            # only the owner of the PaymentRequest can disable it
+            payment_request.transferFrom(
+                creator.address, builder.post_payment_action.address, payment_request_id, {"from": creator}
+            )
+
+        _setup_payer(configuration=configuration, builder=builder, payer=payer)
+        tx = _pay(builder=builder, payment_request_id=payment_request_id, payer=payer)
+        cell.gas_used[FIRST_PAY] = tx.gas_used
+        receipt_id: int = int(tx.return_value)
+
+        if configuration.post_payment_action not in SINGLE_PAYMENT_POST_PAYMENT_ACTIONS:
+            _setup_payer(configuration=configuration, builder=builder, payer=repeat_payer)
+            tx = _pay(builder=builder, payment_request_id=payment_request_id, payer=repeat_payer)
+            cell.gas_used[REPEAT_PAY] = tx.gas_used
+
+        receipt: ProjectContract = Receipt.at(payment_request.receipt())
+        tx = receipt.transferFrom(
+            payer.address, accounts[RECEIPT_RECIPIENT_ACCOUNT_INDEX].address, receipt_id, {"from": payer}
+        )
+        cell.gas_used[RECEIPT_TRANSFER] = tx.gas_used
+    except VirtualMachineError as e:
+        # keep the measurements done so far, a cell that stops working is reported as a regression
+        cell.error = str(e)
+
+    return cell
+
+
+def run_gas_matrix() -> list[GasMatrixCell]:
+    configurations: list[PaymentRequestConfiguration] = [
+        PaymentRequestConfiguration(
+            payment_precondition.value, token_amount.value, post_payment_action.value, STATIC_TOKEN_AMOUNTS
+        )
+        for payment_precondition, token_amount, post_payment_action in itertools.product(
+            PaymentPrecondition, TokenAmount, PostPaymentAction
+        )
+    ]
+
+    # every cell is measured from the same chain state, so that they don't affect each other
+    cells: list[GasMatrixCell] = []
+    chain.snapshot()
+    for configuration in configurations:
+        cells.append(measure_cell(configuration))
+        chain.revert()
+    return cells
+
+
+def to_baseline(cells: list[GasMatrixCell]) -> dict[str, dict[str, Optional[int]]]:
+    return {cell.key: dict(cell.gas_used) for cell in cells}
+
+
+def write_baseline(cells: list[GasMatrixCell], path: Path) -> None:
+    path.write_text(json.dumps(to_baseline(cells), indent=4, sort_keys=True) + "\n")
+
+
+def read_baseline(path: Path) -> dict[str, dict[str, Optional[int]]]:
+    # a missing baseline is not written on the fly, as that would let any regression pass unnoticed
+    if not path.exists():
+        raise GasBaselineNotFoundException(
+            f"No baseline found at {path}. Create it with: brownie run scripts/benchmark/gas_matrix.py update_baseline"
+        )
+    return json.loads(path.read_text())
+
+
+def find_regressions(
+    *,
+    baseline: dict[str, dict[str, Optional[int]]],
+    current: dict[str, dict[str, Optional[int]]],
+    threshold: float,
+) -> list[GasRegression]:
+    """
+    Cells or measurements that are not in the baseline are new, as such they can't regress. A measurement that is in
+    the baseline, but could not be done anymore, is a regression.
+    """
+    regressions: list[GasRegression] = []
+    for key, baseline_gas_used in baseline.items():
+        for measurement, baseline_value in baseline_gas_used.items():
+            if baseline_value is None:
+                continue
+            value: Optional[int] = current.get(key, {}).get(measurement)
+            if value is None or value > baseline_value * (1 + threshold):
+                regressions.append(
+                    GasRegression(key=key, measurement=measurement, baseline_gas_used=baseline_value, gas_used=value)
+                )
+    return regressions
+
+
+def print_gas_matrix(
+    cells: list[GasMatrixCell], baseline: Optional[dict[str, dict[str, Optional[int]]]] = None
+) -> None:
+    key_width: int = max(len(cell.key) for cell in cells) + 2
+    print(f"{'PP/TA/PPA':<{key_width}}" + "".join(f"{name:>18}" for name in MEASUREMENTS))
+
+    for cell in cells:
+        row: str = f"{cell.key:<{key_width}}"
+        for name in MEASUREMENTS:
+            value: Optional[int] = cell.gas_used[name]
+            column: str = "-" if value is None else str(value)
+            baseline_value: Optional[int] = (baseline or {}).get(cell.key, {}).get(name)
+            if value is not None and baseline_value:
+                column += f" ({value - baseline_value:+d})"
+            row += f"{column:>18}"
+        print(row)
+        if cell.error:
+            print(f"{'':<{key_width}}failed: {cell.error}")
+
+
+def update_baseline(baseline_path: str = str(DEFAULT_BASELINE_PATH)):
+    cells: list[GasMatrixCell] = run_gas_matrix()
+    print_gas_matrix(cells)
+    write_baseline(cells, Path(baseline_path))
+    print(f"Baseline written to {baseline_path}")
+
+
+def main(baseline_path: str = str(DEFAULT_BASELINE_PATH), threshold: str = str(DEFAULT_THRESHOLD)):
+    baseline: dict[str, dict[str, Optional[int]]] = read_baseline(Path(baseline_path))
+    cells: list[GasMatrixCell] = run_gas_matrix()
+    print_gas_matrix(cells, baseline)
+
+    regressions: list[GasRegression] = find_regressions(
+        baseline=baseline, current=to_baseline(cells), threshold=float(threshold)
+    )
+    if regressions:
+        raise GasRegressionException(
+            f"{len(regressions)} gas regression(s) above {float(threshold):.2%}:\n"
+            + "\n".join(str(regression) for regression in regressions)
+        )
@@ -0,0 +1,397 @@
+"""
+Load generator: measures how many pay() transactions per second the contracts and the node sustain.
+
+Usage:
+    brownie run scripts/benchmark/load_generator.py main [num_payers] [payments_per_payer] [in_flight] [processes]
+        [receipt_timeout]
+
+The PaymentRequests are set up with PaymentRequestBuilder and PaymentRequestTestProxy (see tests/configuration.py).
+Then, before the load starts:
+- fresh payer accounts are funded (ETH and tokens) and approve all of their payments at once,
+- the nonces of the payers are tracked locally, from the pending nonce read once per payer,
+- every pay() transaction is signed upfront, by a pool of processes.
+
+The signed transactions are then submitted in a round-robin over the payers, keeping in_flight of them sent but not
+mined yet, through the JsonRpcBatchClient (see scripts/utils/json_rpc.py) of an AsyncPaymentRequestClient, which waits
+at most receipt_timeout seconds for every receipt. The report has the throughput (mined transactions per second), the
+latency percentiles (from the submission to the receipt), the gas used per block and the failures: the stages at which
+the reverted payments failed (see scripts/utils/failure_funnel.py) and the payments not mined within receipt_timeout.
+"""
+import asyncio
+import itertools
+import math
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import aiohttp
+from brownie import MyERC20, accounts, web3
+from brownie.network.account import Account, LocalAccount
+from brownie.network.contract import ProjectContract
+from eth_account import Account as EthAccount
+from eth_utils import encode_hex
+from web3 import Web3
+
+from scripts.utils.async_client import AsyncPaymentRequestClient, ReceiptTimeoutException
+from scripts.utils.codec import encode_pay
+from scripts.utils.failure_funnel import FailureClassifier, FailureReport, UNKNOWN_STAGE
+from scripts.utils.json_rpc import JsonRpcException
+from tests.configuration import (
+    PaymentPrecondition,
+    PaymentRequestBuilder,
+    PaymentRequestConfiguration,
+    PaymentRequestTestProxy,
+    PostPaymentAction,
+    TokenAmount,
+)
+
+DEPENDENCIES_DEPLOYER_ACCOUNT_INDEX: int = 0
+PAYMENT_REQUEST_DEPLOYER_ACCOUNT_INDEX: int = 1
+CREATOR_ACCOUNT_INDEX: int = 2
+
+STATIC_TOKEN_AMOUNTS: list[int] = [10]
+# ETH given to every payer, for the gas of its approval and of its payments
+PAYER_FUNDING: int = 10 ** 18
+# margin over the gas estimated for the first payment of a payer, as the transactions are signed upfront
+GAS_LIMIT_MARGIN: float = 1.2
+LATENCY_PERCENTILES: list[int] = [50, 90, 99]
+# seconds
+RECEIPT_POLL_INTERVAL: float = 0.05
+DEFAULT_RECEIPT_TIMEOUT: float = 120
+
+
+class NonceManager:
+    """
+    Next nonce of every account, read from the node once and then tracked locally.
+    """
+
+    def __init__(self, w3: Optional[Web3] = None):
+        self._w3: Web3 = w3 if w3 is not None else web3
+        self._nonces: dict[str, int] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def reserve(self, address: str) -> int:
+        with self._lock:
+            if address not in self._nonces:
+                self._nonces[address] = self._w3.eth.get_transaction_count(address, "pending")
+            nonce: int = self._nonces[address]
+            self._nonces[address] += 1
+            return nonce
+
+
+@dataclass
+class PendingTransaction:
+    payer: str
+    nonce: int
+    raw_transaction: str
+
+
+@dataclass
+class SubmittedTransaction:
+    tx_hash: str
+    latency: float
+    # None if the transaction was not mined within the receipt timeout
+    block_number: Optional[int]
+    is_success: bool
+
+    @property
+    def is_timed_out(self) -> bool:
+        return self.block_number is None
+
+
+@dataclass
+class LoadReport:
+    num_transactions: int
+    elapsed: float
+    latencies: list[float]
+    # block number -> gas used by the block
+    gas_per_block: dict[int, int]
+    failure_stages: Counter = field(default_factory=Counter)
+    num_rejected: int = 0
+    # sent, but not mined within the receipt timeout (or the receipt could not be obtained)
+    num_timed_out: int = 0
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def num_reverted(self) -> int:
+        return sum(self.failure_stages.values())
+
+    @property
+    def num_failures(self) -> int:
+        return self.num_reverted + self.num_timed_out
+
+    def format_report(self) -> str:
+        lines: list[str] = [
+            f"transactions: {self.num_transactions} ({len(self.latencies)} mined, {self.num_reverted} reverted, "
+            f"{self.num_timed_out} timed out, {self.num_rejected} rejected)",
+            f"throughput: {self.throughput:.1f} tx/s over {self.elapsed:.2f}s",
+            "latency: "
+            + ", ".join(
+                f"p{percentile}={get_percentile(self.latencies, percentile) * 1000:.1f}ms"
+                for percentile in LATENCY_PERCENTILES
+            ),
+        ]
+        if self.gas_per_block:
+            gas_used: list[int] = list(self.gas_per_block.values())
+            lines.append(
+                f"gas per block: mean={sum(gas_used) / len(gas_used):.0f}, max={max(gas_used)} "
+                f"over {len(gas_used)} blocks"
+            )
+        if self.failure_stages:
+            lines.append(
+                "failure stages: "
+                + ", ".join(f"{stage}={count}" for stage, count in self.failure_stages.most_common())
+            )
+        return "\n".join(lines)
+
+
+def get_percentile(values: list[float], percentile: int) -> float:
+    """
+    Nearest-rank percentile, 0 for no values.
+    """
+    if not values:
+        return 0.0
+    sorted_values: list[float] = sorted(values)
+    return sorted_values[max(0, math.ceil(percentile / 100 * len(sorted_values)) - 1)]
+
+
+def _sign_transactions(args: tuple[str, list[dict[str, Any]]]) -> list[str]:
+    """
+    Signs the transactions of a single account, in a worker process.
+    """
+    private_key, transactions = args
+    account: EthAccount = EthAccount.from_key(private_key)
+    return [encode_hex(account.sign_transaction(transaction).rawTransaction) for transaction in transactions]
+
+
+def set_up_payment_request() -> tuple[PaymentRequestBuilder, int]:
+    configuration: PaymentRequestConfiguration = PaymentRequestConfiguration(
+        payment_precondition_id=PaymentPrecondition.NONE.value,
+        token_amount_id=TokenAmount.STATIC.value,
+        post_payment_action_id=PostPaymentAction.NONE.value,
+        static_token_amounts=STATIC_TOKEN_AMOUNTS,
+    )
+    builder: PaymentRequestBuilder = PaymentRequestBuilder(
+        configuration=configuration,
+        payment_request_dependencies_deployer_account_index=DEPENDENCIES_DEPLOYER_ACCOUNT_INDEX,
+        payment_request_deployer_account_index=PAYMENT_REQUEST_DEPLOYER_ACCOUNT_INDEX,
+    )
+    proxy: PaymentRequestTestProxy = PaymentRequestTestProxy(
+        payment_request_builder=builder, creator_account_index=CREATOR_ACCOUNT_INDEX
+    )
+    return builder, proxy.create_payment_request()
+
+
+def fund_payers(*, builder: PaymentRequestBuilder, num_payers: int, payments_per_payer: int) -> list[LocalAccount]:
+    token_address, token_amount = builder.static_token_amounts[0]
+    token: ProjectContract = MyERC20.at(token_address)
+    funder: Account = builder.payment_request_dependencies_deployer_account
+
+    payers: list[LocalAccount] = [accounts.add() for _ in range(num_payers)]
+    payer: LocalAccount
+    for payer in payers:
+        funder.transfer(payer, PAYER_FUNDING)
+        builder.transfer_erc20_to_address(erc20=token, to=payer, amount=token_amount * payments_per_payer)
+        builder.approve_tokens_for_payment_request(
+            erc20=token, from_account=payer, amount=token_amount * payments_per_payer
+        )
+    return payers
+
+
+def sign_payments(
+    *,
+    builder: PaymentRequestBuilder,
+    payment_request_id: int,
+    payers: list[LocalAccount],
+    payments_per_payer: int,
+    nonce_manager: NonceManager,
+    processes: int,
+) -> list[PendingTransaction]:
+    """
+    Signs payments_per_payer payments for every payer, returned in a round-robin over the payers.
+    """
+    token_address: str = builder.static_token_amounts[0][0]
+    payment_request_address: str = builder.payment_request.address
+    data: str = encode_hex(encode_pay(payment_request_id, token_address))
+    gas: int = int(
+        web3.eth.estimate_gas({"from": payers[0].address, "to": payment_request_address, "data": data})
+        * GAS_LIMIT_MARGIN
+    )
+    gas_price: int = web3.eth.gas_price
+    chain_id: int = web3.eth.chain_id
+
+    nonces: list[list[int]] = [
+        [nonce_manager.reserve(payer.address) for _ in range(payments_per_payer)] for payer in payers
+    ]
+    jobs: list[tuple[str, list[dict[str, Any]]]] = [
+        (
+            payer.private_key,
+            [
+                {
+                    "to": payment_request_address,
+                    "data": data,
+                    "value": 0,
+                    "nonce": nonce,
+                    "gas": gas,
+                    "gasPrice": gas_price,
+                    "chainId": chain_id,
+                }
+                for nonce in payer_nonces
+            ],
+        )
+        for payer, payer_nonces in zip(payers, nonces)
+    ]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        raw_transactions: list[list[str]] = list(executor.map(_sign_transactions, jobs))
+
+    pending: list[list[PendingTransaction]] = [
+        [
+            PendingTransaction(payer=payer.address, nonce=nonce, raw_transaction=raw_transaction)
+            for nonce, raw_transaction in zip(payer_nonces, payer_raw_transactions)
+        ]
+        for payer, payer_nonces, payer_raw_transactions in zip(payers, nonces, raw_transactions)
+    ]
+    return [
+        transaction
+        for round_transactions in itertools.zip_longest(*pending)
+        for transaction in round_transactions
+        if transaction is not None
+    ]
+
+
+async def _submit(
+    client: AsyncPaymentRequestClient, transaction: PendingTransaction, semaphore: asyncio.Semaphore
+) -> Optional[SubmittedTransaction]:
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    try:
+        sent_at: float = loop.time()
+        tx_hash: str
+        try:
+            tx_hash = await client.rpc.request("eth_sendRawTransaction", [transaction.raw_transaction])
+        except JsonRpcException as e:
+            # development nodes report reverts in the response, the transaction is still mined
+            if not isinstance(e.data, dict) or "hash" not in e.data:
+                return None
+            tx_hash = e.data["hash"]
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # the node could not be reached, as such the transaction is rejected rather than failing the whole load
+            return None
+        receipt: dict[str, Any]
+        try:
+            receipt = await client.wait_for_transaction_receipt(tx_hash)
+        except (ReceiptTimeoutException, JsonRpcException, aiohttp.ClientError, asyncio.TimeoutError):
+            # sent, but its receipt could not be obtained
+            return SubmittedTransaction(
+                tx_hash=tx_hash, latency=loop.time() - sent_at, block_number=None, is_success=False
+            )
+        return SubmittedTransaction(
+            tx_hash=tx_hash,
+            latency=loop.time() - sent_at,
+            block_number=int(receipt["blockNumber"], 16),
+            is_success=int(receipt["status"], 16) == 1,
+        )
+    finally:
+        semaphore.release()
+
+
+async def submit_transactions(
+    transactions: list[PendingTransaction],
+    *,
+    endpoint_uri: str,
+    in_flight: int,
+    receipt_timeout: float = DEFAULT_RECEIPT_TIMEOUT,
+) -> list[Optional[SubmittedTransaction]]:
+    """
+    Submits the transactions in order, with at most in_flight of them not mined yet. Rejected transactions, by the
+    node or because it could not be reached, are None. The ones not mined within receipt_timeout seconds, or whose
+    receipt could not be obtained, are timed out.
+    """
+    semaphore: asyncio.Semaphore = asyncio.Semaphore(in_flight)
+    async with AsyncPaymentRequestClient(
+        endpoint_uri,
+        connection_limit=in_flight,
+        receipt_poll_interval=RECEIPT_POLL_INTERVAL,
+        receipt_timeout=receipt_timeout,
+    ) as client:
+        tasks: list[asyncio.Task] = []
+        transaction: PendingTransaction
+        for transaction in transactions:
+            await semaphore.acquire()
+            tasks.append(asyncio.create_task(_submit(client, transaction, semaphore)))
+        return list(await asyncio.gather(*tasks))
+
+
+def run_load(
+    *,
+    num_payers: int = 20,
+    payments_per_payer: int = 10,
+    in_flight: int = 32,
+    processes: int = 4,
+    receipt_timeout: float = DEFAULT_RECEIPT_TIMEOUT,
+) -> LoadReport:
+    builder, payment_request_id = set_up_payment_request()
+    payers: list[LocalAccount] = fund_payers(
+        builder=builder, num_payers=num_payers, payments_per_payer=payments_per_payer
+    )
+    transactions: list[PendingTransaction] = sign_payments(
+        builder=builder,
+        payment_request_id=payment_request_id,
+        payers=payers,
+        payments_per_payer=payments_per_payer,
+        nonce_manager=NonceManager(),
+        processes=processes,
+    )
+
+    start: float = time.perf_counter()
+    results: list[Optional[SubmittedTransaction]] = asyncio.run(
+        submit_transactions(
+            transactions, endpoint_uri=web3.provider.endpoint_uri, in_flight=in_flight, receipt_timeout=receipt_timeout
+        )
+    )
+    elapsed: float = time.perf_counter() - start
+
+    submitted: list[SubmittedTransaction] = [result for result in results if result is not None]
+    mined: list[SubmittedTransaction] = [result for result in submitted if not result.is_timed_out]
+    block_numbers: set[int] = {result.block_number for result in mined}
+    report: LoadReport = LoadReport(
+        num_transactions=len(transactions),
+        elapsed=elapsed,
+        latencies=[result.latency for result in mined],
+        gas_per_block={
+            block_number: web3.eth.get_block(block_number)["gasUsed"] for block_number in sorted(block_numbers)
+        },
+        num_rejected=len(results) - len(submitted),
+        num_timed_out=len(submitted) - len(mined),
+    )
+
+    failed_tx_hashes: list[str] = [result.tx_hash for result in mined if not result.is_success]
+    if failed_tx_hashes:
+        failure_report: FailureReport = FailureClassifier().classify(failed_tx_hashes)
+        report.failure_stages.update(
+            failure.failed_at if failure.failed_at is not None else UNKNOWN_STAGE
+            for failure in failure_report.failures
+        )
+    return report
+
+
+def main(
+    num_payers: str = "20",
+    payments_per_payer: str = "10",
+    in_flight: str = "32",
+    processes: str = "4",
+    receipt_timeout: str = str(DEFAULT_RECEIPT_TIMEOUT),
+):
+    report: LoadReport = run_load(
+        num_payers=int(num_payers),
+        payments_per_payer=int(payments_per_payer),
+        in_flight=int(in_flight),
+        processes=int(processes),
+        receipt_timeout=float(receipt_timeout),
+    )
+    print(report.format_report())
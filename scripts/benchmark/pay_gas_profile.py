@@ -0,0 +1,63 @@
+"""
+Prints the per-stage gas attribution of a pay() or payPacked() transaction (see scripts/utils/gas_profiler.py), and
+optionally writes it as folded stacks, which can be rendered with flamegraph.pl or speedscope.
+
+Usage: brownie run scripts/benchmark/pay_gas_profile.py main [txid] [folded_stacks_path]
+
+The transaction must be known to the node brownie is connected to, e.g. a ganache instance that is already running
+on the port of the development network. If no transaction ID is provided, a sample payment is performed and profiled.
+"""
+from pathlib import Path
+
+from brownie import PaymentRequest, accounts, chain
+from brownie.network.account import Account
+from brownie.network.contract import ProjectContract
+from brownie.network.transaction import TransactionReceipt
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.calldata import unpack_payment
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.gas_profiler import GasProfile, profile_payment
+
+TOKEN_AMOUNT: int = 10
+
+
+def _get_payment_request_id(payment_request: ProjectContract, tx: TransactionReceipt) -> int:
+    if "PaymentRequestPaid" in tx.events:
+        return tx.events["PaymentRequestPaid"]["paymentRequestId"]
+
+    # reverted payment, no events to read it from
+    function_signature, args = payment_request.decode_input(tx.input)
+    if function_signature.startswith("payPacked"):
+        payment_request_id, _, _ = unpack_payment(args[0])
+        return payment_request_id
+    return args[0]
+
+
+def _perform_sample_payment() -> TransactionReceipt:
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: ProjectContract = contract_builder.PaymentRequest
+    erc_20: ProjectContract = contract_builder.MyERC20
+
+    tx: TransactionReceipt = payment_request.createWithStaticTokenAmount(
+        [(erc_20.address, TOKEN_AMOUNT)], ADDRESS_ZERO, ADDRESS_ZERO, ADDRESS_ZERO, {"from": owner}
+    )
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, TOKEN_AMOUNT, {"from": payer})
+    return payment_request.pay(tx.return_value, erc_20.address, {"from": payer})
+
+
+def main(txid: str = "", folded_stacks_path: str = ""):
+    tx: TransactionReceipt = chain.get_transaction(txid) if txid else _perform_sample_payment()
+    payment_request: ProjectContract = PaymentRequest.at(tx.receiver)
+
+    profile: GasProfile = profile_payment(
+        tx, payment_request=payment_request, payment_request_id=_get_payment_request_id(payment_request, tx)
+    )
+    print(profile.format_table())
+
+    if folded_stacks_path:
+        Path(folded_stacks_path).write_text("\n".join(profile.to_folded_stacks()) + "\n")
+        print(f"Folded stacks written to {folded_stacks_path}")
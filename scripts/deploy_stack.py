@@ -0,0 +1,55 @@
+"""
+Provisions a PaymentRequest stack (PaymentRequest, its Receipt and callbacks) through PaymentRequestFactory, in a single
+transaction, at addresses that are determined by the deploying account and the salt label only.
+
+Usage:
+    brownie run scripts/deploy_stack.py main <salt_label> [name] [symbol] [callbacks] [factory_address] [account_id]
+
+callbacks is a comma-separated list of callback contracts without constructor arguments, e.g.
+"OnePurchasePerAddressPaymentPrecondition,DisablePaymentRequestPaymentPostAction". Without a factory address, the
+factory at its deterministic address is used (or deployed, see scripts/utils/create2.py). Without an account ID, the
+first local account is used.
+Running it again with the same arguments doesn't deploy anything, it only prints the existing addresses.
+"""
+from brownie import accounts, project
+from brownie.network.account import Account
+from brownie.network.contract import ProjectContract
+
+from scripts.utils.contract import get_create2_deployer
+from scripts.utils.create2 import CallbackDeployment, Create2Deployer, PaymentRequestStack, salt_from_label
+
+
+def _get_callbacks(callbacks: str) -> list[CallbackDeployment]:
+    loaded_project = project.get_loaded_projects()[0]
+    return [(loaded_project[name.strip()], ()) for name in callbacks.split(",") if name.strip()]
+
+
+def main(
+    salt_label: str,
+    name: str = "PaymentRequest",
+    symbol: str = "PRQ",
+    callbacks: str = "",
+    factory_address: str = "",
+    account_id: str = "",
+):
+    account: Account = accounts.load(account_id) if account_id else accounts[0]
+    deployer: Create2Deployer = get_create2_deployer(account, factory_address or None)
+
+    stack: PaymentRequestStack = deployer.deploy_stack(
+        account=account,
+        salt=salt_from_label(salt_label),
+        name=name,
+        symbol=symbol,
+        callbacks=_get_callbacks(callbacks),
+    )
+
+    print(f"Factory:         {deployer.factory.address}")
+    print(f"PaymentRequest:  {stack.payment_request.address}")
+    print(f"Receipt:         {stack.receipt.address}")
+    callback: ProjectContract
+    for callback in stack.callbacks:
+        print(f"{callback._name + ':':<17}{callback.address}")
+    if stack.tx is None:
+        print("The stack was already deployed.")
+    else:
+        print(f"Deployed in {stack.tx.txid}, gas used: {stack.tx.gas_used}")
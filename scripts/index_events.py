@@ -0,0 +1,29 @@
+"""
+Indexes the events of a PaymentRequest and of its Receipt into an SQLite database (see scripts/utils/indexer.py).
+
+Usage:
+    brownie run scripts/index_events.py main <payment_request_address> [db_path] [processes] [start_block] --network <network>
+
+The history up to the latest block is backfilled by a pool of processes, later runs only index the new blocks.
+"""
+from pathlib import Path
+
+from brownie import PaymentRequest, web3
+
+from scripts.utils.indexer import EventIndexer
+
+
+def main(payment_request_address: str, db_path: str = "events.sqlite", processes: int = 4, start_block: int = 0):
+    payment_request: PaymentRequest = PaymentRequest.at(payment_request_address)
+    indexer: EventIndexer = EventIndexer(
+        db_path=Path(db_path),
+        payment_request=payment_request.address,
+        receipt=payment_request.receipt(),
+        start_block=int(start_block),
+    )
+
+    try:
+        num_events: int = indexer.backfill(web3.eth.block_number, processes=int(processes))
+        print(f"Indexed {num_events} events up to block {indexer.cursor} into {db_path}")
+    finally:
+        indexer.close()
@@ -0,0 +1,67 @@
+"""
+Creates the PaymentRequests of a catalogue, from a CSV or JSONL file (see scripts/utils/bulk_loader.py).
+
+Usage:
+    brownie run scripts/load_catalogue.py main <catalogue_path> <payment_request_address> <account_id> \
+        [checkpoint_path] [target_block_gas_fraction] --network <network>
+
+The PaymentRequests are created by the account loaded with accounts.load(account_id), its transactions are signed
+locally. The checkpoint defaults to <catalogue_path>.checkpoint.sqlite. An interrupted run is resumed by running the
+same command again: the rows that were already submitted are skipped.
+"""
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+from brownie import accounts, web3
+from eth_account import Account as EthAccount
+from eth_account.signers.local import LocalAccount
+
+from scripts.utils.async_client import AsyncPaymentRequestClient
+from scripts.utils.bulk_loader import (
+    DEFAULT_TARGET_BLOCK_GAS_FRACTION,
+    BulkLoader,
+    LoadCheckpoint,
+    LoadSummary,
+    read_rows,
+)
+
+CHECKPOINT_SUFFIX: str = ".checkpoint.sqlite"
+
+
+async def _load(
+    catalogue_path: Path,
+    payment_request_address: str,
+    account: LocalAccount,
+    checkpoint: LoadCheckpoint,
+    target_block_gas_fraction: float,
+) -> LoadSummary:
+    async with AsyncPaymentRequestClient(web3.provider.endpoint_uri) as client:
+        loader: BulkLoader = BulkLoader(
+            client=client,
+            payment_request=payment_request_address,
+            account=account,
+            checkpoint=checkpoint,
+            target_block_gas_fraction=target_block_gas_fraction,
+        )
+        return await loader.load(read_rows(catalogue_path))
+
+
+def main(
+    catalogue_path: str,
+    payment_request_address: str,
+    account_id: str,
+    checkpoint_path: Optional[str] = None,
+    target_block_gas_fraction: float = DEFAULT_TARGET_BLOCK_GAS_FRACTION,
+):
+    account: LocalAccount = EthAccount.from_key(accounts.load(account_id).private_key)
+    checkpoint: LoadCheckpoint = LoadCheckpoint(
+        Path(checkpoint_path) if checkpoint_path is not None else Path(catalogue_path + CHECKPOINT_SUFFIX)
+    )
+    try:
+        summary: LoadSummary = asyncio.run(
+            _load(Path(catalogue_path), payment_request_address, account, checkpoint, float(target_block_gas_fraction))
+        )
+    finally:
+        checkpoint.close()
+    print(summary.format_summary())
@@ -0,0 +1,809 @@
+"""
+asyncio client of PaymentRequest and Receipt, for services that issue many reads and payments concurrently. All
+calls go through a JsonRpcBatchClient (see scripts/utils/json_rpc.py): the calls issued concurrently are sent to the
+node as a single JSON-RPC batch, over a pooled keep-alive HTTP session.
+
+    async with AsyncPaymentRequestClient(endpoint_uri) as client:
+        payment_request: AsyncPaymentRequest = client.payment_request(payment_request_address)
+        receipt: AsyncReceipt = await payment_request.get_receipt()
+        receipt_ids: list[int] = await receipt.get_receipt_ids_for_payment_request_paid_by(payment_request_id, payer)
+        receipts: list[ReceiptData] = await asyncio.gather(*map(receipt.get_receipt_data, receipt_ids))
+
+Contract objects are cached by address, as such client.payment_request(), client.receipt() and client.erc20() can be
+called on every use. Transactions are sent from an account of the node (its address) or from a LocalAccount, which
+signs them locally. Both wait for the transaction to be mined and raise ContractCallException, with the decoded error,
+if it reverts (TransactionRevertedException if it was mined).
+
+With a ReadCache (see scripts/utils/read_cache.py), immutable reads are only made once, and reads of the latest block
+are made at the head block, which is read at most once per head_refresh_interval, and cached for that block. The
+immutable reads of the PaymentRequests closed by a transaction sent by the client are dropped from the cache.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Callable, NamedTuple, Optional, Union
+
+from eth_abi import decode_abi, encode_abi
+from eth_abi.grammar import BasicType, TupleType, parse
+from eth_account.signers.local import LocalAccount
+from eth_utils import encode_hex, keccak, to_checksum_address
+from hexbytes import HexBytes
+
+from scripts.utils.codec import (
+    PAYMENT_REQUEST_CREATED_TOPIC,
+    PAYMENT_REQUEST_PAID_TOPIC,
+    decode_payment_request_paid,
+    decode_receipt_data,
+    decode_token_amount_infos,
+    encode_approve,
+    encode_create_with_static_token_amount,
+    encode_pay,
+)
+from scripts.utils.errors import ERROR_REGISTRY, DecodedError, get_revert_data_from_call_response
+from scripts.utils.json_rpc import (
+    DEFAULT_BATCH_WINDOW,
+    DEFAULT_CONNECTION_LIMIT,
+    DEFAULT_MAX_BATCH_SIZE,
+    JsonRpcBatchClient,
+    JsonRpcException,
+)
+from scripts.utils.read_cache import ReadCache
+
+# seconds
+DEFAULT_RECEIPT_POLL_INTERVAL: float = 0.1
+DEFAULT_RECEIPT_TIMEOUT: float = 120
+DEFAULT_HEAD_REFRESH_INTERVAL: float = 1
+
+# account of the node (its address), or an account that signs the transactions locally
+Sender = Union[str, LocalAccount]
+
+
+class AsyncClientException(Exception):
+    pass
+
+
+class ContractCallException(AsyncClientException):
+    def __init__(self, message: str, error: Optional[DecodedError] = None):
+        super().__init__(message)
+        self.error: Optional[DecodedError] = error
+
+
+class ReceiptTimeoutException(AsyncClientException):
+    pass
+
+
+class TransactionRevertedException(ContractCallException):
+    def __init__(self, tx_hash: str, error: Optional[DecodedError] = None):
+        error_name: str = error.name if error is not None else "unknown error"
+        super().__init__(f"Transaction {tx_hash} reverted: {error_name}", error)
+        self.tx_hash: str = tx_hash
+
+
+class TokenAmountInfo(NamedTuple):
+    token: str
+    token_amount: int
+
+
+class ReceiptData(NamedTuple):
+    payment_request: str
+    payment_request_id: int
+    token: str
+    token_amount: int
+    payer: str
+    payee: str
+
+
+class OptionalReceiptDataLocation(NamedTuple):
+    data: str
+    data_id: int
+    is_set: bool
+
+
+def _normalize(value: Any, abi_type: Union[BasicType, TupleType]) -> Any:
+    """
+    Decoded value with checksummed addresses and tuples instead of lists.
+    """
+    if abi_type.arrlist:
+        return [_normalize(item, abi_type.item_type) for item in value]
+    if isinstance(abi_type, TupleType):
+        return tuple(_normalize(item, component) for item, component in zip(value, abi_type.components))
+    if abi_type.base == "address":
+        return to_checksum_address(value)
+    return value
+
+
+@dataclass(frozen=True)
+class AbiFunction:
+    name: str
+    input_types: tuple[str, ...] = ()
+    output_types: tuple[str, ...] = ()
+    # fast path of the hot functions (see scripts/utils/codec.py), used instead of eth_abi when set
+    encoder: Optional[Callable[..., bytes]] = field(default=None, compare=False)
+    decoder: Optional[Callable[[bytes], Any]] = field(default=None, compare=False)
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}({','.join(self.input_types)})"
+
+    @cached_property
+    def selector(self) -> bytes:
+        return keccak(text=self.signature)[:4]
+
+    @cached_property
+    def _parsed_output_types(self) -> list[Union[BasicType, TupleType]]:
+        return [parse(output_type) for output_type in self.output_types]
+
+    def encode(self, args: tuple) -> str:
+        if self.encoder is not None:
+            return encode_hex(self.encoder(*args))
+        return encode_hex(self.selector + encode_abi(list(self.input_types), list(args)))
+
+    def decode(self, data: bytes) -> Any:
+        """
+        Decoded return value, a tuple if the function returns more than one value.
+        """
+        if self.decoder is not None:
+            return self.decoder(data)
+        values: tuple = tuple(
+            _normalize(value, abi_type)
+            for value, abi_type in zip(decode_abi(list(self.output_types), data), self._parsed_output_types)
+        )
+        return values[0] if len(values) == 1 else values
+
+
+TOKEN_AMOUNT_INFO: str = "(address,uint256)"
+RECEIPT_DATA: str = "(address,uint256,address,uint256,address,address)"
+OPTIONAL_RECEIPT_DATA_LOCATION: str = "(address,uint256,bool)"
+
+
+def _function(
+    name: str,
+    input_types: str = "",
+    output_types: str = "",
+    *,
+    encoder: Optional[Callable[..., bytes]] = None,
+    decoder: Optional[Callable[[bytes], Any]] = None,
+) -> AbiFunction:
+    """
+    AbiFunction from comma-separated types, structs are given as tuples.
+    """
+
+    def split(types: str) -> tuple[str, ...]:
+        parsed: TupleType = parse(f"({types})")
+        return tuple(component.to_type_str() for component in parsed.components)
+
+    return AbiFunction(
+        name=name, input_types=split(input_types), output_types=split(output_types), encoder=encoder, decoder=decoder
+    )
+
+
+class AsyncContract:
+    def __init__(self, client: "AsyncPaymentRequestClient", address: str):
+        self._client: AsyncPaymentRequestClient = client
+        self.address: str = to_checksum_address(address)
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} '{self.address}'>"
+
+    async def _call(
+        self,
+        function: AbiFunction,
+        *args: Any,
+        sender: Optional[str] = None,
+        block_identifier: Union[int, str] = "latest",
+    ) -> Any:
+        return await self._client.call(self.address, function, *args, sender=sender, block_identifier=block_identifier)
+
+    async def _transact(self, function: AbiFunction, *args: Any, sender: Sender) -> dict[str, Any]:
+        return await self._client.transact(self.address, function, *args, sender=sender)
+
+
+class AsyncERC721(AsyncContract):
+    BALANCE_OF: AbiFunction = _function("balanceOf", "address", "uint256")
+    OWNER_OF: AbiFunction = _function("ownerOf", "uint256", "address")
+    TOTAL_SUPPLY: AbiFunction = _function("totalSupply", "", "uint256")
+    TOKEN_BY_INDEX: AbiFunction = _function("tokenByIndex", "uint256", "uint256")
+    TOKEN_OF_OWNER_BY_INDEX: AbiFunction = _function("tokenOfOwnerByIndex", "address,uint256", "uint256")
+    TRANSFER_FROM: AbiFunction = _function("transferFrom", "address,address,uint256")
+
+    async def balance_of(self, owner: str) -> int:
+        return await self._call(self.BALANCE_OF, owner)
+
+    async def owner_of(self, token_id: int) -> str:
+        return await self._call(self.OWNER_OF, token_id)
+
+    async def total_supply(self) -> int:
+        return await self._call(self.TOTAL_SUPPLY)
+
+    async def token_by_index(self, index: int) -> int:
+        return await self._call(self.TOKEN_BY_INDEX, index)
+
+    async def token_of_owner_by_index(self, owner: str, index: int) -> int:
+        return await self._call(self.TOKEN_OF_OWNER_BY_INDEX, owner, index)
+
+    async def transfer_from(self, from_: str, to: str, token_id: int, *, sender: Sender) -> dict[str, Any]:
+        return await self._transact(self.TRANSFER_FROM, from_, to, token_id, sender=sender)
+
+
+class AsyncERC20(AsyncContract):
+    BALANCE_OF: AbiFunction = _function("balanceOf", "address", "uint256")
+    ALLOWANCE: AbiFunction = _function("allowance", "address,address", "uint256")
+    APPROVE: AbiFunction = _function("approve", "address,uint256", "bool", encoder=encode_approve)
+
+    async def balance_of(self, owner: str) -> int:
+        return await self._call(self.BALANCE_OF, owner)
+
+    async def allowance(self, owner: str, spender: str) -> int:
+        return await self._call(self.ALLOWANCE, owner, spender)
+
+    async def approve(self, spender: str, amount: int, *, sender: Sender) -> dict[str, Any]:
+        return await self._transact(self.APPROVE, spender, amount, sender=sender)
+
+
+class AsyncReceipt(AsyncERC721):
+    GET_RECEIPT_DATA: AbiFunction = _function(
+        "getReceiptData", "uint256", RECEIPT_DATA, decoder=decode_receipt_data
+    )
+    IS_OPTIONAL_RECEIPT_DATA_LOCATION_SET: AbiFunction = _function(
+        "isOptionalReceiptDataLocationSet", "uint256", "bool"
+    )
+    GET_RECEIPT_DATA_LOCATION: AbiFunction = _function(
+        "getReceiptDataLocation", "uint256", OPTIONAL_RECEIPT_DATA_LOCATION
+    )
+    GET_NUMBER_OF_RECEIPTS_PAID_BY: AbiFunction = _function("getNumberOfReceiptsPaidBy", "address", "uint256")
+    GET_RECEIPT_IDS_PAID_BY: AbiFunction = _function("getReceiptIdsPaidBy", "address", "uint256[]")
+    GET_RECEIPT_ID_PAID_BY_AT_INDEX: AbiFunction = _function("getReceiptIdPaidByAtIndex", "address,uint256", "uint256")
+    GET_NUMBER_OF_RECEIPTS_FOR_PAYMENT_REQUEST_PAID_BY: AbiFunction = _function(
+        "getNumberOfReceiptsForPaymentRequestPaidBy", "uint256,address", "uint256"
+    )
+    GET_RECEIPT_IDS_FOR_PAYMENT_REQUEST_PAID_BY: AbiFunction = _function(
+        "getReceiptIdsForPaymentRequestPaidBy", "uint256,address", "uint256[]"
+    )
+    GET_RECEIPT_ID_FOR_PAYMENT_REQUEST_PAID_BY_AT_INDEX: AbiFunction = _function(
+        "getReceiptIdForPaymentRequestPaidByAtIndex", "uint256,address,uint256", "uint256"
+    )
+    RECEIPT_ID_OF_OWNER_FOR_PAYMENT_REQUEST_ID_BY_INDEX: AbiFunction = _function(
+        "receiptIdOfOwnerForPaymentRequestIdByIndex", "uint256,address,uint256", "uint256"
+    )
+    TOTAL_SUPPLY_FOR_PAYMENT_REQUEST_ID: AbiFunction = _function("totalSupplyForPaymentRequestId", "uint256", "uint256")
+    RECEIPT_ID_PAYMENT_REQUEST_ID_BY_INDEX: AbiFunction = _function(
+        "receiptIdPaymentRequestIdByIndex", "uint256,uint256", "uint256"
+    )
+    BALANCE_OF_FOR_PAYMENT_REQUEST_ID: AbiFunction = _function(
+        "balanceOfForPaymentRequestId", "uint256,address", "uint256"
+    )
+
+    async def get_receipt_data(self, receipt_id: int) -> ReceiptData:
+        return ReceiptData(*await self._call(self.GET_RECEIPT_DATA, receipt_id))
+
+    async def is_optional_receipt_data_location_set(self, receipt_id: int) -> bool:
+        return await self._call(self.IS_OPTIONAL_RECEIPT_DATA_LOCATION_SET, receipt_id)
+
+    async def get_receipt_data_location(self, receipt_id: int) -> OptionalReceiptDataLocation:
+        return OptionalReceiptDataLocation(*await self._call(self.GET_RECEIPT_DATA_LOCATION, receipt_id))
+
+    async def get_number_of_receipts_paid_by(self, payer: str) -> int:
+        return await self._call(self.GET_NUMBER_OF_RECEIPTS_PAID_BY, payer)
+
+    async def get_receipt_ids_paid_by(self, payer: str) -> list[int]:
+        return await self._call(self.GET_RECEIPT_IDS_PAID_BY, payer)
+
+    async def get_receipt_id_paid_by_at_index(self, payer: str, index: int) -> int:
+        return await self._call(self.GET_RECEIPT_ID_PAID_BY_AT_INDEX, payer, index)
+
+    async def get_number_of_receipts_for_payment_request_paid_by(self, payment_request_id: int, payer: str) -> int:
+        return await self._call(self.GET_NUMBER_OF_RECEIPTS_FOR_PAYMENT_REQUEST_PAID_BY, payment_request_id, payer)
+
+    async def get_receipt_ids_for_payment_request_paid_by(self, payment_request_id: int, payer: str) -> list[int]:
+        return await self._call(self.GET_RECEIPT_IDS_FOR_PAYMENT_REQUEST_PAID_BY, payment_request_id, payer)
+
+    async def get_receipt_id_for_payment_request_paid_by_at_index(
+        self, payment_request_id: int, payer: str, index: int
+    ) -> int:
+        return await self._call(
+            self.GET_RECEIPT_ID_FOR_PAYMENT_REQUEST_PAID_BY_AT_INDEX, payment_request_id, payer, index
+        )
+
+    async def receipt_id_of_owner_for_payment_request_id_by_index(
+        self, payment_request_id: int, owner: str, index: int
+    ) -> int:
+        return await self._call(
+            self.RECEIPT_ID_OF_OWNER_FOR_PAYMENT_REQUEST_ID_BY_INDEX, payment_request_id, owner, index
+        )
+
+    async def total_supply_for_payment_request_id(self, payment_request_id: int) -> int:
+        return await self._call(self.TOTAL_SUPPLY_FOR_PAYMENT_REQUEST_ID, payment_request_id)
+
+    async def receipt_id_payment_request_id_by_index(self, payment_request_id: int, index: int) -> int:
+        return await self._call(self.RECEIPT_ID_PAYMENT_REQUEST_ID_BY_INDEX, payment_request_id, index)
+
+    async def balance_of_for_payment_request_id(self, payment_request_id: int, owner: str) -> int:
+        return await self._call(self.BALANCE_OF_FOR_PAYMENT_REQUEST_ID, payment_request_id, owner)
+
+
+class AsyncPaymentRequest(AsyncERC721):
+    IS_TOKEN_AMOUNT_STATIC: AbiFunction = _function("isTokenAmountStatic", "uint256", "bool")
+    IS_TOKEN_AMOUNT_DYNAMIC: AbiFunction = _function("isTokenAmountDynamic", "uint256", "bool")
+    IS_PAYMENT_PRECONDITION_SET: AbiFunction = _function("isPaymentPreconditionSet", "uint256", "bool")
+    IS_PAYMENT_POST_ACTION_SET: AbiFunction = _function("isPaymentPostActionSet", "uint256", "bool")
+    GET_NUMBER_OF_STATIC_TOKENS: AbiFunction = _function("getNumberOfStaticTokens", "uint256", "uint256")
+    GET_STATIC_TOKENS: AbiFunction = _function("getStaticTokens", "uint256", "address[]")
+    GET_STATIC_TOKEN_BY_INDEX: AbiFunction = _function("getStaticTokenByIndex", "uint256,uint256", "address")
+    GET_STATIC_TOKEN_AMOUNT_INFOS: AbiFunction = _function(
+        "getStaticTokenAmountInfos", "uint256", f"{TOKEN_AMOUNT_INFO}[]", decoder=decode_token_amount_infos
+    )
+    GET_STATIC_TOKEN_AMOUNT_INFO_BY_INDEX: AbiFunction = _function(
+        "getStaticTokenAmountInfoByIndex", "uint256,uint256", TOKEN_AMOUNT_INFO
+    )
+    GET_STATIC_TOKEN_AMOUNT_BY_INDEX: AbiFunction = _function(
+        "getStaticTokenAmountByIndex", "uint256,uint256", "uint256"
+    )
+    GET_STATIC_AMOUNT_FOR_TOKEN: AbiFunction = _function("getStaticAmountForToken", "uint256,address", "uint256")
+    IS_STATIC_TOKEN_ACCEPTED: AbiFunction = _function("isStaticTokenAccepted", "uint256,address", "bool")
+    IS_DYNAMIC_TOKEN_ACCEPTED: AbiFunction = _function("isDynamicTokenAccepted", "uint256,address", "bool")
+    IS_TOKEN_ACCEPTED: AbiFunction = _function("isTokenAccepted", "uint256,address", "bool")
+    GET_DYNAMIC_AMOUNT_FOR_TOKEN: AbiFunction = _function("getDynamicAmountForToken", "uint256,address", "uint256")
+    GET_AMOUNT_FOR_TOKEN: AbiFunction = _function("getAmountForToken", "uint256,address", "uint256")
+    GET_POST_PAYMENT_ACTION: AbiFunction = _function("getPostPaymentAction", "uint256", "address")
+    GET_PAYMENT_PRECONDITION: AbiFunction = _function("getPaymentPrecondition", "uint256", "address")
+    GET_DYNAMIC_TOKEN_AMOUNT: AbiFunction = _function("getDynamicTokenAmount", "uint256", "address")
+    IS_RESTRICTED: AbiFunction = _function("isRestricted", "uint256", "bool")
+    GET_RESTRICTED_ADDRESS: AbiFunction = _function("getRestrictedAddress", "uint256", "address")
+    GET_NUM_PAYMENT_REQUESTS_REQUESTED_FROM: AbiFunction = _function(
+        "getNumPaymentRequestsRequestedFrom", "address", "uint256"
+    )
+    GET_PAYMENT_REQUEST_REQUESTED_FROM_AT_INDEX: AbiFunction = _function(
+        "getPaymentRequestRequestedFromAtIndex", "address,uint256", "uint256"
+    )
+    GET_PAYMENT_REQUEST_IDS_REQUESTED_FROM: AbiFunction = _function(
+        "getPaymentRequestIdsRequestedFrom", "address", "uint256[]"
+    )
+    GET_NUMBER_OF_PAYMENTS: AbiFunction = _function("getNumberOfPayments", "uint256", "uint256")
+    GET_TOTAL_COLLECTED_FOR_TOKEN: AbiFunction = _function("getTotalCollectedForToken", "uint256,address", "uint256")
+    GET_TOTALS_COLLECTED: AbiFunction = _function(
+        "getTotalsCollected", "uint256", f"{TOKEN_AMOUNT_INFO}[]", decoder=decode_token_amount_infos
+    )
+    IS_CLOSED: AbiFunction = _function("isClosed", "uint256", "bool")
+    IS_ENABLED: AbiFunction = _function("isEnabled", "uint256", "bool")
+    IS_LEAN_EVENTS: AbiFunction = _function("isLeanEvents", "uint256", "bool")
+    RECEIPT: AbiFunction = _function("receipt", "", "address")
+
+    CREATE_WITH_STATIC_TOKEN_AMOUNT: AbiFunction = _function(
+        "createWithStaticTokenAmount",
+        f"{TOKEN_AMOUNT_INFO}[],address,address,address",
+        "uint256",
+        encoder=encode_create_with_static_token_amount,
+    )
+    CREATE_WITH_DYNAMIC_TOKEN_AMOUNT: AbiFunction = _function(
+        "createWithDynamicTokenAmount", "address,address,address,address", "uint256"
+    )
+    ENABLE: AbiFunction = _function("enable", "uint256")
+    DISABLE: AbiFunction = _function("disable", "uint256")
+    SET_LEAN_EVENTS: AbiFunction = _function("setLeanEvents", "uint256,bool")
+    CLOSE: AbiFunction = _function("close", "uint256")
+    CLOSE_MANY: AbiFunction = _function("closeMany", "uint256[]")
+    PAY: AbiFunction = _function("pay", "uint256,address", "uint256", encoder=encode_pay)
+
+    async def is_token_amount_static(self, payment_request_id: int) -> bool:
+        return await self._call(self.IS_TOKEN_AMOUNT_STATIC, payment_request_id)
+
+    async def is_token_amount_dynamic(self, payment_request_id: int) -> bool:
+        return await self._call(self.IS_TOKEN_AMOUNT_DYNAMIC, payment_request_id)
+
+    async def is_payment_precondition_set(self, payment_request_id: int) -> bool:
+        return await self._call(self.IS_PAYMENT_PRECONDITION_SET, payment_request_id)
+
+    async def is_payment_post_action_set(self, payment_request_id: int) -> bool:
+        return await self._call(self.IS_PAYMENT_POST_ACTION_SET, payment_request_id)
+
+    async def get_number_of_static_tokens(self, payment_request_id: int) -> int:
+        return await self._call(self.GET_NUMBER_OF_STATIC_TOKENS, payment_request_id)
+
+    async def get_static_tokens(self, payment_request_id: int) -> list[str]:
+        return await self._call(self.GET_STATIC_TOKENS, payment_request_id)
+
+    async def get_static_token_by_index(self, payment_request_id: int, index: int) -> str:
+        return await self._call(self.GET_STATIC_TOKEN_BY_INDEX, payment_request_id, index)
+
+    async def get_static_token_amount_infos(self, payment_request_id: int) -> list[TokenAmountInfo]:
+        return [
+            TokenAmountInfo(*info)
+            for info in await self._call(self.GET_STATIC_TOKEN_AMOUNT_INFOS, payment_request_id)
+        ]
+
+    async def get_static_token_amount_info_by_index(self, payment_request_id: int, index: int) -> TokenAmountInfo:
+        return TokenAmountInfo(*await self._call(self.GET_STATIC_TOKEN_AMOUNT_INFO_BY_INDEX, payment_request_id, index))
+
+    async def get_static_token_amount_by_index(self, payment_request_id: int, index: int) -> int:
+        return await self._call(self.GET_STATIC_TOKEN_AMOUNT_BY_INDEX, payment_request_id, index)
+
+    async def get_static_amount_for_token(self, payment_request_id: int, token: str) -> int:
+        return await self._call(self.GET_STATIC_AMOUNT_FOR_TOKEN, payment_request_id, token)
+
+    async def is_static_token_accepted(self, payment_request_id: int, token: str) -> bool:
+        return await self._call(self.IS_STATIC_TOKEN_ACCEPTED, payment_request_id, token)
+
+    # the following are not view functions, since DynamicTokenAmount may depend on the payer they're called from it
+
+    async def is_dynamic_token_accepted(
+        self, payment_request_id: int, token: str, *, payer: Optional[str] = None
+    ) -> bool:
+        return await self._call(self.IS_DYNAMIC_TOKEN_ACCEPTED, payment_request_id, token, sender=payer)
+
+    async def is_token_accepted(self, payment_request_id: int, token: str, *, payer: Optional[str] = None) -> bool:
+        return await self._call(self.IS_TOKEN_ACCEPTED, payment_request_id, token, sender=payer)
+
+    async def get_dynamic_amount_for_token(
+        self, payment_request_id: int, token: str, *, payer: Optional[str] = None
+    ) -> int:
+        return await self._call(self.GET_DYNAMIC_AMOUNT_FOR_TOKEN, payment_request_id, token, sender=payer)
+
+    async def get_amount_for_token(self, payment_request_id: int, token: str, *, payer: Optional[str] = None) -> int:
+        return await self._call(self.GET_AMOUNT_FOR_TOKEN, payment_request_id, token, sender=payer)
+
+    async def get_post_payment_action(self, payment_request_id: int) -> str:
+        return await self._call(self.GET_POST_PAYMENT_ACTION, payment_request_id)
+
+    async def get_payment_precondition(self, payment_request_id: int) -> str:
+        return await self._call(self.GET_PAYMENT_PRECONDITION, payment_request_id)
+
+    async def get_dynamic_token_amount(self, payment_request_id: int) -> str:
+        return await self._call(self.GET_DYNAMIC_TOKEN_AMOUNT, payment_request_id)
+
+    async def is_restricted(self, payment_request_id: int) -> bool:
+        return await self._call(self.IS_RESTRICTED, payment_request_id)
+
+    async def get_restricted_address(self, payment_request_id: int) -> str:
+        return await self._call(self.GET_RESTRICTED_ADDRESS, payment_request_id)
+
+    async def get_num_payment_requests_requested_from(self, from_: str) -> int:
+        return await self._call(self.GET_NUM_PAYMENT_REQUESTS_REQUESTED_FROM, from_)
+
+    async def get_payment_request_requested_from_at_index(self, from_: str, index: int) -> int:
+        return await self._call(self.GET_PAYMENT_REQUEST_REQUESTED_FROM_AT_INDEX, from_, index)
+
+    async def get_payment_request_ids_requested_from(self, from_: str) -> list[int]:
+        return await self._call(self.GET_PAYMENT_REQUEST_IDS_REQUESTED_FROM, from_)
+
+    async def get_number_of_payments(self, payment_request_id: int) -> int:
+        return await self._call(self.GET_NUMBER_OF_PAYMENTS, payment_request_id)
+
+    async def get_total_collected_for_token(self, payment_request_id: int, token: str) -> int:
+        return await self._call(self.GET_TOTAL_COLLECTED_FOR_TOKEN, payment_request_id, token)
+
+    async def get_totals_collected(self, payment_request_id: int) -> list[TokenAmountInfo]:
+        return [TokenAmountInfo(*info) for info in await self._call(self.GET_TOTALS_COLLECTED, payment_request_id)]
+
+    async def is_closed(self, payment_request_id: int) -> bool:
+        return await self._call(self.IS_CLOSED, payment_request_id)
+
+    async def is_enabled(self, payment_request_id: int) -> bool:
+        return await self._call(self.IS_ENABLED, payment_request_id)
+
+    async def is_lean_events(self, payment_request_id: int) -> bool:
+        return await self._call(self.IS_LEAN_EVENTS, payment_request_id)
+
+    async def get_receipt(self) -> AsyncReceipt:
+        """
+        Receipt of this PaymentRequest, read once.
+        """
+        return self._client.receipt(await self._client.get_receipt_address(self))
+
+    async def create_with_static_token_amount(
+        self,
+        token_amounts: list[tuple[str, int]],
+        payment_precondition: str,
+        post_payment_action: str,
+        from_: str,
+        *,
+        sender: Sender,
+    ) -> int:
+        """
+        Creates a PaymentRequest, returns its ID.
+        """
+        receipt: dict[str, Any] = await self._transact(
+            self.CREATE_WITH_STATIC_TOKEN_AMOUNT,
+            token_amounts,
+            payment_precondition,
+            post_payment_action,
+            from_,
+            sender=sender,
+        )
+        return self._get_created_payment_request_id(receipt)
+
+    async def create_with_dynamic_token_amount(
+        self,
+        dynamic_token_amount: str,
+        payment_precondition: str,
+        post_payment_action: str,
+        from_: str,
+        *,
+        sender: Sender,
+    ) -> int:
+        """
+        Creates a PaymentRequest, returns its ID.
+        """
+        receipt: dict[str, Any] = await self._transact(
+            self.CREATE_WITH_DYNAMIC_TOKEN_AMOUNT,
+            dynamic_token_amount,
+            payment_precondition,
+            post_payment_action,
+            from_,
+            sender=sender,
+        )
+        return self._get_created_payment_request_id(receipt)
+
+    async def enable(self, payment_request_id: int, *, sender: Sender) -> dict[str, Any]:
+        return await self._transact(self.ENABLE, payment_request_id, sender=sender)
+
+    async def disable(self, payment_request_id: int, *, sender: Sender) -> dict[str, Any]:
+        return await self._transact(self.DISABLE, payment_request_id, sender=sender)
+
+    async def set_lean_events(self, payment_request_id: int, is_lean: bool, *, sender: Sender) -> dict[str, Any]:
+        return await self._transact(self.SET_LEAN_EVENTS, payment_request_id, is_lean, sender=sender)
+
+    async def close(self, payment_request_id: int, *, sender: Sender) -> dict[str, Any]:
+        return await self._transact(self.CLOSE, payment_request_id, sender=sender)
+
+    async def close_many(self, payment_request_ids: list[int], *, sender: Sender) -> dict[str, Any]:
+        return await self._transact(self.CLOSE_MANY, payment_request_ids, sender=sender)
+
+    async def pay(self, payment_request_id: int, token: str, *, sender: Sender) -> int:
+        """
+        Pays a PaymentRequest, returns the ID of the Receipt.
+        """
+        receipt: dict[str, Any] = await self._transact(self.PAY, payment_request_id, token, sender=sender)
+        log: dict[str, Any]
+        for log in self._get_logs(receipt, PAYMENT_REQUEST_PAID_TOPIC):
+            topics: list[bytes] = [bytes(HexBytes(topic)) for topic in log["topics"]]
+            # (payment_request_id, receipt_id, token, amount, payer, payee)
+            return decode_payment_request_paid(topics, bytes(HexBytes(log["data"])))[1]
+        raise AsyncClientException(f"No PaymentRequestPaid event in transaction {receipt['transactionHash']}")
+
+    def _get_logs(self, receipt: dict[str, Any], topic: bytes) -> list[dict[str, Any]]:
+        return [
+            log
+            for log in receipt["logs"]
+            if to_checksum_address(log["address"]) == self.address
+            and log["topics"]
+            and HexBytes(log["topics"][0]) == topic
+        ]
+
+    def _get_created_payment_request_id(self, receipt: dict[str, Any]) -> int:
+        logs: list[dict[str, Any]] = self._get_logs(receipt, PAYMENT_REQUEST_CREATED_TOPIC)
+        if not logs:
+            raise AsyncClientException(f"No PaymentRequestCreated event in transaction {receipt['transactionHash']}")
+        return int.from_bytes(HexBytes(logs[0]["topics"][1]), "big")
+
+
+class AsyncPaymentRequestClient:
+    def __init__(
+        self,
+        endpoint_uri: str,
+        *,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        connection_limit: int = DEFAULT_CONNECTION_LIMIT,
+        receipt_poll_interval: float = DEFAULT_RECEIPT_POLL_INTERVAL,
+        receipt_timeout: float = DEFAULT_RECEIPT_TIMEOUT,
+        read_cache: Optional[ReadCache] = None,
+        head_refresh_interval: float = DEFAULT_HEAD_REFRESH_INTERVAL,
+    ):
+        self.rpc: JsonRpcBatchClient = JsonRpcBatchClient(
+            endpoint_uri, batch_window=batch_window, max_batch_size=max_batch_size, connection_limit=connection_limit
+        )
+        self._receipt_poll_interval: float = receipt_poll_interval
+        self._receipt_timeout: float = receipt_timeout
+
+        self._contracts: dict[tuple[type, str], AsyncContract] = {}
+        # PaymentRequest -> its Receipt, which never changes
+        self._receipt_addresses: dict[str, str] = {}
+        self._chain_id: Optional[int] = None
+        # next nonce of the local accounts, transactions of the same account are signed one at a time
+        self._nonces: dict[str, int] = {}
+        self._nonce_locks: dict[str, asyncio.Lock] = {}
+
+        self._read_cache: Optional[ReadCache] = read_cache
+        # with a read cache, reads of the latest block are made at the head block, read at most once per interval
+        self._head_refresh_interval: float = head_refresh_interval
+        self._head_block_number: Optional[int] = None
+        self._head_read_at: float = 0
+        self._head_lock: asyncio.Lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncPaymentRequestClient":
+        await self.rpc.open()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.rpc.close()
+
+    def _get_contract(self, contract_type: type, address: str) -> Any:
+        key: tuple[type, str] = (contract_type, to_checksum_address(address))
+        if key not in self._contracts:
+            self._contracts[key] = contract_type(self, address)
+        return self._contracts[key]
+
+    def payment_request(self, address: str) -> AsyncPaymentRequest:
+        return self._get_contract(AsyncPaymentRequest, address)
+
+    def receipt(self, address: str) -> AsyncReceipt:
+        return self._get_contract(AsyncReceipt, address)
+
+    def erc20(self, address: str) -> AsyncERC20:
+        return self._get_contract(AsyncERC20, address)
+
+    async def get_receipt_address(self, payment_request: AsyncPaymentRequest) -> str:
+        if payment_request.address not in self._receipt_addresses:
+            self._receipt_addresses[payment_request.address] = await self.call(
+                payment_request.address, AsyncPaymentRequest.RECEIPT
+            )
+        return self._receipt_addresses[payment_request.address]
+
+    async def get_chain_id(self) -> int:
+        if self._chain_id is None:
+            self._chain_id = int(await self.rpc.request("eth_chainId", []), 16)
+        return self._chain_id
+
+    async def get_head_block_number(self) -> int:
+        async with self._head_lock:
+            loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+            if self._head_block_number is None or loop.time() - self._head_read_at >= self._head_refresh_interval:
+                self._head_block_number = int(await self.rpc.request("eth_blockNumber", []), 16)
+                self._head_read_at = loop.time()
+            return self._head_block_number
+
+    async def call(
+        self,
+        address: str,
+        function: AbiFunction,
+        *args: Any,
+        sender: Optional[str] = None,
+        block_identifier: Union[int, str] = "latest",
+    ) -> Any:
+        calldata: bytes = bytes(HexBytes(function.encode(args)))
+        data: bytes
+        if self._read_cache is None:
+            data = await self._eth_call(address, function, calldata, sender, block_identifier)
+        else:
+            data = await self._cached_eth_call(address, function, calldata, sender, block_identifier)
+        return function.decode(data)
+
+    async def _eth_call(
+        self,
+        address: str,
+        function: AbiFunction,
+        calldata: bytes,
+        sender: Optional[str],
+        block_identifier: Union[int, str],
+    ) -> bytes:
+        call: dict[str, Any] = {"to": address, "data": encode_hex(calldata)}
+        if sender is not None:
+            call["from"] = sender
+        block: str = hex(block_identifier) if isinstance(block_identifier, int) else block_identifier
+        try:
+            result: str = await self.rpc.request("eth_call", [call, block])
+        except JsonRpcException as e:
+            error: Optional[DecodedError] = ERROR_REGISTRY.decode(
+                get_revert_data_from_call_response({"error": e.error})
+            )
+            raise ContractCallException(f"{function.name}() reverted: {e.message}", error) from e
+        return bytes(HexBytes(result))
+
+    async def _cached_eth_call(
+        self,
+        address: str,
+        function: AbiFunction,
+        calldata: bytes,
+        sender: Optional[str],
+        block_identifier: Union[int, str],
+    ) -> bytes:
+        chain_id: int = await self.get_chain_id()
+        data: Optional[bytes]
+        if block_identifier == "latest" and self._read_cache.is_immutable(calldata):
+            data = self._read_cache.get_immutable(chain_id, address, calldata)
+            if data is None:
+                data = await self._eth_call(address, function, calldata, sender, block_identifier)
+                self._read_cache.put_immutable(chain_id, address, calldata, data)
+            return data
+
+        if block_identifier == "latest":
+            block_identifier = await self.get_head_block_number()
+        if not isinstance(block_identifier, int):
+            # e.g. pending
+            return await self._eth_call(address, function, calldata, sender, block_identifier)
+
+        data = self._read_cache.get_mutable(chain_id, address, calldata, block_identifier, sender)
+        if data is None:
+            data = await self._eth_call(address, function, calldata, sender, block_identifier)
+            self._read_cache.put_mutable(chain_id, address, calldata, block_identifier, data, sender)
+        return data
+
+    async def transact(self, address: str, function: AbiFunction, *args: Any, sender: Sender) -> dict[str, Any]:
+        """
+        Sends a transaction and waits for it to be mined, returns its receipt (as returned by the node).
+        """
+        transaction: dict[str, Any] = {
+            "from": sender if isinstance(sender, str) else sender.address,
+            "to": address,
+            "data": function.encode(args),
+        }
+        tx_hash: Optional[str]
+        try:
+            if isinstance(sender, str):
+                tx_hash = await self.rpc.request("eth_sendTransaction", [transaction])
+            else:
+                tx_hash = await self._send_signed_transaction(transaction, sender)
+        except JsonRpcException as e:
+            # development nodes report reverts in the response, ganache still mines the transaction
+            tx_hash = e.data.get("hash") if isinstance(e.data, dict) else None
+            if tx_hash is None:
+                raise ContractCallException(
+                    f"{function.name}() rejected: {e.message}", await self._get_revert_error(transaction, "latest")
+                ) from e
+
+        receipt: dict[str, Any] = await self.wait_for_transaction_receipt(tx_hash)
+        block_number: int = int(receipt["blockNumber"], 16)
+        if self._head_block_number is not None and block_number > self._head_block_number:
+            # later reads see the effects of the transaction
+            self._head_block_number = block_number
+        if int(receipt["status"], 16) == 0:
+            # replay the transaction on top of the state of the previous block, as get_revert_data() does
+            raise TransactionRevertedException(
+                tx_hash, await self._get_revert_error(transaction, hex(block_number - 1))
+            )
+        if self._read_cache is not None:
+            # close() and closeMany() erase the values of the cached immutable reads
+            self._read_cache.invalidate_closed_payment_requests(await self.get_chain_id(), receipt["logs"])
+        return receipt
+
+    async def _send_signed_transaction(self, transaction: dict[str, Any], account: LocalAccount) -> str:
+        lock: asyncio.Lock = self._nonce_locks.setdefault(account.address, asyncio.Lock())
+        async with lock:
+            nonce_request: Any = (
+                self.rpc.request("eth_getTransactionCount", [account.address, "pending"])
+                if account.address not in self._nonces
+                else asyncio.sleep(0, hex(self._nonces[account.address]))
+            )
+            nonce, gas, gas_price, chain_id = await asyncio.gather(
+                nonce_request,
+                self.rpc.request("eth_estimateGas", [transaction]),
+                self.rpc.request("eth_gasPrice", []),
+                self.get_chain_id(),
+            )
+            signed: Any = account.sign_transaction(
+                {
+                    "to": transaction["to"],
+                    "data": transaction["data"],
+                    "value": 0,
+                    "nonce": int(nonce, 16),
+                    "gas": int(gas, 16),
+                    "gasPrice": int(gas_price, 16),
+                    "chainId": chain_id,
+                }
+            )
+            try:
+                tx_hash: str = await self.rpc.request("eth_sendRawTransaction", [encode_hex(signed.rawTransaction)])
+            except JsonRpcException:
+                # the nonce is read from the node again
+                self._nonces.pop(account.address, None)
+                raise
+            self._nonces[account.address] = int(nonce, 16) + 1
+            return tx_hash
+
+    async def wait_for_transaction_receipt(self, tx_hash: str) -> dict[str, Any]:
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        deadline: float = loop.time() + self._receipt_timeout
+        while True:
+            receipt: Optional[dict[str, Any]] = await self.rpc.request("eth_getTransactionReceipt", [tx_hash])
+            if receipt is not None:
+                return receipt
+            if loop.time() > deadline:
+                raise ReceiptTimeoutException(f"Transaction {tx_hash} not mined after {self._receipt_timeout} seconds")
+            await asyncio.sleep(self._receipt_poll_interval)
+
+    async def _get_revert_error(self, transaction: dict[str, Any], block: str) -> Optional[DecodedError]:
+        try:
+            await self.rpc.request("eth_call", [transaction, block])
+        except JsonRpcException as e:
+            return ERROR_REGISTRY.decode(get_revert_data_from_call_response({"error": e.error}))
+        return None
@@ -0,0 +1,479 @@
+"""
+Bulk loader of PaymentRequests, for onboarding a catalogue (e.g. the price tables of a merchant) from a CSV or JSONL
+file:
+
+    async with AsyncPaymentRequestClient(endpoint_uri) as client:
+        checkpoint: LoadCheckpoint = LoadCheckpoint(Path("catalogue.checkpoint.sqlite"))
+        loader: BulkLoader = BulkLoader(client=client, payment_request=address, account=account, checkpoint=checkpoint)
+        summary: LoadSummary = await loader.load(read_rows(Path("catalogue.csv")))
+        checkpoint.close()
+
+Every row creates a PaymentRequest, with a static token amount (its price table) or a dynamic one. In a CSV file, the
+token amounts are given as "token:amount" pairs separated by ";":
+
+    id,token_amounts,dynamic_token_amount,payment_precondition,post_payment_action,from
+    sku-1,0xToken1:100;0xToken2:250,,,,
+
+In a JSONL file, each line is an object with the same keys, the token amounts being a list of
+{"token": ..., "amount": ...} objects. Only id and either token_amounts or dynamic_token_amount are required, the
+addresses that are not set are the zero address.
+
+The rows are read one at a time and never kept beyond their submission. The gas of every row is estimated (the
+estimates of estimate_chunk_size rows are sent as a single JSON-RPC batch). The rows are then packed into batches
+whose gas limits sum to at most target_block_gas_fraction of the block gas limit, such that a batch fits into a
+single block next to the transactions of others. The contract has no batch creation, as such every row is still a
+transaction of its own: the transactions of a batch are signed locally and sent as a single JSON-RPC batch. Up to
+max_in_flight_batches batches are sent but not mined yet (pipelining). A row whose gas estimation reverts is recorded
+as failed and not sent. Any other error of the estimation (e.g. the node is overloaded) stops the load, the row is
+not recorded and is loaded by the next run.
+
+The checkpoint (an SQLite file) records every row by its id. A row is recorded, along with its signed transaction,
+before the transaction is sent. As such, when a run is interrupted, the next run skips the rows that are recorded and
+doesn't sign their transactions again: the ones that were not mined yet are sent again as they were signed, with the
+same nonce, and can only be mined once. The ids of the rows must be unique within the catalogue. With retry_failed,
+the rows recorded as failed are loaded again (e.g. after the catalogue or the contracts they use are fixed).
+"""
+import asyncio
+import csv
+import json
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from eth_account.signers.local import LocalAccount
+from eth_utils import encode_hex, to_checksum_address
+from hexbytes import HexBytes
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.async_client import AsyncPaymentRequest, AsyncPaymentRequestClient
+from scripts.utils.codec import PAYMENT_REQUEST_CREATED_TOPIC, decode_payment_request_created
+from scripts.utils.json_rpc import DEFAULT_MAX_BATCH_SIZE, JsonRpcException
+
+DEFAULT_TARGET_BLOCK_GAS_FRACTION: float = 0.5
+DEFAULT_MAX_IN_FLIGHT_BATCHES: int = 2
+DEFAULT_ESTIMATE_CHUNK_SIZE: int = DEFAULT_MAX_BATCH_SIZE
+# margin over the estimated gas, as the state changes between the estimation and the execution
+DEFAULT_GAS_LIMIT_MARGIN: float = 1.2
+
+ROWS_TABLE: str = "rows"
+TOKEN_AMOUNTS_SEPARATOR: str = ";"
+TOKEN_AMOUNT_SEPARATOR: str = ":"
+
+
+class BulkLoaderException(Exception):
+    pass
+
+
+class RowStatus:
+    # the transaction is signed and was sent, or is about to be
+    SUBMITTED: str = "submitted"
+    CREATED: str = "created"
+    # the transaction reverted, or the gas estimation of the row reverted
+    FAILED: str = "failed"
+
+
+@dataclass(frozen=True)
+class CatalogueRow:
+    row_id: str
+    token_amounts: tuple[tuple[str, int], ...] = ()
+    dynamic_token_amount: Optional[str] = None
+    payment_precondition: str = ADDRESS_ZERO
+    post_payment_action: str = ADDRESS_ZERO
+    from_: str = ADDRESS_ZERO
+
+    def encode(self) -> str:
+        """
+        Calldata of the creation of the PaymentRequest.
+        """
+        if self.dynamic_token_amount is not None:
+            return AsyncPaymentRequest.CREATE_WITH_DYNAMIC_TOKEN_AMOUNT.encode(
+                (self.dynamic_token_amount, self.payment_precondition, self.post_payment_action, self.from_)
+            )
+        return AsyncPaymentRequest.CREATE_WITH_STATIC_TOKEN_AMOUNT.encode(
+            (list(self.token_amounts), self.payment_precondition, self.post_payment_action, self.from_)
+        )
+
+
+def _to_row(row_id: str, values: dict[str, Any], token_amounts: list[tuple[str, int]]) -> CatalogueRow:
+    def address(key: str) -> str:
+        return to_checksum_address(values[key]) if values.get(key) else ADDRESS_ZERO
+
+    dynamic_token_amount: Optional[str] = (
+        address("dynamic_token_amount") if values.get("dynamic_token_amount") else None
+    )
+    if (dynamic_token_amount is None) == (not token_amounts):
+        raise BulkLoaderException(f"Row {row_id} needs either token amounts or a dynamic token amount.")
+    return CatalogueRow(
+        row_id=row_id,
+        token_amounts=tuple((to_checksum_address(token), int(amount)) for token, amount in token_amounts),
+        dynamic_token_amount=dynamic_token_amount,
+        payment_precondition=address("payment_precondition"),
+        post_payment_action=address("post_payment_action"),
+        from_=address("from"),
+    )
+
+
+def read_rows(path: Path) -> Iterator[CatalogueRow]:
+    """
+    Rows of a .csv or .jsonl catalogue, read one at a time.
+    """
+    with path.open(newline="") as file:
+        if path.suffix == ".csv":
+            values: dict[str, Any]
+            for values in csv.DictReader(file):
+                token_amounts: list[tuple[str, int]] = [
+                    tuple(token_amount.split(TOKEN_AMOUNT_SEPARATOR))
+                    for token_amount in (values.get("token_amounts") or "").split(TOKEN_AMOUNTS_SEPARATOR)
+                    if token_amount.strip()
+                ]
+                yield _to_row(values["id"], values, token_amounts)
+        elif path.suffix == ".jsonl":
+            line: str
+            for line in file:
+                if line.strip():
+                    values = json.loads(line)
+                    yield _to_row(
+                        str(values["id"]),
+                        values,
+                        [(item["token"], item["amount"]) for item in values.get("token_amounts") or []],
+                    )
+        else:
+            raise BulkLoaderException(f"Unsupported catalogue format: {path.suffix}, expected .csv or .jsonl")
+
+
+@dataclass(frozen=True)
+class SubmittedRow:
+    row_id: str
+    nonce: int
+    tx_hash: str
+    raw_transaction: bytes
+
+
+class LoadCheckpoint:
+    def __init__(self, db_path: Path):
+        self._connection: sqlite3.Connection = sqlite3.connect(db_path)
+        with self._connection:
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {ROWS_TABLE} ("
+                "row_id TEXT PRIMARY KEY, status TEXT NOT NULL, nonce INTEGER, tx_hash TEXT, raw_transaction BLOB, "
+                "payment_request_id INTEGER)"
+            )
+
+    def __contains__(self, row_id: str) -> bool:
+        return self.get_status(row_id) is not None
+
+    def get_status(self, row_id: str) -> Optional[str]:
+        """
+        RowStatus of a row, None if it's not recorded.
+        """
+        row: Optional[tuple] = self._connection.execute(
+            f"SELECT status FROM {ROWS_TABLE} WHERE row_id = ?", (row_id,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def add_submitted(self, rows: list[SubmittedRow]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT INTO {ROWS_TABLE} (row_id, status, nonce, tx_hash, raw_transaction) VALUES (?, ?, ?, ?, ?)",
+                [(row.row_id, RowStatus.SUBMITTED, row.nonce, row.tx_hash, row.raw_transaction) for row in rows],
+            )
+
+    def set_created(self, row_id: str, payment_request_id: int) -> None:
+        with self._connection:
+            self._connection.execute(
+                f"UPDATE {ROWS_TABLE} SET status = ?, payment_request_id = ?, raw_transaction = NULL WHERE row_id = ?",
+                (RowStatus.CREATED, payment_request_id, row_id),
+            )
+
+    def set_failed(self, row_id: str) -> None:
+        with self._connection:
+            self._connection.execute(
+                f"INSERT INTO {ROWS_TABLE} (row_id, status) VALUES (?, ?) "
+                "ON CONFLICT (row_id) DO UPDATE SET status = excluded.status, raw_transaction = NULL",
+                (row_id, RowStatus.FAILED),
+            )
+
+    def delete(self, row_id: str) -> None:
+        with self._connection:
+            self._connection.execute(f"DELETE FROM {ROWS_TABLE} WHERE row_id = ?", (row_id,))
+
+    def get_submitted(self) -> list[SubmittedRow]:
+        """
+        Rows whose transaction was not known to be mined, in the order of their nonces.
+        """
+        return [
+            SubmittedRow(row_id=row_id, nonce=nonce, tx_hash=tx_hash, raw_transaction=bytes(raw_transaction))
+            for row_id, nonce, tx_hash, raw_transaction in self._connection.execute(
+                f"SELECT row_id, nonce, tx_hash, raw_transaction FROM {ROWS_TABLE} WHERE status = ? ORDER BY nonce",
+                (RowStatus.SUBMITTED,),
+            )
+        ]
+
+    def get_next_nonce(self) -> int:
+        """
+        Nonce following the ones of the recorded transactions, 0 if there are none.
+        """
+        (nonce,) = self._connection.execute(f"SELECT MAX(nonce) FROM {ROWS_TABLE}").fetchone()
+        return nonce + 1 if nonce is not None else 0
+
+    def get_payment_request_id(self, row_id: str) -> Optional[int]:
+        row: Optional[tuple] = self._connection.execute(
+            f"SELECT payment_request_id FROM {ROWS_TABLE} WHERE row_id = ?", (row_id,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+@dataclass
+class LoadSummary:
+    num_created: int = 0
+    num_failed: int = 0
+    # rows recorded by a previous run
+    num_skipped: int = 0
+    # rows of a previous run whose transactions were waited for, or sent again
+    num_resumed: int = 0
+    # rows that failed in a previous run, loaded again with retry_failed
+    num_retried: int = 0
+    num_batches: int = 0
+    # gas limits of the batches
+    batch_gas: list[int] = field(default_factory=list)
+
+    def format_summary(self) -> str:
+        lines: list[str] = [
+            f"rows: {self.num_created} created, {self.num_failed} failed, {self.num_skipped} skipped, "
+            f"{self.num_resumed} resumed, {self.num_retried} retried",
+            f"batches: {self.num_batches}",
+        ]
+        if self.batch_gas:
+            lines.append(
+                f"gas per batch: mean={sum(self.batch_gas) / len(self.batch_gas):.0f}, max={max(self.batch_gas)}"
+            )
+        return "\n".join(lines)
+
+
+@dataclass(frozen=True)
+class EstimatedRow:
+    row: CatalogueRow
+    data: str
+    gas: int
+
+
+class BulkLoader:
+    def __init__(
+        self,
+        *,
+        client: AsyncPaymentRequestClient,
+        payment_request: str,
+        account: LocalAccount,
+        checkpoint: LoadCheckpoint,
+        target_block_gas_fraction: float = DEFAULT_TARGET_BLOCK_GAS_FRACTION,
+        max_in_flight_batches: int = DEFAULT_MAX_IN_FLIGHT_BATCHES,
+        estimate_chunk_size: int = DEFAULT_ESTIMATE_CHUNK_SIZE,
+        gas_limit_margin: float = DEFAULT_GAS_LIMIT_MARGIN,
+        retry_failed: bool = False,
+    ):
+        if not 0 < target_block_gas_fraction <= 1:
+            raise ValueError(f"{target_block_gas_fraction=} is not in (0, 1].")
+        self._client: AsyncPaymentRequestClient = client
+        self._payment_request: str = to_checksum_address(payment_request)
+        self._account: LocalAccount = account
+        self._checkpoint: LoadCheckpoint = checkpoint
+        self._target_block_gas_fraction: float = target_block_gas_fraction
+        self._max_in_flight_batches: int = max_in_flight_batches
+        self._estimate_chunk_size: int = estimate_chunk_size
+        self._gas_limit_margin: float = gas_limit_margin
+        self._retry_failed: bool = retry_failed
+
+        self._summary: LoadSummary = LoadSummary()
+        self._nonce: int = 0
+        self._gas_price: int = 0
+        self._chain_id: int = 0
+
+    async def load(self, rows: Iterable[CatalogueRow]) -> LoadSummary:
+        """
+        Creates the PaymentRequests of the rows that are not recorded in the checkpoint yet (or recorded as failed,
+        with retry_failed), after the transactions of an interrupted run are mined. Returns once every transaction is
+        mined.
+        """
+        self._summary = LoadSummary()
+        await self._resume()
+
+        block: dict[str, Any] = await self._client.rpc.request("eth_getBlockByNumber", ["latest", False])
+        block_gas_budget: int = int(int(block["gasLimit"], 16) * self._target_block_gas_fraction)
+        pending_nonce, gas_price, self._chain_id = await asyncio.gather(
+            self._client.rpc.request("eth_getTransactionCount", [self._account.address, "pending"]),
+            self._client.rpc.request("eth_gasPrice", []),
+            self._client.get_chain_id(),
+        )
+        self._nonce = max(int(pending_nonce, 16), self._checkpoint.get_next_nonce())
+        self._gas_price = int(gas_price, 16)
+
+        in_flight: asyncio.Semaphore = asyncio.Semaphore(self._max_in_flight_batches)
+        tasks: set[asyncio.Task] = set()
+        batch: list[EstimatedRow] = []
+        batch_gas: int = 0
+        estimated_row: EstimatedRow
+        for chunk in self._get_new_row_chunks(rows):
+            for estimated_row in await self._estimate(chunk):
+                if batch and batch_gas + estimated_row.gas > block_gas_budget:
+                    await self._submit(batch, in_flight, tasks)
+                    batch, batch_gas = [], 0
+                batch.append(estimated_row)
+                batch_gas += estimated_row.gas
+        if batch:
+            await self._submit(batch, in_flight, tasks)
+        await asyncio.gather(*tasks)
+        return self._summary
+
+    def _get_new_row_chunks(self, rows: Iterable[CatalogueRow]) -> Iterator[list[CatalogueRow]]:
+        # every row ID of the catalogue, as a duplicate may come chunks after the first one, which may not be recorded
+        # yet while its batch is filled
+        row_ids: set[str] = set()
+        chunk: list[CatalogueRow] = []
+        row: CatalogueRow
+        for row in rows:
+            if row.row_id in row_ids:
+                raise BulkLoaderException(f"Row {row.row_id} appears twice in the catalogue.")
+            row_ids.add(row.row_id)
+            status: Optional[str] = self._checkpoint.get_status(row.row_id)
+            if status == RowStatus.FAILED and self._retry_failed:
+                # recorded again once its gas is estimated
+                self._checkpoint.delete(row.row_id)
+                self._summary.num_retried += 1
+            elif status is not None:
+                self._summary.num_skipped += 1
+                continue
+            chunk.append(row)
+            if len(chunk) == self._estimate_chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def _estimate(self, rows: list[CatalogueRow]) -> list[EstimatedRow]:
+        """
+        Rows whose gas could be estimated, the ones whose estimation reverts are recorded as failed. Raises
+        BulkLoaderException on any other error, the row is then loaded by the next run.
+        """
+
+        async def estimate(row: CatalogueRow) -> Optional[EstimatedRow]:
+            data: str = row.encode()
+            try:
+                gas: str = await self._client.rpc.request(
+                    "eth_estimateGas", [{"from": self._account.address, "to": self._payment_request, "data": data}]
+                )
+            except JsonRpcException as e:
+                if not e.is_execution_reverted:
+                    raise BulkLoaderException(
+                        f"Gas of row {row.row_id} not estimated: {e.message}. It's loaded by the next run."
+                    ) from e
+                self._checkpoint.set_failed(row.row_id)
+                self._summary.num_failed += 1
+                return None
+            return EstimatedRow(row=row, data=data, gas=int(int(gas, 16) * self._gas_limit_margin))
+
+        estimated_rows: list[Optional[EstimatedRow]] = await asyncio.gather(*map(estimate, rows))
+        return [estimated_row for estimated_row in estimated_rows if estimated_row is not None]
+
+    async def _submit(self, batch: list[EstimatedRow], in_flight: asyncio.Semaphore, tasks: set[asyncio.Task]) -> None:
+        await in_flight.acquire()
+        submitted_rows: list[SubmittedRow] = []
+        estimated_row: EstimatedRow
+        for estimated_row in batch:
+            signed: Any = self._account.sign_transaction(
+                {
+                    "to": self._payment_request,
+                    "data": estimated_row.data,
+                    "value": 0,
+                    "nonce": self._nonce,
+                    "gas": estimated_row.gas,
+                    "gasPrice": self._gas_price,
+                    "chainId": self._chain_id,
+                }
+            )
+            submitted_rows.append(
+                SubmittedRow(
+                    row_id=estimated_row.row.row_id,
+                    nonce=self._nonce,
+                    tx_hash=encode_hex(signed.hash),
+                    raw_transaction=bytes(signed.rawTransaction),
+                )
+            )
+            self._nonce += 1
+        # recorded before they are sent, as such they're never signed again
+        self._checkpoint.add_submitted(submitted_rows)
+        self._summary.num_batches += 1
+        self._summary.batch_gas.append(sum(estimated_row.gas for estimated_row in batch))
+
+        try:
+            await asyncio.gather(*map(self._send, submitted_rows))
+        except BaseException:
+            in_flight.release()
+            raise
+        task: asyncio.Task = asyncio.create_task(self._wait_for_batch(submitted_rows, in_flight))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    async def _send(self, row: SubmittedRow) -> None:
+        try:
+            await self._client.rpc.request("eth_sendRawTransaction", [encode_hex(row.raw_transaction)])
+        except JsonRpcException as e:
+            # development nodes report reverts in the response, ganache still mines the transaction
+            if not (isinstance(e.data, dict) and e.data.get("hash")):
+                raise BulkLoaderException(
+                    f"Transaction of row {row.row_id} rejected: {e.message}. It's sent again by the next run."
+                ) from e
+
+    async def _wait_for_batch(self, rows: list[SubmittedRow], in_flight: asyncio.Semaphore) -> None:
+        try:
+            await asyncio.gather(*map(self._wait_for_row, rows))
+        finally:
+            in_flight.release()
+
+    async def _wait_for_row(self, row: SubmittedRow) -> None:
+        receipt: dict[str, Any] = await self._client.wait_for_transaction_receipt(row.tx_hash)
+        if int(receipt["status"], 16) == 0:
+            self._checkpoint.set_failed(row.row_id)
+            self._summary.num_failed += 1
+            return
+        log: dict[str, Any] = next(
+            log
+            for log in receipt["logs"]
+            if to_checksum_address(log["address"]) == self._payment_request
+            and HexBytes(log["topics"][0]) == PAYMENT_REQUEST_CREATED_TOPIC
+        )
+        payment_request_id, *_ = decode_payment_request_created(
+            [bytes(HexBytes(topic)) for topic in log["topics"]], bytes(HexBytes(log["data"]))
+        )
+        self._checkpoint.set_created(row.row_id, payment_request_id)
+        self._summary.num_created += 1
+
+    async def _resume(self) -> None:
+        """
+        Waits for the transactions recorded by an interrupted run. The ones the node doesn't know are sent again, as
+        they were signed. A transaction whose nonce was taken by another one can't be mined anymore: its row is
+        dropped from the checkpoint, to be loaded again.
+        """
+        rows: list[SubmittedRow] = self._checkpoint.get_submitted()
+        if not rows:
+            return
+        mined_nonce: int = int(
+            await self._client.rpc.request("eth_getTransactionCount", [self._account.address, "latest"]), 16
+        )
+        pending_rows: list[SubmittedRow] = []
+        row: SubmittedRow
+        for row in rows:
+            transaction: Optional[dict[str, Any]] = await self._client.rpc.request(
+                "eth_getTransactionByHash", [row.tx_hash]
+            )
+            if transaction is None:
+                if row.nonce < mined_nonce:
+                    self._checkpoint.delete(row.row_id)
+                    continue
+                await self._send(row)
+            pending_rows.append(row)
+        self._summary.num_resumed += len(pending_rows)
+        await asyncio.gather(*map(self._wait_for_row, pending_rows))
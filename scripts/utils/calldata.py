@@ -0,0 +1,35 @@
+from scripts.utils.contants import PackedPayment
+
+
+def pack_payment(*, payment_request_id: int, token_index: int, flags: int = 0) -> int:
+    """
+    Build the single word argument of PaymentRequest.payPacked(). token_index is the index of the token in
+    PaymentRequest.getStaticTokens().
+    """
+    if not 0 <= payment_request_id < 2 ** PackedPayment.PAYMENT_REQUEST_ID_BITS:
+        raise ValueError(f"{payment_request_id=} does not fit into {PackedPayment.PAYMENT_REQUEST_ID_BITS} bits.")
+    if not 0 <= token_index < 2 ** PackedPayment.TOKEN_INDEX_BITS:
+        raise ValueError(f"{token_index=} does not fit into {PackedPayment.TOKEN_INDEX_BITS} bits.")
+    if not 0 <= flags < 2 ** PackedPayment.FLAGS_BITS:
+        raise ValueError(f"{flags=} does not fit into {PackedPayment.FLAGS_BITS} bits.")
+
+    return (
+        payment_request_id
+        | (token_index << PackedPayment.TOKEN_INDEX_OFFSET)
+        | (flags << PackedPayment.FLAGS_OFFSET)
+    )
+
+
+def unpack_payment(packed_payment: int) -> tuple[int, int, int]:
+    """Inverse of pack_payment(). Returns a (payment_request_id, token_index, flags) tuple."""
+    payment_request_id: int = packed_payment & (2 ** PackedPayment.PAYMENT_REQUEST_ID_BITS - 1)
+    token_index: int = (packed_payment >> PackedPayment.TOKEN_INDEX_OFFSET) & (2 ** PackedPayment.TOKEN_INDEX_BITS - 1)
+    flags: int = packed_payment >> PackedPayment.FLAGS_OFFSET
+    return payment_request_id, token_index, flags
+
+
+def get_calldata_gas(calldata: str) -> int:
+    """Intrinsic gas charged for the provided hex-encoded calldata (EIP-2028: 4 per zero byte, 16 per non-zero byte)."""
+    data: bytes = bytes.fromhex(calldata[2:] if calldata.startswith("0x") else calldata)
+    num_zero_bytes: int = data.count(0)
+    return num_zero_bytes * 4 + (len(data) - num_zero_bytes) * 16
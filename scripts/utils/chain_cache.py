@@ -0,0 +1,217 @@
+"""
+Persistent cache of the development chain with the shared fixtures (PaymentRequest, Receipt, SharedReceipt, tokens,
+preconditions, token amounts and post-payment actions) already deployed. The database of the development node is
+saved once the fixtures are deployed and restored on the next runs, for as long as the fixtures don't change.
+
+The cache is keyed by a hash of the compiled bytecode of the fixtures and of their constructor arguments, which are
+defined in scripts/utils/contract.py (its source is part of the key), as well as of the settings of the development node
+(e.g. mnemonic and balances of the accounts). Stale entries are never reused, they can be removed by deleting the
+cache directory.
+
+The cache is opt-in, it's enabled by setting the CHAIN_CACHE environment variable:
+
+    CHAIN_CACHE=1 brownie test
+
+Tests always run against a copy of the cached database, so the cache itself is never modified by them. Cached
+fixtures are registered in their contract containers, so that get_or_create_deployed_instance() returns them.
+"""
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from brownie import (
+    DisablePaymentRequestPaymentPostAction,
+    DiscountedTokenAmountForFirst100Customers,
+    MyERC20,
+    MyERC721,
+    MyPostPaymentAction,
+    NFTOwnerPaymentPrecondition,
+    OnePurchasePerAddressPaymentPrecondition,
+    PaymentRequest,
+    Receipt,
+    SharedReceipt,
+)
+from brownie.network import accounts
+from brownie.network.contract import ContractContainer
+
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.dev_node import DevNode, DevNodeException, get_development_network_settings
+from scripts.utils.tracing import TRACER
+
+CHAIN_CACHE_ENV_VAR: str = "CHAIN_CACHE"
+CHAIN_CACHE_DIR_ENV_VAR: str = "CHAIN_CACHE_DIR"
+PROJECT_ROOT: Path = Path(__file__).parents[2]
+DEFAULT_CHAIN_CACHE_DIR: Path = PROJECT_ROOT / ".chain_cache"
+
+# bumped when the layout of the cache changes
+CHAIN_CACHE_FORMAT_VERSION: int = 1
+
+DB_DIR_NAME: str = "db"
+MANIFEST_FILE_NAME: str = "deployments.json"
+
+# the fixtures are deployed by the first account, like the tests do
+FIXTURES_DEPLOYER_ACCOUNT_INDEX: int = 0
+
+
+@dataclass(frozen=True)
+class CachedFixture:
+    container: ContractContainer
+    deploy: Callable[[ContractBuilder], Any]
+
+
+# FixedPricePaymentComputer (random price) and TransferNFTPaymentPostAction (bound to a freshly minted NFT) are
+# deployed per test, as such they are not cached
+CACHED_FIXTURES: list[CachedFixture] = [
+    CachedFixture(Receipt, lambda builder: builder.Receipt),
+    CachedFixture(SharedReceipt, lambda builder: builder.SharedReceipt),
+    CachedFixture(PaymentRequest, lambda builder: builder.PaymentRequest),
+    CachedFixture(MyERC20, lambda builder: builder.MyERC20),
+    CachedFixture(MyERC721, lambda builder: builder.MyERC721),
+    CachedFixture(NFTOwnerPaymentPrecondition, lambda builder: builder.NFTOwnerPaymentPrecondition),
+    CachedFixture(OnePurchasePerAddressPaymentPrecondition, lambda builder: builder.OnePurchasePerAddressPaymentPrecondition),
+    CachedFixture(DiscountedTokenAmountForFirst100Customers, lambda builder: builder.DiscountedTokenAmountForFirst100Customers),
+    CachedFixture(DisablePaymentRequestPaymentPostAction, lambda builder: builder.DisablePaymentRequestPaymentPostAction),
+    CachedFixture(MyPostPaymentAction, lambda builder: builder.MyPostPaymentAction),
+]
+
+# contract name -> addresses of the cached instances, in deployment order
+Manifest = dict[str, list[str]]
+
+
+class ChainCacheException(Exception):
+    pass
+
+
+def is_chain_cache_enabled() -> bool:
+    return bool(os.getenv(CHAIN_CACHE_ENV_VAR))
+
+
+def get_chain_cache_dir() -> Path:
+    cache_dir: Optional[str] = os.getenv(CHAIN_CACHE_DIR_ENV_VAR)
+    return Path(cache_dir) if cache_dir else DEFAULT_CHAIN_CACHE_DIR
+
+
+def compute_cache_key(
+    *,
+    bytecodes: dict[str, str],
+    constructor_args_source: str,
+    node_settings: dict[str, Any],
+) -> str:
+    key_material: dict[str, Any] = {
+        "version": CHAIN_CACHE_FORMAT_VERSION,
+        "bytecodes": bytecodes,
+        "constructor_args": constructor_args_source,
+        "node_settings": node_settings,
+    }
+    return hashlib.sha256(json.dumps(key_material, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def get_cache_key() -> str:
+    node_settings: dict[str, Any] = dict(get_development_network_settings()["cmd_settings"])
+    # the port doesn't affect the state of the chain
+    node_settings.pop("port", None)
+    return compute_cache_key(
+        bytecodes={fixture.container._name: fixture.container.bytecode for fixture in CACHED_FIXTURES},
+        constructor_args_source=inspect.getsource(inspect.getmodule(ContractBuilder)),
+        node_settings=node_settings,
+    )
+
+
+def deploy_fixtures() -> Manifest:
+    builder: ContractBuilder = ContractBuilder(account=accounts[FIXTURES_DEPLOYER_ACCOUNT_INDEX], force_deploy=False)
+    for fixture in CACHED_FIXTURES:
+        fixture.deploy(builder)
+    return {fixture.container._name: [contract.address for contract in fixture.container] for fixture in CACHED_FIXTURES}
+
+
+def register_fixtures(manifest: Manifest) -> None:
+    """
+    Makes the cached fixtures known to brownie. Instances created with ContractContainer.at() have no deployment
+    transaction, which also keeps them registered across chain.reset() and chain.revert().
+    """
+    containers: dict[str, ContractContainer] = {fixture.container._name: fixture.container for fixture in CACHED_FIXTURES}
+    for name, addresses in manifest.items():
+        container: ContractContainer = containers[name]
+        known_addresses: set[str] = {contract.address for contract in container}
+        for address in addresses:
+            if address not in known_addresses:
+                container.at(address)
+
+
+class ChainCache:
+    def __init__(self, *, cache_dir: Optional[Path] = None, key: Optional[str] = None):
+        self._cache_dir: Path = cache_dir if cache_dir is not None else get_chain_cache_dir()
+        self._key: str = key if key is not None else get_cache_key()
+        self._working_dir: Optional[Path] = None
+        self._node: Optional[DevNode] = None
+
+    @property
+    def entry_dir(self) -> Path:
+        return self._cache_dir / self._key
+
+    @property
+    def is_provisioned(self) -> bool:
+        return (self.entry_dir / MANIFEST_FILE_NAME).exists()
+
+    def read_manifest(self) -> Manifest:
+        return json.loads((self.entry_dir / MANIFEST_FILE_NAME).read_text())
+
+    def provision(self) -> None:
+        """
+        Deploys the fixtures on a new development node, in a separate brownie process, and saves its database. The
+        entry is written to a temporary directory first, so that interrupted runs don't leave incomplete entries.
+        """
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        staging_dir: Path = Path(tempfile.mkdtemp(prefix=f"{self._key}.", dir=self._cache_dir))
+        try:
+            with TRACER.span("ChainCache.provision", category="chain_cache"):
+                with DevNode(db_path=staging_dir / DB_DIR_NAME):
+                    # brownie attaches to the node that is already listening on the port of the development network
+                    subprocess.run(
+                        [
+                            "brownie", "run", str(Path(__file__).relative_to(PROJECT_ROOT)),
+                            "provision", str(staging_dir / MANIFEST_FILE_NAME),
+                        ],
+                        cwd=PROJECT_ROOT,
+                        check=True,
+                    )
+            staging_dir.rename(self.entry_dir)
+        except (OSError, subprocess.CalledProcessError, DevNodeException) as e:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise ChainCacheException(f"Could not provision the chain cache: {e}") from e
+
+    def start(self) -> None:
+        """
+        Starts the development node on a copy of the cached database, provisioning the cache first if needed.
+        """
+        if not self.is_provisioned:
+            self.provision()
+
+        with TRACER.span("ChainCache.start", category="chain_cache"):
+            self._working_dir = Path(tempfile.mkdtemp(prefix="chain_cache."))
+            shutil.copytree(self.entry_dir / DB_DIR_NAME, self._working_dir / DB_DIR_NAME)
+            self._node = DevNode(db_path=self._working_dir / DB_DIR_NAME)
+            self._node.start()
+
+    def stop(self) -> None:
+        if self._node is not None:
+            self._node.stop()
+            self._node = None
+        if self._working_dir is not None:
+            shutil.rmtree(self._working_dir, ignore_errors=True)
+            self._working_dir = None
+
+
+def provision(manifest_path: str):
+    """
+    Entry point of the brownie process that deploys the fixtures, on the node started by ChainCache.provision().
+    """
+    manifest: Manifest = deploy_fixtures()
+    Path(manifest_path).write_text(json.dumps(manifest, indent=4) + "\n")
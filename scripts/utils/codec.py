@@ -0,0 +1,166 @@
+"""
+Fast-path encoding and decoding of the hot calls and events of PaymentRequest and Receipt, for bulk submission and
+indexing:
+
+    data: bytes = encode_pay(payment_request_id, token)
+    receipt_data: ReceiptData = ReceiptData(*decode_receipt_data(return_data))
+
+Selectors and topics are computed once, at import. The encoders and decoders are written for a single, fixed layout:
+the arguments are packed into, and the values read from, 32 bytes words directly, instead of walking the ABI types
+as eth_abi does. They give the same results as eth_abi, with addresses checksummed (see tests/unit/test_codec.py).
+Checksummed addresses are cached, as the same tokens and accounts show up in most of the values.
+
+The decoders return plain tuples, in the order of the ABI, as the generic path does, e.g. the event decoders return
+the same values as EventDefinition.decode() (see scripts/utils/indexer.py).
+
+A microbenchmark against the brownie path is in scripts/benchmark/codec.py.
+"""
+from functools import lru_cache
+
+from eth_utils import keccak, to_checksum_address
+
+WORD_SIZE: int = 32
+ADDRESS_SIZE: int = 20
+MAX_UINT256: int = 2 ** 256 - 1
+# offset of the first dynamic argument of a function whose head has four words
+FOUR_WORDS_HEAD_OFFSET: bytes = (4 * WORD_SIZE).to_bytes(WORD_SIZE, "big")
+
+PAY_SELECTOR: bytes = keccak(text="pay(uint256,address)")[:4]
+PAY_PACKED_SELECTOR: bytes = keccak(text="payPacked(uint256)")[:4]
+CREATE_WITH_STATIC_TOKEN_AMOUNT_SELECTOR: bytes = keccak(
+    text="createWithStaticTokenAmount((address,uint256)[],address,address,address)"
+)[:4]
+APPROVE_SELECTOR: bytes = keccak(text="approve(address,uint256)")[:4]
+
+PAYMENT_REQUEST_CREATED_TOPIC: bytes = keccak(text="PaymentRequestCreated(uint256,address,address,bool)")
+PAYMENT_REQUEST_PAID_TOPIC: bytes = keccak(
+    text="PaymentRequestPaid(uint256,uint256,address,uint256,address,address)"
+)
+PAYMENT_REQUEST_CLOSED_TOPIC: bytes = keccak(text="PaymentRequestClosed(uint256)")
+TRANSFER_TOPIC: bytes = keccak(text="Transfer(address,address,uint256)")
+
+
+class CodecException(Exception):
+    pass
+
+
+def _uint_word(value: int) -> bytes:
+    if not 0 <= value <= MAX_UINT256:
+        raise ValueError(f"{value=} is not a uint256.")
+    return value.to_bytes(WORD_SIZE, "big")
+
+
+def _address_word(address: str) -> bytes:
+    if len(address) != 2 + 2 * ADDRESS_SIZE or not address.startswith("0x"):
+        raise ValueError(f"{address=} is not a hex-encoded address.")
+    return bytes(WORD_SIZE - ADDRESS_SIZE) + bytes.fromhex(address[2:])
+
+
+@lru_cache(maxsize=4_096)
+def _to_address(address: bytes) -> str:
+    return to_checksum_address(address)
+
+
+def _read_uint(data: bytes, index: int) -> int:
+    return int.from_bytes(data[index * WORD_SIZE : (index + 1) * WORD_SIZE], "big")
+
+
+def _read_address(data: bytes, index: int) -> str:
+    return _to_address(data[(index + 1) * WORD_SIZE - ADDRESS_SIZE : (index + 1) * WORD_SIZE])
+
+
+def _check_size(data: bytes, num_words: int, name: str) -> None:
+    if len(data) < num_words * WORD_SIZE:
+        raise CodecException(f"{name} needs {num_words} words, got {len(data)} bytes.")
+
+
+def encode_pay(payment_request_id: int, token: str) -> bytes:
+    """Calldata of PaymentRequest.pay()."""
+    return PAY_SELECTOR + _uint_word(payment_request_id) + _address_word(token)
+
+
+def encode_pay_packed(packed_payment: int) -> bytes:
+    """Calldata of PaymentRequest.payPacked(), packed_payment is built by pack_payment() (see calldata.py)."""
+    return PAY_PACKED_SELECTOR + _uint_word(packed_payment)
+
+
+def encode_create_with_static_token_amount(
+    token_amounts: list[tuple[str, int]], payment_precondition: str, post_payment_action: str, from_: str
+) -> bytes:
+    """Calldata of PaymentRequest.createWithStaticTokenAmount()."""
+    return b"".join(
+        [
+            CREATE_WITH_STATIC_TOKEN_AMOUNT_SELECTOR,
+            # the array is the only dynamic argument, its items are encoded in place after its length
+            FOUR_WORDS_HEAD_OFFSET,
+            _address_word(payment_precondition),
+            _address_word(post_payment_action),
+            _address_word(from_),
+            _uint_word(len(token_amounts)),
+            *(_address_word(token) + _uint_word(amount) for token, amount in token_amounts),
+        ]
+    )
+
+
+def encode_approve(spender: str, amount: int) -> bytes:
+    """Calldata of ERC20.approve()."""
+    return APPROVE_SELECTOR + _address_word(spender) + _uint_word(amount)
+
+
+def decode_receipt_data(data: bytes) -> tuple[str, int, str, int, str, str]:
+    """Return value of Receipt.getReceiptData(), a static struct encoded in place."""
+    _check_size(data, 6, "ReceiptData")
+    return (
+        _read_address(data, 0),
+        _read_uint(data, 1),
+        _read_address(data, 2),
+        _read_uint(data, 3),
+        _read_address(data, 4),
+        _read_address(data, 5),
+    )
+
+
+def decode_token_amount_infos(data: bytes) -> list[tuple[str, int]]:
+    """Return value of PaymentRequest.getStaticTokenAmountInfos() and getTotalsCollected(), a TokenAmountInfo[]."""
+    _check_size(data, 2, "TokenAmountInfo[]")
+    length_index: int = _read_uint(data, 0) // WORD_SIZE
+    _check_size(data, length_index + 1, "TokenAmountInfo[]")
+    length: int = _read_uint(data, length_index)
+    _check_size(data, length_index + 1 + 2 * length, "TokenAmountInfo[]")
+    return [
+        (_read_address(data, index), _read_uint(data, index + 1))
+        for index in range(length_index + 1, length_index + 1 + 2 * length, 2)
+    ]
+
+
+def decode_payment_request_paid(topics: list[bytes], data: bytes) -> tuple[int, int, str, int, str, str]:
+    """
+    Values of a PaymentRequestPaid event: (payment_request_id, receipt_id, token, amount, payer, payee). The ID, the
+    payer and the payee are indexed.
+    """
+    if len(topics) != 4:
+        raise CodecException(f"PaymentRequestPaid has 4 topics, got {len(topics)}.")
+    _check_size(data, 3, "PaymentRequestPaid")
+    return (
+        int.from_bytes(topics[1], "big"),
+        _read_uint(data, 0),
+        _read_address(data, 1),
+        _read_uint(data, 2),
+        _read_address(topics[2], 0),
+        _read_address(topics[3], 0),
+    )
+
+
+def decode_payment_request_created(topics: list[bytes], data: bytes) -> tuple[int, str, str, bool]:
+    """Values of a PaymentRequestCreated event: (payment_request_id, creator, from, is_static)."""
+    if len(topics) != 4:
+        raise CodecException(f"PaymentRequestCreated has 4 topics, got {len(topics)}.")
+    _check_size(data, 1, "PaymentRequestCreated")
+    return int.from_bytes(topics[1], "big"), _read_address(topics[2], 0), _read_address(topics[3], 0), data[31] == 1
+
+
+def decode_transfer(topics: list[bytes], data: bytes) -> tuple[str, str, int]:
+    """Values of a Transfer event of the Receipt (ERC721, all inputs indexed): (sender, recipient, receipt_id)."""
+    if len(topics) != 4:
+        raise CodecException(f"Transfer of an ERC721 has 4 topics, got {len(topics)}.")
+    return _read_address(topics[1], 0), _read_address(topics[2], 0), int.from_bytes(topics[3], "big")
@@ -14,6 +14,7 @@ class EventName:
     TOKEN_AMOUNT_OBTAINED: str = "TokenAmountObtained"
     POST_PAYMENT_ACTION_EXECUTED: str = "PostPaymentActionExecuted"
     PAYMENT_REQUEST_PAID: str = "PaymentRequestPaid"
+    PAYMENT_REQUEST_CREATED: str = "PaymentRequestCreated"
 
     APP_SPECIFIC: List[str] = [
         PAYMENT_PRECONDITION_PASSED,
@@ -28,6 +29,18 @@ class PaymentFailedAt:
     PPA: str = "PPA"
     PR: str = "PR"
     TOKEN_BALANCE_OR_APPROVAL: str = "TOKEN_BALANCE_OR_APPROVAL"
+    # not a PaymentStage: pay() checks that the PaymentRequest is enabled before any of them. It's not for a disabled
+    # or closed PaymentRequest, or a restricted one that was paid
+    NOT_ENABLED: str = "NOT_ENABLED"
+
+    # in the order of the PaymentStage enum in PaymentRequest.sol
+    ALL: List[str] = [
+        PP,
+        TA,
+        PPA,
+        PR,
+        TOKEN_BALANCE_OR_APPROVAL,
+    ]
 
 class ExpectedEventsFor:
     class Success:
@@ -57,6 +70,11 @@ class ExpectedEventsFor:
                 EventName.PAYMENT_REQUEST_PAID,
             ]
 
+        # PaymentRequest in lean event mode, regardless of PP and PPA
+        Lean: List[str] = [
+            EventName.PAYMENT_REQUEST_PAID,
+        ]
+
     class Failure:
         class PP:
             class NoPPA:
@@ -103,3 +121,9 @@ class ExpectedEventsFor:
                     ]
 
 
+class PackedPayment:
+    PAYMENT_REQUEST_ID_BITS: int = 128
+    TOKEN_INDEX_OFFSET: int = 128
+    TOKEN_INDEX_BITS: int = 64
+    FLAGS_OFFSET: int = 192
+    FLAGS_BITS: int = 64
@@ -1,19 +1,30 @@
 import random
 from typing import cast, Optional
 
-from brownie import PaymentRequest, Receipt, MyERC20, NFTOwnerPaymentPrecondition, MyERC721, FixedDynamicTokenAmount, MyPostPaymentAction, SharedReceipt, OnePurchasePerAddressPaymentPrecondition, DiscountedTokenAmountForFirst100Customers, DisablePaymentRequestPaymentPostAction, TransferNFTPaymentPostAction
+from brownie import PaymentRequest, PaymentRequestFactory, Receipt, MyERC20, NFTOwnerPaymentPrecondition, MyERC721, FixedDynamicTokenAmount, MyPostPaymentAction, SharedReceipt, OnePurchasePerAddressPaymentPrecondition, DiscountedTokenAmountForFirst100Customers, DisablePaymentRequestPaymentPostAction, TransferNFTPaymentPostAction
 from brownie.network.account import Account
 from brownie.network.contract import ContractContainer, ProjectContract
 from brownie.network.transaction import TransactionReceipt
 from web3.constants import ADDRESS_ZERO
 
+from scripts.utils.create2 import Create2Deployer, Salt, get_or_deploy_factory
+from scripts.utils.tracing import TRACER, traced
 from scripts.utils.types import NFTOwnerPaymentPreconditionMeta, NFTOwnerPaymentPreconditionWithMeta, \
     TransferNFTPaymentPostActionWithMeta, TransferNFTPaymentPostActionMeta
 
+RECEIPT_DEPLOY_ARGS: tuple = ("Receipt", "RCT")
+MY_ERC20_DEPLOY_ARGS: tuple = ("Jasmine", "JSM", 9999999)
+MY_ERC721_DEPLOY_ARGS: tuple = ("JasmineBut721", "JSM721")
+
+
+def get_random_fixed_price() -> int:
+    return random.randint(1, 99)
+
 
 def force_deploy_contract_instance(contract_cls: ContractContainer, account: Account, *deploy_args) -> ProjectContract:
     deploy_args += ({"from": account},)
-    return contract_cls.deploy(*deploy_args)
+    with TRACER.span("force_deploy_contract_instance", category="deploy", contract=contract_cls._name):
+        return contract_cls.deploy(*deploy_args)
 
 
 def get_or_create_deployed_instance(contract_cls: ContractContainer, account: Account, *deploy_args) -> ProjectContract:
@@ -22,71 +33,107 @@ def get_or_create_deployed_instance(contract_cls: ContractContainer, account: Ac
     except IndexError:
         return force_deploy_contract_instance(contract_cls, account, *deploy_args)
 
+
+def get_create2_deployer(account: Account, factory_address: Optional[str] = None) -> Create2Deployer:
+    """
+    Without a factory address, the factory at its deterministic address is used, and deployed if needed (see
+    scripts/utils/create2.py). Unlike contracts deployed directly by an account, its address doesn't depend on the
+    nonce of the account, as such neither do the addresses of the contracts deployed through it.
+    """
+    return Create2Deployer(
+        PaymentRequestFactory.at(factory_address) if factory_address else get_or_deploy_factory(account)
+    )
+
+
+def get_or_create_deterministic_instance(contract_cls: ContractContainer, account: Account, *deploy_args, salt: Salt) -> ProjectContract:
+    """
+    Deploys the contract through the CREATE2 factory, unless it's already deployed. Unlike
+    get_or_create_deployed_instance(), whether it's deployed doesn't depend on the brownie session: its address is
+    determined by the account, the salt and the constructor arguments.
+    """
+    return get_create2_deployer(account).deploy(contract_cls, *deploy_args, account=account, salt=salt)
+
+
+def get_contract_instance(contract_cls: ContractContainer, account: Account, *deploy_args, force_deploy: bool = False, salt: Optional[Salt] = None) -> ProjectContract:
+    if salt is not None:
+        # deterministic deployments are idempotent, there's nothing to force
+        return get_or_create_deterministic_instance(contract_cls, account, *deploy_args, salt=salt)
+    if force_deploy:
+        return force_deploy_contract_instance(contract_cls, account, *deploy_args)
+    return get_or_create_deployed_instance(contract_cls, account, *deploy_args)
+
+
 class ContractBuilder:
 
-    def __init__(self, *, account: Account, force_deploy: bool = False):
+    def __init__(self, *, account: Account, force_deploy: bool = False, salt: Optional[Salt] = None):
+        """
+        With a salt, the PaymentRequest and the callbacks are deployed deterministically through the CREATE2 factory.
+        Test tokens and standalone receipts hand their supply or ownership to msg.sender (the factory, when deployed
+        through it), so they are always deployed directly.
+        """
         self._account = account
         self._force_deploy = force_deploy
+        self._salt = salt
 
     @staticmethod
     def get_shared_receipt_contract(*, account: Account, force_deploy: bool = False) -> Receipt:
-        args: tuple = (SharedReceipt, account, "Receipt", "RCT")
+        args: tuple = (SharedReceipt, account, *RECEIPT_DEPLOY_ARGS)
         return force_deploy_contract_instance(*args) if force_deploy else get_or_create_deployed_instance(*args)
 
     @staticmethod
     def get_receipt_contract(*, account: Account, force_deploy: bool = False) -> Receipt:
-        args: tuple = (Receipt, account, "Receipt", "RCT")
+        args: tuple = (Receipt, account, *RECEIPT_DEPLOY_ARGS)
         return force_deploy_contract_instance(*args) if force_deploy else get_or_create_deployed_instance(*args)
 
     @staticmethod
-    def get_payment_request_contract(*, account: Account, receipt: Optional[ContractContainer] = None, force_deploy: bool = False) -> PaymentRequest:
+    def get_payment_request_contract(*, account: Account, receipt: Optional[ContractContainer] = None, force_deploy: bool = False, salt: Optional[Salt] = None) -> PaymentRequest:
         args: tuple = (PaymentRequest, account, "PaymentRequest", "PRQ", receipt if receipt is not None else ADDRESS_ZERO)
-        return force_deploy_contract_instance(*args) if force_deploy else get_or_create_deployed_instance(*args)
+        return get_contract_instance(*args, force_deploy=force_deploy, salt=salt)
 
     @staticmethod
     def get_my_erc20_contract(*, account: Account, force_deploy: bool = False) -> MyERC20:
-        args: tuple = (MyERC20, account, "Jasmine", "JSM", 9999999)
+        args: tuple = (MyERC20, account, *MY_ERC20_DEPLOY_ARGS)
         return force_deploy_contract_instance(*args) if force_deploy else get_or_create_deployed_instance(*args)
 
     @staticmethod
     def get_my_erc_721_contract(*, account: Account, force_deploy: bool = False) -> MyERC721:
-        args: tuple = (MyERC721, account, "JasmineBut721", "JSM721")
+        args: tuple = (MyERC721, account, *MY_ERC721_DEPLOY_ARGS)
         return force_deploy_contract_instance(*args) if force_deploy else get_or_create_deployed_instance(*args)
 
     @staticmethod
-    def get_nft_owner_payment_precondition(*, erc20TokenAddr: str, erc721TokenAddr: str, account: Account, force_deploy: bool = False) -> NFTOwnerPaymentPrecondition:
+    def get_nft_owner_payment_precondition(*, erc20TokenAddr: str, erc721TokenAddr: str, account: Account, force_deploy: bool = False, salt: Optional[Salt] = None) -> NFTOwnerPaymentPrecondition:
         args: tuple = (NFTOwnerPaymentPrecondition, account, erc20TokenAddr, erc721TokenAddr)
-        return force_deploy_contract_instance(*args) if force_deploy else get_or_create_deployed_instance(*args)
+        return get_contract_instance(*args, force_deploy=force_deploy, salt=salt)
 
     @staticmethod
-    def get_fixed_token_amount_computer(*, price: int, account: Account, force_deploy: bool = False) -> FixedDynamicTokenAmount:
+    def get_fixed_token_amount_computer(*, price: int, account: Account, force_deploy: bool = False, salt: Optional[Salt] = None) -> FixedDynamicTokenAmount:
         args: tuple = (FixedDynamicTokenAmount, account, price)
-        return force_deploy_contract_instance(*args) if force_deploy else get_or_create_deployed_instance(*args)
+        return get_contract_instance(*args, force_deploy=force_deploy, salt=salt)
 
     @staticmethod
-    def get_one_purchase_per_address_payment_precondition(*, account: Account, force_deploy: bool = False) -> OnePurchasePerAddressPaymentPrecondition:
+    def get_one_purchase_per_address_payment_precondition(*, account: Account, force_deploy: bool = False, salt: Optional[Salt] = None) -> OnePurchasePerAddressPaymentPrecondition:
         args: tuple = (OnePurchasePerAddressPaymentPrecondition, account)
-        return force_deploy_contract_instance(*args) if force_deploy else get_or_create_deployed_instance(*args)
+        return get_contract_instance(*args, force_deploy=force_deploy, salt=salt)
 
     @staticmethod
-    def get_discounted_amount_token_price(*, account: Account, force_deploy: bool = False):
+    def get_discounted_amount_token_price(*, account: Account, force_deploy: bool = False, salt: Optional[Salt] = None):
         args: tuple = (DiscountedTokenAmountForFirst100Customers, account)
-        return force_deploy_contract_instance(*args) if force_deploy else get_or_create_deployed_instance(*args)
+        return get_contract_instance(*args, force_deploy=force_deploy, salt=salt)
 
     @staticmethod
-    def get_disable_payment_request_post_payment_action(*, account: Account, force_deploy: bool = False):
+    def get_disable_payment_request_post_payment_action(*, account: Account, force_deploy: bool = False, salt: Optional[Salt] = None):
         args: tuple = (DisablePaymentRequestPaymentPostAction, account)
-        return force_deploy_contract_instance(*args) if force_deploy else get_or_create_deployed_instance(*args)
+        return get_contract_instance(*args, force_deploy=force_deploy, salt=salt)
 
     @staticmethod
-    def get_transfer_nft_post_payment_action(*, erc721_address: str, erc721_id: int, account, force_deploy: bool = False):
+    def get_transfer_nft_post_payment_action(*, erc721_address: str, erc721_id: int, account, force_deploy: bool = False, salt: Optional[Salt] = None):
         args: tuple = (TransferNFTPaymentPostAction, account, erc721_address, erc721_id)
-        return force_deploy_contract_instance(*args) if force_deploy else get_or_create_deployed_instance(*args)
+        return get_contract_instance(*args, force_deploy=force_deploy, salt=salt)
 
     @staticmethod
-    def get_my_post_payment_action(*, account: Account, force_deploy: bool = False) -> MyPostPaymentAction:
+    def get_my_post_payment_action(*, account: Account, force_deploy: bool = False, salt: Optional[Salt] = None) -> MyPostPaymentAction:
         args: tuple = (MyPostPaymentAction, account)
-        return force_deploy_contract_instance(*args) if force_deploy else get_or_create_deployed_instance(*args)
+        return get_contract_instance(*args, force_deploy=force_deploy, salt=salt)
 
     @property
     def account(self) -> Account:
@@ -97,25 +144,31 @@ class ContractBuilder:
         return self._account
 
     @property
+    @traced(category="contract_builder")
     def Receipt(self) -> Receipt:
         return self.get_receipt_contract(account=self._account, force_deploy=self._force_deploy)
 
     @property
+    @traced(category="contract_builder")
     def SharedReceipt(self) -> SharedReceipt:
         return self.get_shared_receipt_contract(account=self._account, force_deploy=self._force_deploy)
 
     @property
+    @traced(category="contract_builder")
     def PaymentRequest(self) -> PaymentRequest:
-        return self.get_payment_request_contract(account=self._account, force_deploy=self._force_deploy)
+        return self.get_payment_request_contract(account=self._account, force_deploy=self._force_deploy, salt=self._salt)
     @property
+    @traced(category="contract_builder")
     def MyERC20(self) -> MyERC20:
         return self.get_my_erc20_contract(account=self._account, force_deploy=self._force_deploy)
 
     @property
+    @traced(category="contract_builder")
     def MyERC721(self) -> MyERC721:
         return self.get_my_erc_721_contract(account=self._account, force_deploy=self._force_deploy)
 
     @property
+    @traced(category="contract_builder")
     def NFTOwnerPaymentPrecondition(self) -> NFTOwnerPaymentPreconditionWithMeta:
         erc20: MyERC20 = self.MyERC20
         erc721: MyERC721 = self.MyERC721
@@ -125,6 +178,7 @@ class ContractBuilder:
             erc721TokenAddr=erc721.address,
             account=self._account,
             force_deploy=self._force_deploy,
+            salt=self._salt,
         )
 
         # Meta attribute attached, type is now changed
@@ -134,43 +188,54 @@ class ContractBuilder:
         return precondition
 
     @property
+    @traced(category="contract_builder")
     def FixedPricePaymentComputer(self) -> FixedDynamicTokenAmount:
-        price: int = random.randint(1, 99)
+        price: int = get_random_fixed_price()
         return self.get_fixed_token_amount_computer(
             price=price,
             account=self._account,
             force_deploy=self._force_deploy,
+            salt=self._salt,
         )
 
     @property
+    @traced(category="contract_builder")
     def MyPostPaymentAction(self) -> MyPostPaymentAction:
         return self.get_my_post_payment_action(
             account=self._account,
             force_deploy=self._force_deploy,
+            salt=self._salt,
         )
 
     @property
+    @traced(category="contract_builder")
     def OnePurchasePerAddressPaymentPrecondition(self) -> OnePurchasePerAddressPaymentPrecondition:
         return self.get_one_purchase_per_address_payment_precondition(
             account=self._account,
             force_deploy=self._force_deploy,
+            salt=self._salt,
         )
     
     @property
+    @traced(category="contract_builder")
     def DiscountedTokenAmountForFirst100Customers(self) -> DiscountedTokenAmountForFirst100Customers:
         return self.get_discounted_amount_token_price(
             account=self._account,
             force_deploy=self._force_deploy,
+            salt=self._salt,
         )
 
     @property
+    @traced(category="contract_builder")
     def DisablePaymentRequestPaymentPostAction(self) -> DisablePaymentRequestPaymentPostAction:
         return self.get_disable_payment_request_post_payment_action(
             account=self._account,
             force_deploy=self._force_deploy,
+            salt=self._salt,
         )
 
     @property
+    @traced(category="contract_builder")
     def TransferNFTPaymentPostAction(self) -> TransferNFTPaymentPostActionWithMeta:
         erc721: MyERC721 = self.MyERC721
         tx: TransactionReceipt = erc721.create(self.account.address)
@@ -181,6 +246,7 @@ class ContractBuilder:
             erc721_address=erc721.address,
             erc721_id=erc721_id,
             force_deploy=self._force_deploy,
+            salt=self._salt,
         )
 
         post_payment_action.Meta = TransferNFTPaymentPostActionMeta(erc721=erc721, erc721_id=erc721_id)
@@ -0,0 +1,202 @@
+"""
+Deterministic deployments through PaymentRequestFactory (CREATE2). Addresses only depend on the factory, the deploying
+account, the salt and the init code of the contract, as such they can be computed offline, before anything is
+deployed, and deploying the same contract twice returns the existing instance instead of a new one.
+
+    deployer: Create2Deployer = Create2Deployer(get_or_deploy_factory(account))
+    salt: bytes = salt_from_label("merchant-42")
+    stack: PaymentRequestStack = deployer.deploy_stack(
+        account=account, salt=salt, name="Coffee", symbol="CFE", callbacks=[(MyPostPaymentAction, ())]
+    )
+
+The factory itself is deployed through the deterministic deployment proxy
+(https://github.com/Arachnid/deterministic-deployment-proxy), which is created by a pre-signed transaction without a
+chain ID from an account nobody holds the key of. As such, the proxy has the same address on every chain and so does
+the factory: its address only depends on its init code, not on the account that deploys it nor on its nonce.
+"""
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from brownie import PaymentRequest, PaymentRequestFactory, Receipt, web3
+from brownie.convert import to_address, to_bytes
+from brownie.network.account import Account
+from brownie.network.contract import ContractContainer, ProjectContract
+from brownie.network.transaction import TransactionReceipt
+from eth_abi import encode_abi
+from eth_utils import keccak
+from hexbytes import HexBytes
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.parallel_deployer import compute_create_address
+from scripts.utils.tracing import TRACER
+
+Salt = Union[bytes, str, int]
+
+# contracts start with nonce 1 (EIP-161), the Receipt is the first contract a PaymentRequest creates
+PAYMENT_REQUEST_RECEIPT_NONCE: int = 1
+
+# (contract, constructor arguments)
+CallbackDeployment = tuple[ContractContainer, tuple]
+
+DETERMINISTIC_DEPLOYMENT_PROXY: str = "0x4e59b44847b379578588920cA78FbF26c0B4956C"
+DETERMINISTIC_DEPLOYMENT_PROXY_SIGNER: str = "0x3fAB184622Dc19b6109349B94811493BF2a45362"
+DETERMINISTIC_DEPLOYMENT_PROXY_TX: str = (
+    "0xf8a58085174876e800830186a08080b853604580600e600039806000f350fe7fffffffffffffffffffffffffffffffffffffffffffff"
+    "ffffffffffffffffffe03601600081602082378035828234f58015156039578182fd5b8082525050506014600cf31ba022222222222222"
+    "22222222222222222222222222222222222222222222222222a02222222222222222222222222222222222222222222222222222222222"
+    "222222"
+)
+# gas price (100 gwei) x gas limit (100 000) of the pre-signed transaction
+DETERMINISTIC_DEPLOYMENT_PROXY_TX_COST: int = 10 ** 16
+FACTORY_SALT: bytes = bytes(32)
+
+
+@dataclass
+class PaymentRequestStack:
+    payment_request: ProjectContract
+    receipt: ProjectContract
+    callbacks: list[ProjectContract]
+    # None if the whole stack was already deployed
+    tx: Optional[TransactionReceipt] = None
+
+
+def salt_from_label(label: str) -> bytes:
+    return keccak(text=label)
+
+
+def to_salt(salt: Salt) -> bytes:
+    return bytes(to_bytes(salt, "bytes32"))
+
+
+def get_init_code(contract_cls: ContractContainer, *deploy_args) -> bytes:
+    return bytes(HexBytes(contract_cls.deploy.encode_input(*deploy_args)))
+
+
+def get_deployer_salt(deployer: str, salt: Salt) -> bytes:
+    """
+    Mirrors PaymentRequestFactory.getDeployerSalt().
+    """
+    return keccak(encode_abi(["address", "bytes32"], [to_address(deployer), to_salt(salt)]))
+
+
+def compute_create2_address(*, factory: str, deployer: str, salt: Salt, init_code: bytes) -> str:
+    return to_address(
+        keccak(b"\xff" + bytes(HexBytes(factory)) + get_deployer_salt(deployer, salt) + keccak(init_code))[12:]
+    )
+
+
+def compute_factory_address() -> str:
+    """
+    Address of PaymentRequestFactory when deployed through the deterministic deployment proxy. The proxy uses the salt
+    as it is, it's not namespaced by the deployer as in PaymentRequestFactory.
+    """
+    return to_address(
+        keccak(
+            b"\xff"
+            + bytes(HexBytes(DETERMINISTIC_DEPLOYMENT_PROXY))
+            + FACTORY_SALT
+            + keccak(get_init_code(PaymentRequestFactory))
+        )[12:]
+    )
+
+
+def deploy_deterministic_deployment_proxy(account: Account) -> None:
+    """Funds the signer of the pre-signed transaction of the proxy and broadcasts it, unless it's already deployed."""
+    if _has_code(DETERMINISTIC_DEPLOYMENT_PROXY):
+        return
+    balance: int = web3.eth.get_balance(DETERMINISTIC_DEPLOYMENT_PROXY_SIGNER)
+    if balance < DETERMINISTIC_DEPLOYMENT_PROXY_TX_COST:
+        account.transfer(DETERMINISTIC_DEPLOYMENT_PROXY_SIGNER, DETERMINISTIC_DEPLOYMENT_PROXY_TX_COST - balance)
+    web3.eth.wait_for_transaction_receipt(web3.eth.send_raw_transaction(DETERMINISTIC_DEPLOYMENT_PROXY_TX))
+
+
+def get_or_deploy_factory(account: Account) -> ProjectContract:
+    """
+    PaymentRequestFactory at its deterministic address. The account only pays for the deployment, if it's needed.
+    """
+    address: str = compute_factory_address()
+    if not _has_code(address):
+        deploy_deterministic_deployment_proxy(account)
+        with TRACER.span("get_or_deploy_factory", category="deploy", contract=PaymentRequestFactory._name):
+            # the calldata of the proxy is the salt followed by the init code
+            data: bytes = FACTORY_SALT + get_init_code(PaymentRequestFactory)
+            account.transfer(DETERMINISTIC_DEPLOYMENT_PROXY, 0, data=HexBytes(data).hex())
+    return PaymentRequestFactory.at(address)
+
+
+def get_payment_request_init_code(name: str, symbol: str) -> bytes:
+    # without a custom Receipt, the PaymentRequest deploys and owns its own
+    return get_init_code(PaymentRequest, name, symbol, ADDRESS_ZERO)
+
+
+class Create2Deployer:
+    def __init__(self, factory: ProjectContract):
+        self._factory: ProjectContract = factory
+
+    @property
+    def factory(self) -> ProjectContract:
+        return self._factory
+
+    def compute_address(self, contract_cls: ContractContainer, *deploy_args, deployer: str, salt: Salt) -> str:
+        return compute_create2_address(
+            factory=self._factory.address,
+            deployer=deployer,
+            salt=salt,
+            init_code=get_init_code(contract_cls, *deploy_args),
+        )
+
+    def deploy(self, contract_cls: ContractContainer, *deploy_args, account: Account, salt: Salt) -> ProjectContract:
+        address: str = self.compute_address(contract_cls, *deploy_args, deployer=account.address, salt=salt)
+        if not _has_code(address):
+            with TRACER.span("Create2Deployer.deploy", category="deploy", contract=contract_cls._name):
+                self._factory.deploy(to_salt(salt), get_init_code(contract_cls, *deploy_args), {"from": account})
+        return contract_cls.at(address)
+
+    def compute_stack_addresses(
+        self, *, deployer: str, salt: Salt, name: str, symbol: str, callbacks: list[CallbackDeployment]
+    ) -> tuple[str, str, list[str]]:
+        """
+        Addresses of the PaymentRequest, of its Receipt and of the callbacks of a stack.
+        """
+        payment_request_address: str = compute_create2_address(
+            factory=self._factory.address,
+            deployer=deployer,
+            salt=salt,
+            init_code=get_payment_request_init_code(name, symbol),
+        )
+        receipt_address: str = compute_create_address(payment_request_address, PAYMENT_REQUEST_RECEIPT_NONCE)
+        callback_addresses: list[str] = [
+            self.compute_address(contract_cls, *deploy_args, deployer=deployer, salt=salt)
+            for contract_cls, deploy_args in callbacks
+        ]
+        return payment_request_address, receipt_address, callback_addresses
+
+    def deploy_stack(
+        self, *, account: Account, salt: Salt, name: str, symbol: str, callbacks: list[CallbackDeployment]
+    ) -> PaymentRequestStack:
+        payment_request_address, receipt_address, callback_addresses = self.compute_stack_addresses(
+            deployer=account.address, salt=salt, name=name, symbol=symbol, callbacks=callbacks
+        )
+
+        tx: Optional[TransactionReceipt] = None
+        if not all(_has_code(address) for address in [payment_request_address, *callback_addresses]):
+            with TRACER.span("Create2Deployer.deploy_stack", category="deploy", callbacks=len(callbacks)):
+                tx = self._factory.deployStack(
+                    to_salt(salt),
+                    get_payment_request_init_code(name, symbol),
+                    [get_init_code(contract_cls, *deploy_args) for contract_cls, deploy_args in callbacks],
+                    {"from": account},
+                )
+
+        return PaymentRequestStack(
+            payment_request=PaymentRequest.at(payment_request_address),
+            receipt=Receipt.at(receipt_address),
+            callbacks=[
+                contract_cls.at(address) for (contract_cls, _), address in zip(callbacks, callback_addresses)
+            ],
+            tx=tx,
+        )
+
+
+def _has_code(address: str) -> bool:
+    return len(web3.eth.get_code(address)) > 0
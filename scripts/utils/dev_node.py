@@ -0,0 +1,117 @@
+"""
+Launcher of local development nodes (ganache), with the same settings brownie uses for the development network.
+Brownie attaches to a node that is already listening on the port of the network it connects to, which allows to
+start nodes with options brownie doesn't expose, such as a persistent database, or on a port of choice.
+"""
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import psutil
+import requests
+from brownie._config import CONFIG
+from brownie.network.rpc.ganache import get_ganache_version, launch
+
+DEVELOPMENT_NETWORK: str = "development"
+
+# flag of the database directory option, by major ganache version
+GANACHE_7_DB_PATH_FLAG: str = "--database.dbPath"
+GANACHE_6_DB_PATH_FLAG: str = "--db"
+
+
+class DevNodeException(Exception):
+    pass
+
+
+def get_development_network_settings(network: str = DEVELOPMENT_NETWORK) -> dict[str, Any]:
+    return CONFIG.networks[network]
+
+
+def get_development_network_port(network: str = DEVELOPMENT_NETWORK) -> int:
+    return int(get_development_network_settings(network)["cmd_settings"]["port"])
+
+
+def is_node_listening(port: int, host: str = "127.0.0.1") -> bool:
+    try:
+        response = requests.post(
+            f"http://{host}:{port}",
+            json={"jsonrpc": "2.0", "method": "web3_clientVersion", "params": [], "id": 1},
+            timeout=1,
+        )
+        return response.ok
+    except requests.exceptions.RequestException:
+        return False
+
+
+class DevNode:
+    def __init__(
+        self,
+        *,
+        port: Optional[int] = None,
+        db_path: Optional[Path] = None,
+        network: str = DEVELOPMENT_NETWORK,
+        cmd_settings: Optional[dict[str, Any]] = None,
+    ):
+        network_settings: dict[str, Any] = get_development_network_settings(network)
+        self._cmd: str = network_settings["cmd"]
+        self._cmd_settings: dict[str, Any] = {**network_settings["cmd_settings"], **(cmd_settings or {})}
+        if port is not None:
+            self._cmd_settings["port"] = port
+        self._db_path: Optional[Path] = db_path
+        self._process: Optional[psutil.Popen] = None
+
+    @property
+    def port(self) -> int:
+        return int(self._cmd_settings["port"])
+
+    @property
+    def is_running(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def _get_cmd(self) -> str:
+        if self._db_path is None:
+            return self._cmd
+
+        executable: str = self._cmd.split(" ")[0]
+        db_path_flag: str = GANACHE_7_DB_PATH_FLAG if get_ganache_version(executable) > 6 else GANACHE_6_DB_PATH_FLAG
+        # brownie splits the command on spaces
+        return f"{self._cmd} {db_path_flag} {self._db_path.resolve()}"
+
+    def start(self, timeout: float = 30) -> None:
+        if is_node_listening(self.port):
+            raise DevNodeException(f"A node is already listening on port {self.port}.")
+
+        if self._db_path is not None:
+            self._db_path.mkdir(parents=True, exist_ok=True)
+        self._process = launch(self._get_cmd(), **self._cmd_settings)
+
+        deadline: float = time.monotonic() + timeout
+        while not is_node_listening(self.port):
+            if not self.is_running:
+                raise DevNodeException(f"Node on port {self.port} exited with code {self._process.returncode}.")
+            if time.monotonic() > deadline:
+                self.stop()
+                raise DevNodeException(f"Node on port {self.port} did not start within {timeout} seconds.")
+            time.sleep(0.1)
+
+    def stop(self, timeout: float = 10) -> None:
+        """
+        Stops the node gracefully, so that its database is completely written to disk.
+        """
+        if not self.is_running:
+            return
+
+        self._process.terminate()
+        try:
+            self._process.wait(timeout)
+        except psutil.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+    def __enter__(self) -> "DevNode":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
@@ -0,0 +1,283 @@
+"""
+Decoding of the custom errors raised by PaymentRequest and Receipt. Allows to tell at which stage a pay() transaction
+failed (see PaymentFailedAt) from its revert data alone, without re-reading the state of the PaymentRequest.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional, Union
+
+from brownie import web3
+from brownie.network.transaction import TransactionReceipt
+from eth_abi import decode_abi
+from eth_utils import encode_hex
+from hexbytes import HexBytes
+from web3 import Web3
+
+from scripts.utils.contants import PaymentFailedAt
+
+RevertData = Union[bytes, str]
+
+
+@dataclass(frozen=True)
+class ErrorDefinition:
+    name: str
+    argument_names: tuple[str, ...] = ()
+    argument_types: tuple[str, ...] = ()
+    # stage at which pay() failed, if the error always maps to the same one
+    failed_at: Optional[str] = None
+    # name of the argument holding the index of the PaymentStage enum, if the stage is carried by the error
+    stage_argument: Optional[str] = None
+    # name of the argument holding the revert data of an inner call, if any
+    reason_argument: Optional[str] = None
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}({','.join(self.argument_types)})"
+
+    @property
+    def selector(self) -> bytes:
+        return bytes(Web3.keccak(text=self.signature)[:4])
+
+
+@dataclass
+class DecodedError:
+    name: str
+    arguments: dict[str, Any]
+    failed_at: Optional[str]
+    inner_error: Optional[DecodedError] = None
+
+    @property
+    def payment_request_id(self) -> Optional[int]:
+        return self.arguments.get("paymentRequestId")
+
+
+class ErrorDecoderRegistry:
+    def __init__(self):
+        self._selector_to_definition: dict[bytes, ErrorDefinition] = {}
+
+    def register(self, definition: ErrorDefinition) -> None:
+        self._selector_to_definition[definition.selector] = definition
+
+    def get_definition(self, selector: bytes) -> Optional[ErrorDefinition]:
+        return self._selector_to_definition.get(bytes(selector))
+
+    def decode(self, revert_data: Optional[RevertData]) -> Optional[DecodedError]:
+        """Decode the provided revert data. None is returned if it does not match any registered error."""
+        if revert_data is None:
+            return None
+
+        data: HexBytes = HexBytes(revert_data)
+        if len(data) < 4:
+            return None
+
+        definition: Optional[ErrorDefinition] = self.get_definition(data[:4])
+        if definition is None:
+            return None
+
+        values: tuple = decode_abi(list(definition.argument_types), bytes(data[4:]))
+        arguments: dict[str, Any] = dict(zip(definition.argument_names, values))
+
+        failed_at: Optional[str] = definition.failed_at
+        if definition.stage_argument is not None:
+            failed_at = PaymentFailedAt.ALL[arguments[definition.stage_argument]]
+
+        inner_error: Optional[DecodedError] = None
+        if definition.reason_argument is not None:
+            inner_error = self.decode(arguments[definition.reason_argument])
+
+        return DecodedError(name=definition.name, arguments=arguments, failed_at=failed_at, inner_error=inner_error)
+
+    def classify(self, revert_data: Optional[RevertData]) -> Optional[str]:
+        """Return the PaymentFailedAt stage encoded in the provided revert data, or None if it is unknown."""
+        decoded_error: Optional[DecodedError] = self.decode(revert_data)
+        return decoded_error.failed_at if decoded_error is not None else None
+
+
+ERROR_DEFINITIONS: list[ErrorDefinition] = [
+    # Solidity built-ins
+    ErrorDefinition(name="Error", argument_names=("message",), argument_types=("string",)),
+    ErrorDefinition(name="Panic", argument_names=("code",), argument_types=("uint256",)),
+
+    # PaymentRequest, pay()
+    ErrorDefinition(
+        name="PaymentRequestNotEnabled",
+        argument_names=("paymentRequestId",),
+        argument_types=("uint256",),
+        failed_at=PaymentFailedAt.NOT_ENABLED,
+    ),
+    ErrorDefinition(
+        name="PayerNotAllowed",
+        argument_names=("paymentRequestId", "payer"),
+        argument_types=("uint256", "address"),
+        failed_at=PaymentFailedAt.PP,
+    ),
+    ErrorDefinition(
+        name="PaymentPreconditionNotMet",
+        argument_names=("paymentRequestId", "payer"),
+        argument_types=("uint256", "address"),
+        failed_at=PaymentFailedAt.PP,
+    ),
+    ErrorDefinition(
+        name="TokenNotAccepted",
+        argument_names=("paymentRequestId", "token"),
+        argument_types=("uint256", "address"),
+        failed_at=PaymentFailedAt.TA,
+    ),
+    ErrorDefinition(
+        name="TokenTransferFailed",
+        argument_names=("paymentRequestId", "token"),
+        argument_types=("uint256", "address"),
+        failed_at=PaymentFailedAt.TOKEN_BALANCE_OR_APPROVAL,
+    ),
+    ErrorDefinition(
+        name="TokenIndexOutOfBounds",
+        argument_names=("paymentRequestId", "tokenIndex"),
+        argument_types=("uint256", "uint256"),
+        failed_at=PaymentFailedAt.TA,
+    ),
+    # malformed payPacked() calldata, rejected before any stage
+    ErrorDefinition(
+        name="UnsupportedPackedPaymentFlags",
+        argument_names=("paymentRequestId", "flags"),
+        argument_types=("uint256", "uint256"),
+    ),
+    ErrorDefinition(
+        name="PaymentStageReverted",
+        argument_names=("paymentRequestId", "stage", "reason"),
+        argument_types=("uint256", "uint8", "bytes"),
+        stage_argument="stage",
+        reason_argument="reason",
+    ),
+
+    # PaymentRequest, outside of pay(). Getters raise TokenAmountNotStatic and TokenAmountNotDynamic as well, as such
+    # they don't map to a stage, payPacked() wraps the former into PaymentStageReverted.
+    ErrorDefinition(
+        name="TokenAmountNotStatic",
+        argument_names=("paymentRequestId",),
+        argument_types=("uint256",),
+    ),
+    ErrorDefinition(
+        name="TokenAmountNotDynamic",
+        argument_names=("paymentRequestId",),
+        argument_types=("uint256",),
+    ),
+    ErrorDefinition(
+        name="NotPaymentRequestOwner",
+        argument_names=("paymentRequestId", "caller"),
+        argument_types=("uint256", "address"),
+    ),
+    ErrorDefinition(
+        name="RestrictedPaymentRequestCannotBeEnabled",
+        argument_names=("paymentRequestId",),
+        argument_types=("uint256",),
+    ),
+    ErrorDefinition(name="EmptyTokenAmounts"),
+    ErrorDefinition(
+        name="DuplicateTokenAmount",
+        argument_names=("paymentRequestId", "token"),
+        argument_types=("uint256", "address"),
+    ),
+    ErrorDefinition(
+        name="PaymentRequestIsClosed",
+        argument_names=("paymentRequestId",),
+        argument_types=("uint256",),
+    ),
+
+    # Receipt
+    ErrorDefinition(name="ConsecutiveTransfersNotSupported"),
+    ErrorDefinition(
+        name="OwnerIndexOutOfBounds",
+        argument_names=("paymentRequestId", "owner", "index"),
+        argument_types=("uint256", "address", "uint256"),
+    ),
+    ErrorDefinition(
+        name="GlobalIndexOutOfBounds",
+        argument_names=("paymentRequestId", "index"),
+        argument_types=("uint256", "uint256"),
+    ),
+]
+
+ERROR_REGISTRY: ErrorDecoderRegistry = ErrorDecoderRegistry()
+for _error_definition in ERROR_DEFINITIONS:
+    ERROR_REGISTRY.register(_error_definition)
+
+
+def _get_revert_data_from_trace(txid: str, w3: Web3 = web3) -> Optional[HexBytes]:
+    response: dict = w3.provider.make_request(
+        "debug_traceTransaction", [txid, {"disableStorage": True, "enableMemory": True}]
+    )
+    struct_logs: list[dict] = response.get("result", {}).get("structLogs", [])
+    if not struct_logs:
+        return None
+
+    top_level_depth: int = struct_logs[0]["depth"]
+    step: dict
+    for step in reversed(struct_logs):
+        if step["op"] == "REVERT" and step["depth"] == top_level_depth:
+            offset: int = int(step["stack"][-1], 16)
+            length: int = int(step["stack"][-2], 16)
+            memory: bytes = bytes.fromhex("".join(word.replace("0x", "").zfill(64) for word in step.get("memory", [])))
+            data: bytes = memory[offset:offset + length]
+            return HexBytes(data + b"\x00" * (length - len(data)))
+
+    return None
+
+
+def _get_revert_data_from_call(call: dict, block_number: int, w3: Web3 = web3) -> Optional[HexBytes]:
+    # replay the transaction on top of the state of the previous block. Exact on development networks, where each
+    # transaction is mined in its own block.
+    response: dict = w3.provider.make_request("eth_call", [call, hex(block_number - 1)])
+    return get_revert_data_from_call_response(response)
+
+
+def get_revert_data_from_call_response(response: dict) -> Optional[HexBytes]:
+    """Revert data of the JSON-RPC response to a reverted eth_call, None if the call didn't revert with data."""
+    error_data: Any = response.get("error", {}).get("data")
+
+    if isinstance(error_data, dict):
+        # ganache-cli v6 format: {"<txid>": {"return": "0x..."}, ...}
+        error_data = next(
+            (value.get("return") for value in error_data.values() if isinstance(value, dict) and "return" in value),
+            None,
+        )
+
+    return HexBytes(error_data) if isinstance(error_data, str) and error_data.startswith("0x") else None
+
+
+def get_revert_data(tx: TransactionReceipt) -> Optional[HexBytes]:
+    """Obtain the raw revert data of a reverted transaction."""
+    if web3.supports_traces:
+        return _get_revert_data_from_trace(tx.txid)
+    call: dict = {"from": tx.sender.address, "to": tx.receiver, "data": tx.input, "value": hex(tx.value)}
+    return _get_revert_data_from_call(call, tx.block_number)
+
+
+def get_revert_data_of_transaction(
+    transaction: dict, *, use_traces: Optional[bool] = None, w3: Optional[Web3] = None
+) -> Optional[HexBytes]:
+    """
+    Same as get_revert_data(), from the transaction as returned by eth_getTransactionByHash, which is cheaper to
+    obtain than a brownie TransactionReceipt when many transactions are processed. The node is reached through w3,
+    brownie's web3 by default. Only the latter knows whether the node supports traces, with another Web3 the
+    transaction is replayed unless use_traces is set.
+    """
+    w3 = w3 if w3 is not None else web3
+    if use_traces if use_traces is not None else getattr(w3, "supports_traces", False):
+        return _get_revert_data_from_trace(encode_hex(HexBytes(transaction["hash"])), w3)
+    call: dict = {
+        "from": transaction["from"],
+        "to": transaction["to"],
+        "data": encode_hex(HexBytes(transaction["input"])),
+        "value": hex(transaction["value"]),
+    }
+    return _get_revert_data_from_call(call, transaction["blockNumber"], w3)
+
+
+def decode_failed_transaction(tx: TransactionReceipt) -> Optional[DecodedError]:
+    return ERROR_REGISTRY.decode(get_revert_data(tx))
+
+
+def classify_failed_transaction(tx: TransactionReceipt) -> Optional[str]:
+    """Return the PaymentFailedAt stage at which the provided pay() transaction failed, or None if it is unknown."""
+    return ERROR_REGISTRY.classify(get_revert_data(tx))
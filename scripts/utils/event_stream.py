@@ -0,0 +1,275 @@
+"""
+Reorg-aware stream of the payments of a PaymentRequest, for services that react to PaymentRequestPaid:
+
+    stream: PaymentEventStream = PaymentEventStream(payment_request=payment_request.address, confirmations=2)
+    async for event in stream:
+        if event.is_retraction:
+            cancel_fulfilment(event.receipt_id)
+        else:
+            fulfil(event.receipt_id)
+
+New blocks are tailed by polling, and a payment is yielded once its block has the requested number of confirmations.
+The hashes of the last processed blocks are kept: when one of them changes, the blocks that are not part of the chain
+anymore are rolled back, and a retraction (is_retraction=True) is yielded for each payment they contained, newest
+first. The blocks of the new branch are then processed as usual.
+
+Payments are queued for the consumer in a bounded queue. When the consumer falls behind, the queue fills up and the
+node is not polled until there's room again (backpressure), as such no payment is ever dropped, only delayed.
+
+ReceiptTransferEventStream streams the Transfer events of a Receipt (mints included) the same way. The retraction of a
+transfer gives the receipt back to its sender.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Generic, Optional, TypeVar, Union
+
+from brownie import web3
+from eth_utils import encode_hex, to_checksum_address
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import BlockNotFound
+
+from scripts.utils.codec import decode_payment_request_paid, decode_transfer
+from scripts.utils.indexer import EventDefinition, get_event_definition
+
+DEFAULT_CONFIRMATIONS: int = 1
+# seconds
+DEFAULT_POLL_INTERVAL: float = 0.2
+DEFAULT_MAX_PENDING_EVENTS: int = 1_000
+# number of processed blocks whose hashes are kept, reorgs deeper than that can't be rolled back
+DEFAULT_MAX_REORG_DEPTH: int = 64
+# blocks processed by a single poll, when catching up
+MAX_BLOCKS_PER_POLL: int = 100
+
+PAYMENT_REQUEST_PAID: EventDefinition = get_event_definition("PaymentRequestPaid")
+RECEIPT_TRANSFER: EventDefinition = get_event_definition("Transfer")
+
+
+class EventStreamException(Exception):
+    pass
+
+
+class ReorgTooDeepException(EventStreamException):
+    pass
+
+
+@dataclass(frozen=True)
+class PaymentEvent:
+    block_number: int
+    block_hash: str
+    log_index: int
+    tx_hash: str
+    payment_request_id: int
+    receipt_id: int
+    token: str
+    amount: int
+    payer: str
+    payee: str
+    # the payment was yielded before, but its block is not part of the chain anymore
+    is_retraction: bool = False
+
+
+@dataclass(frozen=True)
+class ReceiptTransferEvent:
+    block_number: int
+    block_hash: str
+    log_index: int
+    tx_hash: str
+    # the zero address for mints
+    sender: str
+    recipient: str
+    receipt_id: int
+    # the transfer was yielded before, but its block is not part of the chain anymore
+    is_retraction: bool = False
+
+
+Event = TypeVar("Event", PaymentEvent, ReceiptTransferEvent)
+
+
+class LogEventStream(ABC, Generic[Event]):
+    """
+    Stream of the events of a contract, of a single EventDefinition. Subclasses convert the decoded logs.
+    """
+
+    def __init__(
+        self,
+        *,
+        address: str,
+        event_definition: EventDefinition,
+        w3: Optional[Web3] = None,
+        confirmations: int = DEFAULT_CONFIRMATIONS,
+        from_block: Optional[int] = None,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        max_pending_events: int = DEFAULT_MAX_PENDING_EVENTS,
+        max_reorg_depth: int = DEFAULT_MAX_REORG_DEPTH,
+    ):
+        self._address: str = to_checksum_address(address)
+        self._event_definition: EventDefinition = event_definition
+        self._w3: Web3 = w3 if w3 is not None else web3
+        self._confirmations: int = confirmations
+        self._poll_interval: float = poll_interval
+        self._max_pending_events: int = max_pending_events
+        self._max_reorg_depth: int = max_reorg_depth
+
+        # last processed block, by default the stream starts at the current (confirmed) head
+        self._cursor: Optional[int] = from_block - 1 if from_block is not None else None
+        # block number -> hash, of the last processed blocks
+        self._block_hashes: dict[int, HexBytes] = {}
+        # block number -> events yielded for it, that would have to be retracted
+        self._events_by_block: dict[int, list[Event]] = {}
+        # whether processed blocks were forgotten, because they're too deep to be rolled back
+        self._is_window_full: bool = False
+
+    def __aiter__(self) -> AsyncIterator[Event]:
+        return self._stream()
+
+    async def _stream(self) -> AsyncIterator[Event]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._max_pending_events)
+        producer: asyncio.Task = asyncio.create_task(self._produce(queue))
+        try:
+            while True:
+                item: Union[Event, Exception] = await queue.get()
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
+            with suppress(asyncio.CancelledError):
+                await producer
+
+    async def _produce(self, queue: asyncio.Queue) -> None:
+        try:
+            while True:
+                # web3 is synchronous, the node is polled in a thread so that the consumer keeps running
+                events: list[Event] = await asyncio.to_thread(self.poll)
+                event: Event
+                for event in events:
+                    # waits for the consumer when the queue is full
+                    await queue.put(event)
+                if not events:
+                    await asyncio.sleep(self._poll_interval)
+        except Exception as e:
+            await queue.put(e)
+
+    def _get_block_hash(self, block_number: int) -> Optional[HexBytes]:
+        try:
+            return HexBytes(self._w3.eth.get_block(block_number)["hash"])
+        except BlockNotFound:
+            return None
+
+    def _roll_back_reorged_blocks(self) -> list[Event]:
+        """
+        Rolls the cursor back to the last processed block that is still part of the chain. Returns the retractions of
+        the events of the blocks that were rolled back.
+        """
+        retractions: list[Event] = []
+        while self._block_hashes:
+            block_number: int = max(self._block_hashes)
+            if self._get_block_hash(block_number) == self._block_hashes[block_number]:
+                return retractions
+
+            del self._block_hashes[block_number]
+            retractions.extend(
+                replace(event, is_retraction=True) for event in reversed(self._events_by_block.pop(block_number, []))
+            )
+            self._cursor = block_number - 1
+
+        if self._is_window_full:
+            # the common ancestor is one of the blocks that were forgotten
+            raise ReorgTooDeepException(f"Reorg deeper than the last {self._max_reorg_depth} processed blocks.")
+        return retractions
+
+    def _decode_log(self, log: dict[str, Any]) -> dict[str, Any]:
+        """
+        Fields common to every event, followed by the decoded values of the event.
+        """
+        topics: list[bytes] = [bytes(HexBytes(topic)) for topic in log["topics"]]
+        return {
+            "block_number": int(log["blockNumber"]),
+            "block_hash": encode_hex(HexBytes(log["blockHash"])),
+            "log_index": int(log["logIndex"]),
+            "tx_hash": encode_hex(HexBytes(log["transactionHash"])),
+            **dict(zip(self._event_definition.columns, self._decode_values(topics, bytes(HexBytes(log["data"]))))),
+        }
+
+    def _decode_values(self, topics: list[bytes], data: bytes) -> tuple:
+        """
+        Decoded values of the event, in the order of the columns of its definition.
+        """
+        return self._event_definition.decode(topics, data)
+
+    @abstractmethod
+    def _to_event(self, log: dict[str, Any]) -> Event:
+        pass
+
+    def poll(self) -> list[Event]:
+        """
+        Processes the new confirmed blocks. Returns the retractions caused by a reorg, if any, followed by the
+        events of the new blocks.
+        """
+        events: list[Event] = self._roll_back_reorged_blocks()
+
+        target: int = self._w3.eth.block_number - self._confirmations
+        if self._cursor is None:
+            self._cursor = target
+        if target <= self._cursor:
+            return events
+
+        from_block: int = self._cursor + 1
+        to_block: int = min(target, self._cursor + MAX_BLOCKS_PER_POLL)
+        block_hashes: dict[int, Optional[HexBytes]] = {
+            block_number: self._get_block_hash(block_number) for block_number in range(from_block, to_block + 1)
+        }
+        logs: list[dict[str, Any]] = self._w3.eth.get_logs(
+            {
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "address": self._address,
+                "topics": [encode_hex(self._event_definition.topic)],
+            }
+        )
+        if None in block_hashes.values() or any(
+            HexBytes(log["blockHash"]) != block_hashes[int(log["blockNumber"])] for log in logs
+        ):
+            # the chain changed while the blocks were read, they are read again by the next poll
+            return events
+
+        new_events: list[Event] = [self._to_event(log) for log in logs]
+        event: Event
+        for event in new_events:
+            self._events_by_block.setdefault(event.block_number, []).append(event)
+        self._block_hashes.update(block_hashes)
+        self._cursor = to_block
+
+        # forget the blocks that are too deep to be rolled back
+        block_number: int
+        for block_number in [n for n in self._block_hashes if n <= to_block - self._max_reorg_depth]:
+            del self._block_hashes[block_number]
+            self._events_by_block.pop(block_number, None)
+            self._is_window_full = True
+
+        return events + new_events
+
+
+class PaymentEventStream(LogEventStream[PaymentEvent]):
+    def __init__(self, *, payment_request: str, **kwargs: Any):
+        super().__init__(address=payment_request, event_definition=PAYMENT_REQUEST_PAID, **kwargs)
+
+    def _decode_values(self, topics: list[bytes], data: bytes) -> tuple:
+        return decode_payment_request_paid(topics, data)
+
+    def _to_event(self, log: dict[str, Any]) -> PaymentEvent:
+        return PaymentEvent(**self._decode_log(log))
+
+
+class ReceiptTransferEventStream(LogEventStream[ReceiptTransferEvent]):
+    def __init__(self, *, receipt: str, **kwargs: Any):
+        super().__init__(address=receipt, event_definition=RECEIPT_TRANSFER, **kwargs)
+
+    def _decode_values(self, topics: list[bytes], data: bytes) -> tuple:
+        return decode_transfer(topics, data)
+
+    def _to_event(self, log: dict[str, Any]) -> ReceiptTransferEvent:
+        return ReceiptTransferEvent(**self._decode_log(log))
@@ -0,0 +1,185 @@
+"""
+Bulk classification of reverted pay() transactions by the stage at which they failed (see PaymentFailedAt), with a
+failure funnel per PaymentRequest: how many of its failed payments stopped at each stage.
+
+    classifier: FailureClassifier = FailureClassifier()
+    report: FailureReport = classifier.classify(tx_hashes)
+    funnel: PaymentRequestFunnel
+    for funnel in report.funnels.values():
+        print(funnel.payment_request_id, funnel.histogram)
+
+The stage is decoded from the revert data of every transaction (see scripts/utils/errors.py), as such the state of
+the PaymentRequest at the time of the payment is not needed. The configuration of every PaymentRequest (whether a
+PaymentPrecondition and a PostPaymentAction are set) is only read once, to tell which stages apply to it. Closed
+PaymentRequests have no configuration anymore, the stages they failed at still show up in their histogram.
+
+The funnel starts with NOT_ENABLED: the payments to a PaymentRequest that is disabled, closed, or restricted and already
+paid, which pay() rejects before any of its stages. All reads go through the w3 of the FailureClassifier.
+"""
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from brownie import web3
+from eth_abi import decode_abi
+from eth_utils import to_checksum_address
+from hexbytes import HexBytes
+from web3 import Web3
+
+from scripts.utils.async_client import AbiFunction, AsyncPaymentRequest
+from scripts.utils.calldata import unpack_payment
+from scripts.utils.codec import PAY_PACKED_SELECTOR, PAY_SELECTOR
+from scripts.utils.contants import PaymentFailedAt
+from scripts.utils.errors import ERROR_REGISTRY, DecodedError, get_revert_data_of_transaction
+
+# stages in the order in which pay() goes through them
+PAY_STAGES: list[str] = [
+    PaymentFailedAt.NOT_ENABLED,
+    PaymentFailedAt.PP,
+    PaymentFailedAt.TA,
+    PaymentFailedAt.TOKEN_BALANCE_OR_APPROVAL,
+    PaymentFailedAt.PR,
+    PaymentFailedAt.PPA,
+]
+# histogram key of the failures whose revert data doesn't match any known error
+UNKNOWN_STAGE: str = "UNKNOWN"
+
+DEFAULT_MAX_WORKERS: int = 16
+
+# (PaymentRequest address, PaymentRequest ID)
+PaymentRequestKey = tuple[str, int]
+
+
+class FailureClassifierException(Exception):
+    pass
+
+
+@dataclass
+class ClassifiedFailure:
+    tx_hash: str
+    payment_request: str
+    payment_request_id: int
+    # None if the revert data doesn't match any known error
+    failed_at: Optional[str]
+    error: Optional[DecodedError]
+
+
+@dataclass
+class PaymentRequestFunnel:
+    payment_request: str
+    payment_request_id: int
+    is_payment_precondition_set: bool
+    is_post_payment_action_set: bool
+    failures: Counter = field(default_factory=Counter)
+
+    @property
+    def stages(self) -> list[str]:
+        """
+        Stages a payment of this PaymentRequest goes through, in order. PP also applies to restricted PaymentRequests,
+        it's included if any payment failed at it.
+        """
+        return [
+            stage
+            for stage in PAY_STAGES
+            if (stage != PaymentFailedAt.PP or self.is_payment_precondition_set or self.failures[stage])
+            and (stage != PaymentFailedAt.PPA or self.is_post_payment_action_set or self.failures[stage])
+        ]
+
+    @property
+    def histogram(self) -> list[tuple[str, int]]:
+        """
+        (stage, number of failed payments that stopped at it), in the order of the stages, followed by the unknown
+        failures, if any.
+        """
+        histogram: list[tuple[str, int]] = [(stage, self.failures[stage]) for stage in self.stages]
+        if self.failures[UNKNOWN_STAGE]:
+            histogram.append((UNKNOWN_STAGE, self.failures[UNKNOWN_STAGE]))
+        return histogram
+
+    @property
+    def num_failures(self) -> int:
+        return sum(self.failures.values())
+
+
+@dataclass
+class FailureReport:
+    failures: list[ClassifiedFailure]
+    funnels: dict[PaymentRequestKey, PaymentRequestFunnel]
+
+
+def get_paid_payment_request_id(calldata: bytes) -> int:
+    """
+    ID of the PaymentRequest paid by the calldata of a pay() or payPacked() transaction.
+    """
+    selector: bytes = calldata[:4]
+    if selector == PAY_SELECTOR:
+        payment_request_id, _ = decode_abi(["uint256", "address"], calldata[4:])
+        return payment_request_id
+    if selector == PAY_PACKED_SELECTOR:
+        (packed_payment,) = decode_abi(["uint256"], calldata[4:])
+        payment_request_id, _, _ = unpack_payment(packed_payment)
+        return payment_request_id
+    raise FailureClassifierException(f"Not a pay() or payPacked() call: {HexBytes(selector).hex()}")
+
+
+class FailureClassifier:
+    def __init__(self, *, w3: Optional[Web3] = None, max_workers: int = DEFAULT_MAX_WORKERS):
+        self._w3: Web3 = w3 if w3 is not None else web3
+        self._max_workers: int = max_workers
+        # PaymentRequest -> (is_payment_precondition_set, is_post_payment_action_set), read once per PaymentRequest
+        self._configurations: dict[PaymentRequestKey, tuple[bool, bool]] = {}
+
+    def _classify_transaction(self, tx_hash: str) -> ClassifiedFailure:
+        transaction: dict = self._w3.eth.get_transaction(tx_hash)
+        error: Optional[DecodedError] = ERROR_REGISTRY.decode(get_revert_data_of_transaction(transaction, w3=self._w3))
+        return ClassifiedFailure(
+            tx_hash=tx_hash,
+            payment_request=to_checksum_address(transaction["to"]),
+            payment_request_id=get_paid_payment_request_id(bytes(HexBytes(transaction["input"]))),
+            failed_at=error.failed_at if error is not None else None,
+            error=error,
+        )
+
+    def _call(self, key: PaymentRequestKey, function: AbiFunction) -> bool:
+        address, payment_request_id = key
+        return function.decode(
+            bytes(self._w3.eth.call({"to": address, "data": function.encode((payment_request_id,))}))
+        )
+
+    def _get_configuration(self, key: PaymentRequestKey) -> tuple[bool, bool]:
+        if key not in self._configurations:
+            # the configuration of a closed PaymentRequest has been cleared, its getters revert
+            self._configurations[key] = (
+                (False, False)
+                if self._call(key, AsyncPaymentRequest.IS_CLOSED)
+                else (
+                    self._call(key, AsyncPaymentRequest.IS_PAYMENT_PRECONDITION_SET),
+                    self._call(key, AsyncPaymentRequest.IS_PAYMENT_POST_ACTION_SET),
+                )
+            )
+        return self._configurations[key]
+
+    def classify(self, tx_hashes: Iterable[str]) -> FailureReport:
+        """
+        Classifies reverted pay() and payPacked() transactions. The transactions are fetched and replayed
+        concurrently.
+        """
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            failures: list[ClassifiedFailure] = list(executor.map(self._classify_transaction, tx_hashes))
+
+        funnels: dict[PaymentRequestKey, PaymentRequestFunnel] = {}
+        failure: ClassifiedFailure
+        for failure in failures:
+            key: PaymentRequestKey = (failure.payment_request, failure.payment_request_id)
+            if key not in funnels:
+                is_payment_precondition_set, is_post_payment_action_set = self._get_configuration(key)
+                funnels[key] = PaymentRequestFunnel(
+                    payment_request=failure.payment_request,
+                    payment_request_id=failure.payment_request_id,
+                    is_payment_precondition_set=is_payment_precondition_set,
+                    is_post_payment_action_set=is_post_payment_action_set,
+                )
+            funnels[key].failures[failure.failed_at if failure.failed_at is not None else UNKNOWN_STAGE] += 1
+
+        return FailureReport(failures=failures, funnels=funnels)
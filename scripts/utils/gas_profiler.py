@@ -0,0 +1,312 @@
+"""
+Per-stage gas attribution of pay() transactions, built from the debug_traceTransaction struct logs of the local
+development node. The execution is split into call frames (precondition, token amount, each ERC-20 hop,
+Receipt.create(), post-payment action) and the gas of LOG opcodes is accounted separately as events. The lookup of
+static token amounts doesn't call into another contract, it's split out of the PaymentRequest frame by the internal
+function each opcode belongs to, as resolved by brownie from the source maps.
+
+The gas used by a transaction is its intrinsic gas plus the executed gas, minus the storage refunds. The refunds are
+reported as a row of their own, with negative gas.
+
+The result can be printed as a table, or exported as folded stacks, which is the input format of flamegraph.pl and
+speedscope.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+from brownie import web3
+from brownie.convert import to_address
+from brownie.network.contract import ProjectContract
+from brownie.network.transaction import TransactionReceipt
+from brownie.project import get_loaded_projects
+from hexbytes import HexBytes
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.contants import PaymentFailedAt
+
+CALL_OPS: tuple[str, ...] = ("CALL", "CALLCODE", "DELEGATECALL", "STATICCALL")
+# CALL and CALLCODE have an extra value argument before the call arguments
+CALL_OPS_WITH_VALUE: tuple[str, ...] = ("CALL", "CALLCODE")
+LOG_OPS: tuple[str, ...] = ("LOG0", "LOG1", "LOG2", "LOG3", "LOG4")
+
+ERC20_SELECTORS: dict[str, str] = {
+    "0x23b872dd": "transferFrom",
+    "0xa9059cbb": "transfer",
+}
+
+# internal functions of the PaymentRequest that obtain the token amount of a payment
+TOKEN_AMOUNT_FUNCTIONS: tuple[str, ...] = (
+    "PaymentRequest._getPaymentAmountForToken",
+    "PaymentRequest._isTokenAmountStatic",
+    "PaymentRequest._getStaticAmountForToken",
+)
+STATIC_TOKEN_AMOUNT_LABEL: str = "PaymentRequest._getPaymentAmountForToken"
+
+TX_BASE_GAS: int = 21_000
+TX_CREATE_GAS: int = 32_000
+TX_DATA_ZERO_GAS: int = 4
+TX_DATA_NON_ZERO_GAS: int = 16
+
+EVENTS_LABEL: str = "events"
+INTRINSIC_LABEL: str = "intrinsic"
+REFUND_LABEL: str = "refund"
+
+
+class GasStage:
+    PAYMENT_REQUEST: str = "PaymentRequest"
+    PRECONDITION: str = f"precondition ({PaymentFailedAt.PP})"
+    TOKEN_AMOUNT: str = f"token amount ({PaymentFailedAt.TA})"
+    ERC20: str = "ERC-20"
+    RECEIPT: str = f"Receipt.create ({PaymentFailedAt.PR})"
+    POST_PAYMENT_ACTION: str = f"post-payment action ({PaymentFailedAt.PPA})"
+    EVENTS: str = EVENTS_LABEL
+    INTRINSIC: str = INTRINSIC_LABEL
+    REFUND: str = REFUND_LABEL
+    OTHER: str = "other"
+
+
+@dataclass
+class GasFrame:
+    label: str
+    stage: str
+    # gas of the opcodes executed in this frame, including the cost of the call into it, excluding events
+    self_gas: int = 0
+    event_gas: int = 0
+    children: list[GasFrame] = field(default_factory=list)
+
+    @property
+    def inclusive_gas(self) -> int:
+        return self.self_gas + self.event_gas + sum(child.inclusive_gas for child in self.children)
+
+
+@dataclass
+class StageGas:
+    stage: str
+    label: str
+    gas: int
+
+
+@dataclass
+class DeployedContract:
+    name: str
+    selectors: dict[str, str]
+
+
+@dataclass
+class GasProfile:
+    txid: str
+    gas_used: int
+    root: GasFrame
+    # intrinsic gas of the transaction (base cost + calldata)
+    intrinsic_gas: int
+    # storage refunds, deducted from the gas used at the end of the transaction
+    refund_gas: int = 0
+
+    @property
+    def stages(self) -> list[StageGas]:
+        """
+        One row per direct callee of the PaymentRequest, in execution order, with their events included. Events and
+        the remaining logic of the PaymentRequest itself are reported separately.
+        """
+        rows: list[StageGas] = [
+            StageGas(stage=GasStage.INTRINSIC, label=INTRINSIC_LABEL, gas=self.intrinsic_gas),
+            StageGas(stage=GasStage.PAYMENT_REQUEST, label=self.root.label, gas=self.root.self_gas),
+        ]
+        rows.extend(
+            StageGas(stage=child.stage, label=child.label, gas=child.inclusive_gas) for child in self.root.children
+        )
+        rows.append(StageGas(stage=GasStage.EVENTS, label=f"{self.root.label} {EVENTS_LABEL}", gas=self.root.event_gas))
+        if self.refund_gas:
+            rows.append(StageGas(stage=GasStage.REFUND, label=REFUND_LABEL, gas=-self.refund_gas))
+        return rows
+
+    def format_table(self) -> str:
+        label_width: int = max(len(row.label) for row in self.stages) + 2
+        stage_width: int = max(len(row.stage) for row in self.stages) + 2
+        lines: list[str] = [f"{'stage':<{stage_width}}{'frame':<{label_width}}{'gas':>10}{'share':>9}"]
+        for row in self.stages:
+            lines.append(
+                f"{row.stage:<{stage_width}}{row.label:<{label_width}}{row.gas:>10}{row.gas / self.gas_used:>9.1%}"
+            )
+        lines.append(f"{'total':<{stage_width}}{'':<{label_width}}{self.gas_used:>10}")
+        return "\n".join(lines)
+
+    def to_folded_stacks(self) -> list[str]:
+        """The gas before refunds, as folded stacks can't have negative weights."""
+        stacks: list[str] = [f"{INTRINSIC_LABEL} {self.intrinsic_gas}"]
+        _fold(self.root, [], stacks)
+        return stacks
+
+
+def _fold(frame: GasFrame, path: list[str], stacks: list[str]) -> None:
+    frame_path: list[str] = path + [frame.label.replace(";", ",").replace(" ", "_")]
+    if frame.self_gas:
+        stacks.append(f"{';'.join(frame_path)} {frame.self_gas}")
+    if frame.event_gas:
+        stacks.append(f"{';'.join(frame_path + [EVENTS_LABEL])} {frame.event_gas}")
+    for child in frame.children:
+        _fold(child, frame_path, stacks)
+
+
+def get_struct_logs(tx: TransactionReceipt) -> list[dict]:
+    response: dict = web3.provider.make_request(
+        "debug_traceTransaction", [tx.txid, {"disableStorage": True, "enableMemory": True}]
+    )
+    if "error" in response:
+        raise ValueError(f"debug_traceTransaction failed for {tx.txid}: {response['error']}")
+    return response["result"]["structLogs"]
+
+
+def _read_selector(step: dict) -> Optional[str]:
+    stack: list[str] = step["stack"]
+    args_offset_position: int = -4 if step["op"] in CALL_OPS_WITH_VALUE else -3
+    args_offset: int = int(stack[args_offset_position], 16)
+    args_length: int = int(stack[args_offset_position - 1], 16)
+    if args_length < 4:
+        return None
+
+    memory: bytes = bytes.fromhex("".join(word.replace("0x", "").zfill(64) for word in step.get("memory", [])))
+    selector: bytes = memory[args_offset:args_offset + 4]
+    return "0x" + selector.hex() if len(selector) == 4 else None
+
+
+def get_deployed_contracts() -> dict[str, DeployedContract]:
+    """The contracts deployed, or loaded with at(), in the loaded brownie projects, by address."""
+    return {
+        contract.address: DeployedContract(name=name, selectors=container.selectors)
+        for project in get_loaded_projects()
+        for name, container in project.dict().items()
+        for contract in container
+    }
+
+
+def get_intrinsic_gas(tx: TransactionReceipt) -> int:
+    data: bytes = bytes(HexBytes(tx.input))
+    num_zero_bytes: int = data.count(0)
+    return (
+        TX_BASE_GAS
+        + (TX_CREATE_GAS if tx.receiver is None else 0)
+        + num_zero_bytes * TX_DATA_ZERO_GAS
+        + (len(data) - num_zero_bytes) * TX_DATA_NON_ZERO_GAS
+    )
+
+
+class _FrameLabeler:
+    def __init__(self, stage_by_address: dict[str, str], contracts_by_address: dict[str, DeployedContract]):
+        self._stage_by_address: dict[str, str] = stage_by_address
+        self._contracts_by_address: dict[str, DeployedContract] = contracts_by_address
+
+    def get_contract_name(self, address: str) -> str:
+        contract: Optional[DeployedContract] = self._contracts_by_address.get(address)
+        return contract.name if contract is not None else address
+
+    def label(self, address: str, selector: Optional[str]) -> tuple[str, str]:
+        contract: Optional[DeployedContract] = self._contracts_by_address.get(address)
+        contract_name: str = self.get_contract_name(address)
+        function_name: Optional[str] = None
+        if selector is not None:
+            function_name = (contract.selectors.get(selector) if contract is not None else None) or ERC20_SELECTORS.get(
+                selector, selector
+            )
+
+        stage: str = self._stage_by_address.get(address, GasStage.OTHER)
+        if stage == GasStage.OTHER and selector in ERC20_SELECTORS:
+            stage = GasStage.ERC20
+        label: str = f"{contract_name}.{function_name}" if function_name else contract_name
+        return label, stage
+
+
+def _build_frames(
+    struct_logs: list[dict], root: GasFrame, labeler: _FrameLabeler, functions: Optional[list[Optional[str]]] = None
+) -> None:
+    # each entry: (frame, gas available at the call opcode in the parent frame)
+    frames: list[tuple[GasFrame, int]] = [(root, struct_logs[0]["gas"])]
+    # the opcodes of the root frame that look up the token amount, created when the first one is executed, so that it
+    # keeps its place in the execution order
+    token_amount_frame: Optional[GasFrame] = None
+
+    index: int
+    step: dict
+    for index, step in enumerate(struct_logs):
+        next_step: Optional[dict] = struct_logs[index + 1] if index + 1 < len(struct_logs) else None
+        frame: GasFrame = frames[-1][0]
+        if frame is root and functions is not None and functions[index] in TOKEN_AMOUNT_FUNCTIONS:
+            if token_amount_frame is None:
+                token_amount_frame = GasFrame(label=STATIC_TOKEN_AMOUNT_LABEL, stage=GasStage.TOKEN_AMOUNT)
+                root.children.append(token_amount_frame)
+            frame = token_amount_frame
+
+        if next_step is not None and step["op"] in CALL_OPS and next_step["depth"] == step["depth"] + 1:
+            address: str = to_address("0x" + step["stack"][-2].replace("0x", "").zfill(40)[-40:])
+            label, stage = labeler.label(address, _read_selector(step))
+            child: GasFrame = GasFrame(label=label, stage=stage)
+            frame.children.append(child)
+            frames.append((child, step["gas"]))
+            continue
+
+        if next_step is not None and next_step["depth"] == step["depth"]:
+            cost: int = step["gas"] - next_step["gas"]
+        else:
+            cost = step["gasCost"]
+
+        if step["op"] in LOG_OPS:
+            frame.event_gas += cost
+        else:
+            frame.self_gas += cost
+
+        if next_step is not None and next_step["depth"] < step["depth"]:
+            # returning into the parent frame. Whatever was not consumed by the opcodes of the frame nor by its
+            # children is the cost of the call itself (address access, memory expansion, etc.)
+            _, gas_at_call = frames.pop()
+            consumed: int = gas_at_call - next_step["gas"]
+            frame.self_gas += consumed - frame.inclusive_gas
+
+
+def _get_functions(tx: TransactionReceipt, struct_logs: list[dict]) -> Optional[list[Optional[str]]]:
+    # brownie expands each step of the same trace with the internal function it belongs to
+    functions: list[Optional[str]] = [step.get("fn") for step in tx.trace]
+    return functions if len(functions) == len(struct_logs) else None
+
+
+def profile_transaction(
+    tx: TransactionReceipt,
+    *,
+    stage_by_address: Optional[dict[str, str]] = None,
+    contracts_by_address: Optional[dict[str, DeployedContract]] = None,
+) -> GasProfile:
+    struct_logs: list[dict] = get_struct_logs(tx)
+    labeler: _FrameLabeler = _FrameLabeler(
+        stage_by_address or {}, contracts_by_address if contracts_by_address is not None else get_deployed_contracts()
+    )
+    root: GasFrame = GasFrame(
+        label=f"{labeler.get_contract_name(tx.receiver)}.{tx.fn_name}", stage=GasStage.PAYMENT_REQUEST
+    )
+
+    if struct_logs:
+        _build_frames(struct_logs, root, labeler, _get_functions(tx, struct_logs))
+
+    intrinsic_gas: int = get_intrinsic_gas(tx)
+    return GasProfile(
+        txid=tx.txid,
+        gas_used=tx.gas_used,
+        root=root,
+        intrinsic_gas=intrinsic_gas,
+        refund_gas=intrinsic_gas + root.inclusive_gas - tx.gas_used,
+    )
+
+
+def get_stage_by_address(payment_request: ProjectContract, payment_request_id: int) -> dict[str, str]:
+    stage_by_address: dict[str, str] = {
+        payment_request.getPaymentPrecondition(payment_request_id): GasStage.PRECONDITION,
+        payment_request.getDynamicTokenAmount(payment_request_id): GasStage.TOKEN_AMOUNT,
+        payment_request.getPostPaymentAction(payment_request_id): GasStage.POST_PAYMENT_ACTION,
+        payment_request.receipt(): GasStage.RECEIPT,
+    }
+    stage_by_address.pop(ADDRESS_ZERO, None)
+    return {to_address(address): stage for address, stage in stage_by_address.items()}
+
+
+def profile_payment(tx: TransactionReceipt, *, payment_request: ProjectContract, payment_request_id: int) -> GasProfile:
+    return profile_transaction(tx, stage_by_address=get_stage_by_address(payment_request, payment_request_id))
@@ -0,0 +1,229 @@
+"""
+In-process EVM backend (eth-tester + py-evm) for brownie. Instead of sending every request over HTTP to an external
+development node, brownie's web3 instance is connected to an EVM running in the same Python process, which takes the
+serialization and round trips out of short transactions.
+
+ContractBuilder, PaymentRequestBuilder and the asserters work unchanged, as they only go through brownie:
+    - accounts: the same number of unlocked accounts, with the same balance, as the development network
+    - snapshots: chain.snapshot(), chain.revert(), chain.reset() and brownie's isolation fixtures
+    - return values and revert reasons: brownie reads them from debug_traceTransaction, which is emulated by replaying
+      the transaction as a call on the state of the previous block (every transaction is mined in its own block).
+      The emulated trace only contains the final RETURN or REVERT, as such tools that need the full trace (gas
+      profiler, coverage) require the external node.
+
+Account addresses differ from the ones of the development network (eth-tester has its own keys). The EVM version is the
+same one brownie launches ganache with (istanbul), so that transactions without a gas price are accepted.
+
+Enabled in tests with the EVM_BACKEND environment variable:
+
+    EVM_BACKEND=in-process brownie test tests/unit
+
+The tests marked requires_node (see conftest.py) are skipped then: the gas profiler ones, and the ones of the async
+client and of its users, which connect to web3.provider.endpoint_uri.
+
+Requires the dev packages of the Pipfile (web3[tester]). tests/unit/test_in_process_evm_backend.py runs against it.
+
+Only the test harness is wired to it. The `brownie run` benchmark scripts still connect to the development node: the
+gas profiler and the gas matrix need full traces, and the load generator and the async client send their requests
+over HTTP, to the endpoint of the node.
+"""
+import math
+import os
+from typing import Any, Optional
+
+import psutil
+from brownie._config import CONFIG
+from brownie.network import rpc, web3
+from brownie.network.state import Chain
+from hexbytes import HexBytes
+
+from scripts.utils.dev_node import DEVELOPMENT_NETWORK, get_development_network_settings
+
+try:
+    from eth.vm.forks import IstanbulVM
+    from eth_tester import EthereumTester, PyEVMBackend
+    from eth_tester.exceptions import TransactionFailed, TransactionNotFound
+    from web3.providers.eth_tester import EthereumTesterProvider
+except ImportError:
+    # dev packages not installed, InProcessEVM refuses to start
+    EthereumTester = None
+    EthereumTesterProvider = object
+
+EVM_BACKEND_ENV_VAR: str = "EVM_BACKEND"
+IN_PROCESS_EVM_BACKEND: str = "in-process"
+
+CLIENT_VERSION: str = "PayRequestDeFi/in-process-evm"
+WEI_PER_ETHER: int = 10 ** 18
+WORD_SIZE: int = 32
+
+# JSON-RPC error code of unknown transactions, anything but "method not found" tells brownie traces are supported
+TRANSACTION_NOT_FOUND_ERROR_CODE: int = -32000
+# selector of Error(string)
+ERROR_STRING_SELECTOR: bytes = bytes.fromhex("08c379a0")
+
+
+class InProcessEVMException(Exception):
+    pass
+
+
+def is_in_process_evm_enabled() -> bool:
+    return os.getenv(EVM_BACKEND_ENV_VAR) == IN_PROCESS_EVM_BACKEND
+
+
+def _parse_ether(value: Any) -> int:
+    # brownie's default_balance is either a number of ether, or a string such as "100 ether"
+    return int(float(str(value).split(" ")[0]) * WEI_PER_ETHER)
+
+
+def _to_memory(data: bytes) -> list[str]:
+    padded: bytes = data.ljust(math.ceil(len(data) / WORD_SIZE) * WORD_SIZE, b"\x00")
+    return [padded[offset:offset + WORD_SIZE].hex() for offset in range(0, len(padded), WORD_SIZE)]
+
+
+def _to_final_step(op: str, data: bytes) -> dict[str, Any]:
+    """
+    The RETURN or REVERT step of a trace, with the returned data at the start of the memory. brownie reads the offset
+    from the top of the stack, and the length right below it.
+    """
+    return {
+        "pc": 0,
+        "op": op,
+        "gas": 0,
+        "gasCost": 0,
+        "depth": 1,
+        "stack": [f"{len(data):064x}", f"{0:064x}"],
+        "memory": _to_memory(data),
+    }
+
+
+def _get_revert_data(e: Exception) -> bytes:
+    reason: Any = e.args[0] if e.args else b""
+    if isinstance(reason, bytes):
+        return reason
+    # eth-tester decodes Error(string) reverts, encode them back
+    encoded_reason: bytes = str(reason).encode()
+    return (
+        ERROR_STRING_SELECTOR
+        + (WORD_SIZE).to_bytes(WORD_SIZE, "big")
+        + len(encoded_reason).to_bytes(WORD_SIZE, "big")
+        + encoded_reason.ljust(math.ceil(len(encoded_reason) / WORD_SIZE) * WORD_SIZE, b"\x00")
+    )
+
+
+class InProcessEVMProvider(EthereumTesterProvider):
+    def __init__(self, ethereum_tester: "EthereumTester"):
+        super().__init__(ethereum_tester)
+        self._ethereum_tester: "EthereumTester" = ethereum_tester
+
+    def make_request(self, method: str, params: Any) -> dict[str, Any]:
+        if method == "debug_traceTransaction":
+            return {"jsonrpc": "2.0", "id": 0, **self._trace_transaction(params[0])}
+        if method == "web3_clientVersion":
+            return {"jsonrpc": "2.0", "id": 0, "result": CLIENT_VERSION}
+        return super().make_request(method, params)
+
+    def _trace_transaction(self, txid: str) -> dict[str, Any]:
+        try:
+            tx: dict[str, Any] = self._ethereum_tester.get_transaction_by_hash(txid)
+            receipt: dict[str, Any] = self._ethereum_tester.get_transaction_receipt(txid)
+        except TransactionNotFound:
+            return {"error": {"code": TRANSACTION_NOT_FOUND_ERROR_CODE, "message": f"Unknown transaction {txid}."}}
+
+        op: str = "RETURN"
+        output: bytes = b""
+        if tx["to"]:
+            # same message, same state: the transaction is the only one of its block
+            call: dict[str, Any] = {key: tx[key] for key in ("from", "to", "data", "value", "gas")}
+            try:
+                output = bytes(HexBytes(self._ethereum_tester.call(call, receipt["block_number"] - 1)))
+            except TransactionFailed as e:
+                op, output = "REVERT", _get_revert_data(e)
+        elif not receipt["status"]:
+            op = "REVERT"
+
+        return {
+            "result": {
+                "gas": receipt["gas_used"],
+                "failed": op == "REVERT",
+                "returnValue": output.hex(),
+                "structLogs": [_to_final_step(op, output)],
+            }
+        }
+
+
+class InProcessEVM:
+    """
+    Stands in for the brownie RPC backend module (ganache, hardhat, ...) of the connected development network.
+    """
+
+    def __init__(self, network: str = DEVELOPMENT_NETWORK):
+        if EthereumTester is None:
+            raise InProcessEVMException("The in-process EVM requires eth-tester and py-evm: pipenv install --dev")
+
+        cmd_settings: dict[str, Any] = get_development_network_settings(network)["cmd_settings"]
+        genesis_parameters: dict[str, Any] = PyEVMBackend._generate_genesis_params(
+            overrides={"gas_limit": int(cmd_settings.get("gas_limit", 12_000_000))}
+        )
+        # the genesis block of pre-London forks has no base fee
+        genesis_parameters.pop("base_fee_per_gas", None)
+        genesis_state: dict[str, Any] = PyEVMBackend._generate_genesis_state(
+            overrides={"balance": _parse_ether(cmd_settings.get("default_balance", 100))},
+            num_accounts=int(cmd_settings.get("accounts", 10)),
+        )
+
+        self._network: str = network
+        self._ethereum_tester: EthereumTester = EthereumTester(
+            PyEVMBackend(
+                genesis_parameters=genesis_parameters,
+                genesis_state=genesis_state,
+                vm_configuration=((0, IstanbulVM),),
+            )
+        )
+        self._provider: InProcessEVMProvider = InProcessEVMProvider(self._ethereum_tester)
+
+    @property
+    def provider(self) -> InProcessEVMProvider:
+        return self._provider
+
+    def connect(self) -> None:
+        """
+        Connects brownie to the EVM, as if it had launched a development node.
+        """
+        CONFIG.set_active_network(self._network)
+        web3.provider = self._provider
+        web3.reset_middlewares()
+        # brownie considers the RPC backend active while its process is running, and only kills it if it's a child
+        rpc.process = psutil.Process()
+        rpc.backend = self
+        self.on_connection()
+        Chain()._network_connected()
+
+    def disconnect(self) -> None:
+        CONFIG.clear_active()
+        web3.disconnect()
+        rpc.process = None
+        Chain()._network_disconnected()
+
+    # == brownie RPC backend interface ==
+
+    def on_connection(self) -> None:
+        pass
+
+    def snapshot(self) -> int:
+        return self._ethereum_tester.take_snapshot()
+
+    def revert(self, snapshot_id: int) -> None:
+        self._ethereum_tester.revert_to_snapshot(snapshot_id)
+
+    def sleep(self, seconds: int) -> int:
+        latest_timestamp: int = self._ethereum_tester.get_block_by_number("latest")["timestamp"]
+        self._ethereum_tester.time_travel(latest_timestamp + seconds)
+        return seconds
+
+    def mine(self, timestamp: Optional[int] = None) -> None:
+        if timestamp is not None:
+            self._ethereum_tester.time_travel(timestamp)
+        self._ethereum_tester.mine_blocks(1)
+
+    def unlock_account(self, address: str) -> None:
+        raise InProcessEVMException(f"Cannot unlock {address}, only the accounts of the in-process EVM are unlocked.")
@@ -0,0 +1,460 @@
+"""
+Incremental indexer of the events of a PaymentRequest and of its Receipt into SQLite, so that dashboards query a local
+database instead of the node:
+
+    indexer: EventIndexer = EventIndexer(
+        db_path=Path("events.sqlite"), payment_request=payment_request.address, receipt=payment_request.receipt()
+    )
+    indexer.backfill(to_block=chain.height, processes=8)  # history, in parallel
+    indexer.sync()  # from the cursor to the latest block, run periodically
+
+Logs are pulled with eth_getLogs in block ranges that adapt to the node: a range that the node rejects (too many
+results, timeout) is split in two, and ranges that come back sparse are grown. Every row is keyed by its block number
+and log index, as such indexing a range twice doesn't duplicate anything.
+
+uint256 values that don't fit into an SQLite INTEGER (64 bits) are stored as their decimal representation (TEXT).
+"""
+import math
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import requests
+from brownie import web3
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.registry import registry
+from eth_utils import encode_hex, to_checksum_address
+from hexbytes import HexBytes
+from web3 import HTTPProvider, Web3
+
+from scripts.utils.tracing import TRACER
+
+# (table, values of the columns of the table, in order)
+Row = tuple[str, tuple]
+
+CURSOR_TABLE: str = "cursor"
+SQLITE_MAX_INTEGER: int = 2 ** 63 - 1
+
+DEFAULT_INITIAL_RANGE_SIZE: int = 1_000
+DEFAULT_MAX_RANGE_SIZE: int = 100_000
+# ranges returning less logs than this are grown
+DEFAULT_SPARSE_RANGE_LOGS: int = 1_000
+RANGE_GROWTH_FACTOR: int = 2
+# number of ranges every backfill process gets, so that a dense range doesn't hold back the others
+BACKFILL_RANGES_PER_PROCESS: int = 4
+
+
+class IndexerException(Exception):
+    pass
+
+
+class LogRangeRejectedException(IndexerException):
+    pass
+
+
+@dataclass(frozen=True)
+class EventInput:
+    name: str
+    type: str
+    indexed: bool = False
+    # column of the table of the event, the name of the input if not set
+    column: Optional[str] = None
+
+    @property
+    def column_name(self) -> str:
+        return self.column if self.column is not None else self.name
+
+
+@dataclass(frozen=True)
+class EventDefinition:
+    name: str
+    table: str
+    inputs: tuple[EventInput, ...]
+    # column -> value, for events sharing a table (e.g. enabled and disabled)
+    constants: tuple[tuple[str, Any], ...] = ()
+    # name of the contract emitting the event, events with the same signature are told apart by their address
+    emitter: str = "payment_request"
+
+    @property
+    def signature(self) -> str:
+        return f"{self.name}({','.join(event_input.type for event_input in self.inputs)})"
+
+    @property
+    def topic(self) -> bytes:
+        return bytes(Web3.keccak(text=self.signature))
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return tuple(event_input.column_name for event_input in self.inputs) + tuple(
+            column for column, _ in self.constants
+        )
+
+    @cached_property
+    def _data_decoder(self) -> TupleDecoder:
+        return TupleDecoder(
+            decoders=[registry.get_decoder(event_input.type) for event_input in self.inputs if not event_input.indexed]
+        )
+
+    @cached_property
+    def _topic_decoders(self) -> list[Callable]:
+        # static types are encoded into a single word, the same way as in the data of the log
+        return [registry.get_decoder(event_input.type) for event_input in self.inputs if event_input.indexed]
+
+    def decode(self, topics: list[bytes], data: bytes) -> tuple:
+        """
+        Decodes the values of the inputs of the event, in the order of its inputs, followed by the constants.
+        """
+        indexed_values: Iterator = iter(
+            decoder(ContextFramesBytesIO(bytes(topic))) for decoder, topic in zip(self._topic_decoders, topics[1:])
+        )
+        data_values: Iterator = iter(self._data_decoder(ContextFramesBytesIO(bytes(data))))
+        values: list = [
+            next(indexed_values) if event_input.indexed else next(data_values) for event_input in self.inputs
+        ]
+        values = [
+            to_checksum_address(value) if event_input.type == "address" else value
+            for event_input, value in zip(self.inputs, values)
+        ]
+        return tuple(values) + tuple(value for _, value in self.constants)
+
+
+EVENT_DEFINITIONS: list[EventDefinition] = [
+    EventDefinition(
+        name="PaymentRequestPaid",
+        table="payments",
+        inputs=(
+            EventInput("paymentRequestId", "uint256", indexed=True, column="payment_request_id"),
+            EventInput("receiptId", "uint256", column="receipt_id"),
+            EventInput("token", "address"),
+            EventInput("amuont", "uint256", column="amount"),
+            EventInput("payer", "address", indexed=True),
+            EventInput("payee", "address", indexed=True),
+        ),
+    ),
+    EventDefinition(
+        name="TokenAmountObtained",
+        table="token_amounts",
+        inputs=(
+            EventInput("PaymentRequestId", "uint256", indexed=True, column="payment_request_id"),
+            EventInput("token", "address", indexed=True),
+            EventInput("amount", "uint256"),
+            EventInput("payer", "address", indexed=True),
+            EventInput("isStatic", "bool", column="is_static"),
+        ),
+    ),
+    EventDefinition(
+        name="PaymentPreconditionPassed",
+        table="payment_preconditions_passed",
+        inputs=(
+            EventInput("paymentRequestId", "uint256", indexed=True, column="payment_request_id"),
+            EventInput("token", "address", indexed=True),
+            EventInput("payer", "address", indexed=True),
+        ),
+    ),
+    EventDefinition(
+        name="PostPaymentActionExecuted",
+        table="post_payment_actions_executed",
+        inputs=(
+            EventInput("paymentRequestId", "uint256", indexed=True, column="payment_request_id"),
+            EventInput("action", "address"),
+            EventInput("receiptId", "uint256", column="receipt_id"),
+        ),
+    ),
+    EventDefinition(
+        name="PaymentRequestEnabled",
+        table="payment_request_status_changes",
+        inputs=(EventInput("paymentRequestId", "uint256", indexed=True, column="payment_request_id"),),
+        constants=(("is_enabled", True),),
+    ),
+    EventDefinition(
+        name="PaymentRequestDisabled",
+        table="payment_request_status_changes",
+        inputs=(EventInput("paymentRequestId", "uint256", indexed=True, column="payment_request_id"),),
+        constants=(("is_enabled", False),),
+    ),
+    EventDefinition(
+        name="Transfer",
+        table="receipt_transfers",
+        inputs=(
+            EventInput("from", "address", indexed=True, column="sender"),
+            EventInput("to", "address", indexed=True, column="recipient"),
+            EventInput("tokenId", "uint256", indexed=True, column="receipt_id"),
+        ),
+        emitter="receipt",
+    ),
+]
+
+# columns of every table, before the ones of the event
+LOG_COLUMNS: tuple[str, ...] = ("block_number", "log_index", "tx_hash", "address")
+
+# name -> indexed columns, every index covers the columns dashboards read along with the filtered one
+COVERING_INDEXES: dict[str, tuple[str, str]] = {
+    "payments_by_payer": ("payments", "payer, block_number, payment_request_id, token, amount, receipt_id"),
+    "payments_by_payee": ("payments", "payee, block_number, payment_request_id, token, amount, payer"),
+    "payments_by_token": ("payments", "token, block_number, payment_request_id, amount, payer, payee"),
+    "payments_by_payment_request": ("payments", "payment_request_id, block_number, token, amount, payer, receipt_id"),
+    "token_amounts_by_payment_request": ("token_amounts", "payment_request_id, token, amount, payer"),
+    "payment_preconditions_passed_by_payment_request": (
+        "payment_preconditions_passed", "payment_request_id, payer, token"
+    ),
+    "post_payment_actions_executed_by_payment_request": (
+        "post_payment_actions_executed", "payment_request_id, receipt_id, action"
+    ),
+    "payment_request_status_changes_by_payment_request": (
+        "payment_request_status_changes", "payment_request_id, block_number, log_index, is_enabled"
+    ),
+    "receipt_transfers_by_receipt": ("receipt_transfers", "receipt_id, block_number, log_index, recipient"),
+    "receipt_transfers_by_recipient": ("receipt_transfers", "recipient, receipt_id"),
+}
+
+
+def get_event_definition(name: str) -> EventDefinition:
+    return next(definition for definition in EVENT_DEFINITIONS if definition.name == name)
+
+
+def _to_sqlite_value(value: Any) -> Any:
+    if isinstance(value, int) and not isinstance(value, bool) and value > SQLITE_MAX_INTEGER:
+        return str(value)
+    return value
+
+
+def get_schema() -> list[str]:
+    statements: list[str] = [
+        f"CREATE TABLE IF NOT EXISTS {CURSOR_TABLE} (id INTEGER PRIMARY KEY CHECK (id = 0), block_number INTEGER)"
+    ]
+    tables: dict[str, tuple[str, ...]] = {definition.table: definition.columns for definition in EVENT_DEFINITIONS}
+    table: str
+    columns: tuple[str, ...]
+    for table, columns in tables.items():
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(LOG_COLUMNS + columns)}, "
+            f"PRIMARY KEY (block_number, log_index))"
+        )
+    index: str
+    for index, (table, indexed_columns) in COVERING_INDEXES.items():
+        statements.append(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({indexed_columns})")
+    return statements
+
+
+class LogDecoder:
+    def __init__(self, *, payment_request: str, receipt: str):
+        self._emitters: dict[str, str] = {
+            "payment_request": to_checksum_address(payment_request),
+            "receipt": to_checksum_address(receipt),
+        }
+        # (topic, emitter address) -> definition
+        self._definitions: dict[tuple[bytes, str], EventDefinition] = {
+            (definition.topic, self._emitters[definition.emitter]): definition for definition in EVENT_DEFINITIONS
+        }
+
+    @property
+    def addresses(self) -> list[str]:
+        return list(self._emitters.values())
+
+    @property
+    def topics(self) -> list[str]:
+        return list(dict.fromkeys(encode_hex(definition.topic) for definition in EVENT_DEFINITIONS))
+
+    def decode(self, log: dict[str, Any]) -> Optional[Row]:
+        """
+        The row of a log, None if it's not an indexed event (e.g. a Transfer of a PaymentRequest).
+        """
+        topics: list[bytes] = [bytes(HexBytes(topic)) for topic in log["topics"]]
+        if not topics:
+            return None
+        definition: Optional[EventDefinition] = self._definitions.get(
+            (topics[0], to_checksum_address(log["address"]))
+        )
+        if definition is None:
+            return None
+
+        return definition.table, (
+            int(log["blockNumber"]),
+            int(log["logIndex"]),
+            encode_hex(HexBytes(log["transactionHash"])),
+            to_checksum_address(log["address"]),
+        ) + tuple(_to_sqlite_value(value) for value in definition.decode(topics, HexBytes(log["data"])))
+
+
+class AdaptiveRange:
+    """
+    Size of the next eth_getLogs block range: halved when a range is rejected, doubled when a range is sparse.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_size: int = DEFAULT_INITIAL_RANGE_SIZE,
+        max_size: int = DEFAULT_MAX_RANGE_SIZE,
+        sparse_logs: int = DEFAULT_SPARSE_RANGE_LOGS,
+    ):
+        self._size: int = initial_size
+        self._max_size: int = max_size
+        self._sparse_logs: int = sparse_logs
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def on_rejected(self) -> None:
+        if self._size == 1:
+            raise LogRangeRejectedException("The node rejected a range of a single block.")
+        self._size = max(1, self._size // 2)
+
+    def on_fetched(self, num_logs: int) -> None:
+        if num_logs < self._sparse_logs:
+            self._size = min(self._max_size, self._size * RANGE_GROWTH_FACTOR)
+
+
+def fetch_rows(
+    w3: Web3, log_decoder: LogDecoder, from_block: int, to_block: int, adaptive_range: AdaptiveRange
+) -> Iterator[tuple[int, list[Row]]]:
+    """
+    Yields (last block of the range, rows of the range) for consecutive ranges covering [from_block, to_block].
+    """
+    start: int = from_block
+    while start <= to_block:
+        end: int = min(to_block, start + adaptive_range.size - 1)
+        try:
+            with TRACER.span("eth_getLogs", category="indexer", from_block=start, to_block=end):
+                logs: list[dict[str, Any]] = w3.eth.get_logs(
+                    {
+                        "fromBlock": start,
+                        "toBlock": end,
+                        "address": log_decoder.addresses,
+                        "topics": [log_decoder.topics],
+                    }
+                )
+        except (ValueError, requests.exceptions.RequestException):
+            # too many results, or the node timed out
+            adaptive_range.on_rejected()
+            continue
+
+        adaptive_range.on_fetched(len(logs))
+        rows: list[Row] = [row for row in map(log_decoder.decode, logs) if row is not None]
+        yield end, rows
+        start = end + 1
+
+
+def _fetch_range_rows(args: tuple[str, str, str, int, int]) -> list[Row]:
+    # runs in the backfill processes, which connect to the node on their own
+    endpoint_uri, payment_request, receipt, from_block, to_block = args
+    w3: Web3 = Web3(HTTPProvider(endpoint_uri))
+    log_decoder: LogDecoder = LogDecoder(payment_request=payment_request, receipt=receipt)
+    return [
+        row
+        for _, rows in fetch_rows(w3, log_decoder, from_block, to_block, AdaptiveRange())
+        for row in rows
+    ]
+
+
+class EventIndexer:
+    def __init__(
+        self,
+        *,
+        db_path: Path,
+        payment_request: str,
+        receipt: str,
+        w3: Optional[Web3] = None,
+        start_block: int = 0,
+        confirmations: int = 0,
+    ):
+        self._w3: Web3 = w3 if w3 is not None else web3
+        self._payment_request: str = payment_request
+        self._receipt: str = receipt
+        self._log_decoder: LogDecoder = LogDecoder(payment_request=payment_request, receipt=receipt)
+        self._adaptive_range: AdaptiveRange = AdaptiveRange()
+        self._start_block: int = start_block
+        # blocks behind the latest one that sync() stops at, 0 to index up to the latest block
+        self._confirmations: int = confirmations
+
+        self._connection: sqlite3.Connection = sqlite3.connect(db_path)
+        with self._connection:
+            statement: str
+            for statement in get_schema():
+                self._connection.execute(statement)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        return self._connection
+
+    @property
+    def cursor(self) -> Optional[int]:
+        """
+        Last indexed block, None if nothing was indexed yet.
+        """
+        row: Optional[tuple] = self._connection.execute(f"SELECT block_number FROM {CURSOR_TABLE}").fetchone()
+        return row[0] if row is not None else None
+
+    def _store(self, rows: list[Row], cursor: int) -> None:
+        rows_by_table: dict[str, list[tuple]] = {}
+        table: str
+        values: tuple
+        for table, values in rows:
+            rows_by_table.setdefault(table, []).append(values)
+
+        with self._connection:
+            for table, table_rows in rows_by_table.items():
+                placeholders: str = ", ".join("?" * len(table_rows[0]))
+                self._connection.executemany(f"INSERT OR IGNORE INTO {table} VALUES ({placeholders})", table_rows)
+            self._connection.execute(f"INSERT OR REPLACE INTO {CURSOR_TABLE} VALUES (0, ?)", (cursor,))
+
+    def _get_next_block(self) -> int:
+        cursor: Optional[int] = self.cursor
+        return cursor + 1 if cursor is not None else self._start_block
+
+    def sync(self, to_block: Optional[int] = None) -> int:
+        """
+        Indexes the blocks after the cursor, up to to_block (by default, the latest one minus the confirmations).
+        Returns the number of indexed events.
+        """
+        if to_block is None:
+            to_block = self._w3.eth.block_number - self._confirmations
+
+        num_events: int = 0
+        end: int
+        rows: list[Row]
+        for end, rows in fetch_rows(
+            self._w3, self._log_decoder, self._get_next_block(), to_block, self._adaptive_range
+        ):
+            self._store(rows, end)
+            num_events += len(rows)
+        return num_events
+
+    def backfill(self, to_block: int, *, processes: int, endpoint_uri: Optional[str] = None) -> int:
+        """
+        Indexes the blocks after the cursor up to to_block, with the logs fetched and decoded by a pool of processes.
+        The rows are stored (and the cursor moved) in block order, as such an interrupted backfill resumes from the
+        last range that was stored. Returns the number of indexed events.
+        """
+        endpoint_uri = endpoint_uri if endpoint_uri is not None else self._w3.provider.endpoint_uri
+        from_block: int = self._get_next_block()
+        if from_block > to_block:
+            return 0
+
+        num_ranges: int = processes * BACKFILL_RANGES_PER_PROCESS
+        range_size: int = math.ceil((to_block - from_block + 1) / num_ranges)
+        ranges: list[tuple[int, int]] = [
+            (start, min(to_block, start + range_size - 1)) for start in range(from_block, to_block + 1, range_size)
+        ]
+
+        num_events: int = 0
+        with TRACER.span("EventIndexer.backfill", category="indexer", ranges=len(ranges)):
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                rows: list[Row]
+                for (_, end), rows in zip(
+                    ranges,
+                    executor.map(
+                        _fetch_range_rows,
+                        [(endpoint_uri, self._payment_request, self._receipt, start, end) for start, end in ranges],
+                    ),
+                ):
+                    self._store(rows, end)
+                    num_events += len(rows)
+        return num_events
+
+    def close(self) -> None:
+        self._connection.close()
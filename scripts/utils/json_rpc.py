@@ -0,0 +1,171 @@
+"""
+asyncio JSON-RPC client that batches concurrent requests. Requests made within batch_window seconds of each other are
+sent in a single JSON-RPC batch (an array of requests in one HTTP POST), over a pooled keep-alive HTTP session:
+
+    async with JsonRpcBatchClient("http://127.0.0.1:8545") as client:
+        block_number, balance = await asyncio.gather(
+            client.request("eth_blockNumber", []), client.request("eth_getBalance", [address, "latest"])
+        )
+
+A batch is sent as soon as it reaches max_batch_size requests, without waiting for the rest of the window.
+"""
+import asyncio
+from typing import Any, Optional
+
+import aiohttp
+
+DEFAULT_BATCH_WINDOW: float = 0.002
+DEFAULT_MAX_BATCH_SIZE: int = 100
+DEFAULT_CONNECTION_LIMIT: int = 32
+# seconds
+DEFAULT_KEEPALIVE_TIMEOUT: float = 60
+DEFAULT_REQUEST_TIMEOUT: float = 30
+# error code of geth for a call that reverted with revert data
+EXECUTION_REVERTED_CODE: int = 3
+
+
+class JsonRpcException(Exception):
+    def __init__(self, code: Optional[int], message: str, data: Any = None):
+        super().__init__(f"JSON-RPC error {code}: {message}")
+        self.code: Optional[int] = code
+        self.message: str = message
+        self.data: Any = data
+
+    @property
+    def error(self) -> dict[str, Any]:
+        """
+        The error object of the JSON-RPC response.
+        """
+        return {"code": self.code, "message": self.message, "data": self.data}
+
+    @property
+    def is_execution_reverted(self) -> bool:
+        """
+        Whether the call reverted, as opposed to an error of the node (e.g. it's overloaded or out of sync). Nodes
+        report a revert with "revert" in the message, e.g. "execution reverted" (geth) or "VM Exception while
+        processing transaction: revert" (ganache).
+        """
+        return self.code == EXECUTION_REVERTED_CODE or "revert" in self.message.lower()
+
+
+# (method, params, future of the result)
+PendingRequest = tuple[str, list, asyncio.Future]
+
+
+class JsonRpcBatchClient:
+    def __init__(
+        self,
+        endpoint_uri: str,
+        *,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        connection_limit: int = DEFAULT_CONNECTION_LIMIT,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+    ):
+        self._endpoint_uri: str = endpoint_uri
+        self._batch_window: float = batch_window
+        self._max_batch_size: int = max_batch_size
+        self._connection_limit: int = connection_limit
+        self._keepalive_timeout: float = keepalive_timeout
+        self._request_timeout: float = request_timeout
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._pending: list[PendingRequest] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._sending: set[asyncio.Task] = set()
+        self._num_batches: int = 0
+
+    @property
+    def num_batches(self) -> int:
+        """
+        Number of HTTP requests sent so far.
+        """
+        return self._num_batches
+
+    async def __aenter__(self) -> "JsonRpcBatchClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._connection_limit, keepalive_timeout=self._keepalive_timeout),
+                timeout=aiohttp.ClientTimeout(total=self._request_timeout),
+            )
+
+    async def close(self) -> None:
+        self._flush()
+        if self._sending:
+            await asyncio.gather(*self._sending, return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def request(self, method: str, params: list) -> Any:
+        """
+        Result of a JSON-RPC request, raises JsonRpcException if the node responds with an error.
+        """
+        if self._session is None:
+            await self.open()
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((method, params, future))
+        if len(self._pending) >= self._max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._batch_window, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch: list[PendingRequest] = self._pending
+        self._pending = []
+        task: asyncio.Task = asyncio.get_running_loop().create_task(self._send(batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: list[PendingRequest]) -> None:
+        payload: list[dict[str, Any]] = [
+            {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+            for request_id, (method, params, _) in enumerate(batch)
+        ]
+        self._num_batches += 1
+        try:
+            async with self._session.post(self._endpoint_uri, json=payload) as response:
+                response.raise_for_status()
+                responses: Any = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if isinstance(responses, dict):
+            # the whole batch was rejected
+            responses = [{**responses, "id": request_id} for request_id in range(len(batch))]
+        responses_by_id: dict[int, dict[str, Any]] = {response["id"]: response for response in responses}
+
+        request_id: int
+        future: asyncio.Future
+        for request_id, (_, _, future) in enumerate(batch):
+            if future.done():
+                # cancelled by the caller
+                continue
+            response: Optional[dict[str, Any]] = responses_by_id.get(request_id)
+            if response is None:
+                future.set_exception(JsonRpcException(None, "No response to the request in the batch."))
+            elif "error" in response:
+                error: dict[str, Any] = response["error"]
+                future.set_exception(JsonRpcException(error.get("code"), error.get("message", ""), error.get("data")))
+            else:
+                future.set_result(response.get("result"))
@@ -0,0 +1,222 @@
+"""
+Deployer of sets of contracts and setup transactions (transfers, approvals, mints) described as a dependency graph.
+
+Every transaction is sent without waiting for its receipt, with a nonce assigned upfront, so that independent
+transactions are mined together. The deployer only waits for a transaction to be mined when another one depends on
+it, either because it interacts with the contract it deploys, or because it needs its result (e.g. the ID of a minted
+NFT). Constructors that only store the address of another contract don't need to wait for it: the addresses of
+contract deployments are computed from the nonce of the deployer, before they are sent.
+
+    deployer: ParallelDeployer = ParallelDeployer()
+    deployer.deploy("erc20", MyERC20, "Jasmine", "JSM", 9999999, account=account)
+    deployer.deploy("erc721", MyERC721, "JasmineBut721", "JSM721", account=account)
+    deployer.deploy("precondition", NFTOwnerPaymentPrecondition, Ref("erc20"), Ref("erc721"), account=account)
+    deployer.transact(
+        "mint", lambda tx_params: deployer["erc721"].create(account.address, tx_params), account=account, after=("erc721",)
+    )
+    deployer.run()
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+import rlp
+from brownie import web3
+from brownie.convert import to_address
+from brownie.network.account import Account
+from brownie.network.contract import ContractContainer, ProjectContract
+from brownie.network.transaction import Status, TransactionReceipt
+from eth_utils import keccak
+
+from scripts.utils.tracing import TRACER
+
+
+class DeploymentGraphException(Exception):
+    pass
+
+
+class DeploymentFailedException(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Ref:
+    """
+    Constructor argument that is resolved to the address of the contract deployed by another node of the graph.
+    """
+
+    name: str
+
+
+@dataclass
+class DeploymentNode:
+    name: str
+    account: Account
+    # nodes whose transactions must be mined before this one is sent
+    after: tuple[str, ...] = ()
+    # contract deployment
+    container: Optional[ContractContainer] = None
+    args: tuple = ()
+    # any other transaction, sent with the provided transaction parameters
+    send: Optional[Callable[[dict[str, Any]], TransactionReceipt]] = None
+    nonce: Optional[int] = None
+    # address of the deployed contract, known before the deployment is sent
+    address: Optional[str] = None
+    tx: Optional[TransactionReceipt] = None
+    result: Any = field(default=None, repr=False)
+
+    @property
+    def is_deployment(self) -> bool:
+        return self.container is not None
+
+
+def compute_create_address(sender: str, nonce: int) -> str:
+    return to_address(keccak(rlp.encode([bytes.fromhex(sender[2:]), nonce]))[12:])
+
+
+class ParallelDeployer:
+    def __init__(self):
+        self._nodes: dict[str, DeploymentNode] = {}
+        self._plan: Optional[list[DeploymentNode]] = None
+
+    def deploy(
+        self, name: str, container: ContractContainer, *args, account: Account, after: tuple[str, ...] = ()
+    ) -> None:
+        self._add(DeploymentNode(name=name, account=account, after=after, container=container, args=args))
+
+    def transact(
+        self,
+        name: str,
+        send: Callable[[dict[str, Any]], TransactionReceipt],
+        *,
+        account: Account,
+        after: tuple[str, ...] = (),
+    ) -> None:
+        """
+        Adds a transaction other than a deployment. send() is called with the transaction parameters (sender, nonce
+        and confirmations), which have to be passed to the contract call. The results of the nodes it depends on can
+        be accessed with deployer[name].
+        """
+        self._add(DeploymentNode(name=name, account=account, after=after, send=send))
+
+    def _add(self, node: DeploymentNode) -> None:
+        if self._plan is not None:
+            raise DeploymentGraphException(f"Cannot add {node.name}, the graph was already planned.")
+        if node.name in self._nodes:
+            raise DeploymentGraphException(f"{node.name} is already part of the graph.")
+        self._nodes[node.name] = node
+
+    def _get_refs(self, node: DeploymentNode) -> list[str]:
+        return [arg.name for arg in node.args if isinstance(arg, Ref)]
+
+    def _sort(self) -> list[DeploymentNode]:
+        """
+        Kahn's algorithm, nodes are sent in waves: first the ones without dependencies, then the ones that only
+        depend on the first wave, and so on. Within a wave, nodes keep the order in which they were added.
+        """
+        for node in self._nodes.values():
+            for name in node.after:
+                if name not in self._nodes:
+                    raise DeploymentGraphException(f"{node.name} depends on {name}, which is not part of the graph.")
+            for name in self._get_refs(node):
+                if name not in self._nodes or not self._nodes[name].is_deployment:
+                    raise DeploymentGraphException(f"{node.name} references {name}, which is not a deployment.")
+
+        remaining: dict[str, set[str]] = {name: set(node.after) for name, node in self._nodes.items()}
+        ordered: list[DeploymentNode] = []
+        while remaining:
+            wave: list[str] = [name for name, after in remaining.items() if not after]
+            if not wave:
+                raise DeploymentGraphException(f"Dependency cycle between {', '.join(remaining)}.")
+            for name in wave:
+                del remaining[name]
+                ordered.append(self._nodes[name])
+            for after in remaining.values():
+                after.difference_update(wave)
+        return ordered
+
+    def plan(self) -> list[DeploymentNode]:
+        """
+        Nodes in the order they are sent, with their nonces and the addresses of the deployments assigned.
+        """
+        if self._plan is not None:
+            return self._plan
+
+        ordered: list[DeploymentNode] = self._sort()
+        nonces: dict[str, int] = {}
+        for node in ordered:
+            address: str = node.account.address
+            if address not in nonces:
+                nonces[address] = web3.eth.get_transaction_count(address, "pending")
+            node.nonce = nonces[address]
+            nonces[address] += 1
+            if node.is_deployment:
+                node.address = compute_create_address(address, node.nonce)
+
+        self._plan = ordered
+        return self._plan
+
+    def address_of(self, name: str) -> str:
+        """
+        Address at which the node deploys its contract, available before the deployment is sent.
+        """
+        self.plan()
+        node: DeploymentNode = self._nodes[name]
+        if not node.is_deployment:
+            raise DeploymentGraphException(f"{name} is not a deployment.")
+        return node.address
+
+    def _send(self, node: DeploymentNode) -> None:
+        for name in node.after:
+            # only the real dependencies are waited for
+            self[name]
+
+        tx_params: dict[str, Any] = {"from": node.account, "nonce": node.nonce, "required_confs": 0}
+        if node.is_deployment:
+            args: list = [self._nodes[arg.name].address if isinstance(arg, Ref) else arg for arg in node.args]
+            sent: Any = node.container.deploy(*args, tx_params)
+            if isinstance(sent, ProjectContract):
+                # the deployment was confirmed before brownie returned
+                sent = sent.tx
+        else:
+            sent = node.send(tx_params)
+
+        if not isinstance(sent, TransactionReceipt):
+            raise DeploymentGraphException(f"{node.name} did not send a transaction, but returned {sent!r}.")
+        node.tx = sent
+
+    def _wait(self, node: DeploymentNode) -> Any:
+        if node.result is not None:
+            return node.result
+
+        if node.tx.status == Status.Pending:
+            node.tx.wait(1)
+        if node.tx.status != Status.Confirmed:
+            raise DeploymentFailedException(f"{node.name} failed in transaction {node.tx.txid}.")
+
+        if node.is_deployment:
+            if node.tx.contract_address != node.address:
+                raise DeploymentFailedException(
+                    f"{node.name} was deployed at {node.tx.contract_address} instead of {node.address}, was a "
+                    f"transaction from {node.account.address} sent outside of the deployer?"
+                )
+            node.result = node.container.at(node.address, node.account, node.tx)
+        else:
+            node.result = node.tx
+        return node.result
+
+    def __getitem__(self, name: str) -> Any:
+        """
+        Deployed contract or mined transaction of the node, waiting for it if it's still pending.
+        """
+        node: DeploymentNode = self._nodes[name]
+        if node.tx is None:
+            raise DeploymentGraphException(f"{name} was not sent yet.")
+        return self._wait(node)
+
+    def run(self) -> dict[str, Any]:
+        with TRACER.span("ParallelDeployer.run", category="deploy", nodes=len(self._nodes)):
+            plan: list[DeploymentNode] = self.plan()
+            for node in plan:
+                self._send(node)
+            return {node.name: self._wait(node) for node in plan}
+
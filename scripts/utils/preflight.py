@@ -0,0 +1,289 @@
+"""
+Preflight of pay(): predicts whether a payment succeeds, and otherwise the stage at which it fails (see
+PaymentFailedAt), without sending a transaction. The payment is simulated with eth_call, from the payer, on the
+latest state:
+
+    result: PreflightResult = preflight_payment(
+        payment_request=payment_request.address, payment_request_id=payment_request_id, token=token, payer=payer
+    )
+    if result.will_succeed:
+        payment_request.pay(payment_request_id, token, {"from": payer})
+
+The token amount, the balance and the allowance of the payer are read as well, so that a wallet can tell how much is
+missing. With assume_approved=True, the allowance of the payer is overridden for the simulation (eth_call state
+override, requires a node that supports it and a token with the storage layout of OpenZeppelin's ERC20), which
+allows to check the later stages (PR, PPA) before asking the payer to approve the tokens.
+
+preflight_payments() checks many pending payments at once. Every payment is simulated on its own, on the same state,
+the payments of a payer in the same token are then checked against its balance and allowance cumulatively, in order,
+and only the first payment to a restricted PaymentRequest succeeds, as it disables the PaymentRequest. Other than that
+the predictions are independent of each other: a stateful payment precondition (e.g. OnePurchasePerAddress) doesn't
+see the earlier payments of the batch.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Optional
+
+from brownie import web3
+from eth_abi import decode_abi, encode_abi
+from eth_utils import encode_hex, keccak, to_checksum_address
+from hexbytes import HexBytes
+from web3 import Web3
+
+from scripts.utils.contants import PaymentFailedAt
+from scripts.utils.errors import ERROR_REGISTRY, DecodedError, get_revert_data_from_call_response
+
+PAY_SIGNATURE: str = "pay(uint256,address)"
+GET_AMOUNT_FOR_TOKEN_SIGNATURE: str = "getAmountForToken(uint256,address)"
+BALANCE_OF_SIGNATURE: str = "balanceOf(address)"
+ALLOWANCE_SIGNATURE: str = "allowance(address,address)"
+IS_RESTRICTED_SIGNATURE: str = "isRestricted(uint256)"
+
+# storage slot of the _allowances mapping of OpenZeppelin's ERC20 (after _balances)
+ERC20_ALLOWANCES_SLOT: int = 1
+MAX_UINT256: int = 2 ** 256 - 1
+
+DEFAULT_MAX_WORKERS: int = 16
+
+
+@dataclass(frozen=True)
+class PendingPayment:
+    payment_request: str
+    payment_request_id: int
+    token: str
+    payer: str
+
+
+@dataclass(frozen=True)
+class PreflightResult:
+    payment: PendingPayment
+    will_succeed: bool
+    # stage at which the payment fails, None if it succeeds or if the revert data doesn't match any known error
+    failed_at: Optional[str] = None
+    error: Optional[DecodedError] = None
+    # None if the token is not accepted
+    token_amount: Optional[int] = None
+    balance: Optional[int] = None
+    allowance: Optional[int] = None
+    # preflight_payments(): index of the earlier payment of the batch because of which this one is predicted to fail,
+    # None if the prediction is the one of the payment on its own
+    failed_because_of: Optional[int] = None
+
+    @property
+    def missing_balance(self) -> int:
+        return max(0, (self.token_amount or 0) - (self.balance or 0))
+
+    @property
+    def missing_allowance(self) -> int:
+        return max(0, (self.token_amount or 0) - (self.allowance or 0))
+
+
+def _encode_call(signature: str, types: list[str], args: list[Any]) -> str:
+    return encode_hex(Web3.keccak(text=signature)[:4] + encode_abi(types, args))
+
+
+def get_erc20_allowance_slot(owner: str, spender: str) -> str:
+    """
+    Storage slot of _allowances[owner][spender] of OpenZeppelin's ERC20.
+    """
+    owner_slot: bytes = keccak(encode_abi(["address", "uint256"], [to_checksum_address(owner), ERC20_ALLOWANCES_SLOT]))
+    return encode_hex(keccak(encode_abi(["address", "bytes32"], [to_checksum_address(spender), owner_slot])))
+
+
+def _eth_call(
+    w3: Web3, call: dict[str, Any], block_identifier: str, state_override: Optional[dict] = None
+) -> tuple[bool, Optional[bytes]]:
+    """
+    (True, return data) of a successful call, (False, revert data if any) of a reverted one.
+    """
+    params: list = [call, block_identifier] + ([state_override] if state_override is not None else [])
+    response: dict = w3.provider.make_request("eth_call", params)
+    if "error" in response:
+        revert_data: Optional[HexBytes] = get_revert_data_from_call_response(response)
+        return False, bytes(revert_data) if revert_data is not None else None
+    return True, bytes(HexBytes(response["result"]))
+
+
+def _call_uint(w3: Web3, call: dict[str, Any], block_identifier: str) -> Optional[int]:
+    is_success, data = _eth_call(w3, call, block_identifier)
+    return decode_abi(["uint256"], data)[0] if is_success and data else None
+
+
+def _is_restricted(w3: Web3, payment: PendingPayment, block_identifier: str) -> bool:
+    is_success, data = _eth_call(
+        w3,
+        {
+            "to": payment.payment_request,
+            "data": _encode_call(IS_RESTRICTED_SIGNATURE, ["uint256"], [payment.payment_request_id]),
+        },
+        block_identifier,
+    )
+    return is_success and bool(data) and decode_abi(["bool"], data)[0]
+
+
+def _get_allowance_override(payment: PendingPayment) -> dict:
+    return {
+        payment.token: {
+            "stateDiff": {
+                get_erc20_allowance_slot(payment.payer, payment.payment_request): encode_hex(
+                    MAX_UINT256.to_bytes(32, "big")
+                )
+            }
+        }
+    }
+
+
+def preflight_payment(
+    *,
+    payment_request: str,
+    payment_request_id: int,
+    token: str,
+    payer: str,
+    assume_approved: bool = False,
+    block_identifier: str = "latest",
+    w3: Optional[Web3] = None,
+) -> PreflightResult:
+    w3 = w3 if w3 is not None else web3
+    payment: PendingPayment = PendingPayment(
+        payment_request=to_checksum_address(payment_request),
+        payment_request_id=payment_request_id,
+        token=to_checksum_address(token),
+        payer=to_checksum_address(payer),
+    )
+
+    # dynamic token amounts may depend on the payer, as such the amount is obtained from it
+    token_amount: Optional[int] = _call_uint(
+        w3,
+        {
+            "from": payment.payer,
+            "to": payment.payment_request,
+            "data": _encode_call(
+                GET_AMOUNT_FOR_TOKEN_SIGNATURE, ["uint256", "address"], [payment_request_id, payment.token]
+            ),
+        },
+        block_identifier,
+    )
+    balance: Optional[int] = _call_uint(
+        w3,
+        {"to": payment.token, "data": _encode_call(BALANCE_OF_SIGNATURE, ["address"], [payment.payer])},
+        block_identifier,
+    )
+    allowance: Optional[int] = _call_uint(
+        w3,
+        {
+            "to": payment.token,
+            "data": _encode_call(ALLOWANCE_SIGNATURE, ["address", "address"], [payment.payer, payment.payment_request]),
+        },
+        block_identifier,
+    )
+
+    is_success, revert_data = _eth_call(
+        w3,
+        {
+            "from": payment.payer,
+            "to": payment.payment_request,
+            "data": _encode_call(PAY_SIGNATURE, ["uint256", "address"], [payment_request_id, payment.token]),
+        },
+        block_identifier,
+        _get_allowance_override(payment) if assume_approved else None,
+    )
+    result: PreflightResult = PreflightResult(
+        payment=payment, will_succeed=is_success, token_amount=token_amount, balance=balance, allowance=allowance
+    )
+    if is_success:
+        return result
+
+    error: Optional[DecodedError] = ERROR_REGISTRY.decode(revert_data)
+    return replace(result, failed_at=error.failed_at if error is not None else None, error=error)
+
+
+def preflight_payments(
+    payments: list[PendingPayment],
+    *,
+    assume_approved: bool = False,
+    block_identifier: str = "latest",
+    w3: Optional[Web3] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> list[PreflightResult]:
+    """
+    Preflight of many pending payments, concurrently, on the same state. The results are in the order of the
+    payments. A payment that would succeed on its own fails at TOKEN_BALANCE_OR_APPROVAL if the payments of the same
+    payer in the same token that come before it already spend its balance (or allowance), and at NOT_ENABLED if it is
+    to a restricted PaymentRequest that an earlier payment already pays, as pay() disables it. The index of that
+    earlier payment is in failed_because_of. Otherwise the payments are predicted independently, as if each one was
+    the first of the batch to be mined.
+    """
+    w3 = w3 if w3 is not None else web3
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results: list[PreflightResult] = list(
+            executor.map(
+                lambda payment: preflight_payment(
+                    payment_request=payment.payment_request,
+                    payment_request_id=payment.payment_request_id,
+                    token=payment.token,
+                    payer=payment.payer,
+                    assume_approved=assume_approved,
+                    block_identifier=block_identifier,
+                    w3=w3,
+                ),
+                payments,
+            )
+        )
+
+    # (PaymentRequest contract, ID) -> index of the first successful payment to it
+    paid_by: dict[tuple[str, int], int] = {}
+    # (payer, token) -> amount spent by the previous successful payments, per PaymentRequest contract for allowances,
+    # along with the index of the last one of them
+    spent: dict[tuple[str, str], tuple[int, int]] = {}
+    approved_spent: dict[tuple[str, str, str], tuple[int, int]] = {}
+    index: int
+    result: PreflightResult
+    for index, result in enumerate(results):
+        if not result.will_succeed:
+            continue
+
+        payment: PendingPayment = result.payment
+        payment_request_key: tuple[str, int] = (payment.payment_request, payment.payment_request_id)
+        if payment_request_key in paid_by and _is_restricted(w3, payment, block_identifier):
+            results[index] = replace(
+                result,
+                will_succeed=False,
+                failed_at=PaymentFailedAt.NOT_ENABLED,
+                error=DecodedError(
+                    name="PaymentRequestNotEnabled",
+                    arguments={"paymentRequestId": payment.payment_request_id},
+                    failed_at=PaymentFailedAt.NOT_ENABLED,
+                ),
+                failed_because_of=paid_by[payment_request_key],
+            )
+            continue
+        if not result.token_amount:
+            paid_by.setdefault(payment_request_key, index)
+            continue
+
+        balance_key: tuple[str, str] = (payment.payer, payment.token)
+        allowance_key: tuple[str, str, str] = (payment.payer, payment.token, payment.payment_request)
+        spent_amount: int
+        last_spent_index: Optional[int]
+        spent_amount, last_spent_index = spent.get(balance_key, (0, None))
+        approved_amount: int
+        last_approved_index: Optional[int]
+        approved_amount, last_approved_index = approved_spent.get(allowance_key, (0, None))
+        if spent_amount + result.token_amount > (result.balance or 0):
+            failed_because_of: Optional[int] = last_spent_index
+        elif not assume_approved and approved_amount + result.token_amount > (result.allowance or 0):
+            failed_because_of = last_approved_index
+        else:
+            paid_by.setdefault(payment_request_key, index)
+            spent[balance_key] = (spent_amount + result.token_amount, index)
+            approved_spent[allowance_key] = (approved_amount + result.token_amount, index)
+            continue
+
+        results[index] = replace(
+            result,
+            will_succeed=False,
+            failed_at=PaymentFailedAt.TOKEN_BALANCE_OR_APPROVAL,
+            failed_because_of=failed_because_of,
+        )
+
+    return results
@@ -0,0 +1,261 @@
+"""
+Read-through cache of contract calls, used by AsyncPaymentRequestClient (see scripts/utils/async_client.py):
+
+    read_cache: ReadCache = ReadCache(db_path=Path("reads.sqlite"))
+    async with AsyncPaymentRequestClient(endpoint_uri, read_cache=read_cache) as client:
+        ...
+    read_cache.close()
+
+Calls are keyed by (chain ID, contract address, sender, calldata), the calldata being the selector followed by the
+encoded arguments. There are two caches:
+
+- Immutable reads, the calls of IMMUTABLE_READS, whose return value never changes once written (e.g. getReceiptData(),
+  set when the Receipt is minted). They're kept in an in-memory LRU and, if db_path is given, in an SQLite store that
+  outlives the process. A return value is only cached once it's written: the default value returned for an ID that
+  doesn't exist yet (e.g. the zero address) is not cached. PaymentRequest values are erased when it's closed, the
+  entries of a closed PaymentRequest are dropped with invalidate_payment_request(). AsyncPaymentRequestClient does so
+  for the PaymentRequestClosed events of the transactions it sends, a service that shares the cache with other
+  writers feeds the events it sees (e.g. from eth_getLogs) to invalidate_closed_payment_requests().
+- Mutable reads (e.g. a quote of getAmountForToken()), cached for a single block. The entries of older blocks are
+  dropped as soon as a newer block is read.
+
+Immutable reads assume that the ID they were written for is not reorged out afterwards, as such a service that reads
+unconfirmed PaymentRequests or Receipts should only use the cache for confirmed blocks.
+"""
+import sqlite3
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable, Generic, Iterable, Optional, TypeVar
+
+from eth_abi import encode_abi
+from eth_utils import keccak, to_bytes, to_checksum_address
+from hexbytes import HexBytes
+
+from scripts.utils.codec import PAYMENT_REQUEST_CLOSED_TOPIC
+
+DEFAULT_MAX_IMMUTABLE_ENTRIES: int = 100_000
+DEFAULT_MAX_BLOCK_ENTRIES: int = 10_000
+
+IMMUTABLE_READS_TABLE: str = "immutable_reads"
+
+WORD_SIZE: int = 32
+ZERO_WORD: bytes = bytes(WORD_SIZE)
+
+
+class ReadCacheException(Exception):
+    pass
+
+
+def _is_word_set(index: int) -> Callable[[bytes], bool]:
+    """
+    Whether the word at index of the return data is not zero.
+    """
+    return lambda data: data[index * WORD_SIZE : (index + 1) * WORD_SIZE] not in (ZERO_WORD, b"")
+
+
+@dataclass(frozen=True)
+class ImmutableRead:
+    signature: str
+    # whether the return data holds a written value, as opposed to the default of an ID that doesn't exist (yet)
+    is_written: Callable[[bytes], bool]
+    # whether the only argument is a PaymentRequest ID, whose value is erased when the PaymentRequest is closed
+    is_payment_request_scoped: bool = True
+
+    @cached_property
+    def selector(self) -> bytes:
+        return keccak(text=self.signature)[:4]
+
+
+IMMUTABLE_READS: list[ImmutableRead] = [
+    # ReceiptData is a static struct, encoded in place, its first member is the PaymentRequest address
+    ImmutableRead(signature="getReceiptData(uint256)", is_written=_is_word_set(0), is_payment_request_scoped=False),
+    # (offset, length, items...), a static PaymentRequest accepts at least one token
+    ImmutableRead(signature="getStaticTokenAmountInfos(uint256)", is_written=_is_word_set(1)),
+    # true for an ID that doesn't exist, as such only false (dynamic token amount) is cached
+    ImmutableRead(signature="isTokenAmountStatic(uint256)", is_written=lambda data: not _is_word_set(0)(data)),
+    ImmutableRead(signature="getPaymentPrecondition(uint256)", is_written=_is_word_set(0)),
+    ImmutableRead(signature="getDynamicTokenAmount(uint256)", is_written=_is_word_set(0)),
+    ImmutableRead(signature="getPostPaymentAction(uint256)", is_written=_is_word_set(0)),
+]
+
+
+@dataclass
+class ReadCacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total: int = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+Key = TypeVar("Key")
+Value = TypeVar("Value")
+
+
+class LruCache(Generic[Key, Value]):
+    def __init__(self, max_entries: int):
+        self._max_entries: int = max_entries
+        self._entries: OrderedDict[Key, Value] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Key) -> Optional[Value]:
+        value: Optional[Value] = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Key, value: Value) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Key) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def get_call_key(chain_id: int, address: str, calldata: bytes, sender: Optional[str] = None) -> bytes:
+    return (
+        chain_id.to_bytes(WORD_SIZE, "big")
+        + to_bytes(hexstr=to_checksum_address(address))
+        + (to_bytes(hexstr=to_checksum_address(sender)) if sender is not None else bytes(20))
+        + calldata
+    )
+
+
+class ReadCache:
+    def __init__(
+        self,
+        *,
+        db_path: Optional[Path] = None,
+        max_immutable_entries: int = DEFAULT_MAX_IMMUTABLE_ENTRIES,
+        max_block_entries: int = DEFAULT_MAX_BLOCK_ENTRIES,
+    ):
+        self._immutable_reads: dict[bytes, ImmutableRead] = {read.selector: read for read in IMMUTABLE_READS}
+        self._immutable: LruCache[bytes, bytes] = LruCache(max_immutable_entries)
+        self._block: LruCache[bytes, bytes] = LruCache(max_block_entries)
+        # block whose mutable reads are cached
+        self._block_number: Optional[int] = None
+        self.stats: ReadCacheStats = ReadCacheStats()
+
+        self._connection: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            self._connection = sqlite3.connect(db_path)
+            with self._connection:
+                self._connection.execute(
+                    f"CREATE TABLE IF NOT EXISTS {IMMUTABLE_READS_TABLE} (key BLOB PRIMARY KEY, value BLOB NOT NULL)"
+                )
+
+    def is_immutable(self, calldata: bytes) -> bool:
+        return calldata[:4] in self._immutable_reads
+
+    def _count(self, value: Optional[bytes]) -> Optional[bytes]:
+        if value is not None:
+            self.stats.hits += 1
+        else:
+            self.stats.misses += 1
+        return value
+
+    def get_immutable(self, chain_id: int, address: str, calldata: bytes) -> Optional[bytes]:
+        """
+        Cached return data of an immutable read, None if it's not cached.
+        """
+        key: bytes = get_call_key(chain_id, address, calldata)
+        value: Optional[bytes] = self._immutable.get(key)
+        if value is None and self._connection is not None:
+            row: Optional[tuple] = self._connection.execute(
+                f"SELECT value FROM {IMMUTABLE_READS_TABLE} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                value = bytes(row[0])
+                self._immutable.put(key, value)
+        return self._count(value)
+
+    def put_immutable(self, chain_id: int, address: str, calldata: bytes, data: bytes) -> bool:
+        """
+        Caches the return data of an immutable read, if it holds a written value. Returns whether it was cached.
+        """
+        read: Optional[ImmutableRead] = self._immutable_reads.get(calldata[:4])
+        if read is None:
+            raise ReadCacheException(f"Not an immutable read: {calldata[:4].hex()}")
+        if not read.is_written(data):
+            return False
+
+        key: bytes = get_call_key(chain_id, address, calldata)
+        self._immutable.put(key, data)
+        if self._connection is not None:
+            with self._connection:
+                self._connection.execute(
+                    f"INSERT OR REPLACE INTO {IMMUTABLE_READS_TABLE} VALUES (?, ?)", (key, data)
+                )
+        return True
+
+    def invalidate_payment_request(self, chain_id: int, address: str, payment_request_id: int) -> None:
+        """
+        Drops the immutable reads of a PaymentRequest, whose values are erased when it's closed.
+        """
+        keys: list[bytes] = [
+            get_call_key(chain_id, address, read.selector + encode_abi(["uint256"], [payment_request_id]))
+            for read in IMMUTABLE_READS
+            if read.is_payment_request_scoped
+        ]
+        key: bytes
+        for key in keys:
+            self._immutable.delete(key)
+        if self._connection is not None:
+            with self._connection:
+                self._connection.executemany(
+                    f"DELETE FROM {IMMUTABLE_READS_TABLE} WHERE key = ?", [(key,) for key in keys]
+                )
+
+    def invalidate_closed_payment_requests(self, chain_id: int, logs: Iterable[dict[str, Any]]) -> int:
+        """
+        Drops the immutable reads of the PaymentRequests closed by the PaymentRequestClosed events among logs (as
+        returned by the node, e.g. the logs of a transaction receipt). Returns the number of closed PaymentRequests.
+        """
+        num_closed: int = 0
+        log: dict[str, Any]
+        for log in logs:
+            if len(log["topics"]) != 2 or HexBytes(log["topics"][0]) != PAYMENT_REQUEST_CLOSED_TOPIC:
+                continue
+            payment_request_id: int = int.from_bytes(HexBytes(log["topics"][1]), "big")
+            self.invalidate_payment_request(chain_id, log["address"], payment_request_id)
+            num_closed += 1
+        return num_closed
+
+    def get_mutable(
+        self, chain_id: int, address: str, calldata: bytes, block_number: int, sender: Optional[str] = None
+    ) -> Optional[bytes]:
+        """
+        Cached return data of a read at block_number, None if it's not cached.
+        """
+        if block_number != self._block_number:
+            return self._count(None)
+        return self._count(self._block.get(get_call_key(chain_id, address, calldata, sender)))
+
+    def put_mutable(
+        self, chain_id: int, address: str, calldata: bytes, block_number: int, data: bytes, sender: Optional[str] = None
+    ) -> None:
+        """
+        Caches the return data of a read at block_number. The reads of older blocks are dropped, reads of blocks older
+        than the cached one are not cached.
+        """
+        if self._block_number is None or block_number > self._block_number:
+            self._block.clear()
+            self._block_number = block_number
+        if block_number == self._block_number:
+            self._block.put(get_call_key(chain_id, address, calldata, sender), data)
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,333 @@
+"""
+Receipt verification service, which answers "has <payer> paid PaymentRequest <ID>, and who holds its Receipts?" from
+an in-memory index, without querying the node (see scripts/verify_receipts.py):
+
+    GET /verify?payment_request_id=<ID>&payer=<address>
+
+    {"payment_request_id": 1, "payer": "0x...", "has_paid": true,
+     "receipts": [{"receipt_id": 0, "holder": "0x...", "token": "0x...", "token_amount": 10}]}
+
+The index is built at start-up, at the confirmed head, from the Receipt of the PaymentRequest: its Receipts are
+enumerated (ERC721Enumerable) along with their ReceiptData and holder, the ones of other PaymentRequest contracts (of
+a shared Receipt) are left out. All of it is read in JSON-RPC batches (see scripts/utils/async_client.py). The index
+is then kept up to date by the streamed Transfer events of the Receipt (see ReceiptTransferEventStream): a mint adds a
+Receipt, a transfer changes its holder, and a retraction undoes either.
+
+Queries first go through a Bloom filter of the (PaymentRequest ID, payer) pairs that paid, which answers most
+negatives on its own, then through an LRU of the answers to hot queries. An answer is dropped from the LRU when one of
+its Receipts changes hands, or when the payer pays again.
+"""
+import asyncio
+import hashlib
+import math
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from aiohttp import web
+from brownie import web3
+from eth_utils import to_bytes, to_checksum_address
+from web3 import Web3
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.async_client import AsyncPaymentRequestClient, AsyncReceipt, ReceiptData
+from scripts.utils.event_stream import (
+    DEFAULT_CONFIRMATIONS,
+    DEFAULT_POLL_INTERVAL,
+    ReceiptTransferEvent,
+    ReceiptTransferEventStream,
+)
+from scripts.utils.read_cache import LruCache
+
+DEFAULT_MAX_CACHED_RESULTS: int = 100_000
+DEFAULT_BLOOM_CAPACITY: int = 100_000
+DEFAULT_BLOOM_ERROR_RATE: float = 0.01
+
+# (PaymentRequest ID, payer)
+PaymentKey = tuple[int, str]
+
+
+class ReceiptVerificationException(Exception):
+    pass
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_BLOOM_ERROR_RATE):
+        self.capacity: int = capacity
+        self.error_rate: float = error_rate
+        self._num_bits: int = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._num_hashes: int = max(1, round(self._num_bits / capacity * math.log(2)))
+        self._bits: bytearray = bytearray((self._num_bits + 7) // 8)
+        self._num_items: int = 0
+
+    def __len__(self) -> int:
+        return self._num_items
+
+    def _get_positions(self, item: bytes) -> Iterator[int]:
+        # double hashing, the second hash is odd so that it never cycles early
+        digest: bytes = hashlib.blake2b(item, digest_size=16).digest()
+        first: int = int.from_bytes(digest[:8], "big")
+        second: int = int.from_bytes(digest[8:], "big") | 1
+        return ((first + i * second) % self._num_bits for i in range(self._num_hashes))
+
+    def add(self, item: bytes) -> None:
+        position: int
+        for position in self._get_positions(item):
+            self._bits[position // 8] |= 1 << (position % 8)
+        self._num_items += 1
+
+    def __contains__(self, item: bytes) -> bool:
+        return all(self._bits[position // 8] & (1 << (position % 8)) for position in self._get_positions(item))
+
+
+def _get_bloom_item(key: PaymentKey) -> bytes:
+    payment_request_id, payer = key
+    return payment_request_id.to_bytes(32, "big") + to_bytes(hexstr=payer)
+
+
+@dataclass(frozen=True)
+class VerifiedReceipt:
+    receipt_id: int
+    holder: str
+    token: str
+    token_amount: int
+
+
+@dataclass(frozen=True)
+class VerificationResult:
+    payment_request_id: int
+    payer: str
+    receipts: tuple[VerifiedReceipt, ...]
+
+    @property
+    def has_paid(self) -> bool:
+        return bool(self.receipts)
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "payment_request_id": self.payment_request_id,
+            "payer": self.payer,
+            "has_paid": self.has_paid,
+            "receipts": [
+                {
+                    "receipt_id": receipt.receipt_id,
+                    "holder": receipt.holder,
+                    "token": receipt.token,
+                    "token_amount": receipt.token_amount,
+                }
+                for receipt in self.receipts
+            ],
+        }
+
+
+@dataclass
+class VerificationStats:
+    queries: int = 0
+    bloom_negatives: int = 0
+    cache_hits: int = 0
+
+    def to_json(self) -> dict[str, int]:
+        return {"queries": self.queries, "bloom_negatives": self.bloom_negatives, "cache_hits": self.cache_hits}
+
+
+class ReceiptIndex:
+    def __init__(
+        self,
+        *,
+        max_cached_results: int = DEFAULT_MAX_CACHED_RESULTS,
+        bloom_capacity: int = DEFAULT_BLOOM_CAPACITY,
+        bloom_error_rate: float = DEFAULT_BLOOM_ERROR_RATE,
+    ):
+        self._receipt_data: dict[int, ReceiptData] = {}
+        self._holders: dict[int, str] = {}
+        self._receipt_ids: dict[PaymentKey, list[int]] = {}
+        self._bloom_filter: BloomFilter = BloomFilter(bloom_capacity, bloom_error_rate)
+        self._results: LruCache[PaymentKey, VerificationResult] = LruCache(max_cached_results)
+        self.stats: VerificationStats = VerificationStats()
+
+    def __len__(self) -> int:
+        return len(self._receipt_data)
+
+    def _add_to_bloom_filter(self, key: PaymentKey) -> None:
+        if len(self._bloom_filter) >= self._bloom_filter.capacity:
+            # past its capacity the error rate grows, the filter is rebuilt with twice the capacity
+            self._bloom_filter = BloomFilter(self._bloom_filter.capacity * 2, self._bloom_filter.error_rate)
+            existing_key: PaymentKey
+            for existing_key in self._receipt_ids:
+                self._bloom_filter.add(_get_bloom_item(existing_key))
+        self._bloom_filter.add(_get_bloom_item(key))
+
+    def add_receipt(self, receipt_id: int, receipt_data: ReceiptData, holder: str) -> None:
+        if receipt_id in self._receipt_data:
+            return
+        key: PaymentKey = (receipt_data.payment_request_id, receipt_data.payer)
+        self._receipt_data[receipt_id] = receipt_data
+        self._holders[receipt_id] = holder
+        if key not in self._receipt_ids:
+            self._receipt_ids[key] = []
+            self._add_to_bloom_filter(key)
+        self._receipt_ids[key].append(receipt_id)
+        self._results.delete(key)
+
+    def remove_receipt(self, receipt_id: int) -> None:
+        """
+        Removes a Receipt whose mint was reorged out. The Bloom filter keeps the pair, which is then answered by the
+        index.
+        """
+        receipt_data: Optional[ReceiptData] = self._receipt_data.pop(receipt_id, None)
+        if receipt_data is None:
+            return
+        key: PaymentKey = (receipt_data.payment_request_id, receipt_data.payer)
+        del self._holders[receipt_id]
+        self._receipt_ids[key].remove(receipt_id)
+        self._results.delete(key)
+
+    def set_holder(self, receipt_id: int, holder: str) -> None:
+        receipt_data: Optional[ReceiptData] = self._receipt_data.get(receipt_id)
+        if receipt_data is None:
+            # Receipt of another PaymentRequest
+            return
+        self._holders[receipt_id] = holder
+        self._results.delete((receipt_data.payment_request_id, receipt_data.payer))
+
+    def verify(self, payment_request_id: int, payer: str) -> VerificationResult:
+        key: PaymentKey = (payment_request_id, to_checksum_address(payer))
+        self.stats.queries += 1
+        if _get_bloom_item(key) not in self._bloom_filter:
+            self.stats.bloom_negatives += 1
+            return VerificationResult(payment_request_id=payment_request_id, payer=key[1], receipts=())
+
+        result: Optional[VerificationResult] = self._results.get(key)
+        if result is not None:
+            self.stats.cache_hits += 1
+            return result
+
+        result = VerificationResult(
+            payment_request_id=payment_request_id,
+            payer=key[1],
+            receipts=tuple(
+                VerifiedReceipt(
+                    receipt_id=receipt_id,
+                    holder=self._holders[receipt_id],
+                    token=self._receipt_data[receipt_id].token,
+                    token_amount=self._receipt_data[receipt_id].token_amount,
+                )
+                for receipt_id in self._receipt_ids.get(key, [])
+            ),
+        )
+        self._results.put(key, result)
+        return result
+
+
+class ReceiptVerificationService:
+    def __init__(
+        self,
+        *,
+        client: AsyncPaymentRequestClient,
+        payment_request: str,
+        w3: Optional[Web3] = None,
+        confirmations: int = DEFAULT_CONFIRMATIONS,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        index: Optional[ReceiptIndex] = None,
+    ):
+        self._client: AsyncPaymentRequestClient = client
+        self._payment_request: str = to_checksum_address(payment_request)
+        self._w3: Web3 = w3 if w3 is not None else web3
+        self._confirmations: int = confirmations
+        self._poll_interval: float = poll_interval
+        self.index: ReceiptIndex = index if index is not None else ReceiptIndex()
+
+        self._receipt: Optional[AsyncReceipt] = None
+        self._stream: Optional[ReceiptTransferEventStream] = None
+
+    async def bootstrap(self) -> int:
+        """
+        Builds the index at the confirmed head, returns the block it was built at.
+        """
+        block_number: int = int(await self._client.rpc.request("eth_blockNumber", []), 16) - self._confirmations
+        receipt: AsyncReceipt = await self._client.payment_request(self._payment_request).get_receipt()
+
+        async def call(function: Any, *args: Any) -> Any:
+            return await self._client.call(receipt.address, function, *args, block_identifier=block_number)
+
+        total_supply: int = await call(AsyncReceipt.TOTAL_SUPPLY)
+        receipt_ids: list[int] = await asyncio.gather(
+            *(call(AsyncReceipt.TOKEN_BY_INDEX, index) for index in range(total_supply))
+        )
+        receipt_data: list[tuple] = await asyncio.gather(
+            *(call(AsyncReceipt.GET_RECEIPT_DATA, receipt_id) for receipt_id in receipt_ids)
+        )
+        holders: list[str] = await asyncio.gather(
+            *(call(AsyncReceipt.OWNER_OF, receipt_id) for receipt_id in receipt_ids)
+        )
+        receipt_data_by_id: dict[int, ReceiptData] = {
+            receipt_id: ReceiptData(*data)
+            for receipt_id, data in zip(receipt_ids, receipt_data)
+            # a custom Receipt may be shared by several PaymentRequest contracts
+            if data[0] == self._payment_request
+        }
+        holder_by_id: dict[int, str] = dict(zip(receipt_ids, holders))
+
+        # in the order of the mints, as getReceiptIdsForPaymentRequestPaidBy() has them. That one is keyed by the bare
+        # PaymentRequest ID, with a shared Receipt it also has the Receipts of other PaymentRequest contracts
+        receipt_id: int
+        for receipt_id in sorted(receipt_data_by_id):
+            self.index.add_receipt(receipt_id, receipt_data_by_id[receipt_id], holder_by_id[receipt_id])
+
+        self._receipt = receipt
+        self._stream = ReceiptTransferEventStream(
+            receipt=receipt.address,
+            w3=self._w3,
+            confirmations=self._confirmations,
+            from_block=block_number + 1,
+            poll_interval=self._poll_interval,
+        )
+        return block_number
+
+    def _require_bootstrapped(self) -> ReceiptTransferEventStream:
+        if self._stream is None:
+            raise ReceiptVerificationException("bootstrap() must be called first.")
+        return self._stream
+
+    async def apply(self, event: ReceiptTransferEvent) -> None:
+        if event.sender != ADDRESS_ZERO:
+            self.index.set_holder(event.receipt_id, event.sender if event.is_retraction else event.recipient)
+        elif event.is_retraction:
+            self.index.remove_receipt(event.receipt_id)
+        else:
+            receipt_data: ReceiptData = await self._receipt.get_receipt_data(event.receipt_id)
+            if receipt_data.payment_request == self._payment_request:
+                self.index.add_receipt(event.receipt_id, receipt_data, event.recipient)
+
+    async def sync(self) -> int:
+        """
+        Applies the Transfer events of the new confirmed blocks, returns their number.
+        """
+        events: list[ReceiptTransferEvent] = await asyncio.to_thread(self._require_bootstrapped().poll)
+        event: ReceiptTransferEvent
+        for event in events:
+            await self.apply(event)
+        return len(events)
+
+    async def follow(self) -> None:
+        """
+        Applies the Transfer events as they're streamed, until cancelled.
+        """
+        event: ReceiptTransferEvent
+        async for event in self._require_bootstrapped():
+            await self.apply(event)
+
+    async def _handle_verify(self, request: web.Request) -> web.Response:
+        try:
+            payment_request_id: int = int(request.query["payment_request_id"])
+            payer: str = to_checksum_address(request.query["payer"])
+        except (KeyError, ValueError) as e:
+            raise web.HTTPBadRequest(text=f"payment_request_id and payer (address) are required: {e}")
+        return web.json_response(self.index.verify(payment_request_id, payer).to_json())
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({**self.index.stats.to_json(), "receipts": len(self.index)})
+
+    def make_app(self) -> web.Application:
+        app: web.Application = web.Application()
+        app.add_routes([web.get("/verify", self._handle_verify), web.get("/stats", self._handle_stats)])
+        return app
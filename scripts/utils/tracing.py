@@ -0,0 +1,170 @@
+"""
+Opt-in wall-clock tracing of deployments and test harness steps. Tracing is enabled by setting the TRACE_OUTPUT
+environment variable to the path of the file the spans are written to, in the Chrome trace-event format (open it in
+chrome://tracing, Perfetto or speedscope). When it's not set, traced functions are called directly.
+
+    TRACE_OUTPUT=trace.json brownie test tests/integration
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+TRACE_OUTPUT_ENV_VAR: str = "TRACE_OUTPUT"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class Span:
+    name: str
+    category: str
+    start_ns: int
+    duration_ns: int
+    thread_id: int
+    args: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class SpanSummary:
+    name: str
+    count: int
+    total_ns: int
+    max_ns: int
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count
+
+
+class Tracer:
+    def __init__(self, *, enabled: bool):
+        self._enabled: bool = enabled
+        self._spans: list[Span] = []
+        self._lock: threading.Lock = threading.Lock()
+        self._origin_ns: int = time.perf_counter_ns()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, enabled: bool) -> None:
+        self._enabled = enabled
+
+    @property
+    def spans(self) -> list[Span]:
+        return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    @contextmanager
+    def span(self, name: str, *, category: str = "default", **args: Any) -> Iterator[None]:
+        if not self._enabled:
+            yield
+            return
+
+        start_ns: int = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            span: Span = Span(
+                name=name,
+                category=category,
+                start_ns=start_ns - self._origin_ns,
+                duration_ns=time.perf_counter_ns() - start_ns,
+                thread_id=threading.get_ident(),
+                args={key: str(value) for key, value in args.items()},
+            )
+            with self._lock:
+                self._spans.append(span)
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        pid: int = os.getpid()
+        return {
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start_ns / 1_000,
+                    "dur": span.duration_ns / 1_000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": span.args,
+                }
+                for span in self._spans
+            ],
+        }
+
+    def write_chrome_trace(self, path: Path) -> None:
+        path.write_text(json.dumps(self.to_chrome_trace()))
+
+    def summarize(self) -> list[SpanSummary]:
+        """
+        Spans aggregated by name, the ones with the highest total time first. Time spent in nested spans is also
+        accounted in their parents.
+        """
+        summaries: dict[str, SpanSummary] = {}
+        for span in self._spans:
+            summary: Optional[SpanSummary] = summaries.get(span.name)
+            if summary is None:
+                summaries[span.name] = SpanSummary(
+                    name=span.name, count=1, total_ns=span.duration_ns, max_ns=span.duration_ns
+                )
+            else:
+                summary.count += 1
+                summary.total_ns += span.duration_ns
+                summary.max_ns = max(summary.max_ns, span.duration_ns)
+        return sorted(summaries.values(), key=lambda summary: summary.total_ns, reverse=True)
+
+    def format_summary(self, limit: int = 15) -> str:
+        summaries: list[SpanSummary] = self.summarize()[:limit]
+        if not summaries:
+            return "No spans recorded."
+
+        name_width: int = max(len(summary.name) for summary in summaries) + 2
+        lines: list[str] = [f"{'span':<{name_width}}{'count':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}"]
+        for summary in summaries:
+            lines.append(
+                f"{summary.name:<{name_width}}{summary.count:>8}{summary.total_ns / 1e6:>12.1f}"
+                f"{summary.mean_ns / 1e6:>10.1f}{summary.max_ns / 1e6:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+TRACER: Tracer = Tracer(enabled=bool(os.getenv(TRACE_OUTPUT_ENV_VAR)))
+
+
+def get_trace_output_path() -> Optional[Path]:
+    trace_output: Optional[str] = os.getenv(TRACE_OUTPUT_ENV_VAR)
+    return Path(trace_output) if trace_output else None
+
+
+def traced(name: Optional[str] = None, *, category: str = "default") -> Callable[[F], F]:
+    """
+    Decorator that records a span for every call of the decorated function. The span is named after the qualified
+    name of the function, unless a name is provided. To trace properties, apply it below @property.
+    """
+
+    def decorator(func: F) -> F:
+        span_name: str = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            with TRACER.span(span_name, category=category):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
@@ -0,0 +1,64 @@
+"""
+Sharding of the test suite across pytest-xdist workers, each with its own development chain:
+
+    brownie test -n auto
+
+brownie distributes the test modules across the workers and launches one development node per worker, on the port of
+the development network shifted by the worker number (gw0 on 8545, gw1 on 8546, ...). Every node is launched with
+ACCOUNTS_PER_WORKER accounts per worker, and every worker only uses its own slice of them (see
+tests/integration/accounts.py), so that workers never share an account, even when they share a node (e.g. with
+--network, or a node that was already listening).
+
+Worker information comes from the environment pytest-xdist sets up in the worker processes, as such it's available
+at import time, to the hypothesis strategies.
+"""
+import os
+from typing import Any, Optional
+
+from scripts.utils.dev_node import DEVELOPMENT_NETWORK, get_development_network_settings
+
+XDIST_WORKER_ENV_VAR: str = "PYTEST_XDIST_WORKER"
+XDIST_WORKER_COUNT_ENV_VAR: str = "PYTEST_XDIST_WORKER_COUNT"
+
+# number of accounts brownie launches the development network with
+ACCOUNTS_PER_WORKER: int = 10
+
+
+def is_xdist_worker() -> bool:
+    return XDIST_WORKER_ENV_VAR in os.environ
+
+
+def get_worker_index() -> int:
+    """
+    Index of the current xdist worker ("gw3" -> 3), 0 when the tests are not distributed.
+    """
+    worker_id: str = os.getenv(XDIST_WORKER_ENV_VAR, "")
+    digits: str = "".join(c for c in worker_id if c.isdigit())
+    return int(digits) if digits else 0
+
+
+def get_worker_count() -> int:
+    return int(os.getenv(XDIST_WORKER_COUNT_ENV_VAR, "1"))
+
+
+def get_worker_account_offset() -> int:
+    return get_worker_index() * ACCOUNTS_PER_WORKER
+
+
+def get_worker_account_index_range(start: int, end: int) -> tuple[int, int]:
+    """
+    Remaps an account index range (both inclusive) of a single worker to the slice of accounts of the current one.
+    """
+    if not 0 <= start <= end < ACCOUNTS_PER_WORKER:
+        raise ValueError(f"Account index range [{start}, {end}] is not within the {ACCOUNTS_PER_WORKER} of a worker.")
+    offset: int = get_worker_account_offset()
+    return offset + start, offset + end
+
+
+def configure_worker_network(*, worker_count: Optional[int] = None, network: str = DEVELOPMENT_NETWORK) -> None:
+    """
+    Launches the node of the network with the accounts of all workers. Must be called before brownie connects, and
+    before the chain cache key is computed, as it's part of the node settings.
+    """
+    cmd_settings: dict[str, Any] = get_development_network_settings(network)["cmd_settings"]
+    cmd_settings["accounts"] = ACCOUNTS_PER_WORKER * (worker_count if worker_count is not None else get_worker_count())
@@ -0,0 +1,41 @@
+"""
+Serves the Receipt verification endpoint of a PaymentRequest (see scripts/utils/receipt_verification.py).
+
+Usage:
+    brownie run scripts/verify_receipts.py main <payment_request_address> [port] [confirmations] --network <network>
+
+    curl "http://127.0.0.1:<port>/verify?payment_request_id=<id>&payer=<address>"
+
+The index is built once at start-up, it's then kept up to date by the Transfer events of the Receipt.
+"""
+import asyncio
+
+from aiohttp import web
+from brownie import web3
+
+from scripts.utils.async_client import AsyncPaymentRequestClient
+from scripts.utils.receipt_verification import ReceiptVerificationService
+
+HOST: str = "127.0.0.1"
+
+
+async def _serve(payment_request_address: str, port: int, confirmations: int) -> None:
+    async with AsyncPaymentRequestClient(web3.provider.endpoint_uri) as client:
+        service: ReceiptVerificationService = ReceiptVerificationService(
+            client=client, payment_request=payment_request_address, confirmations=confirmations
+        )
+        block_number: int = await service.bootstrap()
+        print(f"Indexed {len(service.index)} receipts up to block {block_number}")
+
+        runner: web.AppRunner = web.AppRunner(service.make_app())
+        await runner.setup()
+        await web.TCPSite(runner, HOST, port).start()
+        print(f"Serving on http://{HOST}:{port}/verify")
+        try:
+            await service.follow()
+        finally:
+            await runner.cleanup()
+
+
+def main(payment_request_address: str, port: int = 8080, confirmations: int = 1):
+    asyncio.run(_serve(payment_request_address, int(port), int(confirmations)))
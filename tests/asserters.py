@@ -7,6 +7,7 @@ from brownie.network.event import EventDict, _EventItem
 from brownie.network.transaction import TransactionReceipt
 
 from scripts.utils.contants import EventName, ExpectedEventsFor
+from scripts.utils.errors import classify_failed_transaction
 
 
 def assert_receipt_metadata_is_correct(*, receipt: Receipt, receipt_id: int, payment_request_addr: str, payment_request_id: int, token_addr: str, token_amount: int, payer_addr: str, payee_addr: str):
@@ -69,6 +70,8 @@ def assert_expected_events_occurred_for_successful_transaction(*, payment_reques
     is_post_payment_action_set: bool = payment_request.isPaymentPostActionSet(payment_request_id)
 
     expected_events: List[str] = PP_PPA_TO_EXPECTED_EVENTS[(is_payment_precondition_set, is_post_payment_action_set)]
+    if payment_request.isLeanEvents(payment_request_id):
+        expected_events = ExpectedEventsFor.Success.Lean
 
     for event in expected_events:
         assert event in tx.events, f"{event} not in {tx.events}"
@@ -89,7 +92,14 @@ def _get_expected_events_for_failure(is_payment_precondition_set: bool, is_post_
 
     return getattr(PP_PPA_TO_EXPECTED_EVENTS[(is_payment_precondition_set, is_post_payment_action_set)], failed_at)
 
+def assert_failed_at_is_correct(*, tx: TransactionReceipt, failed_at: str):
+    # the stage is obtained from the revert data of the transaction, without re-reading the state of the PaymentRequest
+    classified_failed_at: Optional[str] = classify_failed_transaction(tx)
+    assert classified_failed_at == failed_at, f"{classified_failed_at=} != {failed_at=}"
+
 def assert_expected_events_occurred_for_failed_transaction(*, payment_request: ProjectContract, payment_request_id: int, tx: TransactionReceipt, failed_at: str):
+    assert_failed_at_is_correct(tx=tx, failed_at=failed_at)
+
     is_payment_precondition_set: bool = payment_request.isPaymentPreconditionSet(payment_request_id)
     is_post_payment_action_set: bool = payment_request.isPaymentPostActionSet(payment_request_id)
 
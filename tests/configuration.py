@@ -4,16 +4,32 @@ Structures used for test run configuration. This code is used to configure test
 import random
 from dataclasses import dataclass
 from enum import auto
-from typing import Optional, cast, Union
-
-from brownie import MyERC20, ZERO_ADDRESS
+from typing import Any, Optional, cast, Union
+
+from brownie import (
+    DisablePaymentRequestPaymentPostAction,
+    DiscountedTokenAmountForFirst100Customers,
+    FixedDynamicTokenAmount,
+    MyERC20,
+    MyERC721,
+    MyPostPaymentAction,
+    NFTOwnerPaymentPrecondition,
+    OnePurchasePerAddressPaymentPrecondition,
+    TransferNFTPaymentPostAction,
+    ZERO_ADDRESS,
+)
 from brownie.network import accounts
 from brownie.network.account import Accounts, Account
 from brownie.network.contract import ProjectContract
 from brownie.network.transaction import TransactionReceipt, Status
 
-from scripts.utils.contract import ContractBuilder
-from scripts.utils.types import TransferNFTPaymentPostActionWithMeta
+from scripts.utils.contract import MY_ERC20_DEPLOY_ARGS, MY_ERC721_DEPLOY_ARGS, ContractBuilder, get_random_fixed_price
+from scripts.utils.gas_profiler import GasProfile, profile_payment
+from scripts.utils.parallel_deployer import ParallelDeployer, Ref
+from scripts.utils.tracing import traced
+from scripts.utils.types import NFTOwnerPaymentPreconditionMeta, TransferNFTPaymentPostActionMeta, \
+    TransferNFTPaymentPostActionWithMeta
+from tests.deployment_pool import DeploymentPool
 from tests.exceptions import InvalidChoiceException, InvalidTestStateException
 from tests.types import MinMaxEnum, StaticTokenAmounts
 
@@ -89,14 +105,49 @@ class PaymentRequestConfiguration:
         return str(self.__dict__)
 
 
+NUM_TOKENS_FOR_DYNAMIC_TOKEN_AMOUNT_PAYMENT: int = 3
+# amount of the single token of the PaymentRequests created by create_static_payment_request()
+TOKEN_AMOUNT: int = 10
+# ID of the first NFT minted by a freshly deployed MyERC721
+FIRST_MY_ERC721_ID: int = 0
+
+
+def create_static_payment_request(
+    payment_request: ProjectContract,
+    erc_20: ProjectContract,
+    owner: Account,
+    from_address: str = ZERO_ADDRESS,
+    post_payment_action: str = ZERO_ADDRESS,
+) -> int:
+    """
+    Creates a PaymentRequest accepting TOKEN_AMOUNT of erc_20, without payment precondition and, unless one is
+    provided, without post payment action.
+    """
+    tx: TransactionReceipt = payment_request.createWithStaticTokenAmount(
+        [(erc_20.address, TOKEN_AMOUNT)], ZERO_ADDRESS, post_payment_action, from_address, {"from": owner}
+    )
+    assert tx.status == Status.Confirmed
+    return tx.return_value
+
+
 class PaymentRequestBuilder:
     def __init__(
         self,
         configuration: PaymentRequestConfiguration,
         payment_request_dependencies_deployer_account_index: int,
         payment_request_deployer_account_index: int,
+        deployment_pool: Optional[DeploymentPool] = None,
+        parallel_deploy: bool = False,
     ):
+        if deployment_pool is not None and parallel_deploy:
+            raise InvalidChoiceException("Pooled dependencies are deployed on demand, they can't be deployed in parallel.")
+
         self._payment_request_configuration: PaymentRequestConfiguration = configuration
+        self._parallel_deploy: bool = parallel_deploy
+        self._deployment_pool: Optional[DeploymentPool] = deployment_pool
+        if self._deployment_pool is not None:
+            # discard the state left by the previous user of the pool
+            self._deployment_pool.checkout()
         self._accounts: Accounts = accounts  # if needed, can be later done via a constructor arg
         self._payment_request_dependencies_deployer_account: Account = self._accounts[payment_request_dependencies_deployer_account_index]
         self._payment_request_deployer_account: Account = self._accounts[payment_request_deployer_account_index]
@@ -114,8 +165,15 @@ class PaymentRequestBuilder:
         self._post_payment_action: Optional[ProjectContract] = None
 
         self._setup_required_state()
+        if self._deployment_pool is not None:
+            self._deployment_pool.commit()
 
+    @traced(category="test_harness")
     def _setup_required_state(self) -> None:
+        if self._parallel_deploy:
+            self._setup_required_state_in_parallel()
+            return
+
         self._payment_precondition = self._deploy_payment_precondition_or_zero_address()
         self._dynamic_token_amount: Optional[
             ProjectContract
@@ -128,10 +186,114 @@ class PaymentRequestBuilder:
             ProjectContract
         ] = self._deploy_payment_post_action_or_zero_address()
 
+    def _setup_required_state_in_parallel(self) -> None:
+        """
+        Same state as the one set up by the sequential deployment, with the transactions sent by a ParallelDeployer:
+        each one only waits for the ones it depends on.
+        """
+        configuration: PaymentRequestConfiguration = self._payment_request_configuration
+        account: Account = self._payment_request_dependencies_deployer_account
+        deployer: ParallelDeployer = ParallelDeployer()
+
+        if configuration.payment_precondition == PaymentPrecondition.NFT_OWNER:
+            deployer.deploy("precondition_erc20", MyERC20, *MY_ERC20_DEPLOY_ARGS, account=account)
+            deployer.deploy("precondition_erc721", MyERC721, *MY_ERC721_DEPLOY_ARGS, account=account)
+            deployer.deploy(
+                "payment_precondition",
+                NFTOwnerPaymentPrecondition,
+                Ref("precondition_erc20"),
+                Ref("precondition_erc721"),
+                account=account,
+            )
+        elif configuration.payment_precondition == PaymentPrecondition.ONE_PURCHASE_PER_ADDRESS:
+            deployer.deploy("payment_precondition", OnePurchasePerAddressPaymentPrecondition, account=account)
+
+        if configuration.token_amount == TokenAmount.FIXED:
+            deployer.deploy("dynamic_token_amount", FixedDynamicTokenAmount, get_random_fixed_price(), account=account)
+        elif configuration.token_amount == TokenAmount.DISCOUNTED:
+            deployer.deploy("dynamic_token_amount", DiscountedTokenAmountForFirst100Customers, account=account)
+
+        num_erc20s: int = (
+            len(configuration.static_token_amounts)
+            if self.is_token_amount_static
+            else NUM_TOKENS_FOR_DYNAMIC_TOKEN_AMOUNT_PAYMENT
+        )
+        erc20_names: list[str] = [f"erc20_{index}" for index in range(num_erc20s)]
+        for name in erc20_names:
+            deployer.deploy(name, MyERC20, *MY_ERC20_DEPLOY_ARGS, account=account)
+
+        if configuration.post_payment_action == PostPaymentAction.EMIT_EVENTS:
+            deployer.deploy("post_payment_action", MyPostPaymentAction, account=account)
+        elif configuration.post_payment_action == PostPaymentAction.DISABLE_PAYMENT_REQUEST:
+            deployer.deploy("post_payment_action", DisablePaymentRequestPaymentPostAction, account=account)
+        elif configuration.post_payment_action == PostPaymentAction.TRANSFER_NFT:
+            deployer.deploy("post_payment_action_erc721", MyERC721, *MY_ERC721_DEPLOY_ARGS, account=account)
+            # the ID of the NFT is known upfront, so the action doesn't need to wait for the mint
+            deployer.deploy(
+                "post_payment_action",
+                TransferNFTPaymentPostAction,
+                Ref("post_payment_action_erc721"),
+                FIRST_MY_ERC721_ID,
+                account=account,
+            )
+            deployer.transact(
+                "post_payment_action_mint",
+                lambda tx_params: deployer["post_payment_action_erc721"].create(account.address, tx_params),
+                account=account,
+                after=("post_payment_action_erc721",),
+            )
+            # the PostPaymentAction is the one performing the transfer
+            deployer.transact(
+                "post_payment_action_approve",
+                lambda tx_params: deployer["post_payment_action_erc721"].approve(
+                    deployer.address_of("post_payment_action"), FIRST_MY_ERC721_ID, tx_params
+                ),
+                account=account,
+                after=("post_payment_action_mint",),
+            )
+
+        results: dict[str, Any] = deployer.run()
+
+        self._payment_precondition = results.get("payment_precondition", ZERO_ADDRESS)
+        if configuration.payment_precondition == PaymentPrecondition.NFT_OWNER:
+            self._payment_precondition.Meta = NFTOwnerPaymentPreconditionMeta(
+                erc20=results["precondition_erc20"], erc721=results["precondition_erc721"]
+            )
+
+        self._dynamic_token_amount = results.get("dynamic_token_amount", ZERO_ADDRESS)
+        erc20s: list[ProjectContract] = [results[name] for name in erc20_names]
+        if self.is_token_amount_static:
+            self._tokens_for_dynamic_token_amount_payment = None
+            self._static_token_amounts = [
+                (erc20.address, token_amount)
+                for erc20, token_amount in zip(erc20s, configuration.static_token_amounts)
+            ]
+        else:
+            self._tokens_for_dynamic_token_amount_payment = erc20s
+            self._static_token_amounts = None
+
+        self._post_payment_action = results.get("post_payment_action", ZERO_ADDRESS)
+        if configuration.post_payment_action == PostPaymentAction.TRANSFER_NFT:
+            self._post_payment_action.Meta = TransferNFTPaymentPostActionMeta(
+                erc721=results["post_payment_action_erc721"], erc721_id=FIRST_MY_ERC721_ID
+            )
+
     @property
     def contract_builder(self) -> ContractBuilder:
         return ContractBuilder(account=self._payment_request_dependencies_deployer_account, force_deploy=True)
 
+    def _get_dependency(self, name: str) -> ProjectContract:
+        """
+        Deploys the dependency with the provided ContractBuilder property name, or takes it from the deployment pool.
+        """
+        if self._deployment_pool is None:
+            return getattr(self.contract_builder, name)
+        return self._deployment_pool.get(
+            name,
+            self._payment_request_dependencies_deployer_account,
+            lambda: getattr(self.contract_builder, name),
+        )
+
     @property
     def payment_request_dependencies_deployer_account(self) -> Account:
         return self._payment_request_dependencies_deployer_account
@@ -187,13 +349,13 @@ class PaymentRequestBuilder:
             return ZERO_ADDRESS
 
         if self._payment_request_configuration.payment_precondition == PaymentPrecondition.NFT_OWNER:
-            return self.contract_builder.NFTOwnerPaymentPrecondition
+            return self._get_dependency("NFTOwnerPaymentPrecondition")
 
         if (
             self._payment_request_configuration.payment_precondition
             == PaymentPrecondition.ONE_PURCHASE_PER_ADDRESS
         ):
-            return self.contract_builder.OnePurchasePerAddressPaymentPrecondition
+            return self._get_dependency("OnePurchasePerAddressPaymentPrecondition")
 
         raise InvalidChoiceException(
             f"{self._payment_request_configuration.payment_precondition=} is not a valid choice."
@@ -205,10 +367,10 @@ class PaymentRequestBuilder:
 
         if self._payment_request_configuration.token_amount == TokenAmount.FIXED:
             # use .price() to get the required price
-            return self.contract_builder.FixedPricePaymentComputer
+            return self._get_dependency("FixedPricePaymentComputer")
 
         if self._payment_request_configuration.token_amount == TokenAmount.DISCOUNTED:
-            return self.contract_builder.DiscountedTokenAmountForFirst100Customers
+            return self._get_dependency("DiscountedTokenAmountForFirst100Customers")
 
         raise InvalidChoiceException(
             f"{self._payment_request_configuration.token_amount=} is not a valid choice."
@@ -220,7 +382,7 @@ class PaymentRequestBuilder:
 
             token_amount: int
             for token_amount in self._payment_request_configuration.static_token_amounts:
-                erc20: ProjectContract = self.contract_builder.MyERC20
+                erc20: ProjectContract = self._get_dependency("MyERC20")
                 static_token_amounts.append((erc20.address, token_amount))
 
             return static_token_amounts
@@ -231,7 +393,7 @@ class PaymentRequestBuilder:
             return
         else:
             return [
-                self.contract_builder.MyERC20 for _ in range(3)
+                self._get_dependency("MyERC20") for _ in range(3)
             ]
 
     def _deploy_payment_post_action_or_zero_address(self) -> Union[ProjectContract, str]:
@@ -239,23 +401,24 @@ class PaymentRequestBuilder:
             return ZERO_ADDRESS
 
         if self._payment_request_configuration.post_payment_action == PostPaymentAction.EMIT_EVENTS:
-            return self.contract_builder.MyPostPaymentAction
+            return self._get_dependency("MyPostPaymentAction")
 
         if (
             self._payment_request_configuration.post_payment_action
             == PostPaymentAction.DISABLE_PAYMENT_REQUEST
         ):
-            return self.contract_builder.DisablePaymentRequestPaymentPostAction
+            return self._get_dependency("DisablePaymentRequestPaymentPostAction")
 
         if self._payment_request_configuration.post_payment_action == PostPaymentAction.TRANSFER_NFT:
-            transfer_nft_contract: TransferNFTPaymentPostActionWithMeta = (
-                self.contract_builder.TransferNFTPaymentPostAction
+            transfer_nft_contract: TransferNFTPaymentPostActionWithMeta = self._get_dependency(
+                "TransferNFTPaymentPostAction"
             )
             erc721: ProjectContract = transfer_nft_contract.Meta.erc721
             erc721_id: int = transfer_nft_contract.Meta.erc721_id
 
+            # the PostPaymentAction is the one performing the transfer
             erc721.approve(
-                self._payment_request.address,
+                transfer_nft_contract.address,
                 erc721_id,
                 {"from": self.contract_builder.account},
             )
@@ -285,6 +448,7 @@ class PaymentRequestTestProxy:
     ):
         raise NotImplementedError()
 
+    @traced(category="test_harness")
     def create_payment_request(self) -> int:
         # Decide whether to use createWithStaticTokenAmount() or createDynamicTokenAmount()
         tx: TransactionReceipt = (
@@ -292,6 +456,7 @@ class PaymentRequestTestProxy:
                 self._payment_request_builder.static_token_amounts,
                 self._payment_request_builder.payment_precondition,
                 self._payment_request_builder.post_payment_action,
+                ZERO_ADDRESS,
                 {"from": self._creator_account},
             )
             if self._payment_request_builder.is_token_amount_static
@@ -299,6 +464,7 @@ class PaymentRequestTestProxy:
                 self._payment_request_builder.dynamic_token_amount,
                 self._payment_request_builder.payment_precondition,
                 self._payment_request_builder.post_payment_action,
+                ZERO_ADDRESS,
                 {"from": self._creator_account},
             )
         )
@@ -348,9 +514,10 @@ class PaymentRequestTestProxy:
                 contract=selected_token_for_payment,
             )
 
+    @traced(category="test_harness")
     def pay_for_payment_request_with_success(
         self, payment_request_id: int, payer: Account
-    ):
+    ) -> TransactionReceipt:
         """
         Pay for payment request with the provided payment_request_id.
         """
@@ -389,3 +556,15 @@ class PaymentRequestTestProxy:
 
         # 4. Check Payment-Post-Action, If Any + Assertions
         # TODO: first, only testing the simple case
+
+        return tx
+
+    def profile_payment_gas(self, *, tx: TransactionReceipt, payment_request_id: int) -> GasProfile:
+        """
+        Per-stage gas attribution of a payment performed on the proxied PaymentRequest.
+        """
+        return profile_payment(
+            tx,
+            payment_request=self._payment_request_builder.payment_request,
+            payment_request_id=payment_request_id,
+        )
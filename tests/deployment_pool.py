@@ -0,0 +1,106 @@
+"""
+Snapshot-backed pool of PaymentRequest dependencies (preconditions, token amounts, ERC-20s, ERC-721s and
+post-payment actions), to be shared by hypothesis examples.
+
+Instead of deploying the dependencies of every example, each one is deployed once and the chain is snapshotted
+right after it, via evm_snapshot. Before an example is set up, the chain is reverted to that snapshot via evm_revert,
+which discards the payments of the previous example, while keeping the deployed dependencies. This makes examples
+independent from each other, as if the dependencies had just been deployed.
+
+The pool should be used in modules with module_isolation: fn_isolation reverts the chain after each test, which
+discards the snapshot (the pool detects it and deploys again).
+
+The snapshot is not taken with brownie's chain.snapshot(), which holds a single snapshot, the one of module_isolation.
+As such, after evm_revert, the transactions and the contracts of the reverted blocks are dropped from brownie's
+history and ContractContainers, as chain.revert() does.
+"""
+from collections import defaultdict
+from typing import Any, Callable, Optional, TypeVar
+
+from brownie import web3
+from brownie.network.account import Account
+from brownie.network.state import _notify_registry
+from hexbytes import HexBytes
+from web3.exceptions import BlockNotFound
+
+from scripts.utils.tracing import TRACER
+
+T = TypeVar("T")
+
+# (name of the dependency, address of the deployer, ordinal of the request within an example)
+DeploymentKey = tuple[str, str, int]
+
+
+class DeploymentPool:
+    def __init__(self):
+        self._deployments: dict[DeploymentKey, Any] = {}
+        self._ordinals: defaultdict[tuple[str, str], int] = defaultdict(int)
+        self._snapshot_id: Optional[Any] = None
+        # block at which the snapshot was taken. Snapshot IDs can be reused by the node after a revert, so the block
+        # is used to detect that the snapshot no longer belongs to this chain.
+        self._snapshot_block: Optional[tuple[int, HexBytes]] = None
+
+    @property
+    def num_deployments(self) -> int:
+        return len(self._deployments)
+
+    def checkout(self) -> None:
+        """
+        Resets the chain to the state at which the pooled dependencies were last deployed. To be called before an
+        example requests its dependencies.
+        """
+        self._ordinals.clear()
+        if self._snapshot_id is None:
+            return
+
+        with TRACER.span("DeploymentPool.checkout", category="deployment_pool"):
+            if not self._is_snapshot_valid() or not self._revert():
+                # the chain was reset or reverted past the snapshot, the deployed dependencies are gone
+                self._deployments.clear()
+
+        self._snapshot_id = None
+        self._snapshot_block = None
+
+    def get(self, name: str, account: Account, deploy: Callable[[], T]) -> T:
+        """
+        Returns the dependency deployed by the account, deploying it if it's not pooled yet. Requesting the same
+        dependency multiple times in an example (e.g. one ERC-20 per static token amount) yields distinct instances.
+        """
+        ordinal: int = self._ordinals[(name, account.address)]
+        self._ordinals[(name, account.address)] += 1
+
+        key: DeploymentKey = (name, account.address, ordinal)
+        if key not in self._deployments:
+            self._deployments[key] = deploy()
+        return self._deployments[key]
+
+    def commit(self) -> None:
+        """
+        Snapshots the chain with the dependencies of the current example deployed. To be called once the example has
+        requested all of its dependencies, before it performs any other transaction.
+        """
+        latest_block = web3.eth.get_block("latest")
+        self._snapshot_id = web3.provider.make_request("evm_snapshot", [])["result"]
+        self._snapshot_block = (latest_block["number"], HexBytes(latest_block["hash"]))
+
+    def _is_snapshot_valid(self) -> bool:
+        number, block_hash = self._snapshot_block
+        try:
+            return HexBytes(web3.eth.get_block(number)["hash"]) == block_hash
+        except BlockNotFound:
+            # the chain is behind the snapshot
+            return False
+
+    def _revert(self) -> bool:
+        response: dict = web3.provider.make_request("evm_revert", [self._snapshot_id])
+        if not response.get("result"):
+            return False
+        # the payments of the previous example would otherwise remain in history, and the contracts it deployed
+        # in their ContractContainers, pointing to addresses without code
+        number, _ = self._snapshot_block
+        _notify_registry(number)
+        return True
+
+
+# shared by all of the examples of a session
+DEPLOYMENT_POOL: DeploymentPool = DeploymentPool()
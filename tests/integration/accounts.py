@@ -1,7 +1,6 @@
-DEPLOYER_ACCOUNT_INDEX_START: int = 0
-DEPLOYER_ACCOUNT_INDEX_END: int = 2
-
-INTERACTOR_ACCOUNT_INDEX_START: int = 3
-INTERACTOR_ACCOUNT_INDEX_END: int = 9
+from scripts.utils.workers import get_worker_account_index_range
 
+# every xdist worker has its own slice of the accounts of the development network
+DEPLOYER_ACCOUNT_INDEX_START, DEPLOYER_ACCOUNT_INDEX_END = get_worker_account_index_range(0, 2)
 
+INTERACTOR_ACCOUNT_INDEX_START, INTERACTOR_ACCOUNT_INDEX_END = get_worker_account_index_range(3, 9)
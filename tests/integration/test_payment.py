@@ -9,6 +9,7 @@ from tests.configuration import (
     PaymentPrecondition,
     PaymentRequestTestProxy,
 )
+from tests.deployment_pool import DEPLOYMENT_POOL
 from tests.integration.accounts import INTERACTOR_ACCOUNT_INDEX_START, INTERACTOR_ACCOUNT_INDEX_END
 from tests.strategies import (
     payment_request_test_proxy_strategy,
@@ -28,6 +29,7 @@ def shared_setup(module_isolation):
             min_value=0,
             max_value=1,
         ),  # TODO: limited temporarily
+        deployment_pool=strategies.just(DEPLOYMENT_POOL),
     ),
     interactor_account_index=strategies.integers(min_value=INTERACTOR_ACCOUNT_INDEX_START, max_value=INTERACTOR_ACCOUNT_INDEX_END),
 )
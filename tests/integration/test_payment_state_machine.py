@@ -0,0 +1,196 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import brownie
+import pytest
+from brownie import PaymentRequest, MyERC20, Receipt
+from brownie import accounts
+from brownie.network.account import Account
+from brownie.network.transaction import TransactionReceipt, Status
+from hypothesis import strategies
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.contract import ContractBuilder
+from tests.integration.accounts import (
+    DEPLOYER_ACCOUNT_INDEX_START,
+    INTERACTOR_ACCOUNT_INDEX_END,
+)
+from tests.soak import SOAK_STATS, run_soak
+
+MAX_TOKEN_AMOUNT_VALUE: int = 100
+# hypothesis picks existing PaymentRequests and Receipts by an index, modulo their number
+MAX_CHOICE_INDEX: int = 2 ** 16
+
+
+@pytest.fixture(scope="module", autouse=True)
+def shared_setup(module_isolation):
+    pass
+
+
+@dataclass
+class PaymentRequestModel:
+    owner: Account
+    token_amount: int
+    restricted_to: Optional[Account]
+    is_enabled: bool = True
+    num_payments: int = 0
+
+
+class PaymentRequestStateMachine:
+    """
+    Random sequences of PaymentRequest interactions, checked against a model of the expected state after every step.
+    Contracts are deployed once, before the initial snapshot that brownie reverts to at the start of every example.
+    """
+
+    st_account_index = strategies.integers(min_value=DEPLOYER_ACCOUNT_INDEX_START, max_value=INTERACTOR_ACCOUNT_INDEX_END)
+    st_token_amount = strategies.integers(min_value=0, max_value=MAX_TOKEN_AMOUNT_VALUE)
+    st_choice_index = strategies.integers(min_value=0, max_value=MAX_CHOICE_INDEX)
+    st_bool = strategies.booleans()
+
+    def __init__(cls, payment_request: PaymentRequest, erc_20: MyERC20):
+        cls.payment_request = payment_request
+        cls.erc_20 = erc_20
+        cls.receipt = Receipt.at(payment_request.receipt())
+
+    def setup(self):
+        self.payment_requests: dict[int, PaymentRequestModel] = {}
+        # receipt ID -> owner
+        self.receipts: dict[int, Account] = {}
+        SOAK_STATS.examples += 1
+
+    def _choose_payment_request(self, choice_index: int) -> Optional[int]:
+        if not self.payment_requests:
+            return None
+        return list(self.payment_requests)[choice_index % len(self.payment_requests)]
+
+    def rule_create(self, st_account_index, st_token_amount, is_restricted="st_bool", restricted_index="st_account_index"):
+        SOAK_STATS.steps += 1
+        creator: Account = accounts[st_account_index]
+        restricted_to: Optional[Account] = accounts[restricted_index] if is_restricted else None
+
+        tx: TransactionReceipt = self.payment_request.createWithStaticTokenAmount(
+            [(self.erc_20.address, st_token_amount)],
+            ADDRESS_ZERO,
+            ADDRESS_ZERO,
+            restricted_to.address if restricted_to is not None else ADDRESS_ZERO,
+            {"from": creator},
+        )
+
+        self.payment_requests[tx.events["PaymentRequestCreated"]["paymentRequestId"]] = PaymentRequestModel(
+            owner=creator, token_amount=st_token_amount, restricted_to=restricted_to
+        )
+
+    def rule_pay(self, st_choice_index, st_account_index):
+        SOAK_STATS.steps += 1
+        payment_request_id: Optional[int] = self._choose_payment_request(st_choice_index)
+        if payment_request_id is None:
+            return
+        model: PaymentRequestModel = self.payment_requests[payment_request_id]
+        payer: Account = accounts[st_account_index]
+
+        if not model.is_enabled or model.restricted_to not in (None, payer):
+            with brownie.reverts():
+                self.payment_request.pay(payment_request_id, self.erc_20.address, {"from": payer})
+            return
+
+        tx: TransactionReceipt = self.payment_request.pay(payment_request_id, self.erc_20.address, {"from": payer})
+
+        assert tx.status == Status.Confirmed
+        self.receipts[tx.events["PaymentRequestPaid"]["receiptId"]] = payer
+        model.num_payments += 1
+        if model.restricted_to is not None:
+            model.is_enabled = False
+
+    def rule_enable(self, st_choice_index, st_account_index, as_owner="st_bool"):
+        SOAK_STATS.steps += 1
+        payment_request_id: Optional[int] = self._choose_payment_request(st_choice_index)
+        if payment_request_id is None:
+            return
+        model: PaymentRequestModel = self.payment_requests[payment_request_id]
+        caller: Account = model.owner if as_owner else accounts[st_account_index]
+
+        if caller != model.owner or model.restricted_to is not None:
+            with brownie.reverts():
+                self.payment_request.enable(payment_request_id, {"from": caller})
+            return
+
+        self.payment_request.enable(payment_request_id, {"from": caller})
+        model.is_enabled = True
+
+    def rule_disable(self, st_choice_index, st_account_index, as_owner="st_bool"):
+        SOAK_STATS.steps += 1
+        payment_request_id: Optional[int] = self._choose_payment_request(st_choice_index)
+        if payment_request_id is None:
+            return
+        model: PaymentRequestModel = self.payment_requests[payment_request_id]
+        caller: Account = model.owner if as_owner else accounts[st_account_index]
+
+        if caller != model.owner:
+            with brownie.reverts():
+                self.payment_request.disable(payment_request_id, {"from": caller})
+            return
+
+        self.payment_request.disable(payment_request_id, {"from": caller})
+        model.is_enabled = False
+
+    def rule_transfer_payment_request(self, st_choice_index, st_account_index):
+        SOAK_STATS.steps += 1
+        payment_request_id: Optional[int] = self._choose_payment_request(st_choice_index)
+        if payment_request_id is None:
+            return
+        model: PaymentRequestModel = self.payment_requests[payment_request_id]
+        recipient: Account = accounts[st_account_index]
+
+        self.payment_request.transferFrom(model.owner.address, recipient.address, payment_request_id, {"from": model.owner})
+        model.owner = recipient
+
+    def rule_transfer_receipt(self, st_choice_index, st_account_index):
+        SOAK_STATS.steps += 1
+        if not self.receipts:
+            return
+        receipt_id: int = list(self.receipts)[st_choice_index % len(self.receipts)]
+        owner: Account = self.receipts[receipt_id]
+        recipient: Account = accounts[st_account_index]
+
+        self.receipt.transferFrom(owner.address, recipient.address, receipt_id, {"from": owner})
+        self.receipts[receipt_id] = recipient
+
+    def invariant_payment_requests(self):
+        payment_request_id: int
+        model: PaymentRequestModel
+        for payment_request_id, model in self.payment_requests.items():
+            assert self.payment_request.ownerOf(payment_request_id) == model.owner.address
+            assert self.payment_request.isEnabled(payment_request_id) == model.is_enabled
+            assert self.payment_request.getNumberOfPayments(payment_request_id) == model.num_payments
+            assert self.payment_request.getTotalCollectedForToken(
+                payment_request_id, self.erc_20.address
+            ) == model.num_payments * model.token_amount
+
+    def invariant_receipts(self):
+        assert self.receipt.totalSupply() == len(self.receipts)
+        receipt_id: int
+        owner: Account
+        for receipt_id, owner in self.receipts.items():
+            assert self.receipt.ownerOf(receipt_id) == owner.address
+
+
+def test_GIVEN_random_sequence_of_interactions_WHEN_executed_THEN_payment_request_state_matches_the_model(
+    state_machine, *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[DEPLOYER_ACCOUNT_INDEX_START]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+
+    # every participant can pay any number of times, without further approvals
+    participants: list[Account] = accounts[DEPLOYER_ACCOUNT_INDEX_START:INTERACTOR_ACCOUNT_INDEX_END + 1]
+    balance: int = erc_20.balanceOf(owner.address) // len(participants)
+    participant: Account
+    for participant in participants:
+        if participant != owner:
+            erc_20.transfer(participant.address, balance, {"from": owner})
+        erc_20.approve(payment_request.address, 2 ** 256 - 1, {"from": participant})
+
+    # WHEN / THEN
+    run_soak(lambda: state_machine(PaymentRequestStateMachine, payment_request, erc_20))
@@ -0,0 +1,71 @@
+"""
+Time-budgeted fuzzing campaigns. Under the "soak" hypothesis profile, a stateful test runs batches of examples until
+its time budget is spent, instead of a fixed number of examples, and the throughput is reported at the end of the
+session:
+
+    HYPOTHESIS_PROFILE=soak SOAK_TIME_BUDGET=600 brownie test tests/integration/test_payment_state_machine.py
+
+Outside of the soak profile, a single batch is run, with the number of examples of the loaded profile.
+"""
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+SOAK_PROFILE: str = "soak"
+SOAK_TIME_BUDGET_ENV_VAR: str = "SOAK_TIME_BUDGET"
+# seconds
+DEFAULT_SOAK_TIME_BUDGET: float = 300
+# examples per batch, small enough for the budget to be checked often
+SOAK_BATCH_EXAMPLES: int = 50
+SOAK_STATEFUL_STEP_COUNT: int = 100
+
+
+@dataclass
+class SoakStats:
+    examples: int = 0
+    steps: int = 0
+    batches: int = 0
+    elapsed: float = 0
+
+    @property
+    def examples_per_second(self) -> float:
+        return self.examples / self.elapsed if self.elapsed else 0
+
+    @property
+    def steps_per_second(self) -> float:
+        return self.steps / self.elapsed if self.elapsed else 0
+
+    def format_summary(self) -> str:
+        return (
+            f"{self.examples} examples, {self.steps} steps in {self.batches} batches, {self.elapsed:.1f}s: "
+            f"{self.examples_per_second:.2f} examples/s, {self.steps_per_second:.2f} steps/s"
+        )
+
+
+SOAK_STATS: SoakStats = SoakStats()
+
+
+def is_soak_profile() -> bool:
+    return os.getenv("HYPOTHESIS_PROFILE") == SOAK_PROFILE
+
+
+def get_soak_time_budget() -> float:
+    return float(os.getenv(SOAK_TIME_BUDGET_ENV_VAR, DEFAULT_SOAK_TIME_BUDGET))
+
+
+def run_soak(run_batch: Callable[[], None]) -> None:
+    """
+    Runs batches of examples until the time budget is spent (soak profile), or a single one. A batch that is started
+    before the budget is spent runs to completion.
+    """
+    start: float = time.monotonic()
+    deadline: float = start + get_soak_time_budget()
+    try:
+        while True:
+            run_batch()
+            SOAK_STATS.batches += 1
+            if not is_soak_profile() or time.monotonic() >= deadline:
+                break
+    finally:
+        SOAK_STATS.elapsed += time.monotonic() - start
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from brownie.network.account import Account, Accounts, _PrivateKeyAccount
 from hypothesis import strategies
 from hypothesis.strategies import composite, SearchStrategy
@@ -10,6 +12,7 @@ from tests.configuration import (
     PaymentRequestBuilder,
     PaymentRequestTestProxy,
 )
+from tests.deployment_pool import DeploymentPool
 from tests.integration.accounts import (
     DEPLOYER_ACCOUNT_INDEX_START,
     DEPLOYER_ACCOUNT_INDEX_END,
@@ -38,6 +41,8 @@ def payment_request_test_proxy_strategy(
     post_payment_action_id: SearchStrategy[int] = strategies.integers(
         min_value=PostPaymentAction.min_value(), max_value=TokenAmount.max_value()
     ),
+    deployment_pool: SearchStrategy[Optional[DeploymentPool]] = strategies.none(),
+    parallel_deploy: SearchStrategy[bool] = strategies.just(False),
 ) -> SearchStrategy[PaymentRequestTestProxy]:
     static_token_amounts: list[int] = strategies.lists(
         elements=strategies.integers(min_value=0, max_value=MAX_TOKEN_AMOUNT_VALUE),
@@ -59,6 +64,8 @@ def payment_request_test_proxy_strategy(
         configuration=payment_request_configuration,
         payment_request_deployer_account_index=payment_request_deployer_account_index,
         payment_request_dependencies_deployer_account_index=payment_request_dependencies_deployer_account_index,
+        deployment_pool=deployment_pool,
+        parallel_deploy=parallel_deploy,
     )
 
     return strategies.builds(
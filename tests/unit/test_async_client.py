@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+from brownie import PaymentRequest, MyERC20
+from brownie import accounts, web3
+from brownie.network.account import Account
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.async_client import (
+    AsyncPaymentRequest,
+    AsyncPaymentRequestClient,
+    AsyncReceipt,
+    ContractCallException,
+    ReceiptData,
+    TokenAmountInfo,
+)
+from scripts.utils.contants import PaymentFailedAt
+from scripts.utils.contract import ContractBuilder
+from tests.configuration import TOKEN_AMOUNT, create_static_payment_request
+
+# the async client sends its requests over HTTP, to the endpoint of the node
+pytestmark = pytest.mark.requires_node
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+NUM_PAYMENTS: int = 5
+
+
+def test_GIVEN_async_client_WHEN_payment_requests_are_created_and_paid_THEN_receipts_are_read_in_batches(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    erc_20.transfer(payer.address, TOKEN_AMOUNT * NUM_PAYMENTS, {"from": owner})
+
+    async def run() -> tuple[list[int], list[int], list[ReceiptData], list[TokenAmountInfo], int]:
+        async with AsyncPaymentRequestClient(web3.provider.endpoint_uri) as client:
+            async_payment_request: AsyncPaymentRequest = client.payment_request(payment_request.address)
+            await client.erc20(erc_20.address).approve(
+                payment_request.address, TOKEN_AMOUNT * NUM_PAYMENTS, sender=payer.address
+            )
+            payment_request_ids: list[int] = [
+                await async_payment_request.create_with_static_token_amount(
+                    [(erc_20.address, TOKEN_AMOUNT)], ADDRESS_ZERO, ADDRESS_ZERO, ADDRESS_ZERO, sender=owner.address
+                )
+                for _ in range(NUM_PAYMENTS)
+            ]
+            receipt_ids: list[int] = [
+                await async_payment_request.pay(payment_request_id, erc_20.address, sender=payer.address)
+                for payment_request_id in payment_request_ids
+            ]
+
+            receipt: AsyncReceipt = await async_payment_request.get_receipt()
+            num_batches: int = client.rpc.num_batches
+            receipts: list[ReceiptData] = await asyncio.gather(*map(receipt.get_receipt_data, receipt_ids))
+            token_amount_infos: list[TokenAmountInfo] = await async_payment_request.get_static_token_amount_infos(
+                payment_request_ids[0]
+            )
+            return (
+                payment_request_ids,
+                receipt_ids,
+                receipts,
+                token_amount_infos,
+                client.rpc.num_batches - num_batches - 1,
+            )
+
+    # WHEN
+    payment_request_ids, receipt_ids, receipts, token_amount_infos, num_receipt_batches = asyncio.run(run())
+
+    # THEN
+    assert [payment_request.ownerOf(payment_request_id) for payment_request_id in payment_request_ids] == [
+        owner.address
+    ] * NUM_PAYMENTS
+    assert receipts == [
+        ReceiptData(
+            payment_request.address, payment_request_id, erc_20.address, TOKEN_AMOUNT, payer.address, owner.address
+        )
+        for payment_request_id in payment_request_ids
+    ]
+    assert token_amount_infos == [TokenAmountInfo(erc_20.address, TOKEN_AMOUNT)]
+    # the concurrent reads of the Receipts are sent as a single batch
+    assert num_receipt_batches == 1
+    assert erc_20.balanceOf(payer.address) == 0
+
+
+def test_GIVEN_async_client_WHEN_contracts_are_obtained_twice_THEN_they_are_cached_by_address(*args, **kwargs):
+    # GIVEN
+    client: AsyncPaymentRequestClient = AsyncPaymentRequestClient(web3.provider.endpoint_uri)
+    address: str = accounts[0].address
+
+    # WHEN
+    first: AsyncPaymentRequest = client.payment_request(address.lower())
+    second: AsyncPaymentRequest = client.payment_request(address)
+
+    # THEN
+    assert first is second
+    assert client.receipt(address) is not first
+
+
+def test_GIVEN_disabled_payment_request_WHEN_paid_with_async_client_THEN_decoded_error_is_raised(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    payment_request.disable(payment_request_id, {"from": owner})
+
+    async def run() -> None:
+        async with AsyncPaymentRequestClient(web3.provider.endpoint_uri) as client:
+            await client.payment_request(payment_request.address).pay(
+                payment_request_id, erc_20.address, sender=payer.address
+            )
+
+    # WHEN
+    with pytest.raises(ContractCallException) as e:
+        asyncio.run(run())
+
+    # THEN
+    assert e.value.error is not None
+    assert e.value.error.failed_at == PaymentFailedAt.NOT_ENABLED
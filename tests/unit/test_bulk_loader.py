@@ -0,0 +1,304 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable
+
+import pytest
+from brownie import PaymentRequest, MyERC20
+from brownie import accounts, web3
+from brownie.network.account import Account, LocalAccount
+from eth_account import Account as EthAccount
+
+from scripts.utils.async_client import AsyncPaymentRequestClient
+from scripts.utils.bulk_loader import (
+    DEFAULT_ESTIMATE_CHUNK_SIZE,
+    BulkLoader,
+    BulkLoaderException,
+    CatalogueRow,
+    LoadCheckpoint,
+    LoadSummary,
+    RowStatus,
+    SubmittedRow,
+    read_rows,
+)
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.json_rpc import JsonRpcBatchClient, JsonRpcException
+
+# the async client sends its requests over HTTP, to the endpoint of the node
+pytestmark = pytest.mark.requires_node
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+NUM_ROWS: int = 4
+TARGET_BLOCK_GAS_FRACTION: float = 0.05
+
+
+def _fund_creator() -> LocalAccount:
+    creator: LocalAccount = accounts.add()
+    accounts[0].transfer(creator, 10 ** 18)
+    return creator
+
+
+def _load(
+    payment_request: PaymentRequest,
+    creator: LocalAccount,
+    rows: Iterable[CatalogueRow],
+    checkpoint: LoadCheckpoint,
+    retry_failed: bool = False,
+    estimate_chunk_size: int = DEFAULT_ESTIMATE_CHUNK_SIZE,
+) -> LoadSummary:
+    async def run() -> LoadSummary:
+        async with AsyncPaymentRequestClient(web3.provider.endpoint_uri) as client:
+            loader: BulkLoader = BulkLoader(
+                client=client,
+                payment_request=payment_request.address,
+                account=EthAccount.from_key(creator.private_key),
+                checkpoint=checkpoint,
+                target_block_gas_fraction=TARGET_BLOCK_GAS_FRACTION,
+                retry_failed=retry_failed,
+                estimate_chunk_size=estimate_chunk_size,
+            )
+            return await loader.load(rows)
+
+    return asyncio.run(run())
+
+
+def test_GIVEN_csv_catalogue_WHEN_loaded_THEN_payment_requests_are_created_in_batches_under_gas_budget(
+    tmp_path: Path, *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    creator: LocalAccount = _fund_creator()
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20s: list[MyERC20] = [contract_builder.MyERC20 for _ in range(2)]
+    catalogue_path: Path = tmp_path / "catalogue.csv"
+    catalogue_path.write_text(
+        "id,token_amounts,from\n"
+        + "".join(
+            f"sku-{i},{erc_20s[0].address}:{10 + i};{erc_20s[1].address}:{20 + i},{owner.address if i == 0 else ''}\n"
+            for i in range(NUM_ROWS)
+        )
+    )
+    checkpoint: LoadCheckpoint = LoadCheckpoint(tmp_path / "checkpoint.sqlite")
+
+    # WHEN
+    summary: LoadSummary = _load(payment_request, creator, read_rows(catalogue_path), checkpoint)
+
+    # THEN
+    assert summary.num_created == NUM_ROWS
+    assert summary.num_failed == 0
+    assert summary.num_batches > 1
+    assert max(summary.batch_gas) <= web3.eth.get_block("latest").gasLimit * TARGET_BLOCK_GAS_FRACTION
+    i: int
+    for i in range(NUM_ROWS):
+        payment_request_id: int = checkpoint.get_payment_request_id(f"sku-{i}")
+        assert payment_request.ownerOf(payment_request_id) == creator.address
+        assert [tuple(info) for info in payment_request.getStaticTokenAmountInfos(payment_request_id)] == [
+            (erc_20s[0].address, 10 + i),
+            (erc_20s[1].address, 20 + i),
+        ]
+    assert list(payment_request.getPaymentRequestIdsRequestedFrom(owner.address)) == [
+        checkpoint.get_payment_request_id("sku-0")
+    ]
+    checkpoint.close()
+
+
+def test_GIVEN_interrupted_jsonl_load_WHEN_loaded_again_THEN_only_remaining_rows_are_created(
+    tmp_path: Path, *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    creator: LocalAccount = _fund_creator()
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    catalogue_path: Path = tmp_path / "catalogue.jsonl"
+    catalogue_path.write_text(
+        "".join(
+            json.dumps({"id": f"sku-{i}", "token_amounts": [{"token": erc_20.address, "amount": 10 + i}]}) + "\n"
+            for i in range(NUM_ROWS)
+        )
+    )
+    checkpoint: LoadCheckpoint = LoadCheckpoint(tmp_path / "checkpoint.sqlite")
+    interrupted_summary: LoadSummary = _load(
+        payment_request, creator, list(read_rows(catalogue_path))[: NUM_ROWS // 2], checkpoint
+    )
+
+    # WHEN
+    summary: LoadSummary = _load(payment_request, creator, read_rows(catalogue_path), checkpoint)
+
+    # THEN
+    assert interrupted_summary.num_created == NUM_ROWS // 2
+    assert summary.num_skipped == NUM_ROWS // 2
+    assert summary.num_created == NUM_ROWS - NUM_ROWS // 2
+    assert payment_request.balanceOf(creator.address) == NUM_ROWS
+    assert sorted(checkpoint.get_payment_request_id(f"sku-{i}") for i in range(NUM_ROWS)) == sorted(
+        payment_request.tokenOfOwnerByIndex(creator.address, i) for i in range(NUM_ROWS)
+    )
+    checkpoint.close()
+
+
+def _get_rows(erc_20: MyERC20) -> list[CatalogueRow]:
+    return [CatalogueRow(row_id=f"sku-{i}", token_amounts=((erc_20.address, 10 + i),)) for i in range(NUM_ROWS)]
+
+
+def _load_until_first_send(
+    monkeypatch,
+    payment_request: PaymentRequest,
+    creator: LocalAccount,
+    rows: list[CatalogueRow],
+    checkpoint: LoadCheckpoint,
+) -> list[SubmittedRow]:
+    """
+    Interrupts a load as its first batch is about to be sent: its transactions are signed and recorded, not sent.
+    """
+
+    async def send(self: BulkLoader, row: SubmittedRow) -> None:
+        raise BulkLoaderException("Interrupted")
+
+    with monkeypatch.context() as context:
+        context.setattr(BulkLoader, "_send", send)
+        with pytest.raises(BulkLoaderException):
+            _load(payment_request, creator, rows, checkpoint)
+    return checkpoint.get_submitted()
+
+
+def test_GIVEN_load_interrupted_before_sending_WHEN_loaded_again_THEN_signed_transactions_are_sent_and_mined(
+    monkeypatch, tmp_path: Path, *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    creator: LocalAccount = _fund_creator()
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    rows: list[CatalogueRow] = _get_rows(contract_builder.MyERC20)
+    checkpoint: LoadCheckpoint = LoadCheckpoint(tmp_path / "checkpoint.sqlite")
+    submitted_rows: list[SubmittedRow] = _load_until_first_send(monkeypatch, payment_request, creator, rows, checkpoint)
+
+    # WHEN
+    summary: LoadSummary = _load(payment_request, creator, rows, checkpoint)
+
+    # THEN
+    assert 0 < len(submitted_rows) < NUM_ROWS
+    assert web3.eth.get_transaction_count(creator.address) == NUM_ROWS
+    assert summary.num_resumed == len(submitted_rows)
+    assert summary.num_created == NUM_ROWS
+    assert summary.num_skipped == len(submitted_rows)
+    assert payment_request.balanceOf(creator.address) == NUM_ROWS
+    submitted_row: SubmittedRow
+    for submitted_row in submitted_rows:
+        assert checkpoint.get_status(submitted_row.row_id) == RowStatus.CREATED
+        assert web3.eth.get_transaction(submitted_row.tx_hash)["nonce"] == submitted_row.nonce
+    checkpoint.close()
+
+
+def test_GIVEN_nonce_of_recorded_transactions_taken_WHEN_loaded_again_THEN_their_rows_are_loaded_again(
+    monkeypatch, tmp_path: Path, *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    creator: LocalAccount = _fund_creator()
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    rows: list[CatalogueRow] = _get_rows(contract_builder.MyERC20)
+    checkpoint: LoadCheckpoint = LoadCheckpoint(tmp_path / "checkpoint.sqlite")
+    submitted_rows: list[SubmittedRow] = _load_until_first_send(monkeypatch, payment_request, creator, rows, checkpoint)
+    # another transaction of the creator takes the nonce of the first recorded one
+    creator.transfer(owner, 0)
+
+    # WHEN
+    summary: LoadSummary = _load(payment_request, creator, rows, checkpoint)
+
+    # THEN
+    assert submitted_rows[0].nonce == 0
+    # the transfer and the transactions of the rows, the one recorded with the taken nonce is signed again
+    assert web3.eth.get_transaction_count(creator.address) == NUM_ROWS + 1
+    assert summary.num_resumed == len(submitted_rows) - 1
+    assert summary.num_created == NUM_ROWS
+    assert payment_request.balanceOf(creator.address) == NUM_ROWS
+    assert checkpoint.get_status(submitted_rows[0].row_id) == RowStatus.CREATED
+    checkpoint.close()
+
+
+def test_GIVEN_failed_row_WHEN_loaded_again_with_retry_failed_THEN_it_is_created(tmp_path: Path, *args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    creator: LocalAccount = _fund_creator()
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    # the same token twice, the creation reverts
+    failing_row: CatalogueRow = CatalogueRow(row_id="sku-0", token_amounts=((erc_20.address, 10), (erc_20.address, 20)))
+    fixed_row: CatalogueRow = CatalogueRow(row_id="sku-0", token_amounts=((erc_20.address, 10),))
+    checkpoint: LoadCheckpoint = LoadCheckpoint(tmp_path / "checkpoint.sqlite")
+    failed_summary: LoadSummary = _load(payment_request, creator, [failing_row], checkpoint)
+
+    # WHEN
+    skipped_summary: LoadSummary = _load(payment_request, creator, [fixed_row], checkpoint)
+    retried_summary: LoadSummary = _load(payment_request, creator, [fixed_row], checkpoint, retry_failed=True)
+
+    # THEN
+    assert failed_summary.num_failed == 1
+    assert skipped_summary.num_skipped == 1
+    assert skipped_summary.num_created == 0
+    assert retried_summary.num_retried == 1
+    assert retried_summary.num_created == 1
+    assert checkpoint.get_status("sku-0") == RowStatus.CREATED
+    assert payment_request.ownerOf(checkpoint.get_payment_request_id("sku-0")) == creator.address
+    checkpoint.close()
+
+
+def test_GIVEN_node_error_on_gas_estimation_WHEN_loaded_THEN_rows_are_not_recorded_as_failed(
+    monkeypatch, tmp_path: Path, *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    creator: LocalAccount = _fund_creator()
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    rows: list[CatalogueRow] = _get_rows(contract_builder.MyERC20)
+    checkpoint: LoadCheckpoint = LoadCheckpoint(tmp_path / "checkpoint.sqlite")
+    request: Callable[..., Awaitable[Any]] = JsonRpcBatchClient.request
+
+    async def overloaded_request(self: JsonRpcBatchClient, method: str, params: list) -> Any:
+        if method == "eth_estimateGas":
+            raise JsonRpcException(-32005, "request rate limit exceeded")
+        return await request(self, method, params)
+
+    # WHEN
+    with monkeypatch.context() as context:
+        context.setattr(JsonRpcBatchClient, "request", overloaded_request)
+        with pytest.raises(BulkLoaderException):
+            _load(payment_request, creator, rows, checkpoint)
+    summary: LoadSummary = _load(payment_request, creator, rows, checkpoint)
+
+    # THEN
+    assert summary.num_skipped == 0
+    assert summary.num_created == NUM_ROWS
+    checkpoint.close()
+
+
+def test_GIVEN_row_repeated_in_later_chunk_WHEN_loaded_THEN_load_fails_before_signing_it_twice(
+    tmp_path: Path, *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    creator: LocalAccount = _fund_creator()
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    row: CatalogueRow = _get_rows(contract_builder.MyERC20)[0]
+    checkpoint: LoadCheckpoint = LoadCheckpoint(tmp_path / "checkpoint.sqlite")
+
+    # WHEN
+    with pytest.raises(BulkLoaderException, match="appears twice"):
+        # the first one is still in the unsubmitted batch when its duplicate is read, in the next estimate chunk
+        _load(payment_request, creator, [row, row], checkpoint, estimate_chunk_size=1)
+
+    # THEN
+    assert checkpoint.get_next_nonce() == 0
+    checkpoint.close()
@@ -0,0 +1,64 @@
+import pytest
+from brownie import MyERC20
+from brownie import accounts, chain
+from brownie.network.account import Account
+
+from scripts.utils.chain_cache import compute_cache_key, register_fixtures
+from scripts.utils.contract import MY_ERC20_DEPLOY_ARGS, ContractBuilder, get_or_create_deployed_instance
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def test_GIVEN_changed_bytecode_or_constructor_args_WHEN_cache_key_computed_THEN_key_changes(*args, **kwargs):
+    # GIVEN
+    bytecodes: dict[str, str] = {"PaymentRequest": "0x6080", "Receipt": "0x6081"}
+    constructor_args_source: str = 'args: tuple = (Receipt, account, "Receipt", "RCT")'
+    node_settings: dict = {"accounts": 10, "mnemonic": "brownie"}
+
+    # WHEN
+    key: str = compute_cache_key(
+        bytecodes=bytecodes, constructor_args_source=constructor_args_source, node_settings=node_settings
+    )
+
+    # THEN
+    assert key == compute_cache_key(
+        bytecodes=dict(reversed(bytecodes.items())),
+        constructor_args_source=constructor_args_source,
+        node_settings=node_settings,
+    )
+    assert key != compute_cache_key(
+        bytecodes={**bytecodes, "Receipt": "0x6082"},
+        constructor_args_source=constructor_args_source,
+        node_settings=node_settings,
+    )
+    assert key != compute_cache_key(
+        bytecodes=bytecodes,
+        constructor_args_source=constructor_args_source.replace("RCT", "RCP"),
+        node_settings=node_settings,
+    )
+    assert key != compute_cache_key(
+        bytecodes=bytecodes,
+        constructor_args_source=constructor_args_source,
+        node_settings={**node_settings, "mnemonic": "other"},
+    )
+
+
+def test_GIVEN_registered_cached_fixture_WHEN_chain_reset_THEN_it_is_still_returned_by_get_or_create(*args, **kwargs):
+    # GIVEN
+    account: Account = accounts[0]
+    erc20: MyERC20 = ContractBuilder(account=account, force_deploy=True).MyERC20
+    address: str = erc20.address
+    # the cached fixtures are part of the chain brownie connects to, they have no known deployment transaction
+    MyERC20.remove(erc20)
+    chain.snapshot()
+
+    # WHEN
+    register_fixtures({"MyERC20": [address]})
+    chain.revert()
+
+    # THEN
+    assert len(MyERC20) == 1
+    assert get_or_create_deployed_instance(MyERC20, account, *MY_ERC20_DEPLOY_ARGS).address == address
@@ -0,0 +1,195 @@
+import pytest
+from brownie import PaymentRequest, MyERC20
+from brownie import accounts, web3
+from brownie.exceptions import VirtualMachineError
+from brownie.network.account import Account
+from brownie.network.transaction import TransactionReceipt
+
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.errors import ERROR_REGISTRY, DecodedError, get_revert_data_from_call_response
+from tests.configuration import TOKEN_AMOUNT, create_static_payment_request
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def _call_reverted_getter(payment_request: PaymentRequest, getter: str, *args) -> DecodedError:
+    response: dict = web3.provider.make_request(
+        "eth_call",
+        [{"to": payment_request.address, "data": getattr(payment_request, getter).encode_input(*args)}, "latest"],
+    )
+    decoded_error: DecodedError = ERROR_REGISTRY.decode(get_revert_data_from_call_response(response))
+    assert decoded_error is not None
+    return decoded_error
+
+
+def test_GIVEN_payment_request_WHEN_owner_closes_it_THEN_it_is_burned_and_its_state_is_cleared(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    assert payment_request.isClosed(payment_request_id) == False
+
+    # WHEN
+    tx: TransactionReceipt = payment_request.close(payment_request_id, {"from": owner})
+
+    # THEN
+    assert "PaymentRequestClosed" in tx.events
+    assert tx.events["PaymentRequestClosed"]["paymentRequestId"] == payment_request_id
+    assert payment_request.isClosed(payment_request_id) == True
+    assert payment_request.isEnabled(payment_request_id) == False
+    assert payment_request.balanceOf(owner.address) == 0
+    assert payment_request.totalSupply() == 0
+
+    with pytest.raises(VirtualMachineError):
+        payment_request.pay(payment_request_id, erc_20.address, {"from": payer})
+
+    with pytest.raises(VirtualMachineError):
+        payment_request.close(payment_request_id, {"from": owner})
+
+
+def test_GIVEN_payment_request_WHEN_non_owner_closes_it_THEN_it_fails(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    not_owner: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+
+    # WHEN/THEN
+    with pytest.raises(VirtualMachineError):
+        payment_request.close(payment_request_id, {"from": not_owner})
+
+    assert payment_request.isClosed(payment_request_id) == False
+    assert payment_request.isEnabled(payment_request_id) == True
+
+
+def test_GIVEN_not_created_payment_request_WHEN_checking_if_closed_THEN_it_is_not(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+
+    # WHEN/THEN
+    assert payment_request.isClosed(0) == False
+
+
+def test_GIVEN_multiple_payment_requests_WHEN_owner_closes_many_THEN_only_those_are_closed(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_ids: list[int] = [
+        create_static_payment_request(payment_request, erc_20, owner) for _ in range(3)
+    ]
+
+    # WHEN
+    tx: TransactionReceipt = payment_request.closeMany(payment_request_ids[:2], {"from": owner})
+
+    # THEN
+    assert len(tx.events["PaymentRequestClosed"]) == 2
+    assert payment_request.isClosed(payment_request_ids[0]) == True
+    assert payment_request.isClosed(payment_request_ids[1]) == True
+    assert payment_request.isClosed(payment_request_ids[2]) == False
+    assert payment_request.totalSupply() == 1
+    assert payment_request.tokenOfOwnerByIndex(owner.address, 0) == payment_request_ids[2]
+
+
+def test_GIVEN_restricted_payment_request_WHEN_paid_and_closed_THEN_it_is_removed_from_requested_from_list(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    first_id: int = create_static_payment_request(payment_request, erc_20, owner, payer.address)
+    second_id: int = create_static_payment_request(payment_request, erc_20, owner, payer.address)
+    assert payment_request.getPaymentRequestIdsRequestedFrom(payer.address) == [first_id, second_id]
+
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, TOKEN_AMOUNT, {"from": payer})
+    tx: TransactionReceipt = payment_request.pay(first_id, erc_20.address, {"from": payer})
+    assert "PaymentRequestDisabled" in tx.events
+    assert payment_request.isEnabled(first_id) == False
+
+    # WHEN
+    payment_request.close(first_id, {"from": owner})
+
+    # THEN
+    assert payment_request.isClosed(first_id) == True
+    assert payment_request.getPaymentRequestIdsRequestedFrom(payer.address) == [second_id]
+    assert _call_reverted_getter(payment_request, "getRestrictedAddress", first_id).name == "PaymentRequestIsClosed"
+
+
+@pytest.mark.parametrize(
+    "getter",
+    [
+        "isTokenAmountStatic",
+        "isTokenAmountDynamic",
+        "isPaymentPreconditionSet",
+        "isPaymentPostActionSet",
+        "getPaymentPrecondition",
+        "getPostPaymentAction",
+        "getDynamicTokenAmount",
+        "isRestricted",
+        "getRestrictedAddress",
+        "getNumberOfPayments",
+        "isLeanEvents",
+        "getNumberOfStaticTokens",
+        "getStaticTokens",
+        "getStaticTokenAmountInfos",
+        "getTotalsCollected",
+    ],
+)
+def test_GIVEN_closed_payment_request_WHEN_getter_is_called_THEN_it_reverts_with_payment_request_is_closed(
+    getter: str, *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    payment_request.close(payment_request_id, {"from": owner})
+
+    # WHEN
+    decoded_error: DecodedError = _call_reverted_getter(payment_request, getter, payment_request_id)
+
+    # THEN
+    assert decoded_error.name == "PaymentRequestIsClosed"
+    assert decoded_error.payment_request_id == payment_request_id
+    assert decoded_error.failed_at is None
+
+
+def test_GIVEN_closed_payment_request_WHEN_token_getters_are_called_THEN_they_revert_with_payment_request_is_closed(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    payment_request.close(payment_request_id, {"from": owner})
+
+    # WHEN
+    decoded_errors: list[DecodedError] = [
+        _call_reverted_getter(payment_request, "getStaticAmountForToken", payment_request_id, erc_20.address),
+        _call_reverted_getter(payment_request, "isStaticTokenAccepted", payment_request_id, erc_20.address),
+        _call_reverted_getter(payment_request, "getStaticTokenAmountInfoByIndex", payment_request_id, 0),
+    ]
+
+    # THEN
+    decoded_error: DecodedError
+    for decoded_error in decoded_errors:
+        assert decoded_error.name == "PaymentRequestIsClosed"
+        assert decoded_error.payment_request_id == payment_request_id
@@ -0,0 +1,140 @@
+import pytest
+from brownie import PaymentRequest, MyERC20, Receipt
+from brownie import accounts, web3
+from brownie.network.account import Account
+from brownie.network.transaction import TransactionReceipt
+from brownie.test import given, strategy
+from hexbytes import HexBytes
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.codec import (
+    PAYMENT_REQUEST_CREATED_TOPIC,
+    PAYMENT_REQUEST_PAID_TOPIC,
+    TRANSFER_TOPIC,
+    decode_payment_request_created,
+    decode_payment_request_paid,
+    decode_receipt_data,
+    decode_token_amount_infos,
+    decode_transfer,
+    encode_approve,
+    encode_create_with_static_token_amount,
+    encode_pay,
+)
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.indexer import get_event_definition
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+TOKEN_AMOUNTS: list[int] = [10, 20, 30]
+
+
+def _get_log(tx: TransactionReceipt, address: str, topic: bytes) -> tuple[list[bytes], bytes]:
+    log: dict = next(
+        log
+        for log in web3.eth.get_transaction_receipt(tx.txid)["logs"]
+        if log["address"] == address and HexBytes(log["topics"][0]) == topic
+    )
+    return [bytes(HexBytes(topic)) for topic in log["topics"]], bytes(HexBytes(log["data"]))
+
+
+@given(
+    payment_request_id=strategy("uint256"),
+    amount=strategy("uint256"),
+    address=strategy("address"),
+)
+def test_GIVEN_arguments_WHEN_encoded_by_fast_path_THEN_calldata_is_the_same_as_brownie_calldata(
+    payment_request_id: int, amount: int, address: Account, *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    token_amounts: list[tuple[str, int]] = [(address.address, amount), (erc_20.address, payment_request_id)]
+
+    # WHEN
+    pay_calldata: bytes = encode_pay(payment_request_id, address.address)
+    create_calldata: bytes = encode_create_with_static_token_amount(
+        token_amounts, ADDRESS_ZERO, erc_20.address, address.address
+    )
+    approve_calldata: bytes = encode_approve(address.address, amount)
+
+    # THEN
+    assert pay_calldata == HexBytes(payment_request.pay.encode_input(payment_request_id, address.address))
+    assert create_calldata == HexBytes(
+        payment_request.createWithStaticTokenAmount.encode_input(
+            token_amounts, ADDRESS_ZERO, erc_20.address, address.address
+        )
+    )
+    assert approve_calldata == HexBytes(erc_20.approve.encode_input(address.address, amount))
+
+
+def test_GIVEN_invalid_arguments_WHEN_encoded_by_fast_path_THEN_value_error_is_raised(*args, **kwargs):
+    # GIVEN
+    token: str = accounts[0].address
+
+    # WHEN/THEN
+    with pytest.raises(ValueError):
+        encode_pay(-1, token)
+    with pytest.raises(ValueError):
+        encode_pay(2 ** 256, token)
+    with pytest.raises(ValueError):
+        encode_approve(token[2:], 1)
+
+
+def test_GIVEN_paid_payment_request_WHEN_values_decoded_by_fast_path_THEN_they_are_the_same_as_brownie_values(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20s: list[MyERC20] = [contract_builder.MyERC20 for _ in TOKEN_AMOUNTS]
+    receipt: Receipt = Receipt.at(payment_request.receipt())
+    create_tx: TransactionReceipt = payment_request.createWithStaticTokenAmount(
+        [(erc_20.address, amount) for erc_20, amount in zip(erc_20s, TOKEN_AMOUNTS)],
+        ADDRESS_ZERO,
+        ADDRESS_ZERO,
+        ADDRESS_ZERO,
+        {"from": owner},
+    )
+    payment_request_id: int = create_tx.return_value
+    erc_20s[1].transfer(payer.address, TOKEN_AMOUNTS[1], {"from": owner})
+    erc_20s[1].approve(payment_request.address, TOKEN_AMOUNTS[1], {"from": payer})
+    pay_tx: TransactionReceipt = payment_request.pay(payment_request_id, erc_20s[1].address, {"from": payer})
+    receipt_id: int = pay_tx.return_value
+
+    # WHEN
+    receipt_data: tuple = decode_receipt_data(
+        bytes(web3.eth.call({"to": receipt.address, "data": receipt.getReceiptData.encode_input(receipt_id)}))
+    )
+    token_amount_infos: list[tuple[str, int]] = decode_token_amount_infos(
+        bytes(
+            web3.eth.call(
+                {
+                    "to": payment_request.address,
+                    "data": payment_request.getStaticTokenAmountInfos.encode_input(payment_request_id),
+                }
+            )
+        )
+    )
+    paid_log: tuple[list[bytes], bytes] = _get_log(pay_tx, payment_request.address, PAYMENT_REQUEST_PAID_TOPIC)
+    paid: tuple = decode_payment_request_paid(*paid_log)
+    created: tuple = decode_payment_request_created(
+        *_get_log(create_tx, payment_request.address, PAYMENT_REQUEST_CREATED_TOPIC)
+    )
+    # the mint of the Receipt, the token transfer has the same topic
+    transfer: tuple = decode_transfer(*_get_log(pay_tx, receipt.address, TRANSFER_TOPIC))
+
+    # THEN
+    assert receipt_data == tuple(receipt.getReceiptData(receipt_id))
+    assert token_amount_infos == [tuple(info) for info in payment_request.getStaticTokenAmountInfos(payment_request_id)]
+    assert paid == get_event_definition("PaymentRequestPaid").decode(*paid_log)
+    assert paid == (payment_request_id, receipt_id, erc_20s[1].address, TOKEN_AMOUNTS[1], payer.address, owner.address)
+    assert created == (payment_request_id, owner.address, ADDRESS_ZERO, True)
+    assert transfer == (ADDRESS_ZERO, payer.address, receipt_id)
@@ -0,0 +1,141 @@
+import pytest
+from brownie import PaymentRequest, MyERC20, Receipt, FixedDynamicTokenAmount
+from brownie import accounts
+from brownie.exceptions import VirtualMachineError
+from brownie.network.account import Account
+from brownie.network.contract import Contract
+from brownie.network.transaction import TransactionReceipt, Status
+from brownie.test import given, strategy
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.calldata import pack_payment, unpack_payment
+from scripts.utils.contract import ContractBuilder
+from tests.asserters import (
+    assert_expected_events_occurred_for_successful_transaction,
+    assert_receipt_metadata_is_correct,
+)
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+@given(
+    payment_request_id=strategy("uint128"),
+    token_index=strategy("uint64"),
+    flags=strategy("uint64"),
+)
+def test_GIVEN_payment_request_id_token_index_and_flags_WHEN_packed_and_unpacked_THEN_original_values_are_obtained(
+    payment_request_id: int, token_index: int, flags: int, *args, **kwargs
+):
+    packed_payment: int = pack_payment(payment_request_id=payment_request_id, token_index=token_index, flags=flags)
+    assert packed_payment < 2**256
+    assert unpack_payment(packed_payment) == (payment_request_id, token_index, flags)
+
+
+@given(num_tokens=strategy("uint256", min_value=1, max_value=5), price_in_tokens=strategy("uint256", min_value=0, max_value=999))
+def test_GIVEN_static_token_amounts_WHEN_paying_with_packed_token_index_THEN_indexed_token_is_paid(
+    num_tokens: int, price_in_tokens: int, *args, **kwargs
+):
+    # GIVEN
+    deployer: Account = accounts[0]
+    purchaser: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=deployer, force_deploy=True)
+
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    tokens: list[MyERC20] = [contract_builder.MyERC20 for _ in range(num_tokens)]
+    tx: TransactionReceipt = payment_request.createWithStaticTokenAmount(
+        [(token.address, price_in_tokens + index) for index, token in enumerate(tokens)],
+        ADDRESS_ZERO,
+        ADDRESS_ZERO,
+        ADDRESS_ZERO,
+        {"from": deployer},
+    )
+    assert tx.status == Status.Confirmed
+    payment_request_id: int = tx.return_value
+
+    token_index: int = num_tokens - 1
+    token: MyERC20 = tokens[token_index]
+    token_amount: int = price_in_tokens + token_index
+    token.transfer(purchaser.address, token_amount, {"from": deployer})
+    token.approve(payment_request.address, token_amount, {"from": purchaser})
+
+    # WHEN
+    tx = payment_request.payPacked(
+        pack_payment(payment_request_id=payment_request_id, token_index=token_index),
+        {"from": purchaser},
+    )
+
+    # THEN
+    assert tx.status == Status.Confirmed
+    assert_expected_events_occurred_for_successful_transaction(
+        payment_request=payment_request,
+        payment_request_id=payment_request_id,
+        tx=tx,
+    )
+    assert tx.events["PaymentRequestPaid"]["token"] == token.address
+    assert token.balanceOf(purchaser.address) == 0
+
+    receipt: Receipt = Contract.from_abi("Receipt", payment_request.receipt(), Receipt.abi)
+    assert_receipt_metadata_is_correct(
+        receipt=receipt,
+        receipt_id=tx.return_value,
+        payment_request_addr=payment_request.address,
+        payment_request_id=payment_request_id,
+        token_addr=token.address,
+        token_amount=token_amount,
+        payer_addr=purchaser.address,
+        payee_addr=deployer.address,
+    )
+
+
+def test_GIVEN_static_token_amounts_WHEN_paying_with_invalid_packed_payment_THEN_payment_fails(*args, **kwargs):
+    # GIVEN
+    deployer: Account = accounts[0]
+    purchaser: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=deployer, force_deploy=True)
+
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    tx: TransactionReceipt = payment_request.createWithStaticTokenAmount(
+        [(erc_20.address, 0)], ADDRESS_ZERO, ADDRESS_ZERO, ADDRESS_ZERO, {"from": deployer}
+    )
+    payment_request_id: int = tx.return_value
+
+    # WHEN / THEN
+    with pytest.raises(VirtualMachineError):
+        # only one token accepted
+        payment_request.payPacked(
+            pack_payment(payment_request_id=payment_request_id, token_index=1), {"from": purchaser}
+        )
+
+    with pytest.raises(VirtualMachineError):
+        # no flags are defined
+        payment_request.payPacked(
+            pack_payment(payment_request_id=payment_request_id, token_index=0, flags=1), {"from": purchaser}
+        )
+
+    tx = payment_request.payPacked(
+        pack_payment(payment_request_id=payment_request_id, token_index=0), {"from": purchaser}
+    )
+    assert tx.status == Status.Confirmed
+
+
+def test_GIVEN_dynamic_token_amount_WHEN_paying_with_packed_payment_THEN_payment_fails(*args, **kwargs):
+    # GIVEN
+    deployer: Account = accounts[0]
+    contract_builder: ContractBuilder = ContractBuilder(account=deployer, force_deploy=True)
+
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    price_computer: FixedDynamicTokenAmount = contract_builder.FixedPricePaymentComputer
+    tx: TransactionReceipt = payment_request.createWithDynamicTokenAmount(
+        price_computer.address, ADDRESS_ZERO, ADDRESS_ZERO, ADDRESS_ZERO, {"from": deployer}
+    )
+    payment_request_id: int = tx.return_value
+
+    # WHEN / THEN
+    with pytest.raises(VirtualMachineError):
+        payment_request.payPacked(
+            pack_payment(payment_request_id=payment_request_id, token_index=0), {"from": deployer}
+        )
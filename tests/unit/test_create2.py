@@ -0,0 +1,107 @@
+import pytest
+from brownie import DisablePaymentRequestPaymentPostAction, MyPostPaymentAction, PaymentRequest
+from brownie import accounts
+from brownie.network.account import Account
+from brownie.network.contract import ProjectContract
+from eth_utils import keccak
+
+from scripts.utils.contract import ContractBuilder, get_create2_deployer
+from scripts.utils.create2 import (
+    Create2Deployer,
+    PaymentRequestStack,
+    compute_create2_address,
+    compute_factory_address,
+    get_init_code,
+    salt_from_label,
+)
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def test_GIVEN_salt_WHEN_address_computed_offline_THEN_it_matches_factory_and_deployment(*args, **kwargs):
+    # GIVEN
+    account: Account = accounts[0]
+    deployer: Create2Deployer = get_create2_deployer(account)
+    salt: bytes = salt_from_label("merchant-1")
+    init_code: bytes = get_init_code(MyPostPaymentAction)
+
+    # WHEN
+    address: str = compute_create2_address(
+        factory=deployer.factory.address, deployer=account.address, salt=salt, init_code=init_code
+    )
+
+    # THEN
+    assert address == deployer.factory.computeAddress(account.address, salt, keccak(init_code))
+    assert deployer.deploy(MyPostPaymentAction, account=account, salt=salt).address == address
+    # a different deployer gets a different address for the same salt
+    assert deployer.compute_address(MyPostPaymentAction, deployer=accounts[1].address, salt=salt) != address
+
+
+def test_GIVEN_deployed_contract_WHEN_deployed_again_THEN_existing_instance_is_returned(*args, **kwargs):
+    # GIVEN
+    account: Account = accounts[0]
+    contract_builder: ContractBuilder = ContractBuilder(
+        account=account, force_deploy=True, salt=salt_from_label("idempotent")
+    )
+    first: ProjectContract = contract_builder.DisablePaymentRequestPaymentPostAction
+    nonce: int = account.nonce
+
+    # WHEN
+    second: ProjectContract = contract_builder.DisablePaymentRequestPaymentPostAction
+
+    # THEN
+    assert second.address == first.address
+    assert account.nonce == nonce
+
+
+def test_GIVEN_stack_WHEN_deployed_THEN_it_is_deployed_in_one_transaction_at_precomputed_addresses(*args, **kwargs):
+    # GIVEN
+    account: Account = accounts[0]
+    deployer: Create2Deployer = get_create2_deployer(account)
+    salt: bytes = salt_from_label("merchant-2")
+    callbacks: list = [(MyPostPaymentAction, ()), (DisablePaymentRequestPaymentPostAction, ())]
+    payment_request_address, receipt_address, callback_addresses = deployer.compute_stack_addresses(
+        deployer=account.address, salt=salt, name="Coffee", symbol="CFE", callbacks=callbacks
+    )
+
+    # WHEN
+    stack: PaymentRequestStack = deployer.deploy_stack(
+        account=account, salt=salt, name="Coffee", symbol="CFE", callbacks=callbacks
+    )
+
+    # THEN
+    assert stack.tx is not None
+    assert stack.payment_request.address == payment_request_address
+    assert stack.receipt.address == receipt_address
+    assert PaymentRequest.at(payment_request_address).receipt() == receipt_address
+    assert stack.receipt.owner() == payment_request_address
+    assert [callback.address for callback in stack.callbacks] == callback_addresses
+
+    assert deployer.deploy_stack(
+        account=account, salt=salt, name="Coffee", symbol="CFE", callbacks=callbacks
+    ).tx is None
+
+
+
+def test_GIVEN_accounts_with_distinct_nonces_WHEN_factory_deployed_THEN_it_is_at_deterministic_address(*args, **kwargs):
+    # GIVEN
+    first_account: Account = accounts[0]
+    second_account: Account = accounts[1]
+    # the nonce of the account doesn't play a role in the address of the factory
+    first_account.transfer(second_account, 1)
+    first_account.transfer(second_account, 1)
+
+    # WHEN
+    first_deployer: Create2Deployer = get_create2_deployer(first_account)
+    second_deployer: Create2Deployer = get_create2_deployer(second_account)
+    configured_deployer: Create2Deployer = get_create2_deployer(
+        second_account, factory_address=first_deployer.factory.address
+    )
+
+    # THEN
+    assert first_deployer.factory.address == compute_factory_address()
+    assert second_deployer.factory.address == compute_factory_address()
+    assert configured_deployer.factory.address == compute_factory_address()
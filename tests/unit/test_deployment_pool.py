@@ -0,0 +1,85 @@
+import pytest
+from brownie import MyERC20
+from brownie import accounts, chain, history
+from brownie.network.account import Account
+from brownie.network.transaction import TransactionReceipt
+
+from scripts.utils.contract import ContractBuilder
+from tests.deployment_pool import DeploymentPool
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def _deploy_erc20(account: Account) -> MyERC20:
+    return ContractBuilder(account=account, force_deploy=True).MyERC20
+
+
+def test_GIVEN_pooled_dependency_WHEN_checked_out_again_THEN_it_is_reused_and_state_is_reverted(*args, **kwargs):
+    # GIVEN
+    deployer: Account = accounts[0]
+    other: Account = accounts[1]
+    pool: DeploymentPool = DeploymentPool()
+
+    pool.checkout()
+    first_erc_20: MyERC20 = pool.get("MyERC20", deployer, lambda: _deploy_erc20(deployer))
+    second_erc_20: MyERC20 = pool.get("MyERC20", deployer, lambda: _deploy_erc20(deployer))
+    pool.commit()
+    first_erc_20.transfer(other.address, 5, {"from": deployer})
+    assert first_erc_20.balanceOf(other.address) == 5
+
+    # WHEN
+    pool.checkout()
+    reused_erc_20: MyERC20 = pool.get("MyERC20", deployer, lambda: _deploy_erc20(deployer))
+    pool.commit()
+
+    # THEN
+    assert first_erc_20.address != second_erc_20.address
+    assert reused_erc_20.address == first_erc_20.address
+    assert reused_erc_20.balanceOf(other.address) == 0
+    assert pool.num_deployments == 2
+
+
+def test_GIVEN_chain_reverted_past_snapshot_WHEN_checked_out_THEN_dependencies_are_deployed_again(*args, **kwargs):
+    # GIVEN
+    deployer: Account = accounts[0]
+    pool: DeploymentPool = DeploymentPool()
+
+    pool.checkout()
+    erc_20: MyERC20 = pool.get("MyERC20", deployer, lambda: _deploy_erc20(deployer))
+    pool.commit()
+    chain.revert()
+
+    # WHEN
+    pool.checkout()
+    redeployed_erc_20: MyERC20 = pool.get("MyERC20", deployer, lambda: _deploy_erc20(deployer))
+
+    # THEN
+    assert pool.num_deployments == 1
+    assert redeployed_erc_20.totalSupply() > 0
+    assert redeployed_erc_20 is not erc_20
+
+
+def test_GIVEN_transactions_after_snapshot_WHEN_checked_out_THEN_they_are_dropped_from_history_and_containers(
+    *args, **kwargs
+):
+    # GIVEN
+    deployer: Account = accounts[0]
+    other: Account = accounts[1]
+    pool: DeploymentPool = DeploymentPool()
+
+    pool.checkout()
+    erc_20: MyERC20 = pool.get("MyERC20", deployer, lambda: _deploy_erc20(deployer))
+    pool.commit()
+    tx: TransactionReceipt = erc_20.transfer(other.address, 5, {"from": deployer})
+    not_pooled_erc_20: MyERC20 = _deploy_erc20(deployer)
+
+    # WHEN
+    pool.checkout()
+
+    # THEN
+    assert tx not in history
+    assert erc_20 in MyERC20
+    assert not_pooled_erc_20 not in MyERC20
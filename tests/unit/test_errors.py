@@ -0,0 +1,181 @@
+import pytest
+from brownie import PaymentRequest, MyERC20, FixedDynamicTokenAmount
+from brownie import accounts
+from brownie.exceptions import VirtualMachineError
+from brownie.network.account import Account
+from brownie.network.transaction import TransactionReceipt, Status
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.calldata import pack_payment
+from scripts.utils.contants import PaymentFailedAt
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.errors import DecodedError, decode_failed_transaction
+from tests.asserters import assert_failed_at_is_correct
+from tests.configuration import TOKEN_AMOUNT, create_static_payment_request
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def test_GIVEN_disabled_payment_request_WHEN_paying_THEN_revert_is_classified_as_not_enabled(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    payment_request.disable(payment_request_id, {"from": owner})
+
+    # WHEN
+    with pytest.raises(VirtualMachineError) as e:
+        payment_request.pay(payment_request_id, erc_20.address, {"from": payer})
+
+    # THEN
+    tx: TransactionReceipt = TransactionReceipt(e.value.txid)
+    assert tx.status == Status.Reverted
+    assert_failed_at_is_correct(tx=tx, failed_at=PaymentFailedAt.NOT_ENABLED)
+
+    decoded_error: DecodedError = decode_failed_transaction(tx)
+    assert decoded_error.name == "PaymentRequestNotEnabled"
+    assert decoded_error.payment_request_id == payment_request_id
+
+
+def test_GIVEN_payment_request_WHEN_paying_in_not_accepted_token_THEN_revert_is_classified_as_token_amount_failure(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    not_accepted_erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+
+    # WHEN
+    with pytest.raises(VirtualMachineError) as e:
+        payment_request.pay(payment_request_id, not_accepted_erc_20.address, {"from": payer})
+
+    # THEN
+    tx: TransactionReceipt = TransactionReceipt(e.value.txid)
+    assert_failed_at_is_correct(tx=tx, failed_at=PaymentFailedAt.TA)
+
+    decoded_error: DecodedError = decode_failed_transaction(tx)
+    assert decoded_error.name == "TokenNotAccepted"
+    assert decoded_error.arguments["token"].lower() == not_accepted_erc_20.address.lower()
+
+
+def test_GIVEN_payment_request_WHEN_paying_without_approval_THEN_token_revert_reason_is_preserved(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+
+    # WHEN
+    with pytest.raises(VirtualMachineError) as e:
+        payment_request.pay(payment_request_id, erc_20.address, {"from": payer})
+
+    # THEN
+    tx: TransactionReceipt = TransactionReceipt(e.value.txid)
+    assert_failed_at_is_correct(tx=tx, failed_at=PaymentFailedAt.TOKEN_BALANCE_OR_APPROVAL)
+
+    decoded_error: DecodedError = decode_failed_transaction(tx)
+    assert decoded_error.name == "PaymentStageReverted"
+    assert decoded_error.payment_request_id == payment_request_id
+    assert decoded_error.inner_error.name == "Error"
+    assert decoded_error.inner_error.arguments["message"] == "ERC20: insufficient allowance"
+
+
+def test_GIVEN_payment_request_WHEN_non_owner_disables_it_THEN_typed_error_is_raised(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    not_owner: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+
+    # WHEN
+    with pytest.raises(VirtualMachineError) as e:
+        payment_request.disable(payment_request_id, {"from": not_owner})
+
+    # THEN
+    decoded_error: DecodedError = decode_failed_transaction(TransactionReceipt(e.value.txid))
+    assert decoded_error.name == "NotPaymentRequestOwner"
+    assert decoded_error.payment_request_id == payment_request_id
+    assert decoded_error.failed_at is None
+
+
+def test_GIVEN_duplicated_token_amounts_WHEN_creating_payment_request_THEN_typed_error_is_raised(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+
+    # WHEN
+    with pytest.raises(VirtualMachineError) as e:
+        payment_request.createWithStaticTokenAmount(
+            [(erc_20.address, TOKEN_AMOUNT), (erc_20.address, TOKEN_AMOUNT)],
+            ADDRESS_ZERO,
+            ADDRESS_ZERO,
+            ADDRESS_ZERO,
+            {"from": owner},
+        )
+
+    # THEN
+    decoded_error: DecodedError = decode_failed_transaction(TransactionReceipt(e.value.txid))
+    assert decoded_error.name == "DuplicateTokenAmount"
+    assert decoded_error.arguments["token"].lower() == erc_20.address.lower()
+
+
+def test_GIVEN_static_payment_request_WHEN_reading_dynamic_amount_THEN_error_is_not_attributed_to_a_stage(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+
+    # WHEN
+    with pytest.raises(VirtualMachineError) as e:
+        payment_request.getDynamicAmountForToken(payment_request_id, erc_20.address, {"from": owner})
+
+    # THEN
+    decoded_error: DecodedError = decode_failed_transaction(TransactionReceipt(e.value.txid))
+    assert decoded_error.name == "TokenAmountNotDynamic"
+    assert decoded_error.payment_request_id == payment_request_id
+    assert decoded_error.failed_at is None
+
+
+def test_GIVEN_dynamic_payment_request_WHEN_paying_with_packed_payment_THEN_revert_is_classified_as_token_amount_failure(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    price_computer: FixedDynamicTokenAmount = contract_builder.FixedPricePaymentComputer
+    payment_request_id: int = payment_request.createWithDynamicTokenAmount(
+        price_computer.address, ADDRESS_ZERO, ADDRESS_ZERO, ADDRESS_ZERO, {"from": owner}
+    ).return_value
+
+    # WHEN
+    with pytest.raises(VirtualMachineError) as e:
+        payment_request.payPacked(pack_payment(payment_request_id=payment_request_id, token_index=0), {"from": owner})
+
+    # THEN
+    tx: TransactionReceipt = TransactionReceipt(e.value.txid)
+    assert_failed_at_is_correct(tx=tx, failed_at=PaymentFailedAt.TA)
+
+    decoded_error: DecodedError = decode_failed_transaction(tx)
+    assert decoded_error.name == "PaymentStageReverted"
+    assert decoded_error.inner_error.name == "TokenAmountNotStatic"
+    assert decoded_error.inner_error.failed_at is None
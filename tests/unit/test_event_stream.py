@@ -0,0 +1,106 @@
+import asyncio
+from typing import AsyncIterator
+
+import pytest
+from brownie import PaymentRequest, MyERC20
+from brownie import accounts, chain
+from brownie.network.account import Account
+
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.event_stream import PaymentEvent, PaymentEventStream
+from tests.configuration import TOKEN_AMOUNT, create_static_payment_request
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+POLL_INTERVAL: float = 0.01
+# seconds
+EVENT_TIMEOUT: float = 10
+
+
+def _create_payment_request(owner: Account) -> tuple[PaymentRequest, MyERC20, int]:
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    return payment_request, erc_20, create_static_payment_request(payment_request, erc_20, owner)
+
+
+def _pay(payment_request: PaymentRequest, payment_request_id: int, erc_20: MyERC20, owner: Account, payer: Account) -> int:
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, TOKEN_AMOUNT, {"from": payer})
+    return payment_request.pay(payment_request_id, erc_20.address, {"from": payer}).return_value
+
+
+def test_GIVEN_payment_WHEN_blocks_confirmed_THEN_it_is_returned_once_it_has_enough_confirmations(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    payment_request, erc_20, payment_request_id = _create_payment_request(owner)
+    stream: PaymentEventStream = PaymentEventStream(payment_request=payment_request.address, confirmations=2)
+    assert stream.poll() == []
+
+    receipt_id: int = _pay(payment_request, payment_request_id, erc_20, owner, payer)
+    paid_at: int = chain.height
+    assert stream.poll() == []
+
+    # WHEN
+    chain.mine(2)
+    events: list[PaymentEvent] = stream.poll()
+
+    # THEN
+    assert events == [
+        PaymentEvent(
+            block_number=paid_at,
+            block_hash=chain[paid_at].hash.hex(),
+            log_index=events[0].log_index,
+            tx_hash=events[0].tx_hash,
+            payment_request_id=payment_request_id,
+            receipt_id=receipt_id,
+            token=erc_20.address,
+            amount=TOKEN_AMOUNT,
+            payer=payer.address,
+            payee=owner.address,
+        )
+    ]
+    assert stream.poll() == []
+
+
+def test_GIVEN_yielded_payment_WHEN_chain_reorganized_THEN_retraction_is_yielded(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    payment_request, erc_20, payment_request_id = _create_payment_request(owner)
+    stream: PaymentEventStream = PaymentEventStream(
+        payment_request=payment_request.address, confirmations=0, poll_interval=POLL_INTERVAL
+    )
+
+    async def consume() -> tuple[PaymentEvent, PaymentEvent, PaymentEvent]:
+        events: AsyncIterator[PaymentEvent] = stream.__aiter__()
+        # let the stream start at the current head
+        await asyncio.sleep(POLL_INTERVAL * 10)
+        chain.snapshot()
+        _pay(payment_request, payment_request_id, erc_20, owner, payer)
+        paid: PaymentEvent = await asyncio.wait_for(events.__anext__(), EVENT_TIMEOUT)
+
+        # WHEN
+        # the payment is dropped, and the new branch contains another one
+        chain.revert()
+        chain.mine()
+        _pay(payment_request, payment_request_id, erc_20, owner, payer)
+        retraction: PaymentEvent = await asyncio.wait_for(events.__anext__(), EVENT_TIMEOUT)
+        paid_again: PaymentEvent = await asyncio.wait_for(events.__anext__(), EVENT_TIMEOUT)
+        await events.aclose()
+        return paid, retraction, paid_again
+
+    paid, retraction, paid_again = asyncio.run(consume())
+
+    # THEN
+    assert not paid.is_retraction
+    assert retraction.is_retraction
+    assert retraction.tx_hash == paid.tx_hash
+    assert retraction.receipt_id == paid.receipt_id
+    assert not paid_again.is_retraction
+    assert paid_again.block_hash != paid.block_hash
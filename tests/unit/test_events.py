@@ -0,0 +1,132 @@
+import pytest
+from brownie import PaymentRequest, MyERC20
+from brownie import accounts, web3
+from brownie.exceptions import VirtualMachineError
+from brownie.network.account import Account
+from brownie.network.transaction import TransactionReceipt, Status
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.contants import EventName
+from scripts.utils.contract import ContractBuilder
+from tests.asserters import assert_expected_events_occurred_for_successful_transaction
+from tests.configuration import TOKEN_AMOUNT, create_static_payment_request
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def _address_to_topic(address: str) -> str:
+    return "0x" + address[2:].lower().rjust(64, "0")
+
+
+def _pay(payment_request: PaymentRequest, payment_request_id: int, erc_20: MyERC20, owner: Account, payer: Account) -> TransactionReceipt:
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, TOKEN_AMOUNT, {"from": payer})
+    return payment_request.pay(payment_request_id, erc_20.address, {"from": payer})
+
+
+def test_GIVEN_deployed_contract_WHEN_payment_request_created_THEN_created_event_is_emitted(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    restricted_to: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+
+    # WHEN
+    static_tx: TransactionReceipt = payment_request.createWithStaticTokenAmount(
+        [(erc_20.address, TOKEN_AMOUNT)], ADDRESS_ZERO, ADDRESS_ZERO, restricted_to.address, {"from": owner}
+    )
+    dynamic_tx: TransactionReceipt = payment_request.createWithDynamicTokenAmount(
+        contract_builder.FixedPricePaymentComputer.address, ADDRESS_ZERO, ADDRESS_ZERO, ADDRESS_ZERO, {"from": owner}
+    )
+
+    # THEN
+    assert dict(static_tx.events[EventName.PAYMENT_REQUEST_CREATED]) == {
+        "paymentRequestId": static_tx.return_value,
+        "creator": owner.address,
+        "from": restricted_to.address,
+        "isStatic": True,
+    }
+    assert dict(dynamic_tx.events[EventName.PAYMENT_REQUEST_CREATED]) == {
+        "paymentRequestId": dynamic_tx.return_value,
+        "creator": owner.address,
+        "from": ADDRESS_ZERO,
+        "isStatic": False,
+    }
+
+
+def test_GIVEN_payments_from_multiple_payers_WHEN_filtering_logs_by_payer_topic_THEN_only_their_payments_are_returned(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    other_payer: Account = accounts[2]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+
+    payer_tx: TransactionReceipt = _pay(payment_request, payment_request_id, erc_20, owner, payer)
+    _pay(payment_request, payment_request_id, erc_20, owner, other_payer)
+
+    # WHEN
+    logs: list = web3.eth.get_logs(
+        {
+            "address": payment_request.address,
+            "fromBlock": 0,
+            "topics": [
+                payment_request.topics[EventName.PAYMENT_REQUEST_PAID],
+                None,
+                _address_to_topic(payer.address),
+                _address_to_topic(owner.address),
+            ],
+        }
+    )
+
+    # THEN
+    assert len(logs) == 1
+    assert logs[0]["transactionHash"].hex() == payer_tx.txid
+
+
+def test_GIVEN_payment_request_in_lean_event_mode_WHEN_paid_THEN_only_paid_event_is_emitted(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+
+    tx: TransactionReceipt = payment_request.setLeanEvents(payment_request_id, True, {"from": owner})
+    assert "PaymentRequestEventModeChanged" in tx.events
+    assert payment_request.isLeanEvents(payment_request_id) == True
+
+    # WHEN
+    tx = _pay(payment_request, payment_request_id, erc_20, owner, payer)
+
+    # THEN
+    assert tx.status == Status.Confirmed
+    assert_expected_events_occurred_for_successful_transaction(
+        payment_request=payment_request, payment_request_id=payment_request_id, tx=tx
+    )
+    assert EventName.TOKEN_AMOUNT_OBTAINED not in tx.events
+
+
+def test_GIVEN_payment_request_WHEN_non_owner_sets_lean_event_mode_THEN_it_fails(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    not_owner: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+
+    # WHEN/THEN
+    with pytest.raises(VirtualMachineError):
+        payment_request.setLeanEvents(payment_request_id, True, {"from": not_owner})
+
+    assert payment_request.isLeanEvents(payment_request_id) == False
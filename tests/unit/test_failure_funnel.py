@@ -0,0 +1,130 @@
+import pytest
+from brownie import PaymentRequest, MyERC20
+from brownie import accounts, web3
+from brownie.exceptions import VirtualMachineError
+from brownie.network.account import Account
+from web3 import Web3
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.calldata import pack_payment
+from scripts.utils.contants import PaymentFailedAt
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.failure_funnel import (
+    FailureClassifier,
+    FailureReport,
+    PaymentRequestFunnel,
+    get_paid_payment_request_id,
+)
+from tests.configuration import TOKEN_AMOUNT, create_static_payment_request
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def _pay_with_failure(payment_request: PaymentRequest, payment_request_id: int, token: str, payer: Account) -> str:
+    with pytest.raises(VirtualMachineError) as e:
+        payment_request.pay(payment_request_id, token, {"from": payer})
+    return e.value.txid
+
+
+def test_GIVEN_pay_and_pay_packed_calldata_WHEN_decoded_THEN_payment_request_id_is_returned(*args, **kwargs):
+    # GIVEN
+    payment_request: PaymentRequest = ContractBuilder(account=accounts[0], force_deploy=True).PaymentRequest
+    pay_calldata: str = payment_request.pay.encode_input(42, ADDRESS_ZERO)
+    pay_packed_calldata: str = payment_request.payPacked.encode_input(
+        pack_payment(payment_request_id=43, token_index=1)
+    )
+
+    # WHEN / THEN
+    assert get_paid_payment_request_id(bytes.fromhex(pay_calldata[2:])) == 42
+    assert get_paid_payment_request_id(bytes.fromhex(pay_packed_calldata[2:])) == 43
+
+
+def test_GIVEN_failed_payments_of_several_payment_requests_WHEN_classified_THEN_funnel_per_payment_request_is_returned(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    not_accepted_erc_20: MyERC20 = contract_builder.MyERC20
+    disabled_payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    payment_request.disable(disabled_payment_request_id, {"from": owner})
+    enabled_payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+
+    tx_hashes: list[str] = [
+        _pay_with_failure(payment_request, disabled_payment_request_id, erc_20.address, payer),
+        _pay_with_failure(payment_request, disabled_payment_request_id, erc_20.address, payer),
+        _pay_with_failure(payment_request, enabled_payment_request_id, not_accepted_erc_20.address, payer),
+        # not approved
+        _pay_with_failure(payment_request, enabled_payment_request_id, erc_20.address, payer),
+    ]
+
+    # WHEN
+    report: FailureReport = FailureClassifier(max_workers=2).classify(tx_hashes)
+
+    # THEN
+    assert [failure.failed_at for failure in report.failures] == [
+        PaymentFailedAt.NOT_ENABLED,
+        PaymentFailedAt.NOT_ENABLED,
+        PaymentFailedAt.TA,
+        PaymentFailedAt.TOKEN_BALANCE_OR_APPROVAL,
+    ]
+    assert [failure.tx_hash for failure in report.failures] == tx_hashes
+
+    disabled_funnel: PaymentRequestFunnel = report.funnels[(payment_request.address, disabled_payment_request_id)]
+    assert disabled_funnel.num_failures == 2
+    assert disabled_funnel.histogram == [
+        (PaymentFailedAt.NOT_ENABLED, 2),
+        (PaymentFailedAt.TA, 0),
+        (PaymentFailedAt.TOKEN_BALANCE_OR_APPROVAL, 0),
+        (PaymentFailedAt.PR, 0),
+    ]
+
+    enabled_funnel: PaymentRequestFunnel = report.funnels[(payment_request.address, enabled_payment_request_id)]
+    assert enabled_funnel.histogram == [
+        (PaymentFailedAt.NOT_ENABLED, 0),
+        (PaymentFailedAt.TA, 1),
+        (PaymentFailedAt.TOKEN_BALANCE_OR_APPROVAL, 1),
+        (PaymentFailedAt.PR, 0),
+    ]
+
+
+@pytest.mark.requires_node
+def test_GIVEN_payments_to_paid_restricted_and_closed_requests_WHEN_classified_with_w3_THEN_they_are_not_enabled(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    restricted_payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner, payer.address)
+    closed_payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    erc_20.transfer(payer.address, 2 * TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, 2 * TOKEN_AMOUNT, {"from": payer})
+    # a restricted PaymentRequest is disabled once paid
+    payment_request.pay(restricted_payment_request_id, erc_20.address, {"from": payer})
+    payment_request.close(closed_payment_request_id, {"from": owner})
+    tx_hashes: list[str] = [
+        _pay_with_failure(payment_request, restricted_payment_request_id, erc_20.address, payer),
+        _pay_with_failure(payment_request, closed_payment_request_id, erc_20.address, payer),
+    ]
+    # a Web3 of its own, not brownie's
+    w3: Web3 = Web3(Web3.HTTPProvider(web3.provider.endpoint_uri))
+
+    # WHEN
+    report: FailureReport = FailureClassifier(w3=w3).classify(tx_hashes)
+
+    # THEN
+    assert [failure.failed_at for failure in report.failures] == [PaymentFailedAt.NOT_ENABLED] * 2
+    funnel: PaymentRequestFunnel
+    for funnel in report.funnels.values():
+        assert funnel.histogram[0] == (PaymentFailedAt.NOT_ENABLED, 1)
+        assert funnel.num_failures == 1
@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pytest
+
+from scripts.benchmark.gas_matrix import (
+    CREATE,
+    FIRST_PAY,
+    GasBaselineNotFoundException,
+    GasRegression,
+    find_regressions,
+    read_baseline,
+)
+
+KEY: str = "NONE/STATIC/NONE"
+
+
+def test_GIVEN_gas_used_within_threshold_WHEN_finding_regressions_THEN_none_are_found(*args, **kwargs):
+    # GIVEN
+    baseline: dict = {KEY: {CREATE: 100_000, FIRST_PAY: 200_000}}
+    current: dict = {KEY: {CREATE: 101_000, FIRST_PAY: 150_000}, "NEW/STATIC/NONE": {CREATE: 1}}
+
+    # WHEN
+    regressions: list[GasRegression] = find_regressions(baseline=baseline, current=current, threshold=0.02)
+
+    # THEN
+    assert regressions == []
+
+
+def test_GIVEN_gas_used_above_threshold_WHEN_finding_regressions_THEN_regression_is_found(*args, **kwargs):
+    # GIVEN
+    baseline: dict = {KEY: {CREATE: 100_000, FIRST_PAY: 200_000}}
+    current: dict = {KEY: {CREATE: 103_000, FIRST_PAY: 200_000}}
+
+    # WHEN
+    regressions: list[GasRegression] = find_regressions(baseline=baseline, current=current, threshold=0.02)
+
+    # THEN
+    assert regressions == [GasRegression(key=KEY, measurement=CREATE, baseline_gas_used=100_000, gas_used=103_000)]
+
+
+def test_GIVEN_measurement_no_longer_possible_WHEN_finding_regressions_THEN_regression_is_found(*args, **kwargs):
+    # GIVEN
+    baseline: dict = {KEY: {CREATE: 100_000, FIRST_PAY: 200_000}}
+    current: dict = {KEY: {CREATE: 100_000, FIRST_PAY: None}}
+
+    # WHEN
+    regressions: list[GasRegression] = find_regressions(baseline=baseline, current=current, threshold=0.02)
+
+    # THEN
+    assert regressions == [GasRegression(key=KEY, measurement=FIRST_PAY, baseline_gas_used=200_000, gas_used=None)]
+
+
+def test_GIVEN_no_baseline_WHEN_reading_baseline_THEN_it_fails(tmp_path: Path, *args, **kwargs):
+    # GIVEN
+    path: Path = tmp_path / "gas_matrix_baseline.json"
+
+    # WHEN/THEN
+    with pytest.raises(GasBaselineNotFoundException):
+        read_baseline(path)
+    assert not path.exists()
@@ -0,0 +1,66 @@
+import pytest
+from brownie import PaymentRequest, MyERC20
+from brownie import accounts
+from brownie.network.account import Account
+from brownie.network.transaction import TransactionReceipt, Status
+
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.gas_profiler import GasProfile, GasStage, StageGas, get_intrinsic_gas, profile_payment
+from tests.configuration import TOKEN_AMOUNT, create_static_payment_request
+
+# the gas profiler needs the struct logs of debug_traceTransaction
+pytestmark = pytest.mark.requires_node
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def test_GIVEN_payment_with_post_payment_action_WHEN_profiling_THEN_gas_is_split_across_stages(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    post_payment_action = contract_builder.MyPostPaymentAction
+
+    payment_request_id: int = create_static_payment_request(
+        payment_request, erc_20, owner, post_payment_action=post_payment_action.address
+    )
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, TOKEN_AMOUNT, {"from": payer})
+    tx: TransactionReceipt = payment_request.pay(payment_request_id, erc_20.address, {"from": payer})
+    assert tx.status == Status.Confirmed
+
+    # WHEN
+    profile: GasProfile = profile_payment(tx, payment_request=payment_request, payment_request_id=payment_request_id)
+
+    # THEN
+    stages: list[StageGas] = profile.stages
+    # the balance of the PaymentRequest and the allowance of the payer are cleared, which is refunded
+    assert [stage.stage for stage in stages] == [
+        GasStage.INTRINSIC,
+        GasStage.PAYMENT_REQUEST,
+        GasStage.TOKEN_AMOUNT,
+        GasStage.ERC20,
+        GasStage.ERC20,
+        GasStage.RECEIPT,
+        GasStage.POST_PAYMENT_ACTION,
+        GasStage.EVENTS,
+        GasStage.REFUND,
+    ]
+    assert [stage.label for stage in stages if stage.stage == GasStage.ERC20] == [
+        "MyERC20.transferFrom",
+        "MyERC20.transfer",
+    ]
+    assert all(stage.gas > 0 for stage in stages if stage.stage != GasStage.REFUND)
+    assert profile.intrinsic_gas == get_intrinsic_gas(tx)
+    assert profile.refund_gas > 0
+    assert sum(stage.gas for stage in stages) == tx.gas_used
+
+    folded_stacks: list[str] = profile.to_folded_stacks()
+    assert sum(int(stack.rsplit(" ", 1)[1]) for stack in folded_stacks) == tx.gas_used + profile.refund_gas
+    assert any(stack.startswith("PaymentRequest.pay;Receipt.create") for stack in folded_stacks)
+
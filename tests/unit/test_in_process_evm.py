@@ -0,0 +1,70 @@
+import os
+import subprocess
+from pathlib import Path
+
+import pytest
+from eth_abi import decode_abi
+from hexbytes import HexBytes
+
+from scripts.utils.in_process_evm import (
+    ERROR_STRING_SELECTOR,
+    EVM_BACKEND_ENV_VAR,
+    IN_PROCESS_EVM_BACKEND,
+    _get_revert_data,
+    _to_final_step,
+    is_in_process_evm_enabled,
+)
+
+PROJECT_PATH: Path = Path(__file__).parents[2]
+BACKEND_TEST_PATH: Path = Path(__file__).parent / "test_in_process_evm_backend.py"
+
+
+def _read_memory(step: dict) -> bytes:
+    # the same way brownie reads the data returned by a RETURN or REVERT step
+    offset: int = int(step["stack"][-1], 16)
+    length: int = int(step["stack"][-2], 16)
+    return bytes(HexBytes("".join(step["memory"])))[offset:offset + length]
+
+
+def test_GIVEN_returned_data_WHEN_final_step_built_THEN_brownie_reads_it_back(*args, **kwargs):
+    # GIVEN
+    data: bytes = (42).to_bytes(32, "big") + b"\x01\x02\x03"
+
+    # WHEN
+    step: dict = _to_final_step("RETURN", data)
+
+    # THEN
+    assert step["op"] == "RETURN"
+    assert len(step["memory"]) == 2
+    assert all(len(word) == 64 for word in step["memory"])
+    assert _read_memory(step) == data
+
+
+def test_GIVEN_decoded_revert_reason_WHEN_revert_data_built_THEN_it_is_encoded_as_error_string(*args, **kwargs):
+    # GIVEN
+    exception: Exception = Exception("PaymentRequest is disabled")
+
+    # WHEN
+    data: bytes = _get_revert_data(exception)
+
+    # THEN
+    assert data[:4] == ERROR_STRING_SELECTOR
+    assert decode_abi(["string"], data[4:]) == ("PaymentRequest is disabled",)
+    assert _get_revert_data(Exception(b"\xde\xad\xbe\xef")) == b"\xde\xad\xbe\xef"
+
+
+def test_GIVEN_in_process_evm_backend_WHEN_brownie_tests_run_THEN_they_pass(*args, **kwargs):
+    # GIVEN
+    if is_in_process_evm_enabled():
+        pytest.skip("the session already runs against the in-process EVM")
+    env: dict[str, str] = {**os.environ, EVM_BACKEND_ENV_VAR: IN_PROCESS_EVM_BACKEND}
+
+    # WHEN
+    # brownie connects once per session, as such the backend is only swapped in a session of its own
+    result: subprocess.CompletedProcess = subprocess.run(
+        ["brownie", "test", str(BACKEND_TEST_PATH)], cwd=PROJECT_PATH, env=env, capture_output=True, text=True
+    )
+
+    # THEN
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "2 passed" in result.stdout
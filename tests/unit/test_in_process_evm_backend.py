@@ -0,0 +1,56 @@
+import pytest
+from brownie import PaymentRequest, MyERC20
+from brownie import accounts, chain, web3
+from brownie.network.account import Account
+from brownie.network.transaction import TransactionReceipt, Status
+
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.in_process_evm import CLIENT_VERSION, is_in_process_evm_enabled
+from tests.configuration import TOKEN_AMOUNT, create_static_payment_request
+
+# run by test_GIVEN_in_process_evm_backend_WHEN_brownie_tests_run_THEN_they_pass, in a session of their own
+pytestmark = pytest.mark.skipif(not is_in_process_evm_enabled(), reason="only runs against the in-process EVM")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def shared_setup(module_isolation):
+    pass
+
+
+def test_GIVEN_in_process_evm_WHEN_payment_request_deployed_and_paid_THEN_return_values_are_read(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    assert web3.clientVersion == CLIENT_VERSION
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, TOKEN_AMOUNT, {"from": payer})
+
+    # WHEN
+    tx: TransactionReceipt = payment_request.pay(payment_request_id, erc_20.address, {"from": payer})
+
+    # THEN
+    assert tx.status == Status.Confirmed
+    assert tx.events["PaymentRequestPaid"]["receiptId"] == tx.return_value
+    assert erc_20.balanceOf(payer.address) == 0
+
+
+def test_GIVEN_in_process_evm_WHEN_reverted_to_snapshot_THEN_deployment_is_undone(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    chain.snapshot()
+    height: int = chain.height
+    nonce: int = owner.nonce
+
+    # WHEN
+    erc_20: MyERC20 = ContractBuilder(account=owner, force_deploy=True).MyERC20
+    assert len(web3.eth.get_code(erc_20.address)) > 0
+    chain.revert()
+
+    # THEN
+    assert len(web3.eth.get_code(erc_20.address)) == 0
+    assert chain.height == height
+    assert owner.nonce == nonce
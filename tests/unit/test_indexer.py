@@ -0,0 +1,116 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+from brownie import PaymentRequest, MyERC20, Receipt
+from brownie import accounts
+from brownie.network.account import Account
+from brownie.network.contract import ProjectContract
+from brownie.network.transaction import TransactionReceipt
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.indexer import AdaptiveRange, EventIndexer, LogDecoder, LogRangeRejectedException, fetch_rows
+from tests.configuration import TOKEN_AMOUNT, create_static_payment_request
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+class _RangeLimitedEth:
+    """eth namespace of a node that rejects eth_getLogs over more than max_range_size blocks."""
+
+    def __init__(self, max_range_size: int):
+        self.max_range_size: int = max_range_size
+        self.requested_ranges: list[tuple[int, int]] = []
+
+    def get_logs(self, filter_params: dict[str, Any]) -> list[dict[str, Any]]:
+        self.requested_ranges.append((filter_params["fromBlock"], filter_params["toBlock"]))
+        if filter_params["toBlock"] - filter_params["fromBlock"] + 1 > self.max_range_size:
+            raise ValueError({"code": -32005, "message": "query returned more than 10000 results"})
+        return []
+
+
+class _RangeLimitedWeb3:
+    def __init__(self, max_range_size: int):
+        self.eth: _RangeLimitedEth = _RangeLimitedEth(max_range_size)
+
+
+def test_GIVEN_node_rejecting_large_ranges_WHEN_logs_fetched_THEN_ranges_are_split_and_grown_back(*args, **kwargs):
+    # GIVEN
+    w3: _RangeLimitedWeb3 = _RangeLimitedWeb3(max_range_size=100)
+    log_decoder: LogDecoder = LogDecoder(payment_request=ADDRESS_ZERO, receipt=ADDRESS_ZERO)
+    adaptive_range: AdaptiveRange = AdaptiveRange(initial_size=1_000, max_size=1_000, sparse_logs=1)
+
+    # WHEN
+    cursors: list[int] = [end for end, _ in fetch_rows(w3, log_decoder, 0, 499, adaptive_range)]
+
+    # THEN
+    accepted_ranges: list[tuple[int, int]] = [
+        (start, end) for start, end in w3.eth.requested_ranges if end - start + 1 <= 100
+    ]
+    assert accepted_ranges[0] == (0, 61)
+    assert cursors[-1] == 499
+    assert [end for _, end in accepted_ranges] == cursors
+    # contiguous, without gaps or overlaps
+    assert all(next_start == end + 1 for (_, end), (next_start, _) in zip(accepted_ranges, accepted_ranges[1:]))
+
+
+def test_GIVEN_node_rejecting_single_block_WHEN_logs_fetched_THEN_exception_is_raised(*args, **kwargs):
+    # GIVEN
+    w3: _RangeLimitedWeb3 = _RangeLimitedWeb3(max_range_size=0)
+    log_decoder: LogDecoder = LogDecoder(payment_request=ADDRESS_ZERO, receipt=ADDRESS_ZERO)
+
+    # WHEN / THEN
+    with pytest.raises(LogRangeRejectedException):
+        list(fetch_rows(w3, log_decoder, 0, 10, AdaptiveRange(initial_size=4)))
+
+
+def test_GIVEN_payments_and_receipt_transfer_WHEN_indexer_synced_THEN_events_are_queryable_locally(
+    tmp_path: Path, *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    recipient: Account = accounts[2]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    receipt: ProjectContract = Receipt.at(payment_request.receipt())
+
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, TOKEN_AMOUNT, {"from": payer})
+    receipt_id: int = payment_request.pay(payment_request_id, erc_20.address, {"from": payer}).return_value
+    payment_request.disable(payment_request_id, {"from": owner})
+    transfer_tx: TransactionReceipt = receipt.transferFrom(
+        payer.address, recipient.address, receipt_id, {"from": payer}
+    )
+
+    indexer: EventIndexer = EventIndexer(
+        db_path=tmp_path / "events.sqlite", payment_request=payment_request.address, receipt=receipt.address
+    )
+
+    # WHEN
+    num_events: int = indexer.sync()
+
+    # THEN
+    # PaymentRequestPaid, TokenAmountObtained, disabled, Receipt mint and transfer
+    assert num_events == 5
+    assert indexer.cursor == transfer_tx.block_number
+    assert indexer.connection.execute(
+        "SELECT payment_request_id, receipt_id, token, amount, payee FROM payments WHERE payer = ?", (payer.address,)
+    ).fetchall() == [(payment_request_id, receipt_id, erc_20.address, TOKEN_AMOUNT, owner.address)]
+    assert indexer.connection.execute(
+        "SELECT is_enabled FROM payment_request_status_changes WHERE payment_request_id = ?", (payment_request_id,)
+    ).fetchall() == [(0,)]
+    assert indexer.connection.execute(
+        "SELECT sender, recipient FROM receipt_transfers WHERE receipt_id = ? ORDER BY block_number", (receipt_id,)
+    ).fetchall() == [(ADDRESS_ZERO, payer.address), (payer.address, recipient.address)]
+
+    # AND re-indexing doesn't duplicate anything
+    indexer.connection.execute("DELETE FROM cursor")
+    indexer.sync()
+    assert indexer.connection.execute("SELECT COUNT(*) FROM payments").fetchone() == (1,)
@@ -0,0 +1,116 @@
+import asyncio
+from typing import Optional
+
+import pytest
+from brownie import accounts, web3
+from brownie.network.account import LocalAccount
+from eth_account import Account as EthAccount
+from eth_utils import encode_hex
+
+from scripts.benchmark.load_generator import (
+    LoadReport,
+    NonceManager,
+    PendingTransaction,
+    SubmittedTransaction,
+    get_percentile,
+    run_load,
+    submit_transactions,
+)
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def test_GIVEN_latencies_WHEN_percentiles_computed_THEN_nearest_rank_is_returned(*args, **kwargs):
+    # GIVEN
+    latencies: list[float] = [float(latency) for latency in range(1, 101)]
+
+    # WHEN
+    percentiles: list[float] = [get_percentile(latencies, percentile) for percentile in (50, 90, 99, 100)]
+
+    # THEN
+    assert percentiles == [50.0, 90.0, 99.0, 100.0]
+    assert get_percentile([], 50) == 0.0
+
+
+def test_GIVEN_nonce_manager_WHEN_nonces_reserved_THEN_they_are_consecutive_from_the_pending_nonce(*args, **kwargs):
+    # GIVEN
+    address: str = accounts[0].address
+    pending_nonce: int = web3.eth.get_transaction_count(address, "pending")
+    nonce_manager: NonceManager = NonceManager()
+
+    # WHEN
+    nonces: list[int] = [nonce_manager.reserve(address) for _ in range(3)]
+
+    # THEN
+    assert nonces == [pending_nonce, pending_nonce + 1, pending_nonce + 2]
+
+
+@pytest.mark.requires_node
+def test_GIVEN_funded_payers_WHEN_load_generated_THEN_every_payment_is_mined(*args, **kwargs):
+    # WHEN
+    report: LoadReport = run_load(num_payers=2, payments_per_payer=3, in_flight=4, processes=1)
+
+    # THEN
+    assert report.num_transactions == 6
+    assert len(report.latencies) == 6
+    assert report.num_rejected == 0
+    assert report.num_failures == 0
+    assert sum(report.gas_per_block.values()) > 0
+    assert report.throughput > 0
+
+
+@pytest.mark.requires_node
+def test_GIVEN_transaction_that_is_never_mined_WHEN_submitted_THEN_it_times_out(*args, **kwargs):
+    # GIVEN
+    payer: LocalAccount = accounts.add()
+    accounts[0].transfer(payer, 10 ** 18)
+    # the nonce after the pending one, the node holds the transaction until the gap is filled
+    nonce: int = web3.eth.get_transaction_count(payer.address, "pending") + 1
+    raw_transaction: str = encode_hex(
+        EthAccount.from_key(payer.private_key)
+        .sign_transaction(
+            {
+                "to": payer.address,
+                "value": 0,
+                "nonce": nonce,
+                "gas": 21_000,
+                "gasPrice": web3.eth.gas_price,
+                "chainId": web3.eth.chain_id,
+            }
+        )
+        .rawTransaction
+    )
+    transaction: PendingTransaction = PendingTransaction(
+        payer=payer.address, nonce=nonce, raw_transaction=raw_transaction
+    )
+
+    # WHEN
+    results: list[Optional[SubmittedTransaction]] = asyncio.run(
+        submit_transactions([transaction], endpoint_uri=web3.provider.endpoint_uri, in_flight=1, receipt_timeout=0.5)
+    )
+
+    # THEN
+    assert results[0] is not None
+    assert results[0].is_timed_out
+    assert not results[0].is_success
+    report: LoadReport = LoadReport(
+        num_transactions=1, elapsed=results[0].latency, latencies=[], gas_per_block={}, num_timed_out=1
+    )
+    assert report.num_failures == 1
+    assert "1 timed out" in report.format_report()
+
+
+def test_GIVEN_unreachable_node_WHEN_submitted_THEN_transaction_is_rejected(*args, **kwargs):
+    # GIVEN
+    transaction: PendingTransaction = PendingTransaction(payer=accounts[0].address, nonce=0, raw_transaction="0x00")
+
+    # WHEN
+    results: list[Optional[SubmittedTransaction]] = asyncio.run(
+        submit_transactions([transaction], endpoint_uri="http://127.0.0.1:1", in_flight=1, receipt_timeout=0.5)
+    )
+
+    # THEN
+    assert results == [None]
@@ -0,0 +1,63 @@
+import pytest
+from brownie import MyERC20, MyERC721, NFTOwnerPaymentPrecondition
+from brownie import accounts
+from brownie.network.account import Account
+from brownie.network.transaction import TransactionReceipt
+
+from scripts.utils.contract import MY_ERC20_DEPLOY_ARGS, MY_ERC721_DEPLOY_ARGS
+from scripts.utils.parallel_deployer import DeploymentGraphException, ParallelDeployer, Ref, compute_create_address
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def test_GIVEN_sender_and_nonce_WHEN_create_address_computed_THEN_it_matches_the_known_address(*args, **kwargs):
+    # GIVEN
+    sender: str = "0x6ac7ea33f8831ea9dcc53393aaa88b25a785dbf0"
+
+    # WHEN / THEN
+    assert compute_create_address(sender, 0) == "0xcd234A471b72ba2F1Ccf0A70FCABA648a5eeCD8d"
+    assert compute_create_address(sender, 1) == "0x343c43A37D37dfF08AE8C4A11544c718AbB4fCF8"
+
+
+def test_GIVEN_dependency_graph_WHEN_run_THEN_contracts_are_deployed_at_planned_addresses(*args, **kwargs):
+    # GIVEN
+    account: Account = accounts[0]
+    other: Account = accounts[1]
+    deployer: ParallelDeployer = ParallelDeployer()
+    deployer.deploy("erc20", MyERC20, *MY_ERC20_DEPLOY_ARGS, account=account)
+    deployer.deploy("erc721", MyERC721, *MY_ERC721_DEPLOY_ARGS, account=account)
+    deployer.deploy("precondition", NFTOwnerPaymentPrecondition, Ref("erc20"), Ref("erc721"), account=account)
+    deployer.transact(
+        "transfer",
+        lambda tx_params: deployer["erc20"].transfer(other.address, 5, tx_params),
+        account=account,
+        after=("erc20",),
+    )
+    start_nonce: int = account.nonce
+
+    # WHEN
+    results: dict = deployer.run()
+
+    # THEN
+    assert [node.nonce for node in deployer.plan()] == list(range(start_nonce, start_nonce + 4))
+    assert [node.name for node in deployer.plan()] == ["erc20", "erc721", "precondition", "transfer"]
+    assert results["erc20"].address == deployer.address_of("erc20")
+    assert results["precondition"].address == deployer.address_of("precondition")
+    assert results["precondition"].exclusivePaymentToken() == results["erc20"].address
+    assert isinstance(results["transfer"], TransactionReceipt)
+    assert results["erc20"].balanceOf(other.address) == 5
+
+
+def test_GIVEN_dependency_cycle_WHEN_planned_THEN_exception_is_raised(*args, **kwargs):
+    # GIVEN
+    account: Account = accounts[0]
+    deployer: ParallelDeployer = ParallelDeployer()
+    deployer.deploy("erc20", MyERC20, *MY_ERC20_DEPLOY_ARGS, account=account, after=("erc721",))
+    deployer.deploy("erc721", MyERC721, *MY_ERC721_DEPLOY_ARGS, account=account, after=("erc20",))
+
+    # WHEN / THEN
+    with pytest.raises(DeploymentGraphException):
+        deployer.plan()
@@ -0,0 +1,134 @@
+import pytest
+from brownie import PaymentRequest, MyERC20
+from brownie import accounts
+from brownie.exceptions import VirtualMachineError
+from brownie.network.account import Account
+from brownie.network.transaction import TransactionReceipt, Status
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.contract import ContractBuilder
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def _pay(
+    payment_request: PaymentRequest,
+    payment_request_id: int,
+    erc_20: MyERC20,
+    amount: int,
+    owner: Account,
+    payer: Account,
+) -> None:
+    erc_20.transfer(payer.address, amount, {"from": owner})
+    erc_20.approve(payment_request.address, amount, {"from": payer})
+    tx: TransactionReceipt = payment_request.pay(payment_request_id, erc_20.address, {"from": payer})
+    assert tx.status == Status.Confirmed
+
+
+def test_GIVEN_static_payment_request_WHEN_paid_multiple_times_THEN_aggregates_are_updated(*args, **kwargs):
+    # GIVEN
+    FIRST_TOKEN_AMOUNT: int = 10
+    SECOND_TOKEN_AMOUNT: int = 7
+    owner: Account = accounts[0]
+    payers: list[Account] = [accounts[1], accounts[2], accounts[3]]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    first_erc_20: MyERC20 = contract_builder.MyERC20
+    second_erc_20: MyERC20 = contract_builder.MyERC20
+
+    tx: TransactionReceipt = payment_request.createWithStaticTokenAmount(
+        [(first_erc_20.address, FIRST_TOKEN_AMOUNT), (second_erc_20.address, SECOND_TOKEN_AMOUNT)],
+        ADDRESS_ZERO,
+        ADDRESS_ZERO,
+        ADDRESS_ZERO,
+        {"from": owner},
+    )
+    payment_request_id: int = tx.return_value
+    assert payment_request.getNumberOfPayments(payment_request_id) == 0
+    assert payment_request.getTotalsCollected(payment_request_id) == [
+        (first_erc_20.address, 0),
+        (second_erc_20.address, 0),
+    ]
+
+    # WHEN
+    _pay(payment_request, payment_request_id, first_erc_20, FIRST_TOKEN_AMOUNT, owner, payers[0])
+    _pay(payment_request, payment_request_id, first_erc_20, FIRST_TOKEN_AMOUNT, owner, payers[1])
+    _pay(payment_request, payment_request_id, second_erc_20, SECOND_TOKEN_AMOUNT, owner, payers[2])
+
+    # THEN
+    assert payment_request.getNumberOfPayments(payment_request_id) == 3
+    assert payment_request.getTotalCollectedForToken(payment_request_id, first_erc_20.address) == 2 * FIRST_TOKEN_AMOUNT
+    assert payment_request.getTotalCollectedForToken(payment_request_id, second_erc_20.address) == SECOND_TOKEN_AMOUNT
+    assert payment_request.getTotalsCollected(payment_request_id) == [
+        (first_erc_20.address, 2 * FIRST_TOKEN_AMOUNT),
+        (second_erc_20.address, SECOND_TOKEN_AMOUNT),
+    ]
+
+    # aggregates are cleared along with the rest of the PaymentRequest
+    payment_request.close(payment_request_id, {"from": owner})
+    with pytest.raises(VirtualMachineError):
+        payment_request.getNumberOfPayments(payment_request_id)
+    with pytest.raises(VirtualMachineError):
+        payment_request.getTotalCollectedForToken(payment_request_id, first_erc_20.address)
+
+
+def test_GIVEN_dynamic_payment_request_WHEN_paid_THEN_only_number_of_payments_is_tracked(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    discounted_token_amount = contract_builder.DiscountedTokenAmountForFirst100Customers
+
+    tx: TransactionReceipt = payment_request.createWithDynamicTokenAmount(
+        discounted_token_amount.address, ADDRESS_ZERO, ADDRESS_ZERO, ADDRESS_ZERO, {"from": owner}
+    )
+    payment_request_id: int = tx.return_value
+    discounted_price: int = (
+        discounted_token_amount.PRICE() // discounted_token_amount.DICOUNT_DIVIDER()
+    )
+
+    # WHEN
+    _pay(payment_request, payment_request_id, erc_20, discounted_price, owner, payer)
+
+    # THEN
+    assert payment_request.getNumberOfPayments(payment_request_id) == 1
+
+    with pytest.raises(VirtualMachineError):
+        payment_request.getTotalCollectedForToken(payment_request_id, erc_20.address)
+
+
+def test_GIVEN_discounted_payment_request_WHEN_payer_repeats_purchase_THEN_discount_counts_unique_purchasers(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    discounted_token_amount = contract_builder.DiscountedTokenAmountForFirst100Customers
+
+    tx: TransactionReceipt = payment_request.createWithDynamicTokenAmount(
+        discounted_token_amount.address, ADDRESS_ZERO, ADDRESS_ZERO, ADDRESS_ZERO, {"from": owner}
+    )
+    payment_request_id: int = tx.return_value
+    discounted_price: int = (
+        discounted_token_amount.PRICE() // discounted_token_amount.DICOUNT_DIVIDER()
+    )
+
+    # WHEN
+    _pay(payment_request, payment_request_id, erc_20, discounted_price, owner, payer)
+    _pay(payment_request, payment_request_id, erc_20, discounted_price, owner, payer)
+
+    # THEN
+    # the discount is bound to the number of unique purchasers, not to the number of payments
+    assert payment_request.getNumberOfPayments(payment_request_id) == 2
+    assert discounted_token_amount.numUniquePurchases() == 1
+    assert payment_request.getDynamicAmountForToken.call(
+        payment_request_id, erc_20.address, {"from": payer}
+    ) == discounted_token_amount.PRICE()
@@ -0,0 +1,162 @@
+import pytest
+from brownie import PaymentRequest, MyERC20
+from brownie import accounts
+from brownie.network.account import Account
+from brownie.network.transaction import Status
+
+from scripts.utils.contants import PaymentFailedAt
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.preflight import PendingPayment, PreflightResult, preflight_payment, preflight_payments
+from tests.configuration import TOKEN_AMOUNT, create_static_payment_request
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def test_GIVEN_funded_and_approved_payer_WHEN_preflight_THEN_payment_is_predicted_to_succeed(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, TOKEN_AMOUNT, {"from": payer})
+
+    # WHEN
+    result: PreflightResult = preflight_payment(
+        payment_request=payment_request.address,
+        payment_request_id=payment_request_id,
+        token=erc_20.address,
+        payer=payer.address,
+    )
+
+    # THEN
+    assert result.will_succeed
+    assert result.failed_at is None
+    assert (result.token_amount, result.balance, result.allowance) == (TOKEN_AMOUNT, TOKEN_AMOUNT, TOKEN_AMOUNT)
+    assert payment_request.pay(payment_request_id, erc_20.address, {"from": payer}).status == Status.Confirmed
+
+
+def test_GIVEN_failing_payments_WHEN_preflight_THEN_failing_stage_is_predicted(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    not_accepted_erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    disabled_payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    payment_request.disable(disabled_payment_request_id, {"from": owner})
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+
+    # WHEN
+    not_approved: PreflightResult = preflight_payment(
+        payment_request=payment_request.address,
+        payment_request_id=payment_request_id,
+        token=erc_20.address,
+        payer=payer.address,
+    )
+    not_accepted: PreflightResult = preflight_payment(
+        payment_request=payment_request.address,
+        payment_request_id=payment_request_id,
+        token=not_accepted_erc_20.address,
+        payer=payer.address,
+    )
+    disabled: PreflightResult = preflight_payment(
+        payment_request=payment_request.address,
+        payment_request_id=disabled_payment_request_id,
+        token=erc_20.address,
+        payer=payer.address,
+    )
+
+    # THEN
+    assert not not_approved.will_succeed
+    assert not_approved.failed_at == PaymentFailedAt.TOKEN_BALANCE_OR_APPROVAL
+    assert not_approved.missing_allowance == TOKEN_AMOUNT
+    assert not_approved.missing_balance == 0
+
+    assert not not_accepted.will_succeed
+    assert not_accepted.failed_at == PaymentFailedAt.TA
+    assert not_accepted.token_amount is None
+
+    assert not disabled.will_succeed
+    assert disabled.failed_at == PaymentFailedAt.NOT_ENABLED
+    assert disabled.error.name == "PaymentRequestNotEnabled"
+
+
+def test_GIVEN_pending_payments_exceeding_balance_WHEN_batch_preflight_THEN_later_payments_are_predicted_to_fail(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_ids: list[int] = [create_static_payment_request(payment_request, erc_20, owner) for _ in range(3)]
+    # enough for a single payment
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, TOKEN_AMOUNT * len(payment_request_ids), {"from": payer})
+
+    # WHEN
+    results: list[PreflightResult] = preflight_payments(
+        [
+            PendingPayment(
+                payment_request=payment_request.address,
+                payment_request_id=payment_request_id,
+                token=erc_20.address,
+                payer=payer.address,
+            )
+            for payment_request_id in payment_request_ids
+        ],
+        max_workers=2,
+    )
+
+    # THEN
+    assert [result.payment.payment_request_id for result in results] == payment_request_ids
+    assert [result.will_succeed for result in results] == [True, False, False]
+    assert [result.failed_at for result in results] == [
+        None, PaymentFailedAt.TOKEN_BALANCE_OR_APPROVAL, PaymentFailedAt.TOKEN_BALANCE_OR_APPROVAL
+    ]
+
+
+def test_GIVEN_payments_to_restricted_payment_request_WHEN_batch_preflight_THEN_only_first_is_predicted_to_succeed(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner, from_address=payer.address)
+    erc_20.transfer(payer.address, 2 * TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, 2 * TOKEN_AMOUNT, {"from": payer})
+    payment: PendingPayment = PendingPayment(
+        payment_request=payment_request.address,
+        payment_request_id=payment_request_id,
+        token=erc_20.address,
+        payer=payer.address,
+    )
+
+    # WHEN
+    results: list[PreflightResult] = preflight_payments([payment, payment])
+
+    # THEN
+    assert [result.will_succeed for result in results] == [True, False]
+    assert results[1].failed_at == PaymentFailedAt.NOT_ENABLED
+    assert results[1].error.name == "PaymentRequestNotEnabled"
+    assert results[1].failed_because_of == 0
+    # the prediction matches what the chain does
+    assert payment_request.pay(payment_request_id, erc_20.address, {"from": payer}).status == Status.Confirmed
+    assert preflight_payment(
+        payment_request=payment_request.address,
+        payment_request_id=payment_request_id,
+        token=erc_20.address,
+        payer=payer.address,
+    ).failed_at == PaymentFailedAt.NOT_ENABLED
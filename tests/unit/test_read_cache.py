@@ -0,0 +1,146 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from brownie import PaymentRequest, MyERC20
+from brownie import accounts, web3
+from brownie.network.account import Account
+from eth_abi import encode_abi
+from web3.constants import ADDRESS_ZERO
+
+from scripts.utils.async_client import (
+    AsyncPaymentRequest,
+    AsyncPaymentRequestClient,
+    AsyncReceipt,
+    ContractCallException,
+    ReceiptData,
+    TokenAmountInfo,
+)
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.read_cache import ReadCache, get_call_key
+from tests.configuration import TOKEN_AMOUNT, create_static_payment_request
+
+CHAIN_ID: int = 1337
+ADDRESS: str = "0x0000000000000000000000000000000000000001"
+
+# the async client sends its requests over HTTP, to the endpoint of the node
+pytestmark = pytest.mark.requires_node
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def _get_calldata(selector: bytes, payment_request_id: int) -> bytes:
+    return selector + encode_abi(["uint256"], [payment_request_id])
+
+
+def test_GIVEN_immutable_reads_WHEN_cached_THEN_written_values_are_persisted_on_disk(tmp_path: Path, *args, **kwargs):
+    # GIVEN
+    db_path: Path = tmp_path / "reads.sqlite"
+    read_cache: ReadCache = ReadCache(db_path=db_path)
+    written_calldata: bytes = _get_calldata(AsyncPaymentRequest.GET_PAYMENT_PRECONDITION.selector, 1)
+    default_calldata: bytes = _get_calldata(AsyncPaymentRequest.GET_PAYMENT_PRECONDITION.selector, 2)
+    written: bytes = encode_abi(["address"], [ADDRESS])
+    default: bytes = encode_abi(["address"], [ADDRESS_ZERO])
+
+    # WHEN
+    is_written_cached: bool = read_cache.put_immutable(CHAIN_ID, ADDRESS, written_calldata, written)
+    is_default_cached: bool = read_cache.put_immutable(CHAIN_ID, ADDRESS, default_calldata, default)
+    read_cache.close()
+    reopened_read_cache: ReadCache = ReadCache(db_path=db_path)
+
+    # THEN
+    assert is_written_cached
+    assert not is_default_cached
+    assert reopened_read_cache.get_immutable(CHAIN_ID, ADDRESS, written_calldata) == written
+    assert reopened_read_cache.get_immutable(CHAIN_ID, ADDRESS, default_calldata) is None
+    assert not reopened_read_cache.is_immutable(_get_calldata(AsyncPaymentRequest.IS_ENABLED.selector, 1))
+
+    reopened_read_cache.invalidate_payment_request(CHAIN_ID, ADDRESS, 1)
+    assert reopened_read_cache.get_immutable(CHAIN_ID, ADDRESS, written_calldata) is None
+    reopened_read_cache.close()
+
+
+def test_GIVEN_mutable_reads_WHEN_newer_block_is_read_THEN_older_block_is_dropped(*args, **kwargs):
+    # GIVEN
+    read_cache: ReadCache = ReadCache()
+    calldata: bytes = _get_calldata(AsyncPaymentRequest.IS_ENABLED.selector, 1)
+    enabled: bytes = encode_abi(["bool"], [True])
+    disabled: bytes = encode_abi(["bool"], [False])
+    read_cache.put_mutable(CHAIN_ID, ADDRESS, calldata, 10, enabled)
+
+    # WHEN
+    cached_at_block: bytes = read_cache.get_mutable(CHAIN_ID, ADDRESS, calldata, 10)
+    cached_for_other_sender: bytes = read_cache.get_mutable(CHAIN_ID, ADDRESS, calldata, 10, sender=ADDRESS)
+    read_cache.put_mutable(CHAIN_ID, ADDRESS, calldata, 11, disabled)
+
+    # THEN
+    assert cached_at_block == enabled
+    assert cached_for_other_sender is None
+    assert read_cache.get_mutable(CHAIN_ID, ADDRESS, calldata, 10) is None
+    assert read_cache.get_mutable(CHAIN_ID, ADDRESS, calldata, 11) == disabled
+    assert get_call_key(CHAIN_ID, ADDRESS, calldata) != get_call_key(CHAIN_ID + 1, ADDRESS, calldata)
+
+
+def test_GIVEN_async_client_with_read_cache_WHEN_receipt_data_is_read_twice_THEN_node_is_called_once(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, TOKEN_AMOUNT, {"from": payer})
+    receipt_id: int = payment_request.pay(payment_request_id, erc_20.address, {"from": payer}).return_value
+    read_cache: ReadCache = ReadCache()
+
+    async def run() -> tuple[ReceiptData, ReceiptData, int]:
+        async with AsyncPaymentRequestClient(web3.provider.endpoint_uri, read_cache=read_cache) as client:
+            receipt: AsyncReceipt = await client.payment_request(payment_request.address).get_receipt()
+            first: ReceiptData = await receipt.get_receipt_data(receipt_id)
+            num_batches: int = client.rpc.num_batches
+            second: ReceiptData = await receipt.get_receipt_data(receipt_id)
+            return first, second, client.rpc.num_batches - num_batches
+
+    # WHEN
+    first, second, num_batches = asyncio.run(run())
+
+    # THEN
+    assert first == second
+    assert first.payment_request_id == payment_request_id
+    assert num_batches == 0
+    assert read_cache.stats.hits == 1
+
+
+def test_GIVEN_cached_reads_of_payment_request_WHEN_it_is_closed_THEN_reads_are_made_again(*args, **kwargs):
+    # GIVEN
+    owner: Account = accounts[0]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    read_cache: ReadCache = ReadCache()
+
+    async def run() -> tuple[list[TokenAmountInfo], list[TokenAmountInfo], int, ContractCallException]:
+        async with AsyncPaymentRequestClient(web3.provider.endpoint_uri, read_cache=read_cache) as client:
+            pr: AsyncPaymentRequest = client.payment_request(payment_request.address)
+            first: list[TokenAmountInfo] = await pr.get_static_token_amount_infos(payment_request_id)
+            second: list[TokenAmountInfo] = await pr.get_static_token_amount_infos(payment_request_id)
+            await pr.close(payment_request_id, sender=owner.address)
+            num_batches: int = client.rpc.num_batches
+            with pytest.raises(ContractCallException) as e:
+                await pr.get_static_token_amount_infos(payment_request_id)
+            return first, second, client.rpc.num_batches - num_batches, e.value
+
+    # WHEN
+    first, second, num_batches, error = asyncio.run(run())
+
+    # THEN
+    assert first == second == [(erc_20.address, TOKEN_AMOUNT)]
+    assert read_cache.stats.hits == 1
+    assert num_batches == 1
+    assert error.error is not None
+    assert error.error.name == "PaymentRequestIsClosed"
@@ -0,0 +1,55 @@
+import pytest
+from brownie import PaymentRequest, MyERC20, Receipt
+from brownie import accounts
+from brownie.network.account import Account
+from brownie.network.contract import ProjectContract
+from brownie.network.transaction import TransactionReceipt, Status
+
+from scripts.utils.contract import ContractBuilder
+from tests.configuration import TOKEN_AMOUNT, create_static_payment_request
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def _pay(payment_request: PaymentRequest, payment_request_id: int, erc_20: MyERC20, owner: Account, payer: Account) -> int:
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, TOKEN_AMOUNT, {"from": payer})
+    tx: TransactionReceipt = payment_request.pay(payment_request_id, erc_20.address, {"from": payer})
+    assert tx.status == Status.Confirmed
+    return tx.return_value
+
+
+def test_GIVEN_receipts_for_payment_request_WHEN_receipt_transferred_THEN_per_payment_request_enumeration_is_updated(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    recipient: Account = accounts[2]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    receipt: ProjectContract = Receipt.at(payment_request.receipt())
+
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    first_receipt_id: int = _pay(payment_request, payment_request_id, erc_20, owner, payer)
+    second_receipt_id: int = _pay(payment_request, payment_request_id, erc_20, owner, payer)
+
+    assert receipt.balanceOfForPaymentRequestId(payment_request_id, payer.address) == 2
+    assert receipt.receiptIdOfOwnerForPaymentRequestIdByIndex(payment_request_id, payer.address, 0) == first_receipt_id
+    assert receipt.receiptIdOfOwnerForPaymentRequestIdByIndex(payment_request_id, payer.address, 1) == second_receipt_id
+
+    # WHEN
+    tx: TransactionReceipt = receipt.transferFrom(payer.address, recipient.address, first_receipt_id, {"from": payer})
+
+    # THEN
+    assert tx.status == Status.Confirmed
+    assert receipt.ownerOf(first_receipt_id) == recipient.address
+    assert receipt.balanceOfForPaymentRequestId(payment_request_id, payer.address) == 1
+    assert receipt.balanceOfForPaymentRequestId(payment_request_id, recipient.address) == 1
+    assert receipt.receiptIdOfOwnerForPaymentRequestIdByIndex(payment_request_id, payer.address, 0) == second_receipt_id
+    assert receipt.receiptIdOfOwnerForPaymentRequestIdByIndex(payment_request_id, recipient.address, 0) == first_receipt_id
+    assert receipt.totalSupplyForPaymentRequestId(payment_request_id) == 2
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from brownie import PaymentRequest, MyERC20, Receipt, SharedReceipt
+from brownie import accounts, web3
+from brownie.network.account import Account
+
+from scripts.utils.async_client import AsyncPaymentRequestClient
+from scripts.utils.contract import ContractBuilder
+from scripts.utils.receipt_verification import (
+    BloomFilter,
+    ReceiptVerificationService,
+    VerificationResult,
+    VerifiedReceipt,
+)
+from tests.configuration import TOKEN_AMOUNT, create_static_payment_request
+
+# the async client sends its requests over HTTP, to the endpoint of the node
+pytestmark = pytest.mark.requires_node
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def _pay(
+    payment_request: PaymentRequest, payment_request_id: int, erc_20: MyERC20, owner: Account, payer: Account
+) -> int:
+    erc_20.transfer(payer.address, TOKEN_AMOUNT, {"from": owner})
+    erc_20.approve(payment_request.address, TOKEN_AMOUNT, {"from": payer})
+    return payment_request.pay(payment_request_id, erc_20.address, {"from": payer}).return_value
+
+
+def test_GIVEN_bloom_filter_WHEN_items_added_THEN_there_are_no_false_negatives(*args, **kwargs):
+    # GIVEN
+    bloom_filter: BloomFilter = BloomFilter(1_000)
+    items: list[bytes] = [i.to_bytes(32, "big") for i in range(1_000)]
+
+    # WHEN
+    item: bytes
+    for item in items:
+        bloom_filter.add(item)
+
+    # THEN
+    assert all(item in bloom_filter for item in items)
+    num_false_positives: int = sum(i.to_bytes(32, "big") in bloom_filter for i in range(1_000, 11_000))
+    assert num_false_positives < 300
+
+
+def test_GIVEN_verification_service_WHEN_receipts_are_minted_and_transferred_THEN_answers_follow_the_events(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    holder: Account = accounts[2]
+    late_payer: Account = accounts[3]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    payment_request: PaymentRequest = contract_builder.PaymentRequest
+    erc_20: MyERC20 = contract_builder.MyERC20
+    receipt: Receipt = Receipt.at(payment_request.receipt())
+    payment_request_id: int = create_static_payment_request(payment_request, erc_20, owner)
+    receipt_ids: list[int] = [_pay(payment_request, payment_request_id, erc_20, owner, payer) for _ in range(2)]
+
+    async def run() -> tuple[VerificationResult, VerificationResult, VerificationResult, VerificationResult, int, dict]:
+        async with AsyncPaymentRequestClient(web3.provider.endpoint_uri) as client:
+            service: ReceiptVerificationService = ReceiptVerificationService(
+                client=client, payment_request=payment_request.address, confirmations=0
+            )
+            await service.bootstrap()
+            bootstrapped: VerificationResult = service.index.verify(payment_request_id, payer.address)
+            not_paid: VerificationResult = service.index.verify(payment_request_id, late_payer.address)
+
+            receipt.transferFrom(payer.address, holder.address, receipt_ids[0], {"from": payer})
+            late_receipt_id: int = _pay(payment_request, payment_request_id, erc_20, owner, late_payer)
+            await service.sync()
+            transferred: VerificationResult = service.index.verify(payment_request_id, payer.address)
+            late_paid: VerificationResult = service.index.verify(payment_request_id, late_payer.address)
+
+            async with TestClient(TestServer(service.make_app())) as http_client:
+                response = await http_client.get(
+                    "/verify", params={"payment_request_id": payment_request_id, "payer": payer.address.lower()}
+                )
+                assert response.status == 200
+                response_json: dict = await response.json()
+            return bootstrapped, not_paid, transferred, late_paid, late_receipt_id, response_json
+
+    # WHEN
+    bootstrapped, not_paid, transferred, late_paid, late_receipt_id, response_json = asyncio.run(run())
+
+    # THEN
+    assert bootstrapped.receipts == tuple(
+        VerifiedReceipt(receipt_id=receipt_id, holder=payer.address, token=erc_20.address, token_amount=TOKEN_AMOUNT)
+        for receipt_id in receipt_ids
+    )
+    assert not not_paid.has_paid
+    assert [receipt.holder for receipt in transferred.receipts] == [holder.address, payer.address]
+    assert [receipt.receipt_id for receipt in late_paid.receipts] == [late_receipt_id]
+    assert response_json == transferred.to_json()
+
+
+def test_GIVEN_shared_receipt_WHEN_same_id_of_other_payment_request_is_paid_THEN_only_own_receipts_are_indexed(
+    *args, **kwargs
+):
+    # GIVEN
+    owner: Account = accounts[0]
+    payer: Account = accounts[1]
+    contract_builder: ContractBuilder = ContractBuilder(account=owner, force_deploy=True)
+    shared_receipt: SharedReceipt = contract_builder.SharedReceipt
+    payment_requests: list[PaymentRequest] = [
+        ContractBuilder.get_payment_request_contract(account=owner, receipt=shared_receipt, force_deploy=True)
+        for _ in range(2)
+    ]
+    erc_20: MyERC20 = contract_builder.MyERC20
+    payment_request_ids: list[int] = [
+        create_static_payment_request(payment_request, erc_20, owner) for payment_request in payment_requests
+    ]
+    receipt_ids: list[int] = [
+        _pay(payment_request, payment_request_id, erc_20, owner, payer)
+        for payment_request, payment_request_id in zip(payment_requests, payment_request_ids)
+    ]
+
+    async def run() -> VerificationResult:
+        async with AsyncPaymentRequestClient(web3.provider.endpoint_uri) as client:
+            service: ReceiptVerificationService = ReceiptVerificationService(
+                client=client, payment_request=payment_requests[0].address, confirmations=0
+            )
+            await service.bootstrap()
+            return service.index.verify(payment_request_ids[0], payer.address)
+
+    # WHEN
+    result: VerificationResult = asyncio.run(run())
+
+    # THEN
+    assert payment_request_ids[0] == payment_request_ids[1]
+    # the Receipt mixes the Receipts of both PaymentRequest contracts
+    assert (
+        list(shared_receipt.getReceiptIdsForPaymentRequestPaidBy(payment_request_ids[0], payer.address)) == receipt_ids
+    )
+    assert [receipt.receipt_id for receipt in result.receipts] == [receipt_ids[0]]
@@ -0,0 +1,38 @@
+from scripts.utils.tracing import SpanSummary, Tracer
+
+
+def test_GIVEN_disabled_tracer_WHEN_span_entered_THEN_nothing_is_recorded(*args, **kwargs):
+    # GIVEN
+    tracer: Tracer = Tracer(enabled=False)
+
+    # WHEN
+    with tracer.span("deploy"):
+        pass
+
+    # THEN
+    assert tracer.spans == []
+    assert tracer.to_chrome_trace()["traceEvents"] == []
+
+
+def test_GIVEN_enabled_tracer_WHEN_nested_spans_entered_THEN_chrome_trace_and_summary_are_produced(*args, **kwargs):
+    # GIVEN
+    tracer: Tracer = Tracer(enabled=True)
+
+    # WHEN
+    with tracer.span("create_payment_request", category="test_harness"):
+        with tracer.span("deploy", category="deploy", contract="MyERC20"):
+            pass
+        with tracer.span("deploy", category="deploy", contract="PaymentRequest"):
+            pass
+
+    # THEN
+    trace_events: list[dict] = tracer.to_chrome_trace()["traceEvents"]
+    assert [event["name"] for event in trace_events] == ["deploy", "deploy", "create_payment_request"]
+    assert all(event["ph"] == "X" for event in trace_events)
+    assert trace_events[0]["args"] == {"contract": "MyERC20"}
+    assert trace_events[2]["ts"] <= trace_events[0]["ts"]
+    assert trace_events[2]["dur"] >= trace_events[0]["dur"] + trace_events[1]["dur"]
+
+    summaries: list[SpanSummary] = tracer.summarize()
+    assert [summary.name for summary in summaries] == ["create_payment_request", "deploy"]
+    assert summaries[1].count == 2
@@ -0,0 +1,53 @@
+import pytest
+
+from scripts.utils.workers import (
+    ACCOUNTS_PER_WORKER,
+    XDIST_WORKER_COUNT_ENV_VAR,
+    XDIST_WORKER_ENV_VAR,
+    get_worker_account_index_range,
+    get_worker_index,
+)
+
+
+@pytest.fixture(autouse=True)
+def shared_setup(fn_isolation):
+    pass
+
+
+def test_GIVEN_no_xdist_worker_WHEN_account_index_range_remapped_THEN_it_is_unchanged(monkeypatch, *args, **kwargs):
+    # GIVEN
+    monkeypatch.delenv(XDIST_WORKER_ENV_VAR, raising=False)
+
+    # WHEN
+    index_range: tuple[int, int] = get_worker_account_index_range(3, 9)
+
+    # THEN
+    assert get_worker_index() == 0
+    assert index_range == (3, 9)
+
+
+def test_GIVEN_xdist_workers_WHEN_account_index_ranges_remapped_THEN_they_are_disjoint(monkeypatch, *args, **kwargs):
+    # GIVEN
+    worker_count: int = 4
+    monkeypatch.setenv(XDIST_WORKER_COUNT_ENV_VAR, str(worker_count))
+
+    # WHEN
+    account_indexes: list[set[int]] = []
+    for worker_index in range(worker_count):
+        monkeypatch.setenv(XDIST_WORKER_ENV_VAR, f"gw{worker_index}")
+        start, end = get_worker_account_index_range(0, ACCOUNTS_PER_WORKER - 1)
+        account_indexes.append(set(range(start, end + 1)))
+
+    # THEN
+    assert set.union(*account_indexes) == set(range(ACCOUNTS_PER_WORKER * worker_count))
+    assert sum(len(indexes) for indexes in account_indexes) == ACCOUNTS_PER_WORKER * worker_count
+
+
+def test_GIVEN_range_outside_of_worker_accounts_WHEN_remapped_THEN_exception_is_raised(*args, **kwargs):
+    # GIVEN
+    start: int = 0
+    end: int = ACCOUNTS_PER_WORKER
+
+    # WHEN / THEN
+    with pytest.raises(ValueError):
+        get_worker_account_index_range(start, end)